@@ -850,9 +850,9 @@ def _stream_chat_completion(payload, api_key):
         raise RuntimeError(original_error)
 
 
-def get_tutor_system_prompt(student, subject=None):
-    """Generate context-aware system prompt for AI tutor"""
-    from .models import Subject, SchoolInfo
+def _build_profile_context(student):
+    """Core tutor instructions personalised with the student profile."""
+    from .models import SchoolInfo
 
     try:
         school_info = SchoolInfo.objects.first()
@@ -1397,95 +1397,167 @@ LOCALIZED FINAL ASSESSMENT LOGIC
 - Final checks and stress-test questions must reference the learner's local environment and daily context.
 - Example (Ghana): "Imagine you are at Kejetia Market. You push a heavy crate of yams and it does not move. Using static friction, explain why the crate 'fights back' and how mass changes the required force."
 """
-    
+    return context
+
+
+def _build_enrolled_subjects_context(student):
+    from .models import Subject
+
+    if not student.current_class:
+        return ""
+    try:
+        names = list(
+            Subject.objects.filter(classsubject__class_name=student.current_class)
+            .distinct().values_list('name', flat=True)
+        )
+    except Exception:
+        return ""
+    return f"\n\nStudent's Subjects: {', '.join(names)}" if names else ""
+
+
+def _build_session_state_context(student):
+    """Resume cross-session lesson progress (Shared State Manager)."""
+    try:
+        from .gamification_models import AuraSessionState
+        _aura_state = AuraSessionState.objects.filter(student=student).first()
+        if _aura_state:
+            return _aura_state.as_prompt_injection()
+    except Exception:
+        pass
+    return ""
+
+
+def _build_scheme_of_work_context(student, subject=None):
+    """Curriculum topic sequence from the teacher's scheme of work for this class/subject."""
+    try:
+        from .models import SchemeOfWork, AcademicYear as _AY, ClassSubject as _CS
+        if not (subject and student.current_class):
+            return ""
+        _cy = _AY.objects.filter(is_current=True).first()
+        if not _cy:
+            return ""
+        _cs = _CS.objects.filter(
+            class_name=student.current_class, subject=subject
+        ).first()
+        if not _cs:
+            return ""
+        _scheme = SchemeOfWork.objects.filter(
+            class_subject=_cs, academic_year=_cy
+        ).order_by('-uploaded_at').first()
+        _topics = _scheme.get_topics() if _scheme else None
+        if not _topics:
+            return ""
+        context = (
+            "\n\n─── TEACHER'S TERMLY SCHEME OF WORK ───\n"
+            "The teacher has uploaded their official scheme of work for this class and subject.\n"
+            "You MUST follow this topic sequence when deciding what to teach.\n"
+            "Do not skip ahead or introduce topics not in this list without student mastery of prior topics.\n"
+            "Topics (in order):\n"
+        )
+        for _i, _t in enumerate(_topics, 1):
+            context += f"  {_i}. {_t}\n"
+        context += (
+            "When the student starts a new session, pick up from the topic they are most \n"
+            "likely to be studying based on the current week of term.\n"
+        )
+        return context
+    except Exception:
+        return ""
+
+
+def get_tutor_system_prompt(student, subject=None):
+    """Generate context-aware system prompt for AI tutor.
+
+    Every section is a prompt-cache segment (academics.prompt_cache) that is
+    rebuilt only when the rows behind it change, so a chat turn normally
+    assembles the prompt without touching the database.
+    """
+    from .prompt_cache import Segment, load_segments
+
+    subject_id = subject.pk if subject else ''
+    class_id = student.current_class_id or ''
+    now = timezone.now()
+
+    segments = load_segments(student, [
+        # Age is derived from today's date, so the profile varies per day.
+        Segment('profile', ('student', 'user', 'school', 'class_subjects'),
+                lambda: _build_profile_context(student), extra=now.date().isoformat()),
+        Segment('subjects', ('class_subjects',),
+                lambda: _build_enrolled_subjects_context(student), extra=class_id),
+        Segment('grades', ('grades', 'academic_year', 'class_subjects'),
+                lambda: _build_grade_performance_context(student, subject), extra=subject_id),
+        Segment('memory', ('memory',),
+                lambda: _build_learner_memory_context(student)),
+        Segment('power_words', ('power_words',),
+                lambda: _build_power_word_warmup_context(student)),
+        # Timetable rows for today/tomorrow; rendered against the clock below.
+        Segment('schedule', ('timetable', 'class_subjects'),
+                lambda: _load_schedule_entries(student, now), extra=f'{class_id}:{now.weekday()}'),
+        _linguistic_segment(student),
+        Segment('session_state', ('aura_state',),
+                lambda: _build_session_state_context(student)),
+        Segment('scheme', ('scheme', 'class_subjects', 'academic_year'),
+                lambda: _build_scheme_of_work_context(student, subject), extra=f'{class_id}:{subject_id}'),
+    ])
+
+    context = segments['profile']
+
     if subject:
         context += f"\n\nCurrent Subject Focus: {subject.name}"
         if subject.description:
             context += f"\nSubject Description: {subject.description}"
-    
+
     # Add student's enrolled subjects
-    if student.current_class:
-        try:
-            enrolled_subjects = Subject.objects.filter(
-                classsubject__class_name=student.current_class
-            ).distinct()
-            if enrolled_subjects.exists():
-                context += f"\n\nStudent's Subjects: {', '.join([s.name for s in enrolled_subjects])}"
-        except Exception:
-            pass
+    context += segments['subjects']
 
     # ── CONTINUOUS CONTEXT AWARENESS: Grade Performance Trends ────────
-    context += _build_grade_performance_context(student, subject)
+    context += segments['grades']
 
     # ── CONTINUOUS CONTEXT AWARENESS: Learner Memory Brief ───────────
-    context += _build_learner_memory_context(student)
+    context += segments['memory']
 
     # ── CONTINUOUS CONTEXT AWARENESS: Power Word Warmup ──────────────
-    context += _build_power_word_warmup_context(student)
+    context += segments['power_words']
 
     # ── CONTINUOUS CONTEXT AWARENESS: Timetable / Daily Schedule ──────
-    context += _build_schedule_context(student)
+    context += _render_schedule_context(segments['schedule'], now)
 
     # ── LINGUISTIC CHAMELEON — voice, culture, cognitive stage ────────
     # Augment with the richer SchoolPadi Linguistic Profile built in views_ai
-    try:
-        from students.views_ai import _build_student_context
-        linguistic_profile = _build_student_context(student)
-        if linguistic_profile:
-            context += (
-                "\n\n─── SCHOOLPADI LINGUISTIC CHAMELEON PROFILE ───\n"
-                "Use every line below to tutor in a culturally resonant, "
-                "cognitively calibrated way throughout the entire session.\n"
-                + linguistic_profile
-            )
-    except Exception:
-        pass  # never block on this
+    linguistic_profile = segments['linguistic']
+    if linguistic_profile:
+        context += (
+            "\n\n─── SCHOOLPADI LINGUISTIC CHAMELEON PROFILE ───\n"
+            "Use every line below to tutor in a culturally resonant, "
+            "cognitively calibrated way throughout the entire session.\n"
+            + linguistic_profile
+        )
 
     # ── SHARED STATE MANAGER: resume cross-session lesson progress ──────────────────
-    try:
-        from .gamification_models import AuraSessionState
-        _aura_state = AuraSessionState.objects.filter(student=student).first()
-        if _aura_state:
-            context += _aura_state.as_prompt_injection()
-    except Exception:
-        pass
+    context += segments['session_state']
 
     context += "\n\nAlways maintain an encouraging, supportive tone. Keep responses concise, structured, and cognitively active."
 
     # ── SCHEME OF WORK: curriculum topic sequence for this class/subject ─────
-    try:
-        from .models import SchemeOfWork, AcademicYear as _AY, ClassSubject as _CS
-        _cy = _AY.objects.filter(is_current=True).first()
-        if _cy and subject and student.current_class:
-            _cs = _CS.objects.filter(
-                class_name=student.current_class, subject=subject
-            ).first()
-            if _cs:
-                _scheme = SchemeOfWork.objects.filter(
-                    class_subject=_cs, academic_year=_cy
-                ).order_by('-uploaded_at').first()
-                if _scheme:
-                    _topics = _scheme.get_topics()
-                    if _topics:
-                        context += (
-                            "\n\n─── TEACHER'S TERMLY SCHEME OF WORK ───\n"
-                            "The teacher has uploaded their official scheme of work for this class and subject.\n"
-                            "You MUST follow this topic sequence when deciding what to teach.\n"
-                            "Do not skip ahead or introduce topics not in this list without student mastery of prior topics.\n"
-                            "Topics (in order):\n"
-                        )
-                        for _i, _t in enumerate(_topics, 1):
-                            context += f"  {_i}. {_t}\n"
-                        context += (
-                            "When the student starts a new session, pick up from the topic they are most \n"
-                            "likely to be studying based on the current week of term.\n"
-                        )
-    except Exception:
-        pass
+    context += segments['scheme']
 
     return context
 
 
+def _linguistic_segment(student):
+    """The SchoolPadi Linguistic Profile segment (students.views_ai)."""
+    from .prompt_cache import Segment
+
+    def _build():
+        try:
+            from students.views_ai import _compose_student_context
+            return _compose_student_context(student)
+        except Exception:
+            return ""  # never block on this
+
+    return Segment('linguistic', ('student', 'user', 'grades', 'academic_year', 'class_subjects'), _build)
+
+
 def _build_grade_performance_context(student, subject=None):
     """
     Query the student's actual Grade records and build a compact
@@ -1615,24 +1687,21 @@ def _build_power_word_warmup_context(student):
         return ""
 
 
-def _build_schedule_context(student):
+def _load_schedule_entries(student, now=None):
     """
-    Query the student's timetable and build a compact schedule brief
-    for today and tomorrow so SchoolPadi can proactively review lessons.
+    Today's and tomorrow's timetable rows for the student's class as plain
+    tuples ``(day, start_time, end_time, subject, teacher, room)``.
     """
     try:
         from .models import Timetable
-        from datetime import timedelta
 
         if not student.current_class:
-            return ""
+            return []
 
-        now = timezone.now()
+        now = now or timezone.now()
         today_dow = now.weekday()          # 0=Mon … 6=Sun
         tomorrow_dow = (today_dow + 1) % 7
-        current_time = now.time()
 
-        # Fetch all entries for today and tomorrow for this class
         entries = (
             Timetable.objects.filter(
                 class_subject__class_name=student.current_class,
@@ -1641,70 +1710,94 @@ def _build_schedule_context(student):
             .select_related('class_subject__subject', 'class_subject__teacher__user')
             .order_by('day', 'start_time')
         )
+        rows = []
+        for e in entries:
+            teacher = ''
+            if e.class_subject.teacher and e.class_subject.teacher.user:
+                teacher = e.class_subject.teacher.user.get_full_name()
+            rows.append((e.day, e.start_time, e.end_time, e.class_subject.subject.name, teacher, e.room))
+        return rows
+    except Exception:
+        return []
 
-        if not entries.exists():
-            return ""
 
-        day_names = {0: 'Monday', 1: 'Tuesday', 2: 'Wednesday',
-                     3: 'Thursday', 4: 'Friday', 5: 'Saturday', 6: 'Sunday'}
+def _render_schedule_context(entries, now):
+    """
+    Compact schedule brief for today and tomorrow so SchoolPadi can
+    proactively review lessons.  ``entries`` come from ``_load_schedule_entries``.
+    """
+    if not entries:
+        return ""
 
-        today_entries = [e for e in entries if e.day == today_dow]
-        tomorrow_entries = [e for e in entries if e.day == tomorrow_dow]
+    today_dow = now.weekday()
+    tomorrow_dow = (today_dow + 1) % 7
+    current_time = now.time()
+
+    day_names = {0: 'Monday', 1: 'Tuesday', 2: 'Wednesday',
+                 3: 'Thursday', 4: 'Friday', 5: 'Saturday', 6: 'Sunday'}
+
+    today_entries = [e for e in entries if e[0] == today_dow]
+    tomorrow_entries = [e for e in entries if e[0] == tomorrow_dow]
+
+    lines = ["\n\nSTUDENT TIMETABLE CONTEXT"]
+    lines.append(f"  Current date/time: {now.strftime('%A %B %d, %Y %I:%M %p')}")
+
+    def format_entry(e):
+        _day, start, end, subj, teacher_name, room_name = e
+        t_start = start.strftime('%I:%M %p')
+        t_end = end.strftime('%I:%M %p')
+        teacher = f' (Teacher: {teacher_name})' if teacher_name else ''
+        room = f' [{room_name}]' if room_name else ''
+        return f"{t_start}-{t_end}: {subj}{teacher}{room}"
+
+    if today_entries:
+        lines.append(f"\n  Today ({day_names.get(today_dow, '?')}):")
+        completed = []
+        upcoming = []
+        for e in today_entries:
+            if e[2] <= current_time:
+                completed.append(e)
+            else:
+                upcoming.append(e)
+
+        if completed:
+            lines.append("    Already completed:")
+            for e in completed:
+                lines.append(f"      ✓ {format_entry(e)}")
+        if upcoming:
+            lines.append("    Still coming:")
+            for e in upcoming:
+                lines.append(f"      → {format_entry(e)}")
+
+        # Determine school status
+        if not upcoming and completed:
+            last_end = max(e[2] for e in completed)
+            lines.append(f"    STATUS: School day is OVER (last class ended at {last_end.strftime('%I:%M %p')}).")
+            lines.append("    → AFTER-SCHOOL MODE: Proactively offer to review today's lessons. Summarize key concepts from each subject and quiz the student.")
+        elif upcoming and not completed:
+            lines.append("    STATUS: School has not started yet.")
+            lines.append("    → PRE-SCHOOL MODE: Offer a quick preview of today's subjects to prime the student.")
+    else:
+        lines.append(f"\n  Today ({day_names.get(today_dow, '?')}): No classes scheduled.")
 
-        lines = ["\n\nSTUDENT TIMETABLE CONTEXT"]
-        lines.append(f"  Current date/time: {now.strftime('%A %B %d, %Y %I:%M %p')}")
+    if tomorrow_entries:
+        lines.append(f"\n  Tomorrow ({day_names.get(tomorrow_dow, '?')}):")
+        for e in tomorrow_entries:
+            lines.append(f"    → {format_entry(e)}")
+        lines.append("    → When reviewing today's lessons, also preview what's coming tomorrow to help the student prepare.")
+    else:
+        lines.append(f"\n  Tomorrow ({day_names.get(tomorrow_dow, '?')}): No classes scheduled.")
 
-        def format_entry(e):
-            subj = e.class_subject.subject.name
-            t_start = e.start_time.strftime('%I:%M %p')
-            t_end = e.end_time.strftime('%I:%M %p')
-            teacher = ''
-            if e.class_subject.teacher and e.class_subject.teacher.user:
-                teacher = f' (Teacher: {e.class_subject.teacher.user.get_full_name()})'
-            room = f' [{e.room}]' if e.room else ''
-            return f"{t_start}-{t_end}: {subj}{teacher}{room}"
-
-        if today_entries:
-            lines.append(f"\n  Today ({day_names.get(today_dow, '?')}):")
-            completed = []
-            upcoming = []
-            for e in today_entries:
-                if e.end_time <= current_time:
-                    completed.append(e)
-                else:
-                    upcoming.append(e)
-
-            if completed:
-                lines.append("    Already completed:")
-                for e in completed:
-                    lines.append(f"      ✓ {format_entry(e)}")
-            if upcoming:
-                lines.append("    Still coming:")
-                for e in upcoming:
-                    lines.append(f"      → {format_entry(e)}")
-
-            # Determine school status
-            if not upcoming and completed:
-                last_end = max(e.end_time for e in completed)
-                lines.append(f"    STATUS: School day is OVER (last class ended at {last_end.strftime('%I:%M %p')}).")
-                lines.append("    → AFTER-SCHOOL MODE: Proactively offer to review today's lessons. Summarize key concepts from each subject and quiz the student.")
-            elif upcoming and not completed:
-                lines.append("    STATUS: School has not started yet.")
-                lines.append("    → PRE-SCHOOL MODE: Offer a quick preview of today's subjects to prime the student.")
-        else:
-            lines.append(f"\n  Today ({day_names.get(today_dow, '?')}): No classes scheduled.")
+    return "\n".join(lines)
 
-        if tomorrow_entries:
-            lines.append(f"\n  Tomorrow ({day_names.get(tomorrow_dow, '?')}):")
-            for e in tomorrow_entries:
-                lines.append(f"    → {format_entry(e)}")
-            lines.append("    → When reviewing today's lessons, also preview what's coming tomorrow to help the student prepare.")
-        else:
-            lines.append(f"\n  Tomorrow ({day_names.get(tomorrow_dow, '?')}): No classes scheduled.")
 
-        return "\n".join(lines)
-    except Exception:
-        return ""
+def _build_schedule_context(student):
+    """
+    Query the student's timetable and build a compact schedule brief
+    for today and tomorrow so SchoolPadi can proactively review lessons.
+    """
+    now = timezone.now()
+    return _render_schedule_context(_load_schedule_entries(student, now), now)
 
 
 def get_student_schedule_data(student):
@@ -0,0 +1,308 @@
+"""
+School analytics cubes.
+
+The admin dashboard and ``school_analytics`` used to recompute fee status
+counts, 30 days of attendance, per-class grade averages and a grade
+histogram (a Python loop over every ``total_score`` of the year) on every
+page load.  They now read the small summary tables in
+``academics.analytics_models``:
+
+  * ``AttendanceDailyCube``   — present/absent/late/excused per class per day
+  * ``GradeDistributionCube`` — grade count and score sum per
+                                class/subject/term/letter bucket
+  * ``FeeStatusCube``         — count, amount payable and amount paid per
+                                fee status
+
+Maintenance is incremental.  post_save/post_delete receivers
+(``academics.signals``) record the slice a write touched — one attendance
+date, one (academic year, term), or the fee cube — in
+``AnalyticsStaleScope``.  Every reader first rebuilds only the stale slices
+with one GROUP BY query each, so a busy term costs the head teacher a few
+small reads instead of full table scans.  Bulk writes that bypass signals
+(``bulk_create`` / ``update``) call ``mark_stale`` directly, and the nightly
+job recomputes everything to pick up class moves::
+
+    python manage.py all_tenants_command rebuild_analytics_cubes
+
+Readers::
+
+    from academics import analytics
+    analytics.attendance_by_day(start, end)      # {date: present}
+    analytics.attendance_rate()                  # 0-100
+    analytics.grade_distribution(year)           # OrderedDict bucket -> n
+    analytics.class_grade_averages()             # [(class name, avg)]
+    analytics.fee_summary()                      # counts and totals
+"""
+import logging
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, CharField, Count, Q, Sum, Value, When
+
+logger = logging.getLogger(__name__)
+
+# Letter buckets used by the analytics histogram: (label, minimum score).
+GRADE_BUCKETS = (
+    ('A+', 90),
+    ('A', 80),
+    ('B+', 70),
+    ('B', 60),
+    ('C', 50),
+    ('F', 0),
+)
+
+ATTENDANCE_STATUSES = ('present', 'absent', 'late', 'excused')
+FEE_STATUSES = ('paid', 'partial', 'unpaid')
+
+
+def grade_bucket(score):
+    """Letter bucket for a total score (``None`` → ``None``)."""
+    if score is None:
+        return None
+    score = float(score)
+    for label, minimum in GRADE_BUCKETS:
+        if score >= minimum:
+            return label
+    return GRADE_BUCKETS[-1][0]
+
+
+def _bucket_expression(field='total_score'):
+    """SQL CASE equivalent of ``grade_bucket``."""
+    return Case(
+        *[When(**{f'{field}__gte': minimum}, then=Value(label)) for label, minimum in GRADE_BUCKETS[:-1]],
+        default=Value(GRADE_BUCKETS[-1][0]),
+        output_field=CharField(),
+    )
+
+
+def grade_scope(academic_year_id, term):
+    return f'{academic_year_id}:{term}'
+
+
+# ── Staleness tracking ─────────────────────────────────────────
+
+def mark_stale(cube, scopes):
+    """Record that ``scopes`` of ``cube`` must be rebuilt before the next read.
+
+    One ``INSERT … ON CONFLICT DO NOTHING`` regardless of how many scopes.
+    Never raises — a failed mark must not break a save.
+    """
+    from academics.analytics_models import AnalyticsStaleScope
+    if isinstance(scopes, str):
+        scopes = [scopes]
+    rows = [AnalyticsStaleScope(cube=cube, scope=str(s)) for s in set(scopes)]
+    if not rows:
+        return
+    try:
+        with transaction.atomic():
+            AnalyticsStaleScope.objects.bulk_create(rows, ignore_conflicts=True)
+    except Exception:
+        logger.exception('Could not mark %s analytics cube stale', cube)
+
+
+def refresh_stale(cube):
+    """Rebuild every stale slice of ``cube``. Returns the number rebuilt.
+
+    Stale rows are claimed with ``SKIP LOCKED`` so concurrent readers never
+    rebuild the same slice twice, and deleted before the rebuild: a
+    ``mark_stale`` made meanwhile waits for this transaction and then
+    inserts a fresh row instead of conflicting with the claimed one.  A
+    failed rebuild rolls the delete back.
+    """
+    from academics.analytics_models import AnalyticsStaleScope
+    try:
+        with transaction.atomic():
+            claimed = list(
+                AnalyticsStaleScope.objects
+                .select_for_update(skip_locked=True)
+                .filter(cube=cube)
+                .values_list('id', 'scope')
+            )
+            if not claimed:
+                return 0
+            AnalyticsStaleScope.objects.filter(id__in=[i for i, _s in claimed]).delete()
+            scopes = [scope for _id, scope in claimed]
+            if cube == 'attendance':
+                rebuild_attendance(dates=scopes)
+            elif cube == 'grades':
+                for scope in scopes:
+                    year_id, _, term = scope.partition(':')
+                    rebuild_grades(academic_year_id=int(year_id), term=term)
+            elif cube == 'fees':
+                rebuild_fees()
+            return len(claimed)
+    except Exception:
+        logger.exception('Analytics cube refresh failed for %s', cube)
+        return 0
+
+
+# ── Rebuilders ─────────────────────────────────────────────────
+
+def rebuild_attendance(dates=None):
+    """Recompute ``AttendanceDailyCube`` for ``dates`` (all dates if None)."""
+    from academics.analytics_models import AttendanceDailyCube
+    from students.models import Attendance
+
+    source = Attendance.objects.all()
+    cube = AttendanceDailyCube.objects.all()
+    if dates is not None:
+        source = source.filter(date__in=dates)
+        cube = cube.filter(date__in=dates)
+
+    rows = (
+        source.values('date', 'student__current_class')
+        .annotate(
+            total=Count('id'),
+            **{s: Count('id', filter=Q(status=s)) for s in ATTENDANCE_STATUSES},
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        cube.delete()
+        AttendanceDailyCube.objects.bulk_create([
+            AttendanceDailyCube(
+                date=r['date'],
+                school_class_id=r['student__current_class'],
+                total=r['total'],
+                **{s: r[s] for s in ATTENDANCE_STATUSES},
+            )
+            for r in rows
+        ], batch_size=500)
+
+
+def rebuild_grades(academic_year_id=None, term=None):
+    """Recompute ``GradeDistributionCube`` for one (year, term) or everything."""
+    from academics.analytics_models import GradeDistributionCube
+    from students.models import Grade
+
+    source = Grade.objects.all()
+    cube = GradeDistributionCube.objects.all()
+    if academic_year_id is not None:
+        source = source.filter(academic_year_id=academic_year_id, term=term)
+        cube = cube.filter(academic_year_id=academic_year_id, term=term)
+
+    rows = (
+        source.annotate(bucket=_bucket_expression())
+        .values('academic_year', 'term', 'student__current_class', 'subject', 'bucket')
+        .annotate(count=Count('id'), score_sum=Sum('total_score'))
+        .order_by()
+    )
+    with transaction.atomic():
+        cube.delete()
+        GradeDistributionCube.objects.bulk_create([
+            GradeDistributionCube(
+                academic_year_id=r['academic_year'],
+                term=r['term'],
+                school_class_id=r['student__current_class'],
+                subject_id=r['subject'],
+                bucket=r['bucket'],
+                count=r['count'],
+                score_sum=r['score_sum'] or 0,
+            )
+            for r in rows
+        ], batch_size=500)
+
+
+def rebuild_fees():
+    """Recompute ``FeeStatusCube`` (one row per status)."""
+    from academics.analytics_models import FeeStatusCube
+    from finance.models import Payment, StudentFee
+
+    fees = {
+        r['status']: r
+        for r in StudentFee.objects.values('status')
+        .annotate(count=Count('id'), payable=Sum('amount_payable')).order_by()
+    }
+    paid = dict(
+        Payment.objects.values('student_fee__status')
+        .annotate(total=Sum('amount')).order_by()
+        .values_list('student_fee__status', 'total')
+    )
+    with transaction.atomic():
+        FeeStatusCube.objects.all().delete()
+        FeeStatusCube.objects.bulk_create([
+            FeeStatusCube(
+                status=status,
+                count=fees.get(status, {}).get('count', 0),
+                amount_payable=fees.get(status, {}).get('payable') or 0,
+                amount_paid=paid.get(status) or 0,
+            )
+            for status in set(fees) | set(paid)
+        ])
+
+
+def rebuild_all():
+    """Recompute every cube from scratch and clear all stale marks."""
+    from academics.analytics_models import AnalyticsStaleScope
+    with transaction.atomic():
+        rebuild_attendance()
+        rebuild_grades()
+        rebuild_fees()
+        AnalyticsStaleScope.objects.all().delete()
+
+
+# ── Readers ────────────────────────────────────────────────────
+
+def attendance_by_day(start, end, status='present'):
+    """``{date: count}`` of ``status`` records between ``start`` and ``end``."""
+    from academics.analytics_models import AttendanceDailyCube
+    refresh_stale('attendance')
+    return dict(
+        AttendanceDailyCube.objects
+        .filter(date__gte=start, date__lte=end)
+        .values('date').annotate(n=Sum(status)).order_by()
+        .values_list('date', 'n')
+    )
+
+
+def attendance_rate():
+    """Overall present percentage across all recorded attendance."""
+    from academics.analytics_models import AttendanceDailyCube
+    refresh_stale('attendance')
+    totals = AttendanceDailyCube.objects.aggregate(present=Sum('present'), total=Sum('total'))
+    if not totals['total']:
+        return 0
+    return round(totals['present'] / totals['total'] * 100, 1)
+
+
+def grade_distribution(academic_year=None):
+    """``OrderedDict`` of bucket label → number of grades, A+ first."""
+    from academics.analytics_models import GradeDistributionCube
+    refresh_stale('grades')
+    qs = GradeDistributionCube.objects.all()
+    if academic_year is not None:
+        qs = qs.filter(academic_year=academic_year)
+    counts = dict(qs.values('bucket').annotate(n=Sum('count')).order_by().values_list('bucket', 'n'))
+    return OrderedDict((label, counts.get(label, 0)) for label, _min in GRADE_BUCKETS)
+
+
+def class_grade_averages():
+    """``[(class name, average total score)]`` best first."""
+    from academics.analytics_models import GradeDistributionCube
+    refresh_stale('grades')
+    rows = (
+        GradeDistributionCube.objects
+        .filter(school_class__isnull=False)
+        .values('school_class__name')
+        .annotate(n=Sum('count'), total=Sum('score_sum'))
+        .order_by()
+    )
+    averages = [
+        (r['school_class__name'], round(float(r['total'] / r['n']), 1) if r['n'] else 0)
+        for r in rows
+    ]
+    return sorted(averages, key=lambda item: item[1], reverse=True)
+
+
+def fee_summary():
+    """Fee counts per status plus expected and collected totals."""
+    from academics.analytics_models import FeeStatusCube
+    refresh_stale('fees')
+    rows = list(FeeStatusCube.objects.all())
+    by_status = {row.status: row for row in rows}
+    return {
+        'status': {s: by_status[s].count if s in by_status else 0 for s in FEE_STATUSES},
+        'expected': sum((row.amount_payable for row in rows), Decimal('0')),
+        'collected': sum((row.amount_paid for row in rows), Decimal('0')),
+    }
@@ -0,0 +1,83 @@
+"""
+Pre-aggregated analytics cubes.
+
+Small summary tables read by the admin dashboard and the school analytics
+page instead of scanning Attendance / Grade / StudentFee on every load.
+They are kept current by ``academics.analytics`` — writes mark the affected
+scope stale, the next read rebuilds just that scope, and the nightly
+``rebuild_analytics_cubes`` command recomputes everything.
+"""
+from django.db import models
+
+
+class AttendanceDailyCube(models.Model):
+    """Attendance counts for one class on one day."""
+    date = models.DateField()
+    school_class = models.ForeignKey(
+        'academics.Class', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='attendance_cube_rows',
+    )
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'school_class')
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date} {self.school_class or 'Unassigned'}: {self.present}/{self.total}"
+
+
+class GradeDistributionCube(models.Model):
+    """Number of grades per letter bucket for a class/subject/term."""
+    academic_year = models.ForeignKey('academics.AcademicYear', on_delete=models.CASCADE)
+    term = models.CharField(max_length=10)
+    school_class = models.ForeignKey(
+        'academics.Class', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='grade_cube_rows',
+    )
+    subject = models.ForeignKey('academics.Subject', on_delete=models.CASCADE)
+    bucket = models.CharField(max_length=2)
+    count = models.PositiveIntegerField(default=0)
+    score_sum = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('academic_year', 'term', 'school_class', 'subject', 'bucket')
+        indexes = [
+            models.Index(fields=['academic_year', 'term'], name='gdc_year_term_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.academic_year} {self.term} {self.subject} {self.bucket}: {self.count}"
+
+
+class FeeStatusCube(models.Model):
+    """Fee count and totals per StudentFee status."""
+    status = models.CharField(max_length=20, unique=True)
+    count = models.PositiveIntegerField(default=0)
+    amount_payable = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    amount_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.status}: {self.count}"
+
+
+class AnalyticsStaleScope(models.Model):
+    """A cube slice that must be rebuilt before it is read again."""
+    CUBE_CHOICES = (
+        ('attendance', 'Attendance'),
+        ('grades', 'Grades'),
+        ('fees', 'Fees'),
+    )
+    cube = models.CharField(max_length=20, choices=CUBE_CHOICES)
+    scope = models.CharField(max_length=40)
+    marked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('cube', 'scope')
+
+    def __str__(self):
+        return f"{self.cube}:{self.scope}"
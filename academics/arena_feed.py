@@ -0,0 +1,201 @@
+"""
+Study-group arena feed: the tail of each room kept ready to serve.
+
+Every participant polls ``padi_arena_api`` every few seconds.  Each tick
+looked up the student, class and room, loaded the room's new messages with
+their sender, reply and winner fetched one query at a time, and read the
+XP row again.
+
+  * **Feed**: the newest ``ARENA_FEED_SIZE`` messages of a room are kept as
+    a sorted set in the live-state store (``school_system.livestate``),
+    scored by message id and already shaped for the client.  A poll with
+    ``after_id`` reads everything above the cursor in one call.
+    ``StudyGroupMessage.save()`` adds new messages after commit and replaces
+    battles that were answered.
+  * **Seeding**: the first poll of a room with nothing stored loads its
+    tail in one joined query.  Polls use the feed only once seeding has
+    finished, and a client whose cursor fell behind the whole feed is
+    served from the database.
+  * **Without a store** (no Redis in production) each poll is one joined
+    query over the messages above the cursor.
+  * **Membership**: the student, class and room a user polls from are
+    cached for a few minutes.  The XP bar comes from
+    ``gamification.snapshot`` and the leaderboard from
+    ``gamification.class_leaderboard``; awards invalidate both.
+
+Usage::
+
+    from academics import arena_feed
+
+    member = arena_feed.membership(request.user)     # (student_id, class_id, room_id) or None
+    rows = arena_feed.messages(member[2], after_id, request.user)
+
+Settings:
+  ARENA_FEED_SIZE   Messages kept per room (default 100)
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from school_system import livestate
+
+logger = logging.getLogger(__name__)
+
+MEMBERSHIP_SECONDS = 300
+
+
+def size():
+    return getattr(settings, 'ARENA_FEED_SIZE', 100)
+
+
+def _session(room_id):
+    return f'arena:{room_id}'
+
+
+def _feed(room_id):
+    return livestate.key(_session(room_id), 'feed')
+
+
+def _name(user):
+    return user.get_full_name() if user else 'SchoolPadi'
+
+
+def payload(m):
+    """``m`` as the client renders it, plus ``sender_id`` (turned into ``is_me`` per reader)."""
+    reply = None
+    if m.reply_to_id and m.reply_to:
+        reply = {'id': m.reply_to.id, 'sender': _name(m.reply_to.sender), 'content': m.reply_to.content[:120]}
+    battle = m.is_battle_question
+    return {
+        'id': m.id,
+        'content': m.content,
+        'sender': _name(m.sender),
+        'sender_id': m.sender_id,
+        'is_aura': m.is_aura,
+        'is_battle': battle,
+        'battle_type': m.battle_type if battle else None,
+        'battle_xp': m.battle_xp if battle else None,
+        'battle_answered': m.battle_answered,
+        'winner': m.battle_winner.get_full_name() if m.battle_winner else None,
+        'time': m.created_at.strftime('%H:%M'),
+        'reply_to': reply,
+    }
+
+
+def _for(rows, user_id):
+    """Client rows: one per id, oldest first, ``sender_id`` swapped for ``is_me``."""
+    by_id = {}
+    for row in rows:
+        by_id[row['id']] = row  # a replaced battle sorts after its original
+    out = []
+    for row in sorted(by_id.values(), key=lambda r: r['id']):
+        row = dict(row)
+        row['is_me'] = row.pop('sender_id') == user_id and user_id is not None
+        out.append(row)
+    return out
+
+
+def _query(room_id):
+    from academics.arena_models import StudyGroupMessage
+    return (StudyGroupMessage.objects.filter(room_id=room_id)
+            .select_related('sender', 'battle_winner', 'reply_to__sender'))
+
+
+# ── Feed ───────────────────────────────────────────────────────
+
+def _seed(st, room_id):
+    """Load the room's tail once; returns whether the feed can be read."""
+    state = livestate.key(_session(room_id))
+    if st.hget(state, 'ready'):
+        return True
+    if not st.hsetnx(state, 'seeded', 1):
+        return False  # another poll is seeding
+    feed = _feed(room_id)
+    try:
+        st.delete(feed)
+        # Oldest first, so new messages appended meanwhile only ever land on top.
+        for m in reversed(list(_query(room_id).order_by('-id')[:size()])):
+            st.zadd(feed, json.dumps(payload(m), default=str), m.id)
+        st.zkeep(feed, size())
+        st.hset(state, {'ready': 1})
+    finally:
+        # After the refill: the delete above dropped the feed's expiry.
+        livestate.touch(st, _session(room_id), 'feed')
+    return True
+
+
+def _store(room_id, row, replace=False):
+    st = livestate.store()
+    if st is None:
+        return
+    try:
+        if not st.hget(livestate.key(_session(room_id)), 'seeded'):
+            return  # seeded from the database on the next poll
+        feed = _feed(room_id)
+        if replace:
+            st.zdrop(feed, row['id'])
+        st.zadd(feed, json.dumps(row, default=str), row['id'])
+        st.zkeep(feed, size())
+        livestate.touch(st, _session(room_id), 'feed')
+    except Exception:
+        logger.warning('Arena feed update failed for room %s', room_id, exc_info=True)
+
+
+def _after_commit(fn):
+    if connection.in_atomic_block:
+        transaction.on_commit(fn)
+    else:
+        fn()
+
+
+def appended(m):
+    """``m`` was inserted — add it once it commits."""
+    row = payload(m)
+    _after_commit(lambda: _store(m.room_id, row))
+
+
+def changed(m):
+    """``m`` was updated (a battle answered) — replace it once it commits."""
+    row = payload(m)
+    _after_commit(lambda: _store(m.room_id, row, replace=True))
+
+
+def messages(room_id, after_id, user):
+    """Messages of ``room_id`` above ``after_id``, oldest first, as client dicts."""
+    st = livestate.store()
+    if st is not None:
+        try:
+            if _seed(st, room_id):
+                rows = [json.loads(raw) for raw in st.zsince(_feed(room_id), after_id + 1)]
+                # A full feed above a cursor may have dropped messages the client never saw.
+                if not (after_id and len(rows) >= size()):
+                    return _for(rows, user.pk)
+        except Exception:
+            logger.warning('Arena feed read failed for room %s', room_id, exc_info=True)
+    qs = _query(room_id).filter(id__gt=after_id).order_by('id')
+    if not after_id:
+        qs = reversed(list(qs.order_by('-id')[:size()]))
+    return _for([payload(m) for m in qs], user.pk)
+
+
+# ── Membership ─────────────────────────────────────────────────
+
+def membership(user):
+    """``(student_id, class_id, room_id)`` the arena polls for ``user``, or None."""
+    from academics.arena_models import StudyGroupRoom
+    from students.models import Student
+
+    key = f'arena:{getattr(connection, "schema_name", "public")}:member:{user.pk}'
+    found = cache.get(key)
+    if found is None:
+        student = Student.objects.filter(user=user).values_list('pk', 'current_class_id').first()
+        if not student or not student[1]:
+            return None
+        room_id = StudyGroupRoom.objects.filter(student_class_id=student[1]).values_list('pk', flat=True).first()
+        found = (student[0], student[1], room_id)
+        if room_id is not None:  # rooms are created on first visit
+            cache.set(key, found, MEMBERSHIP_SECONDS)
+    return found
@@ -38,5 +38,16 @@ class StudyGroupMessage(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        """Save, then keep the room's arena feed in step (academics.arena_feed)."""
+        from academics import arena_feed
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            arena_feed.appended(self)
+        else:
+            arena_feed.changed(self)
+
     def __str__(self):
         return f"{self.sender or 'SchoolPadi'} in {self.room.name}: {self.content[:30]}"
@@ -0,0 +1,397 @@
+"""
+XP, streak and achievement engine with indexed leaderboards.
+
+Voice sessions, the arena, homework and the text tutor all awarded XP
+through ``StudentXP.add_xp`` / ``update_streak``, which read the row,
+changed it in Python and ``save()``-d every column — two awards landing
+together lost one of them.  ``check_and_unlock_achievements`` ran a
+``get_or_create`` for every catalog entry on every call, and each
+leaderboard loaded the whole class (or school), sorted it in Python and
+ranked it by hand on every poll.
+
+  * **Atomic awards**: ``award()`` moves XP, level and streak with ``F()``
+    updates in one transaction and reads the totals back while it still
+    holds the row lock, so concurrent awards add up and each caller sees
+    the totals its own award produced.
+  * **Achievements**: the catalog is seeded once per schema and process and
+    kept in memory.  Thresholds are only checked for counters an award
+    carried across them (XP from before to after, a streak that actually
+    advanced), so an ordinary award costs no achievement queries.
+  * **Leaderboards**: ranks come from the ``-total_xp`` index on
+    ``StudentXP`` — top N is an index-ordered scan and "my rank" is one
+    plus the count of higher scores.  Top-N rows are cached per class and
+    per school under a version that every award in that scope bumps.
+  * **Snapshots**: ``snapshot(student_id)`` is the XP bar polled by the
+    arena and dashboards, cached per student and dropped by every ``bump``.
+
+Usage::
+
+    from academics import gamification
+
+    result = gamification.award(student, 15, extra_slugs=['homework-ace'])
+    if result.leveled_up:
+        notify(result.level)
+    rows = gamification.class_leaderboard(student.current_class_id, 20)
+    my_rank = gamification.class_rank(student)
+
+Settings:
+  LEADERBOARD_CACHE_SECONDS   Lifetime of a cached top-N and of XP snapshots (default 300)
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+XP_PER_LEVEL = 100
+# Rows on the full leaderboard page.
+LEADERBOARD_PAGE_SIZE = 100
+
+
+def level_for(total_xp):
+    return 1 + max(total_xp, 0) // XP_PER_LEVEL
+
+
+def _schema():
+    return getattr(connection, 'schema_name', 'public')
+
+
+# ── Awards ─────────────────────────────────────────────────────
+
+class Award:
+    """What one award did: the new totals plus level-up and unlocks."""
+
+    __slots__ = ('profile', 'leveled_up', 'streak_advanced', 'unlocked')
+
+    def __init__(self, profile, leveled_up=False, streak_advanced=False, unlocked=()):
+        self.profile = profile
+        self.leveled_up = leveled_up
+        self.streak_advanced = streak_advanced
+        self.unlocked = list(unlocked)
+
+    @property
+    def total_xp(self):
+        return self.profile.total_xp
+
+    @property
+    def level(self):
+        return self.profile.level
+
+
+def bump(profile, amount=0, streak=False):
+    """Atomically add ``amount`` XP (and advance the daily streak) on ``profile``.
+
+    ``profile`` is refreshed in place.  Returns ``(leveled_up, streak_advanced)``.
+    """
+    from academics.gamification_models import StudentXP
+
+    amount = int(amount or 0)
+    now = timezone.now()
+    today = now.date()
+    row = StudentXP.objects.filter(pk=profile.pk)
+    with transaction.atomic():
+        advanced = False
+        if streak:
+            # Only the first activity of the day matches; later ones update nothing.
+            advanced = bool(row.exclude(last_activity_date=today).update(
+                current_streak=Case(
+                    When(last_activity_date=today - timedelta(days=1), then=F('current_streak') + 1),
+                    default=Value(1),
+                ),
+                last_activity_date=today,
+                updated_at=now,
+            ))
+        if amount:
+            row.update(
+                total_xp=F('total_xp') + amount,
+                level=Greatest(F('level'), 1 + (F('total_xp') + amount) / XP_PER_LEVEL),
+                updated_at=now,
+            )
+        if advanced or amount:
+            profile.refresh_from_db(fields=[
+                'total_xp', 'level', 'current_streak', 'last_activity_date', 'updated_at',
+            ])
+            forget_snapshot(profile.student_id)
+    leveled_up = amount > 0 and level_for(profile.total_xp) > level_for(profile.total_xp - amount)
+    return leveled_up, advanced
+
+
+def award(student, amount=0, extra_slugs=(), streak=True):
+    """Award XP, advance the streak and unlock what the award earned.
+
+    ``extra_slugs`` are unlocked outright (e.g. ``'homework-ace'``).
+    """
+    from academics.gamification_models import StudentXP
+
+    profile, _ = StudentXP.objects.get_or_create(student=student)
+    amount = int(amount or 0)
+    leveled_up, advanced = bump(profile, amount, streak=streak)
+
+    moves = {}
+    if amount > 0:
+        before = profile.total_xp - amount
+        moves['total_xp'] = (before, profile.total_xp)
+        moves['level'] = (level_for(before), profile.level)
+    if advanced:
+        moves['current_streak'] = (profile.current_streak - 1, profile.current_streak)
+
+    unlocked = unlock(student, crossed(moves) + list(extra_slugs or ()))
+    if amount:
+        invalidate_leaderboards(student)
+    return Award(profile, leveled_up, advanced, unlocked)
+
+
+# ── Snapshots ──────────────────────────────────────────────────
+
+def _snapshot_key(student_id):
+    return f'xp:{_schema()}:{student_id}'
+
+
+def forget_snapshot(student_id):
+    """Drop ``student_id``'s cached snapshot (again after commit, if in a transaction)."""
+    key = _snapshot_key(student_id)
+    cache.delete(key)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+def snapshot(student_id):
+    """``{'total_xp', 'level', 'level_progress', 'xp_to_next_level'}`` — or None
+    without a profile — cached until the student's next award."""
+    from academics.gamification_models import StudentXP
+
+    key = _snapshot_key(student_id)
+    data = cache.get(key)
+    if data is None:
+        row = StudentXP.objects.filter(student_id=student_id).values_list('total_xp', 'level').first()
+        data = {'profile': None}
+        if row is not None:
+            total_xp, level = row
+            data = {
+                'total_xp': total_xp,
+                'level': level,
+                'level_progress': total_xp % XP_PER_LEVEL,
+                'xp_to_next_level': XP_PER_LEVEL - total_xp % XP_PER_LEVEL,
+            }
+        cache.set(key, data, getattr(settings, 'LEADERBOARD_CACHE_SECONDS', 300))
+    return None if 'profile' in data else data
+
+
+# ── Achievements ───────────────────────────────────────────────
+
+_catalog = {}
+_catalog_lock = threading.Lock()
+
+
+def achievements():
+    """``{slug: Achievement}`` for this schema, seeded on first use per process."""
+    from academics.gamification_models import ACHIEVEMENT_CATALOG, Achievement
+
+    schema = _schema()
+    found = _catalog.get(schema)
+    if found is not None:
+        return found
+    with _catalog_lock:
+        found = _catalog.get(schema)
+        if found is None:
+            Achievement.objects.bulk_create([
+                Achievement(slug=slug, name=name, description=description, icon=icon,
+                            xp_reward=xp_reward, category=category)
+                for slug, name, description, icon, xp_reward, category, _, _ in ACHIEVEMENT_CATALOG
+            ], ignore_conflicts=True)
+            slugs = [entry[0] for entry in ACHIEVEMENT_CATALOG]
+            found = _catalog[schema] = {a.slug: a for a in Achievement.objects.filter(slug__in=slugs)}
+    return found
+
+
+def crossed(moves):
+    """Catalog slugs whose threshold a counter passed: ``before < threshold <= after``."""
+    from academics.gamification_models import ACHIEVEMENT_CATALOG
+
+    return [
+        slug for slug, _, _, _, _, _, field, threshold in ACHIEVEMENT_CATALOG
+        if field in moves and moves[field][0] < threshold <= moves[field][1]
+    ]
+
+
+def reached(profile):
+    """Catalog slugs ``profile`` currently qualifies for."""
+    from academics.gamification_models import ACHIEVEMENT_CATALOG
+
+    return [
+        slug for slug, _, _, _, _, _, field, threshold in ACHIEVEMENT_CATALOG
+        if field is not None and getattr(profile, field, 0) >= threshold
+    ]
+
+
+def unlock(student, slugs):
+    """Unlock ``slugs`` not yet held and send a bell notification for each.
+
+    Returns the newly unlocked ``Achievement`` rows.  Never raises —
+    gamification must not break the flow that awarded the XP.
+    """
+    slugs = list(dict.fromkeys(s for s in slugs if s))
+    if not slugs:
+        return []
+    try:
+        from academics.gamification_models import StudentAchievement
+        from announcements.models import Notification
+
+        catalog = achievements()
+        wanted = [catalog[slug] for slug in slugs if slug in catalog]
+        held = set(
+            StudentAchievement.objects.filter(student=student, achievement__in=wanted)
+            .values_list('achievement_id', flat=True)
+        )
+        new = []
+        for achievement in wanted:
+            if achievement.pk in held:
+                continue
+            _, created = StudentAchievement.objects.get_or_create(student=student, achievement=achievement)
+            if created:
+                new.append(achievement)
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=student.user,
+                message=f'{a.icon} Achievement unlocked: {a.name} — {a.description} (+{a.xp_reward} XP)',
+                alert_type='general',
+                link='../../students/padi-portfolio/',
+            )
+            for a in new
+        ])
+        return new
+    except Exception:
+        logger.warning('Achievement unlock failed for student %s', student.pk, exc_info=True)
+        return []
+
+
+# ── Leaderboards ───────────────────────────────────────────────
+
+def _version_key(scope):
+    return f'leaderboard:{_schema()}:{scope}:v'
+
+
+def _version(scope):
+    return cache.get_or_set(_version_key(scope), 1, None)
+
+
+def invalidate_leaderboards(student):
+    """Bump the class and school leaderboard versions ``student`` appears in
+    (after commit, if in a transaction, so no reader caches the old ranks)."""
+    keys = [_version_key('school')]
+    if student.current_class_id:
+        keys.append(_version_key(f'class:{student.current_class_id}'))
+
+    def bump_versions():
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 2, None)
+
+    if connection.in_atomic_block:
+        transaction.on_commit(bump_versions)
+    else:
+        bump_versions()
+
+
+def _display_name(first, last, username):
+    return f'{first} {last}'.strip() or username
+
+
+def rank_rows(rows):
+    """Competition ranks (1, 1, 3, …) over ``rows`` sorted by ``total_xp`` descending."""
+    prev_xp, current = None, 0
+    for i, row in enumerate(rows, 1):
+        if row['total_xp'] != prev_xp:
+            current, prev_xp = i, row['total_xp']
+        row['rank'] = current
+    return rows
+
+
+def _top(students, n):
+    """Top ``n`` of ``students`` by XP; students without XP fill up the end at 0."""
+    from academics.gamification_models import StudentXP
+
+    name_fields = ('student__user__first_name', 'student__user__last_name', 'student__user__username')
+    rows = [
+        {
+            'student_id': r['student_id'],
+            'name': _display_name(*(r[f] for f in name_fields)),
+            'initials': (r['student__user__first_name'][:1] + r['student__user__last_name'][:1]).upper(),
+            'total_xp': r['total_xp'],
+            'level': r['level'],
+            'level_progress': r['total_xp'] % XP_PER_LEVEL,
+            'current_streak': r['current_streak'],
+        }
+        for r in StudentXP.objects.filter(student__in=students)
+        .order_by('-total_xp', 'student_id')
+        .values('student_id', 'total_xp', 'level', 'current_streak', *name_fields)[:n]
+    ]
+    if len(rows) < n:
+        for s in (students.filter(gamification_profile__isnull=True)
+                  .order_by('user__last_name', 'pk')
+                  .values('pk', 'user__first_name', 'user__last_name', 'user__username')[:n - len(rows)]):
+            rows.append({
+                'student_id': s['pk'],
+                'name': _display_name(s['user__first_name'], s['user__last_name'], s['user__username']),
+                'initials': (s['user__first_name'][:1] + s['user__last_name'][:1]).upper(),
+                'total_xp': 0, 'level': 1, 'level_progress': 0, 'current_streak': 0,
+            })
+    return rank_rows(rows)
+
+
+def _cached_top(scope, students, n, variant=''):
+    key = f'leaderboard:{_schema()}:{scope}:{_version(scope)}:{variant}:{n}'
+    rows = cache.get(key)
+    if rows is None:
+        rows = _top(students, n)
+        cache.set(key, rows, getattr(settings, 'LEADERBOARD_CACHE_SECONDS', 300))
+    return rows
+
+
+def _rank(student, students):
+    from academics.gamification_models import StudentXP
+
+    mine = StudentXP.objects.filter(student=student).values_list('total_xp', flat=True).first() or 0
+    return 1 + StudentXP.objects.filter(student__in=students, total_xp__gt=mine).count()
+
+
+def _class_students(class_id):
+    from students.models import Student
+    return Student.objects.filter(current_class_id=class_id)
+
+
+def _school_students(year=None):
+    from students.models import Student
+    if year is None:
+        return Student.objects.all()
+    return Student.objects.filter(current_class__academic_year=year)
+
+
+def class_leaderboard(class_id, n=20):
+    """Top ``n`` of a class as ranked dicts (cached until the next award in it)."""
+    return _cached_top(f'class:{class_id}', _class_students(class_id), n)
+
+
+def school_leaderboard(n=100, year=None):
+    """Top ``n`` of the school — or of ``year``'s classes — as ranked dicts."""
+    return _cached_top('school', _school_students(year), n, variant=year.pk if year else 'all')
+
+
+def class_rank(student):
+    """``student``'s competition rank in their class (None without a class)."""
+    if not student.current_class_id:
+        return None
+    return _rank(student, _class_students(student.current_class_id))
+
+
+def school_rank(student, year=None):
+    return _rank(student, _school_students(year))
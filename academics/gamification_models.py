@@ -1,5 +1,4 @@
 from django.db import models
-from django.utils import timezone
 from students.models import Student
 
 class StudentXP(models.Model):
@@ -17,6 +16,12 @@ class StudentXP(models.Model):
     
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Leaderboards: top N and "how many are ahead of me" (academics.gamification).
+            models.Index(fields=['-total_xp', 'student'], name='student_xp_rank_idx'),
+        ]
+
     @property
     def level_progress(self):
         """Standard 100 XP per level progression"""
@@ -30,41 +35,15 @@ class StudentXP(models.Model):
         return f"{self.student} - Lvl {self.level} ({self.total_xp} XP)"
 
     def add_xp(self, amount):
-        """Add XP and recalculate level."""
-        self.total_xp += amount
-        
-        # Simple level formula: Level = 1 + (XP / 100)
-        # Or slightly progressive: 100 * level
-        # Let's keep it simple: 100 XP per level for now.
-        # But let's check for level up
-        new_level = 1 + (self.total_xp // 100)
-        
-        leveled_up = False
-        if new_level > self.level:
-            self.level = new_level
-            leveled_up = True
-            
-        self.save()
+        """Add XP atomically and recalculate level.  Returns True on a level-up."""
+        from academics.gamification import bump
+        leveled_up, _ = bump(self, amount)
         return leveled_up
 
     def update_streak(self):
-        """Call this when user performs an action."""
-        today = timezone.now().date()
-        
-        if self.last_activity_date == today:
-            return  # Already counted for today
-            
-        if self.last_activity_date:
-            delta = today - self.last_activity_date
-            if delta.days == 1:
-                self.current_streak += 1
-            else:
-                self.current_streak = 1
-        else:
-            self.current_streak = 1
-            
-        self.last_activity_date = today
-        self.save()
+        """Call this when user performs an action (counts once per day, atomically)."""
+        from academics.gamification import bump
+        bump(self, streak=True)
 
 
 class Achievement(models.Model):
@@ -116,72 +95,20 @@ ACHIEVEMENT_CATALOG = [
 
 def check_and_unlock_achievements(student, profile, extra_slugs=None):
     """
-    Check the student's XP profile against the achievement catalog.
+    Check the student's XP profile against the whole achievement catalog.
     Unlocks any newly-earned badges and sends a bell notification.
 
+    Awards go through ``academics.gamification.award``, which only checks
+    the thresholds an award crosses; this full check is for backfills.
+
     Args:
         student: Student instance
         profile: StudentXP instance
         extra_slugs: optional list of achievement slugs to force-unlock
                      (e.g. ['homework-ace'] after a high-scoring submission)
     """
-    try:
-        from announcements.models import Notification
-
-        # Ensure all catalog achievements exist in DB
-        for slug, name, description, icon, xp_reward, category, _, _ in ACHIEVEMENT_CATALOG:
-            Achievement.objects.get_or_create(
-                slug=slug,
-                defaults={
-                    'name': name,
-                    'description': description,
-                    'icon': icon,
-                    'xp_reward': xp_reward,
-                    'category': category,
-                }
-            )
-
-        # Already-unlocked slugs for this student
-        unlocked_slugs = set(
-            StudentAchievement.objects.filter(student=student)
-            .values_list('achievement__slug', flat=True)
-        )
-
-        to_unlock = []
-
-        # Catalog-driven conditions on the XP profile fields
-        for slug, _, _, _, _, _, condition_field, threshold in ACHIEVEMENT_CATALOG:
-            if slug in unlocked_slugs:
-                continue
-            if condition_field is None:
-                continue
-            if getattr(profile, condition_field, 0) >= threshold:
-                to_unlock.append(slug)
-
-        # Any extra slugs (e.g. 'homework-ace') passed in by caller
-        if extra_slugs:
-            for slug in extra_slugs:
-                if slug not in unlocked_slugs:
-                    to_unlock.append(slug)
-
-        for slug in to_unlock:
-            try:
-                achievement = Achievement.objects.get(slug=slug)
-                _, created = StudentAchievement.objects.get_or_create(
-                    student=student,
-                    achievement=achievement,
-                )
-                if created:
-                    Notification.objects.create(
-                        recipient=student.user,
-                        message=f'{achievement.icon} Achievement unlocked: {achievement.name} — {achievement.description} (+{achievement.xp_reward} XP)',
-                        alert_type='general',
-                        link='../../students/padi-portfolio/',
-                    )
-            except Achievement.DoesNotExist:
-                pass
-    except Exception:
-        pass  # Gamification must never break core flows
+    from academics.gamification import reached, unlock
+    return unlock(student, reached(profile) + list(extra_slugs or ()))
 
 
 class AuraSessionState(models.Model):
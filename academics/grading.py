@@ -0,0 +1,194 @@
+"""
+Per-school grading scale service.
+
+``Grade.save``, report cards and the bulk grade importer turn a score into a
+grade label and remark.  The scale used to be cached under one global key,
+``'grading_scale_rows'`` — with Redis shared by every tenant, one school's
+boundaries could grade another school's report cards, and a change was only
+seen after the five-minute TTL.
+
+Boundaries are now compiled into a ``CompiledScale`` (ascending thresholds
+plus their bands) keyed by tenant schema *and* a version counter that the
+``GradingScale`` receivers in ``academics.signals`` bump on every change:
+
+  * a per-process LRU holds compiled scales by (schema, version), so a hot
+    worker costs one cache ``get`` (the version) per lookup; the version
+    expires after ``GRADING_SCALE_VERSION_TTL``, so a worker whose cache
+    missed a bump (LocMemCache is per process) reloads within that time,
+  * the shared cache holds the raw rows by (schema, version), so a cold
+    worker costs one more ``get`` instead of a query,
+  * score → (label, remark) is a ``bisect`` over the thresholds.
+
+Schools without a custom scale use the Ghana default (1 Highest … 9 Lowest).
+
+Usage::
+
+    from academics.grading import get_scale, grade_for
+    label, remarks = grade_for(total_score)
+    scale = get_scale()              # reuse in loops: scale.lookup(score)
+
+Settings:
+  GRADING_SCALE_LRU_SIZE      Compiled scales kept per process (default 256)
+  GRADING_SCALE_VERSION_TTL   Seconds a version is trusted before a reload (default 300)
+"""
+import logging
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Ghana default: (minimum score, grade label, remarks), highest band first.
+DEFAULT_BANDS = (
+    (Decimal('80'), '1', 'Highest'),
+    (Decimal('70'), '2', 'Higher'),
+    (Decimal('65'), '3', 'High'),
+    (Decimal('60'), '4', 'High Average'),
+    (Decimal('55'), '5', 'Average'),
+    (Decimal('50'), '6', 'Low Average'),
+    (Decimal('45'), '7', 'Low'),
+    (Decimal('40'), '8', 'Lower'),
+    (Decimal('0'), '9', 'Lowest'),
+)
+
+_ROWS_TTL = 60 * 60 * 24
+
+
+class CompiledScale:
+    """Score → (grade label, remarks) over sorted thresholds."""
+    __slots__ = ('thresholds', 'bands', 'custom')
+
+    def __init__(self, bands, custom=True):
+        # ``bands`` is highest first; among equal minimums the first one wins,
+        # so reversing keeps it last in ascending order where bisect lands.
+        ordered = sorted(reversed(list(bands)), key=lambda band: band[0])
+        self.thresholds = [Decimal(str(band[0])) for band in ordered]
+        self.bands = [(band[1], band[2]) for band in ordered]
+        self.custom = custom
+
+    def lookup(self, score):
+        """``(label, remarks)`` for ``score``; below every band → lowest band."""
+        if score is None:
+            score = Decimal('0')
+        index = bisect_right(self.thresholds, Decimal(str(score))) - 1
+        return self.bands[max(index, 0)]
+
+
+DEFAULT_SCALE = CompiledScale(DEFAULT_BANDS, custom=False)
+
+
+class _LRU:
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > getattr(settings, 'GRADING_SCALE_LRU_SIZE', 256):
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_compiled = _LRU()
+
+
+def _schema():
+    from django.db import connection
+    return getattr(connection, 'schema_name', 'public')
+
+
+def _version_key(schema):
+    return f'grading_scale_v:{schema}'
+
+
+def _version_ttl():
+    return getattr(settings, 'GRADING_SCALE_VERSION_TTL', 300)
+
+
+def _version(schema):
+    key = _version_key(schema)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), _version_ttl())
+        version = cache.get(key)
+    return version
+
+
+def bump_version():
+    """Invalidate the current tenant's compiled scale everywhere, once the change commits.
+
+    Bumping inside the writing transaction would let a concurrent reader
+    cache the old rows under the new version until the TTL.
+    """
+    from django.db import connection, transaction
+
+    key = _version_key(_schema())
+
+    def bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Missing or evicted — a fresh token can never match an old entry.
+            cache.set(key, time.time_ns(), _version_ttl())
+        except Exception:
+            logger.warning('Grading scale version bump failed for %s', key, exc_info=True)
+
+    if connection.in_atomic_block:
+        transaction.on_commit(bump)
+    else:
+        bump()
+
+
+def _load_rows():
+    from academics.models import GradingScale
+    return [
+        (row['min_score'], row['grade_label'], row['remarks'])
+        for row in GradingScale.objects.values('min_score', 'grade_label', 'remarks')  # -min_score
+    ]
+
+
+def get_scale():
+    """The current tenant's ``CompiledScale`` (the default when none is set)."""
+    schema = _schema()
+    try:
+        version = _version(schema)
+    except Exception:
+        logger.warning('Grading scale cache unavailable — reading from the database', exc_info=True)
+        rows = _load_rows()
+        return CompiledScale(rows) if rows else DEFAULT_SCALE
+
+    local_key = (schema, version)
+    scale = _compiled.get(local_key)
+    if scale is not None:
+        return scale
+
+    rows_key = f'grading_scale_rows:{schema}:{version}'
+    rows = cache.get(rows_key)
+    if rows is None:
+        rows = _load_rows()
+        cache.set(rows_key, rows, _ROWS_TTL)
+    scale = CompiledScale(rows) if rows else DEFAULT_SCALE
+    _compiled.put(local_key, scale)
+    return scale
+
+
+def grade_for(score):
+    """``(grade label, remarks)`` for ``score`` on the current school's scale."""
+    return get_scale().lookup(score)
@@ -0,0 +1,939 @@
+"""
+Student and teacher ID-card rendering.
+
+Bulk printing used to re-load the fonts, re-read ``SchoolInfo`` and re-open
+and resize every profile photo from storage for each card, composite the
+cards one after another inside the request, and hold every card image plus
+the whole ReportLab document in memory — a 1,200-student school timed out.
+Cards now go through a batch pipeline:
+
+  1. **Specs**     people are read in chunks (``select_related`` /
+                   ``prefetch_related``) into plain dicts.  Photo thumbnails
+                   are resized once per template size and kept in the shared
+                   cache under a hash of the stored file name (storage names
+                   are never reused), fetched with one ``get_many`` per chunk.
+  2. **Render**    the specs are composited into JPEGs by a per-process pool
+                   of ``ID_CARD_WORKERS`` spawned processes, at most a few
+                   cards in flight per worker.  Fonts and photo masks are
+                   cached per process.  Where process pools are unavailable
+                   (serverless) the cards render inline.
+  3. **Assemble**  ``iter_pdf`` writes the PDF as a stream — one page in
+                   memory at a time, JPEGs embedded as-is — straight into a
+                   ``StreamingHttpResponse``.
+
+Only stage 1 touches Django; the rendering half of this module imports
+nothing but PIL and qrcode so spawned workers start without ``setup()``.
+
+Usage::
+
+    from academics.id_cards import id_cards_pdf_response
+
+    response = id_cards_pdf_response(students_qs, 'student', 'student_ids_B7.pdf')
+    if response is None:
+        ...  # no card could be rendered
+
+Settings:
+  ID_CARD_WORKERS   Render processes per web process; 0/1 renders inline
+                    (default min(4, CPUs))
+"""
+import hashlib
+import logging
+import math
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES = ('classic', 'modern', 'elegant')
+PHOTO_SIZES = {'classic': 150, 'modern': 140, 'elegant': 160}
+
+_THUMB_TTL = 60 * 60 * 24 * 7
+_SPEC_CHUNK = 100
+_IN_FLIGHT_PER_WORKER = 4
+_JPEG_QUALITY = 92
+
+
+# ── Per-process render caches ──────────────────────────────────
+
+@lru_cache(maxsize=64)
+def _font(name, size):
+    try:
+        return ImageFont.truetype(name, size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1)
+def _load_fonts():
+    """Load fonts with graceful fallback (once per process)."""
+    try:
+        return {
+            'title': ImageFont.truetype("arial.ttf", 26),
+            'name': ImageFont.truetype("arialbd.ttf", 22),
+            'label': ImageFont.truetype("arial.ttf", 13),
+            'value': ImageFont.truetype("arialbd.ttf", 15),
+            'small': ImageFont.truetype("arial.ttf", 11),
+            'header': ImageFont.truetype("arialbd.ttf", 28),
+            'motto': ImageFont.truetype("ariali.ttf", 12),
+        }
+    except Exception:
+        default = ImageFont.load_default()
+        return {k: default for k in ['title', 'name', 'label', 'value', 'small', 'header', 'motto']}
+
+
+@lru_cache(maxsize=8)
+def _circle_mask(size):
+    mask = Image.new('L', (size, size), 0)
+    ImageDraw.Draw(mask).ellipse([0, 0, size - 1, size - 1], fill=255)
+    return mask
+
+
+def _make_qr(data, size=110):
+    """Generate QR code image."""
+    qr = qrcode.QRCode(version=1, box_size=5, border=1)
+    qr.add_data(data)
+    qr.make(fit=True)
+    qr_img = qr.make_image(fill_color="black", back_color="white").convert('RGB')
+    return qr_img.resize((size, size), Image.Resampling.LANCZOS)
+
+
+def _photo(spec, size):
+    """The spec's thumbnail as an RGB image of ``size``, or None."""
+    if not spec.get('photo'):
+        return None
+    try:
+        img = Image.open(BytesIO(spec['photo'])).convert('RGB')
+    except Exception:
+        return None
+    if img.size != (size, size):
+        img = img.resize((size, size), Image.Resampling.LANCZOS)
+    return img
+
+
+def _initials(spec):
+    return f"{spec['first_name'][:1]}{spec['last_name'][:1]}".upper()
+
+
+def _paste_profile(card, spec, x, y, size, border_color=(255, 255, 255), border_width=4):
+    """Paste profile picture or draw placeholder."""
+    draw = ImageDraw.Draw(card)
+    profile_img = _photo(spec, size)
+    if profile_img is not None:
+        card.paste(profile_img, (x, y), _circle_mask(size))
+        draw.ellipse([x, y, x + size, y + size], outline=border_color, width=border_width)
+        return
+    # Placeholder
+    draw.ellipse([x, y, x + size, y + size], fill=(220, 230, 240), outline=border_color, width=border_width)
+    initials = _initials(spec)
+    init_font = _font("arialbd.ttf", size // 3)
+    bbox = draw.textbbox((0, 0), initials, font=init_font)
+    tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    draw.text((x + (size - tw) // 2, y + (size - th) // 2 - 4), initials, fill=(100, 116, 139), font=init_font)
+
+
+def _draw_rounded_rect(draw, coords, radius, fill=None, outline=None, width=1):
+    """Draw a rounded rectangle."""
+    x1, y1, x2, y2 = coords
+    if fill:
+        draw.rectangle([x1 + radius, y1, x2 - radius, y2], fill=fill)
+        draw.rectangle([x1, y1 + radius, x2, y2 - radius], fill=fill)
+        draw.pieslice([x1, y1, x1 + 2 * radius, y1 + 2 * radius], 180, 270, fill=fill)
+        draw.pieslice([x2 - 2 * radius, y1, x2, y1 + 2 * radius], 270, 360, fill=fill)
+        draw.pieslice([x1, y2 - 2 * radius, x1 + 2 * radius, y2], 90, 180, fill=fill)
+        draw.pieslice([x2 - 2 * radius, y2 - 2 * radius, x2, y2], 0, 90, fill=fill)
+    if outline:
+        draw.arc([x1, y1, x1 + 2 * radius, y1 + 2 * radius], 180, 270, fill=outline, width=width)
+        draw.arc([x2 - 2 * radius, y1, x2, y1 + 2 * radius], 270, 360, fill=outline, width=width)
+        draw.arc([x1, y2 - 2 * radius, x1 + 2 * radius, y2], 90, 180, fill=outline, width=width)
+        draw.arc([x2 - 2 * radius, y2 - 2 * radius, x2, y2], 0, 90, fill=outline, width=width)
+        draw.line([x1 + radius, y1, x2 - radius, y1], fill=outline, width=width)
+        draw.line([x1 + radius, y2, x2 - radius, y2], fill=outline, width=width)
+        draw.line([x1, y1 + radius, x1, y2 - radius], fill=outline, width=width)
+        draw.line([x2, y1 + radius, x2, y2 - radius], fill=outline, width=width)
+
+
+def _card_id(spec, card_type):
+    return f"STU-{spec['id']:06d}" if card_type == 'student' else f"TCH-{spec['id']:06d}"
+
+
+def _qr_data(spec, card_type):
+    return f"{_card_id(spec, card_type)}|{spec['email']}"
+
+
+def _subjects(spec, count):
+    return ", ".join(spec['subjects'][:count])
+
+
+# ==========================================
+# TEMPLATE 1: CLASSIC (Orange accent)
+# ==========================================
+def _classic_card(spec, card_type, school):
+    """Classic template — Orange accent sidebar, clean professional layout."""
+    W, H = 650, 1000  # Portrait orientation
+    card = Image.new('RGB', (W, H), color='#FFFFFF')
+    draw = ImageDraw.Draw(card)
+    fonts = _load_fonts()
+
+    # Colors
+    accent = (243, 146, 0)       # Orange
+    accent_dark = (220, 120, 0)
+    dark = (40, 40, 40)
+    muted = (120, 130, 140)
+    light_bg = (250, 248, 245)
+    white = (255, 255, 255)
+
+    # === TOP ACCENT BAND ===
+    # Diagonal orange shape (left side)
+    triangle_points = [(0, 0), (200, 0), (0, 280)]
+    draw.polygon(triangle_points, fill=accent)
+    # Small triangle accent
+    draw.polygon([(0, 280), (150, 0), (200, 0), (0, 340)], fill=accent_dark)
+
+    # School name area (top right)
+    draw.text((220, 40), school['name'][:28].upper(), fill=dark, font=fonts['header'])
+    draw.text((220, 78), school['motto'][:45], fill=muted, font=fonts['motto'])
+
+    # Top accent line
+    draw.rectangle([(220, 105), (W - 40, 107)], fill=accent)
+
+    # === PROFILE PHOTO ===
+    photo_size = PHOTO_SIZES['classic']
+    photo_x = (W - photo_size) // 2
+    photo_y = 140
+    # Circle border
+    draw.ellipse([photo_x - 5, photo_y - 5, photo_x + photo_size + 5, photo_y + photo_size + 5], fill=accent)
+    _paste_profile(card, spec, photo_x, photo_y, photo_size, border_color=accent, border_width=4)
+
+    # === CARD TYPE LABEL ===
+    type_label = "STUDENT ID CARD" if card_type == 'student' else "TEACHER ID CARD"
+    bbox = draw.textbbox((0, 0), type_label, font=fonts['label'])
+    lw = bbox[2] - bbox[0]
+    draw.text(((W - lw) // 2, photo_y + photo_size + 20), type_label, fill=accent, font=fonts['label'])
+
+    # === INFO SECTION ===
+    info_y = photo_y + photo_size + 55
+    left_margin = 60
+    label_x = left_margin
+    value_x = left_margin + 165
+
+    if card_type == 'student':
+        fields = [
+            ("Reg No", spec['admission_number']),
+            ("Student ID", _card_id(spec, card_type)),
+            ("Student Name", spec['full_name'][:30]),
+            ("Class", spec['class_name'] or "N/A"),
+            ("Blood Group", spec['blood_group'] or "N/A"),
+            ("Emergency", spec['emergency_contact']),
+        ]
+    else:
+        subjects = _subjects(spec, 3)
+        fields = [
+            ("Employee ID", spec['employee_id']),
+            ("Teacher ID", _card_id(spec, card_type)),
+            ("Name", spec['full_name'][:30]),
+            ("Qualification", spec['qualification'][:30] if spec['qualification'] else "N/A"),
+            ("Subjects", subjects[:30] if subjects else "N/A"),
+            ("Phone", spec['phone'] or "N/A"),
+        ]
+
+    for i, (label, value) in enumerate(fields):
+        y = info_y + i * 42
+        # Alternate row bg
+        if i % 2 == 0:
+            draw.rectangle([(left_margin - 10, y - 5), (W - left_margin + 10, y + 32)], fill=light_bg)
+        draw.text((label_x, y + 2), label, fill=muted, font=fonts['label'])
+        draw.text((value_x, y), f":  {value}", fill=dark, font=fonts['value'])
+
+    # === BOTTOM BAR ===
+    bottom_y = H - 120
+    draw.rectangle([(0, bottom_y), (W, H)], fill=accent)
+    draw.text((30, bottom_y + 15), school['address'][:50], fill=white, font=fonts['small'])
+    draw.text((30, bottom_y + 35), f"Phone: {school['phone']}", fill=white, font=fonts['small'])
+
+    # === QR CODE (bottom right) ===
+    qr_img = _make_qr(_qr_data(spec, card_type), 80)
+    qr_x = W - 110
+    qr_y = bottom_y - 100
+    # White bg behind QR
+    draw.rectangle([qr_x - 5, qr_y - 5, qr_x + 85, qr_y + 85], fill=white)
+    card.paste(qr_img, (qr_x, qr_y))
+
+    # Validity
+    draw.text((30, bottom_y - 40), f"Issued: {school['issued']}", fill=muted, font=fonts['small'])
+    draw.text((30, bottom_y - 22), "Valid: 31/08/2027", fill=muted, font=fonts['small'])
+
+    return card
+
+
+# ==========================================
+# TEMPLATE 2: MODERN (Gradient / Vibrant)
+# ==========================================
+def _gradient_line(draw, y, W, top, bottom, ratio):
+    r = int(top[0] + (bottom[0] - top[0]) * ratio)
+    g = int(top[1] + (bottom[1] - top[1]) * ratio)
+    b = int(top[2] + (bottom[2] - top[2]) * ratio)
+    draw.line([(0, y), (W, y)], fill=(r, g, b))
+
+
+def _modern_card(spec, card_type, school):
+    """Modern template — Gradient header, vibrant purple/magenta, wavy shapes."""
+    W, H = 650, 1000
+    card = Image.new('RGB', (W, H), color='#FFFFFF')
+    draw = ImageDraw.Draw(card)
+    fonts = _load_fonts()
+
+    # Colors
+    primary = (130, 40, 160)      # Purple
+    secondary = (200, 50, 130)    # Magenta
+    accent = (180, 45, 145)       # Mid blend
+    dark = (35, 35, 50)
+    muted = (110, 115, 130)
+    white = (255, 255, 255)
+    light_purple = (245, 238, 252)
+
+    # === GRADIENT HEADER ===
+    header_h = 200
+    for y in range(header_h):
+        _gradient_line(draw, y, W, primary, secondary, y / header_h)
+
+    # Decorative diagonal stripe
+    draw.polygon([(0, 160), (W, 120), (W, 200), (0, 200)], fill=white)
+
+    # Wavy bottom of header
+    for x in range(W):
+        wave_y = int(170 + 15 * math.sin(x / 40))
+        draw.line([(x, wave_y), (x, 200)], fill=white)
+
+    # School name in header
+    bbox = draw.textbbox((0, 0), school['name'][:25].upper(), font=fonts['header'])
+    tw = bbox[2] - bbox[0]
+    draw.text(((W - tw) // 2, 30), school['name'][:25].upper(), fill=white, font=fonts['header'])
+
+    # Motto
+    bbox2 = draw.textbbox((0, 0), school['motto'][:40], font=fonts['motto'])
+    tw2 = bbox2[2] - bbox2[0]
+    draw.text(((W - tw2) // 2, 68), school['motto'][:40], fill=(255, 220, 240), font=fonts['motto'])
+
+    # Card type badge
+    type_label = "STUDENT ID" if card_type == 'student' else "TEACHER ID"
+    bbox3 = draw.textbbox((0, 0), type_label, font=fonts['value'])
+    tw3 = bbox3[2] - bbox3[0]
+    badge_x = (W - tw3 - 30) // 2
+    _draw_rounded_rect(draw, [badge_x, 95, badge_x + tw3 + 30, 120], 10, fill=white)
+    draw.text((badge_x + 15, 98), type_label, fill=primary, font=fonts['value'])
+
+    # === PROFILE PHOTO ===
+    photo_size = PHOTO_SIZES['modern']
+    photo_x = (W - photo_size) // 2
+    photo_y = 210
+    # Decorative ring
+    draw.ellipse([photo_x - 8, photo_y - 8, photo_x + photo_size + 8, photo_y + photo_size + 8], fill=accent)
+    draw.ellipse([photo_x - 4, photo_y - 4, photo_x + photo_size + 4, photo_y + photo_size + 4], fill=white)
+    _paste_profile(card, spec, photo_x, photo_y, photo_size, border_color=white, border_width=3)
+
+    # Name below photo
+    name = spec['full_name'][:28]
+    bbox_n = draw.textbbox((0, 0), name, font=fonts['name'])
+    nw = bbox_n[2] - bbox_n[0]
+    draw.text(((W - nw) // 2, photo_y + photo_size + 15), name, fill=dark, font=fonts['name'])
+
+    # ID below name
+    id_str = _card_id(spec, card_type)
+    bbox_id = draw.textbbox((0, 0), id_str, font=fonts['label'])
+    iw = bbox_id[2] - bbox_id[0]
+    draw.text(((W - iw) // 2, photo_y + photo_size + 45), id_str, fill=accent, font=fonts['label'])
+
+    # === INFO SECTION ===
+    info_y = photo_y + photo_size + 80
+    left_margin = 50
+
+    if card_type == 'student':
+        fields = [
+            ("Reg No", spec['admission_number']),
+            ("Class", spec['class_name'] or "N/A"),
+            ("Blood Group", spec['blood_group'] or "N/A"),
+            ("Emergency", spec['emergency_contact']),
+            ("Email", spec['email'][:30] if spec['email'] else "N/A"),
+        ]
+    else:
+        subjects = _subjects(spec, 3)
+        fields = [
+            ("Employee ID", spec['employee_id']),
+            ("Qualification", spec['qualification'][:28] if spec['qualification'] else "N/A"),
+            ("Subjects", subjects[:28] if subjects else "N/A"),
+            ("Phone", spec['phone'] or "N/A"),
+            ("Email", spec['email'][:30] if spec['email'] else "N/A"),
+        ]
+
+    for i, (label, value) in enumerate(fields):
+        y = info_y + i * 40
+        # Pill background
+        _draw_rounded_rect(draw, [left_margin - 5, y - 3, W - left_margin + 5, y + 30], 8, fill=light_purple)
+        # Colored dot
+        draw.ellipse([left_margin + 5, y + 8, left_margin + 15, y + 18], fill=accent)
+        draw.text((left_margin + 25, y + 2), f"{label}:", fill=muted, font=fonts['label'])
+        draw.text((left_margin + 155, y), value, fill=dark, font=fonts['value'])
+
+    # === BOTTOM SECTION ===
+    bottom_y = H - 160
+    # Wavy top separator
+    for x in range(W):
+        wave_y = int(bottom_y + 10 * math.sin(x / 50))
+        draw.line([(x, wave_y), (x, bottom_y + 15)], fill=light_purple)
+
+    # Validity
+    draw.text((left_margin, bottom_y + 25), f"Joined: {school['issued']}", fill=muted, font=fonts['small'])
+    draw.text((left_margin, bottom_y + 45), "Expires: 31/08/2027", fill=accent, font=fonts['small'])
+
+    # QR code
+    qr_img = _make_qr(_qr_data(spec, card_type), 90)
+    qr_x = W - 140
+    qr_y = bottom_y + 20
+    card.paste(qr_img, (qr_x, qr_y))
+
+    # Bottom gradient bar
+    bar_y = H - 50
+    for y_pos in range(bar_y, H):
+        _gradient_line(draw, y_pos, W, primary, secondary, (y_pos - bar_y) / (H - bar_y))
+
+    draw.text((20, H - 38), school['phone'], fill=white, font=fonts['small'])
+    draw.text((W // 2 - 40, H - 38), school['email'][:25], fill=white, font=fonts['small'])
+
+    return card
+
+
+# ==========================================
+# TEMPLATE 3: ELEGANT (Navy & Gold)
+# ==========================================
+def _elegant_card(spec, card_type, school):
+    """Elegant template — Navy & gold, horizontal professional layout."""
+    W, H = 920, 580  # Landscape orientation
+    card = Image.new('RGB', (W, H), color='#FFFFFF')
+    draw = ImageDraw.Draw(card)
+    fonts = _load_fonts()
+
+    # Colors
+    navy = (15, 30, 65)
+    gold = (200, 165, 60)
+    gold_light = (255, 230, 150)
+    dark = (25, 30, 45)
+    muted = (100, 110, 125)
+    white = (255, 255, 255)
+    cream = (252, 250, 245)
+
+    # === NAVY HEADER BAR ===
+    draw.rectangle([(0, 0), (W, 130)], fill=navy)
+    # Gold accent line
+    draw.rectangle([(0, 130), (W, 136)], fill=gold)
+
+    # School name
+    draw.text((30, 25), school['name'][:30].upper(), fill=white, font=fonts['header'])
+    draw.text((30, 65), school['motto'][:45], fill=gold_light, font=fonts['motto'])
+
+    # Card type label (right side)
+    type_label = "STUDENT IDENTIFICATION" if card_type == 'student' else "STAFF IDENTIFICATION"
+    bbox = draw.textbbox((0, 0), type_label, font=fonts['label'])
+    tw = bbox[2] - bbox[0]
+    draw.text((W - tw - 30, 25), type_label, fill=gold, font=fonts['label'])
+
+    # Address in header
+    draw.text((W - 300, 65), school['address'][:35], fill=(180, 190, 210), font=fonts['small'])
+
+    # === LEFT SIDE: PROFILE ===
+    photo_size = PHOTO_SIZES['elegant']
+    photo_x = 40
+    photo_y = 170
+    # Gold frame
+    draw.rectangle([photo_x - 4, photo_y - 4, photo_x + photo_size + 4, photo_y + photo_size + 4], fill=gold)
+    draw.rectangle([photo_x - 2, photo_y - 2, photo_x + photo_size + 2, photo_y + photo_size + 2], fill=white)
+    # Square profile (not circular for elegant style)
+    profile_img = _photo(spec, photo_size)
+    if profile_img is not None:
+        card.paste(profile_img, (photo_x, photo_y))
+    else:
+        draw.rectangle([photo_x, photo_y, photo_x + photo_size, photo_y + photo_size], fill=cream)
+        initials = _initials(spec)
+        init_font = _font("arialbd.ttf", 48)
+        bbox_i = draw.textbbox((0, 0), initials, font=init_font)
+        iw, ih = bbox_i[2] - bbox_i[0], bbox_i[3] - bbox_i[1]
+        draw.text((photo_x + (photo_size - iw) // 2, photo_y + (photo_size - ih) // 2 - 5), initials, fill=navy, font=init_font)
+
+    # Name below photo
+    name = spec['full_name'][:25].upper()
+    bbox_n = draw.textbbox((0, 0), name, font=fonts['name'])
+    nw = bbox_n[2] - bbox_n[0]
+    name_x = photo_x + (photo_size - nw) // 2
+    draw.text((max(10, name_x), photo_y + photo_size + 18), name, fill=navy, font=fonts['name'])
+
+    # Role under name
+    if card_type == 'student':
+        role = spec['class_name'] or ''
+    else:
+        role = spec['qualification'][:20] if spec['qualification'] else ''
+    if role:
+        bbox_r = draw.textbbox((0, 0), role, font=fonts['label'])
+        rw = bbox_r[2] - bbox_r[0]
+        role_x = photo_x + (photo_size - rw) // 2
+        draw.text((max(10, role_x), photo_y + photo_size + 48), role, fill=gold, font=fonts['label'])
+
+    # === RIGHT SIDE: INFO ===
+    info_x = photo_x + photo_size + 50
+    info_y = 160
+
+    if card_type == 'student':
+        fields = [
+            ("ID NO", _card_id(spec, card_type)),
+            ("REG NO", spec['admission_number']),
+            ("CLASS", spec['class_name'] or "N/A"),
+            ("BLOOD", spec['blood_group'] or "N/A"),
+            ("PHONE", spec['emergency_contact']),
+        ]
+    else:
+        subjects = _subjects(spec, 2)
+        fields = [
+            ("ID NO", _card_id(spec, card_type)),
+            ("EMP ID", spec['employee_id']),
+            ("SUBJECTS", subjects[:25] if subjects else "N/A"),
+            ("PHONE", spec['phone'] or "N/A"),
+            ("EMAIL", spec['email'][:25] if spec['email'] else "N/A"),
+        ]
+
+    for i, (label, value) in enumerate(fields):
+        y = info_y + i * 48
+        draw.text((info_x, y), label, fill=muted, font=fonts['label'])
+        # Gold colon separator
+        draw.text((info_x + 95, y), ":", fill=gold, font=fonts['label'])
+        draw.text((info_x + 115, y - 1), value, fill=dark, font=fonts['value'])
+        # Subtle underline
+        draw.line([(info_x, y + 28), (info_x + 350, y + 28)], fill=(230, 230, 230), width=1)
+
+    # === QR & VALIDITY (bottom right) ===
+    qr_img = _make_qr(_qr_data(spec, card_type), 100)
+    qr_x = W - 135
+    qr_y = 170
+
+    # Gold border around QR
+    draw.rectangle([qr_x - 4, qr_y - 4, qr_x + 104, qr_y + 104], fill=gold)
+    draw.rectangle([qr_x - 2, qr_y - 2, qr_x + 102, qr_y + 102], fill=white)
+    card.paste(qr_img, (qr_x, qr_y))
+
+    # Validity below QR
+    draw.text((qr_x - 10, qr_y + 115), f"Issued: {school['issued']}", fill=muted, font=fonts['small'])
+    draw.text((qr_x - 10, qr_y + 135), "Valid: 31/08/2027", fill=muted, font=fonts['small'])
+
+    # === BOTTOM BAR ===
+    draw.rectangle([(0, H - 40), (W, H)], fill=navy)
+    draw.rectangle([(0, H - 43), (W, H - 40)], fill=gold)
+    draw.text((30, H - 32), f"{school['phone']}  |  {school['email'][:30]}  |  {school['address'][:35]}", fill=(180, 190, 210), font=fonts['small'])
+
+    # Border
+    draw.rectangle([(0, 0), (W - 1, H - 1)], outline=navy, width=2)
+
+    return card
+
+
+_RENDERERS = {
+    'classic': _classic_card,
+    'modern': _modern_card,
+    'elegant': _elegant_card,
+}
+
+
+def render_card(spec, card_type, school):
+    """Composite one card (PIL Image) from a spec dict — no database access."""
+    return _RENDERERS.get(school['template'], _classic_card)(spec, card_type, school)
+
+
+def _jpeg(card):
+    buf = BytesIO()
+    card.save(buf, 'JPEG', quality=_JPEG_QUALITY, subsampling=0)
+    return card.size[0], card.size[1], buf.getvalue()
+
+
+def _render_jpeg(task):
+    """Pool entry point: ``(spec, card_type, school)`` → ``(w, h, jpeg)`` or None."""
+    spec, card_type, school = task
+    try:
+        return _jpeg(render_card(spec, card_type, school))
+    except Exception:
+        logger.exception('ID card for %s #%s failed', card_type, spec.get('id'))
+        return None
+
+
+# ── Streaming PDF ──────────────────────────────────────────────
+
+_MM = 72 / 25.4
+A4 = (210 * _MM, 297 * _MM)
+
+# (page size, card box, margins, cards per row, cards per page) — the sheet
+# layouts the ReportLab exporter used.
+SHEET_PORTRAIT = (A4, (95 * _MM, 90 * _MM), (5 * _MM, 5 * _MM), 2, 6)
+SHEET_LANDSCAPE = (A4, (190 * _MM, 120 * _MM), (10 * _MM, 10 * _MM), 1, 2)
+
+
+def single_card_layout(landscape):
+    page = (148 * _MM, 105 * _MM) if landscape else (105 * _MM, 148 * _MM)
+    return (page, page, (0, 0), 1, 1)
+
+
+def iter_pdf(cards, layout):
+    """Yield a PDF placing ``(width, height, jpeg_bytes)`` cards per ``layout``.
+
+    Image objects are written as they arrive and each page as soon as it is
+    full, so memory holds one page of cards at most.  Objects 1 and 2 are
+    reserved for the catalog and page tree, written last.
+    """
+    (page_w, page_h), (card_w, card_h), (margin_x, margin_y), per_row, per_page = layout
+    offsets = {}
+    state = {'pos': 0, 'next': 3}
+
+    def emit(num, body):
+        offsets[num] = state['pos']
+        chunk = b'%d 0 obj\n' % num + body + b'\nendobj\n'
+        state['pos'] += len(chunk)
+        return chunk
+
+    def allocate():
+        num = state['next']
+        state['next'] += 1
+        return num
+
+    def stream(header, data):
+        return header.replace(b'>>', b' /Length %d >>' % len(data), 1) + b'\nstream\n' + data + b'\nendstream'
+
+    def finish_page(placed):
+        ops, xobjects = [], []
+        for name, num, x, y, w, h in placed:
+            ops.append(b'q %.2f 0 0 %.2f %.2f %.2f cm /%s Do Q' % (w, h, x, y, name))
+            xobjects.append(b'/%s %d 0 R' % (name, num))
+        content_num, page_num = allocate(), allocate()
+        out = emit(content_num, stream(b'<< >>', b'\n'.join(ops)))
+        out += emit(page_num, (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] '
+            b'/Resources << /XObject << %s >> >> /Contents %d 0 R >>'
+        ) % (page_w, page_h, b' '.join(xobjects), content_num))
+        page_nums.append(page_num)
+        return out
+
+    header = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+    state['pos'] = len(header)
+    yield header
+
+    page_nums, placed = [], []
+    for index, (img_w, img_h, data) in enumerate(cards):
+        num = allocate()
+        yield emit(num, stream(
+            b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB '
+            b'/BitsPerComponent 8 /Filter /DCTDecode >>' % (img_w, img_h),
+            data,
+        ))
+        pos = index % per_page
+        row, col = pos // per_row, pos % per_row
+        box_x = margin_x + col * (card_w + margin_x)
+        box_y = page_h - margin_y - (row + 1) * (card_h + margin_y)
+        scale = min(card_w / img_w, card_h / img_h)
+        w, h = img_w * scale, img_h * scale
+        placed.append((b'Im%d' % num, num, box_x + (card_w - w) / 2, box_y + (card_h - h) / 2, w, h))
+        if len(placed) == per_page:
+            yield finish_page(placed)
+            placed = []
+    if placed or not page_nums:
+        yield finish_page(placed)
+
+    kids = b' '.join(b'%d 0 R' % n for n in page_nums)
+    tail = emit(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_nums)))
+    tail += emit(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+    xref_at = state['pos']
+    count = state['next']
+    xref = b'xref\n0 %d\n0000000000 65535 f \n' % count
+    xref += b''.join(b'%010d 00000 n \n' % offsets[n] for n in range(1, count))
+    yield tail + xref + b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (count, xref_at)
+
+
+# ── Render pool ────────────────────────────────────────────────
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _workers():
+    from django.conf import settings
+    return getattr(settings, 'ID_CARD_WORKERS', 1)
+
+
+def _executor():
+    """The per-process render pool, or None to render inline."""
+    global _pool
+    workers = _workers()
+    if workers <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            try:
+                # ``spawn``: forking a threaded web worker holding DB sockets is unsafe.
+                _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            except (OSError, NotImplementedError, ImportError):
+                logger.warning('ID card process pool unavailable — rendering inline', exc_info=True)
+                return None
+        return _pool
+
+
+def _discard_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def _result(task, future):
+    if future is not None:
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            logger.warning('ID card process pool broke — rendering inline', exc_info=True)
+            _discard_pool()
+    return _render_jpeg(task)
+
+
+def render_jpegs(tasks):
+    """Yield ``_render_jpeg`` results for ``tasks`` in order, a bounded number in flight."""
+    tasks = iter(tasks)
+    pool = _executor()
+    if pool is not None:
+        window = deque()
+        limit = _workers() * _IN_FLIGHT_PER_WORKER
+        for task in tasks:
+            try:
+                future = pool.submit(_render_jpeg, task)
+            except (BrokenProcessPool, RuntimeError):
+                logger.warning('ID card process pool unusable — rendering inline', exc_info=True)
+                _discard_pool()
+                future = None
+            window.append((task, future))
+            if future is None:
+                break
+            if len(window) >= limit:
+                yield _result(*window.popleft())
+        while window:
+            yield _result(*window.popleft())
+    # Inline rendering, or whatever is left after the pool broke.
+    for task in tasks:
+        yield _render_jpeg(task)
+
+
+# ── Specs (Django side) ────────────────────────────────────────
+
+def school_info():
+    """School branding for a batch of cards."""
+    info = None
+    try:
+        from academics.models import SchoolInfo
+        info = SchoolInfo.objects.first()
+    except Exception:
+        pass
+    school = {
+        'name': 'School Name',
+        'address': 'School Address',
+        'phone': 'Phone',
+        'email': 'info@school.edu',
+        'motto': 'Education for All',
+        'template': 'classic',
+    }
+    if info:
+        school.update({
+            'name': info.name,
+            'address': info.address,
+            'phone': info.phone,
+            'email': info.email,
+            'motto': info.motto,
+            'template': info.id_card_template,
+        })
+    school = {k: v or '' for k, v in school.items()}
+    if school['template'] not in TEMPLATES:
+        school['template'] = 'classic'
+    school['issued'] = datetime.now().strftime('%d/%m/%Y')
+    return school
+
+
+def _thumb_key(name, size):
+    return f"idcard_thumb:{hashlib.sha1(f'{name}:{size}'.encode()).hexdigest()}"
+
+
+def _make_thumbnail(field_file, size):
+    """Square ``size`` JPEG of a stored photo, read through the storage API."""
+    try:
+        with field_file.open('rb') as fh:
+            img = Image.open(fh)
+            img.draft('RGB', (size * 2, size * 2))  # JPEG: decode at reduced scale
+            img = img.convert('RGB').resize((size, size), Image.Resampling.LANCZOS)
+    except Exception:
+        return b''
+    buf = BytesIO()
+    img.save(buf, 'JPEG', quality=90)
+    return buf.getvalue()
+
+
+def _person_spec(person, card_type):
+    user = person.user
+    spec = {
+        'id': person.id,
+        'first_name': user.first_name or '',
+        'last_name': user.last_name or '',
+        'full_name': user.get_full_name(),
+        'email': user.email or '',
+        'phone': getattr(user, 'phone', '') or '',
+        'photo': None,
+    }
+    if card_type == 'student':
+        spec.update({
+            'admission_number': person.admission_number,
+            'class_name': person.current_class.name if person.current_class else '',
+            'blood_group': person.blood_group or '',
+            'emergency_contact': person.emergency_contact,
+        })
+    else:
+        spec.update({
+            'employee_id': person.employee_id,
+            'qualification': person.qualification or '',
+            'subjects': [s.name for s in person.subjects.all()][:3],
+        })
+    return spec
+
+
+def iter_specs(people, card_type, school):
+    """Spec dicts for ``people``, photos from the thumbnail cache in chunked ``get_many``.
+
+    A queryset is read as a list of pks, then ``_SPEC_CHUNK`` people at a
+    time, each chunk in its own transaction: a bulk PDF streams after the
+    request's transaction has committed, where neither a server-side
+    cursor nor autocommit queries survive pgBouncer transaction mode.
+    """
+    from django.core.cache import cache
+    from django.db import transaction
+
+    size = PHOTO_SIZES[school['template']]
+
+    def _flush(chunk):
+        photos = {p.pk: p.user.profile_picture for p in chunk if p.user.profile_picture}
+        keys = {pk: _thumb_key(f.name, size) for pk, f in photos.items()}
+        try:
+            cached = cache.get_many(list(keys.values()))
+        except Exception:
+            cached = {}
+        for person in chunk:
+            try:
+                spec = _person_spec(person, card_type)
+            except Exception:
+                logger.exception('ID card data for %s #%s failed', card_type, person.pk)
+                continue
+            if person.pk in photos:
+                key = keys[person.pk]
+                thumb = cached.get(key)
+                if thumb is None:
+                    thumb = _make_thumbnail(photos[person.pk], size)
+                    if thumb:  # a failed read is retried on the next card run
+                        cache.set(key, thumb, _THUMB_TTL)
+                spec['photo'] = thumb or None
+            yield spec
+
+    if not hasattr(people, 'iterator'):
+        people = list(people)
+        for i in range(0, len(people), _SPEC_CHUNK):
+            yield from _flush(people[i:i + _SPEC_CHUNK])
+        return
+
+    with transaction.atomic():
+        pks = list(people.values_list('pk', flat=True))
+    for i in range(0, len(pks), _SPEC_CHUNK):
+        ids = pks[i:i + _SPEC_CHUNK]
+        with transaction.atomic():
+            found = {person.pk: person for person in people.filter(pk__in=ids)}
+            # Materialised here: specs read related rows (subjects, photos).
+            specs = list(_flush([found[pk] for pk in ids if pk in found]))
+        yield from specs
+
+
+# ── Public API — called by views ───────────────────────────────
+
+def _generate_card(person, card_type, template=None):
+    school = school_info()
+    if template in TEMPLATES:
+        school['template'] = template
+    spec = next(iter_specs([person], card_type, school), None)
+    if spec is None:
+        raise ValueError(f'Could not read ID card data for {card_type} #{person.pk}')
+    return render_card(spec, card_type, school)
+
+
+def generate_student_id_card(student, template=None):
+    """
+    Generate student ID card using the school's selected template.
+
+    Args:
+        student: Student object
+        template: Override template name ('classic', 'modern', 'elegant')
+
+    Returns:
+        PIL Image object
+    """
+    return _generate_card(student, 'student', template)
+
+
+def generate_teacher_id_card(teacher, template=None):
+    """
+    Generate teacher ID card using the school's selected template.
+
+    Args:
+        teacher: Teacher object
+        template: Override template name ('classic', 'modern', 'elegant')
+
+    Returns:
+        PIL Image object
+    """
+    return _generate_card(teacher, 'teacher', template)
+
+
+def export_id_card_to_pdf(card_image):
+    """
+    Convert PIL Image to PDF for printing.
+    Auto-detects orientation from image dimensions.
+
+    Returns:
+        BytesIO object containing PDF
+    """
+    w, h = card_image.size
+    return BytesIO(b''.join(iter_pdf([_jpeg(card_image)], single_card_layout(w > h))))
+
+
+def id_cards_pdf_response(people, card_type, filename):
+    """``StreamingHttpResponse`` with every renderable card of ``people`` on A4 sheets.
+
+    Returns None when not a single card could be rendered.
+    """
+    from django.http import StreamingHttpResponse
+
+    school = school_info()
+    cards = (
+        card for card in render_jpegs((spec, card_type, school) for spec in iter_specs(people, card_type, school))
+        if card is not None
+    )
+    first = next(cards, None)
+    if first is None:
+        return None
+
+    def _all():
+        yield first
+        yield from cards
+
+    layout = SHEET_LANDSCAPE if school['template'] == 'elegant' else SHEET_PORTRAIT
+    response = StreamingHttpResponse(iter_pdf(_all(), layout), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,31 @@
+"""
+Recompute the school analytics cubes (academics.analytics).
+
+Writes keep the cubes current slice by slice; run this nightly to pick up
+bulk updates and students moving class:
+    python manage.py all_tenants_command rebuild_analytics_cubes
+    python manage.py tenant_command rebuild_analytics_cubes --schema=<school>
+    python manage.py rebuild_analytics_cubes --stale-only
+"""
+from django.core.management.base import BaseCommand
+
+from academics import analytics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the attendance, grade and fee analytics cubes for the current schema'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-only',
+            action='store_true',
+            help='Only rebuild slices marked stale by recent writes',
+        )
+
+    def handle(self, *args, **options):
+        if options['stale_only']:
+            rebuilt = sum(analytics.refresh_stale(cube) for cube in ('attendance', 'grades', 'fees'))
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} stale cube slice(s).'))
+            return
+        analytics.rebuild_all()
+        self.stdout.write(self.style.SUCCESS('Analytics cubes rebuilt.'))
@@ -0,0 +1,70 @@
+# Generated by Django 5.0 on 2026-10-19 02:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0038_make_sow_image_optional'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeeStatusCube',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20, unique=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('amount_payable', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('amount_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AnalyticsStaleScope',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cube', models.CharField(choices=[('attendance', 'Attendance'), ('grades', 'Grades'), ('fees', 'Fees')], max_length=20)),
+                ('scope', models.CharField(max_length=40)),
+                ('marked_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('cube', 'scope')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceDailyCube',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('excused', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('school_class', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_cube_rows', to='academics.class')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('date', 'school_class')},
+            },
+        ),
+        migrations.CreateModel(
+            name='GradeDistributionCube',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=10)),
+                ('bucket', models.CharField(max_length=2)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='academics.academicyear')),
+                ('school_class', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='grade_cube_rows', to='academics.class')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='academics.subject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['academic_year', 'term'], name='gdc_year_term_idx')],
+                'unique_together': {('academic_year', 'term', 'school_class', 'subject', 'bucket')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0039_analytics_cubes'),
+        ('students', '0011_alter_student_aura_notes_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentxp',
+            index=models.Index(fields=['-total_xp', 'student'], name='student_xp_rank_idx'),
+        ),
+    ]
@@ -525,3 +525,11 @@ from .pulse_models import (
     PulseSession,
     PulseResponse,
 )
+
+# Import analytics cube models
+from .analytics_models import (
+    AttendanceDailyCube,
+    GradeDistributionCube,
+    FeeStatusCube,
+    AnalyticsStaleScope,
+)
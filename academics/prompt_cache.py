@@ -0,0 +1,137 @@
+"""
+Per-student tutor prompt-context cache.
+
+``get_tutor_system_prompt`` and ``students.views_ai._build_student_context``
+used to rebuild the learner's whole context on every chat turn — grades,
+learner memory, power words, timetable, scheme of work and profile — at a
+dozen queries per turn.  The prompt is now assembled from named
+*segments*, each cached separately and keyed on the versions of the data
+it depends on (its *tags*):
+
+    Segment('grades', ('grades', 'academic_year'), build, extra=subject_id)
+
+Tags are either per student (``grades``, ``memory`` …: one version per
+student) or school-wide (``timetable``, ``scheme`` …).  The receivers in
+``academics.signals`` bump a tag whenever a row behind it changes — a new
+grade bumps only that student's ``grades`` version, so their grade segment
+is rebuilt on the next turn while every other segment is served from the
+cache.  One chat turn costs two cache round trips when nothing changed.
+
+Usage::
+
+    from academics.prompt_cache import Segment, load_segments
+    parts = load_segments(student, [Segment('memory', ('memory',), build_fn)])
+
+Settings:
+  TUTOR_CONTEXT_CACHE_TTL   Seconds a segment is kept (default 21600)
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Tags versioned per student; 'user' is keyed by the student's user id.
+STUDENT_TAGS = frozenset({'student', 'grades', 'memory', 'power_words', 'aura_state'})
+USER_TAGS = frozenset({'user'})
+
+
+class Segment:
+    """One cacheable piece of prompt context.
+
+    ``build`` is called with no arguments on a miss and must return a
+    picklable value.  ``extra`` distinguishes variants that share tags
+    (e.g. the focus subject or the day of the week).
+    """
+    __slots__ = ('name', 'tags', 'build', 'extra')
+
+    def __init__(self, name, tags, build, extra=''):
+        self.name = name
+        self.tags = tuple(tags)
+        self.build = build
+        self.extra = extra
+
+
+def _schema():
+    from django.db import connection
+    return getattr(connection, 'schema_name', 'public')
+
+
+def _version_key(tag, owner_id=None):
+    if owner_id is None:
+        return f'tutor_ctx_v:{_schema()}:{tag}'
+    return f'tutor_ctx_v:{_schema()}:{tag}:{owner_id}'
+
+
+def _tag_key(tag, student):
+    if tag in STUDENT_TAGS:
+        return _version_key(tag, student.pk)
+    if tag in USER_TAGS:
+        return _version_key(tag, student.user_id)
+    return _version_key(tag)
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def bump(tag, owner_id=None):
+    """Invalidate every segment depending on ``tag`` (for ``owner_id``)."""
+    key = _version_key(tag, owner_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing or evicted — a fresh token can never match an old segment key.
+        cache.set(key, _new_version(), None)
+    except Exception:
+        logger.warning('Prompt cache bump failed for %s', key, exc_info=True)
+
+
+def _versions(keys):
+    found = cache.get_many(keys)
+    missing = [k for k in keys if k not in found]
+    for key in missing:
+        cache.add(key, _new_version(), None)
+    if missing:
+        found.update(cache.get_many(missing))
+    return found
+
+
+def _segment_key(segment, student, versions):
+    signature = '|'.join(str(versions.get(_tag_key(t, student), '')) for t in segment.tags)
+    digest = hashlib.md5(f'{segment.extra}|{signature}'.encode()).hexdigest()[:16]
+    return f'tutor_ctx:{_schema()}:{segment.name}:{student.pk}:{digest}'
+
+
+def load_segments(student, segments):
+    """Return ``{name: value}`` for ``segments``, building only the misses."""
+    try:
+        version_keys = sorted({_tag_key(t, student) for s in segments for t in s.tags})
+        versions = _versions(version_keys)
+        keys = {s.name: _segment_key(s, student, versions) for s in segments}
+        found = cache.get_many(list(keys.values()))
+    except Exception:
+        logger.warning('Prompt cache unavailable — building context uncached', exc_info=True)
+        return {s.name: s.build() for s in segments}
+
+    values = {}
+    fresh = {}
+    for segment in segments:
+        key = keys[segment.name]
+        if key in found:
+            values[segment.name] = found[key]
+        else:
+            values[segment.name] = fresh[key] = segment.build()
+    if fresh:
+        try:
+            cache.set_many(fresh, getattr(settings, 'TUTOR_CONTEXT_CACHE_TTL', 6 * 60 * 60))
+        except Exception:
+            logger.warning('Prompt cache write failed', exc_info=True)
+    return values
+
+
+def load_segment(student, segment):
+    return load_segments(student, [segment])[segment.name]
@@ -0,0 +1,108 @@
+"""
+Cache invalidation for academics read models.
+
+  * Analytics cubes (academics.analytics): each write marks only the slice
+    it touched as stale; the slice is rebuilt on the next dashboard read.
+  * Tutor prompt context (academics.prompt_cache): each write bumps the
+    version of the one segment tag it affects.
+  * Grading scale (academics.grading): any change bumps the school's
+    scale version.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender='students.Attendance')
+@receiver(post_delete, sender='students.Attendance')
+def attendance_cube_stale(sender, instance, **kwargs):
+    from academics.analytics import mark_stale
+    mark_stale('attendance', str(instance.date))
+
+
+@receiver(post_save, sender='students.Grade')
+@receiver(post_delete, sender='students.Grade')
+def grade_cube_stale(sender, instance, **kwargs):
+    from academics.analytics import grade_scope, mark_stale
+    mark_stale('grades', grade_scope(instance.academic_year_id, instance.term))
+
+
+@receiver(post_save, sender='finance.StudentFee')
+@receiver(post_delete, sender='finance.StudentFee')
+@receiver(post_save, sender='finance.Payment')
+@receiver(post_delete, sender='finance.Payment')
+def fee_cube_stale(sender, instance, **kwargs):
+    from academics.analytics import mark_stale
+    mark_stale('fees', 'all')
+
+
+# ── Tutor prompt-context cache ─────────────────────────────────
+
+def _bump(tag, owner_id=None):
+    from academics.prompt_cache import bump
+    bump(tag, owner_id)
+
+
+@receiver(post_save, sender='students.Student')
+@receiver(post_delete, sender='students.Student')
+def student_prompt_stale(sender, instance, **kwargs):
+    _bump('student', instance.pk)
+
+
+@receiver(post_save, sender='accounts.User')
+def user_prompt_stale(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    _bump('user', instance.pk)
+
+
+@receiver(post_save, sender='students.Grade')
+@receiver(post_delete, sender='students.Grade')
+def grade_prompt_stale(sender, instance, **kwargs):
+    _bump('grades', instance.student_id)
+
+
+@receiver(post_save, sender='academics.LearnerMemory')
+@receiver(post_delete, sender='academics.LearnerMemory')
+def memory_prompt_stale(sender, instance, **kwargs):
+    _bump('memory', instance.student_id)
+
+
+@receiver(post_save, sender='academics.PowerWord')
+@receiver(post_delete, sender='academics.PowerWord')
+def power_word_prompt_stale(sender, instance, **kwargs):
+    _bump('power_words', instance.student_id)
+
+
+@receiver(post_save, sender='academics.AuraSessionState')
+@receiver(post_delete, sender='academics.AuraSessionState')
+def session_state_prompt_stale(sender, instance, **kwargs):
+    _bump('aura_state', instance.student_id)
+
+
+_SCHOOL_WIDE_TAGS = {
+    'academics.SchoolInfo': 'school',
+    'academics.AcademicYear': 'academic_year',
+    'academics.Class': 'class_subjects',
+    'academics.Subject': 'class_subjects',
+    'academics.ClassSubject': 'class_subjects',
+    'academics.Timetable': 'timetable',
+    'academics.SchemeOfWork': 'scheme',
+}
+
+
+def _school_wide_prompt_stale(sender, **kwargs):
+    _bump(_SCHOOL_WIDE_TAGS[sender._meta.label])
+
+
+for _label in _SCHOOL_WIDE_TAGS:
+    post_save.connect(_school_wide_prompt_stale, sender=_label, dispatch_uid=f'prompt_cache_{_label}_save')
+    post_delete.connect(_school_wide_prompt_stale, sender=_label, dispatch_uid=f'prompt_cache_{_label}_delete')
+
+
+# ── Grading scale (academics.grading) ──────────────────────────
+
+@receiver(post_save, sender='academics.GradingScale')
+@receiver(post_delete, sender='academics.GradingScale')
+def grading_scale_changed(sender, instance, **kwargs):
+    from academics.grading import bump_version
+    bump_version()
@@ -1,5 +1,9 @@
 from django.urls import path
-from . import views
+
+from school_system.startup import lazy_views
+
+# ~4k lines; imported when one of its views is first dispatched.
+views = lazy_views('academics.views')
 
 app_name = 'academics'
 
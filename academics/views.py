@@ -10,7 +10,6 @@ import re
 import os
 import io
 import base64
-from huggingface_hub import InferenceClient
 from django.db import connection, ProgrammingError, transaction
 from django.db.models import Q, Count, Max
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
@@ -795,14 +794,10 @@ def admissions_assistant(request):
         return JsonResponse({'error': 'Invalid request'}, status=405)
 
     # Basic IP-based rate limiting (20 requests per 60s window)
-    from django.core.cache import cache
-    ip = request.META.get('REMOTE_ADDR', 'unknown')
-    schema = getattr(getattr(connection, 'tenant', None), 'schema_name', 'public')
-    rate_key = f"{schema}:chatbot_rate:{ip}"
-    hits = cache.get(rate_key, 0)
-    if hits >= 20:
-        return JsonResponse({'error': 'Too many requests. Please wait a moment.'}, status=429)
-    cache.set(rate_key, hits + 1, 60)
+    from school_system.ratelimit import check
+    decision = check(request, 'chatbot', '20/m', key=('tenant', 'ip'))
+    if not decision.allowed:
+        return decision.response({'error': 'Too many requests. Please wait a moment.'})
 
     try:
         # Parse request body
@@ -976,14 +971,10 @@ def copilot_assistant(request):
 
     # Rate limiting for unauthenticated users (30 requests per 60s window)
     if not request.user.is_authenticated:
-        from django.core.cache import cache
-        ip = request.META.get('REMOTE_ADDR', 'unknown')
-        schema = connection.tenant.schema_name
-        rate_key = f"{schema}:copilot_rate:{ip}"
-        hits = cache.get(rate_key, 0)
-        if hits >= 30:
-            return JsonResponse({'error': 'Too many requests. Please wait a moment.'}, status=429)
-        cache.set(rate_key, hits + 1, 60)
+        from school_system.ratelimit import check
+        decision = check(request, 'copilot', '30/m', key=('tenant', 'ip'))
+        if not decision.allowed:
+            return decision.response({'error': 'Too many requests. Please wait a moment.'})
 
     def violates_school_policy(text: str) -> bool:
         if not text:
@@ -2293,24 +2284,21 @@ def _process_xp_awards(student, full_text):
                 pass
                 
         if total_awarded > 0:
-            from .gamification_models import StudentXP, check_and_unlock_achievements
-            profile, created = StudentXP.objects.get_or_create(student=student)
-            leveled_up = profile.add_xp(total_awarded)
-            profile.update_streak()
-            check_and_unlock_achievements(student, profile)
-            if leveled_up:
+            from .gamification import award
+            result = award(student, total_awarded)
+            if result.leveled_up:
                 try:
                     from announcements.models import Notification
                     Notification.objects.create(
                         recipient=student.user,
-                        message=f'⭐ Level Up! You reached Level {profile.level} — keep learning with SchoolPadi!',
+                        message=f'⭐ Level Up! You reached Level {result.level} — keep learning with SchoolPadi!',
                         alert_type='general',
                         link='../../students/padi-portfolio/',
                     )
                 except Exception:
                     pass
-            logger.info("Awarded %d XP to %s. New Level: %d", total_awarded, student, profile.level)
-            return total_awarded, leveled_up
+            logger.info("Awarded %d XP to %s. New Level: %d", total_awarded, student, result.level)
+            return total_awarded, result.leveled_up
     except Exception as e:
         logger.error("Gamification error: %s", e)
         
@@ -3072,6 +3060,7 @@ def generate_tutor_image(request):
         if not hf_token:
             return JsonResponse({'error': 'HF_TOKEN not configured'}, status=500)
 
+        from huggingface_hub import InferenceClient
         client = InferenceClient(token=hf_token)
         image = client.text_to_image(
             prompt,
@@ -3261,13 +3250,10 @@ def help_chat_api(request):
         return JsonResponse({'error': 'POST required'}, status=405)
 
     # Rate limiting: 30 requests per minute per user
-    from django.core.cache import cache
-    schema = connection.tenant.schema_name
-    rate_key = f"{schema}:help_chat:{request.user.pk}"
-    hits = cache.get(rate_key, 0)
-    if hits >= 30:
-        return JsonResponse({'error': 'Too many requests. Please wait a moment.'}, status=429)
-    cache.set(rate_key, hits + 1, 60)
+    from school_system.ratelimit import check
+    decision = check(request, 'help_chat', '30/m', key=('tenant', 'user'))
+    if not decision.allowed:
+        return decision.response({'error': 'Too many requests. Please wait a moment.'})
 
     try:
         payload = json.loads(request.body.decode('utf-8'))
@@ -0,0 +1,221 @@
+"""
+Append-only AI credit ledger with a cached, denormalized balance.
+
+Teacher credits (``teachers.TeacherCreditBalance`` / ``CreditTransaction``,
+per school schema) and individual-portal credits
+(``individual_users.IndividualCreditBalance`` / ``IndividualCreditTransaction``,
+public schema) follow the same model: every grant, purchase, use and refund
+is a ledger row, and the balance row is its running total.
+
+Previously each page view ran ``get_or_create`` on the balance row through
+the context processor, and each AI call locked, read and re-saved it.  Now:
+
+  * **Posting** is one statement: a conditional
+    ``UPDATE … SET balance = balance + amount WHERE balance + amount >= 0
+    RETURNING …`` with the ledger ``INSERT`` chained in the same CTE, so a
+    deduction either happens together with its ledger row or not at all, and
+    two tabs can never spend the same credit.
+  * **Reading** the balance is a cache hit; postings write the new balance
+    through, or — inside a transaction — drop the key once it commits.
+  * ``reconcile()`` (``python manage.py reconcile_credits``) proves that
+    every balance equals the sum of its ledger rows.
+
+Accounts are opened lazily with the welcome bonus as their first ledger row.
+
+Usage::
+
+    from accounts.credit_ledger import CreditLedger
+
+    LEDGER = CreditLedger('teachers.TeacherCreditBalance', 'teachers.CreditTransaction',
+                          owner='teacher', welcome_bonus=10)
+    LEDGER.balance(user)
+    ok, balance = LEDGER.post(user, -2, 'usage', 'Slide Gen (-2 credits)')
+
+Settings:
+  CREDIT_BALANCE_CACHE_TTL   Seconds a cached balance is kept (default 600)
+"""
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class CreditLedger:
+    """One balance model + its ledger model, both keyed by a user FK named ``owner``."""
+
+    def __init__(self, balance_model, ledger_model, owner, welcome_bonus=0, name=None):
+        self.balance_label = balance_model
+        self.ledger_label = ledger_model
+        self.owner = owner
+        self.welcome_bonus = welcome_bonus
+        self.name = name or balance_model.split('.')[0]
+
+    @property
+    def balance_model(self):
+        return apps.get_model(self.balance_label)
+
+    @property
+    def ledger_model(self):
+        return apps.get_model(self.ledger_label)
+
+    # ── Cache ──────────────────────────────────────────────────
+
+    def cache_key(self, user_id):
+        schema = getattr(connection, 'schema_name', 'public')
+        return f'credits:{self.name}:{schema}:{user_id}'
+
+    def _cache_written(self, user_id, balance):
+        key = self.cache_key(user_id)
+        if connection.in_atomic_block:
+            # Nothing is cached before commit: a rolled-back posting must not
+            # leave its balance behind.  A concurrent posting may commit in
+            # between, so drop the key and let the next read re-fetch.
+            transaction.on_commit(lambda: cache.delete(key))
+            return
+        try:
+            cache.set(key, balance, getattr(settings, 'CREDIT_BALANCE_CACHE_TTL', 600))
+        except Exception:
+            logger.warning('Credit balance cache write failed for %s', key, exc_info=True)
+
+    def forget(self, user_id):
+        cache.delete(self.cache_key(user_id))
+
+    # ── Accounts ───────────────────────────────────────────────
+
+    def open_account(self, user):
+        """The balance row for ``user``, created with the welcome bonus if new."""
+        with transaction.atomic():
+            bal, created = self.balance_model.objects.get_or_create(
+                **{self.owner: user},
+                defaults={'balance': self.welcome_bonus, 'total_purchased': 0, 'total_used': 0},
+            )
+            if created and self.welcome_bonus:
+                self.ledger_model.objects.create(
+                    **{self.owner: user},
+                    amount=self.welcome_bonus,
+                    balance_after=self.welcome_bonus,
+                    transaction_type='bonus',
+                    description=f'Welcome bonus — {self.welcome_bonus} free AI credits',
+                )
+        if created:
+            self._cache_written(user.pk, bal.balance)
+        return bal
+
+    def balance(self, user):
+        """Current balance of ``user`` — a cache hit on every page view after the first."""
+        key = self.cache_key(user.pk)
+        try:
+            cached = cache.get(key)
+        except Exception:
+            cached = None
+        if cached is not None:
+            return cached
+        value = (
+            self.balance_model.objects.filter(**{self.owner: user})
+            .values_list('balance', flat=True).first()
+        )
+        if value is None:
+            return self.open_account(user).balance
+        try:
+            cache.set(key, value, getattr(settings, 'CREDIT_BALANCE_CACHE_TTL', 600))
+        except Exception:
+            pass
+        return value
+
+    # ── Posting ────────────────────────────────────────────────
+
+    def _post_sql(self):
+        qn = connection.ops.quote_name
+        bal_meta, led_meta = self.balance_model._meta, self.ledger_model._meta
+        bal_cols = [f.column for f in bal_meta.concrete_fields]
+        owner_col = bal_meta.get_field(self.owner).column
+        led_owner_col = led_meta.get_field(self.owner).column
+        led_cols = [led_owner_col] + [
+            led_meta.get_field(name).column for name in (
+                'amount', 'balance_after', 'transaction_type', 'description',
+                'payment_reference', 'created_at',
+            )
+        ]
+        returning = ', '.join(qn(c) for c in bal_cols)
+        sql = (
+            f'WITH upd AS ('
+            f'UPDATE {qn(bal_meta.db_table)} SET '
+            f'{qn("balance")} = {qn("balance")} + %s, '
+            f'{qn("total_used")} = {qn("total_used")} + %s, '
+            f'{qn("total_purchased")} = {qn("total_purchased")} + %s, '
+            f'{qn("updated_at")} = %s '
+            f'WHERE {qn(owner_col)} = %s AND {qn("balance")} + %s >= 0 '
+            f'RETURNING {returning}'
+            f'), ins AS ('
+            f'INSERT INTO {qn(led_meta.db_table)} ({", ".join(qn(c) for c in led_cols)}) '
+            f'SELECT {qn(owner_col)}, %s, {qn("balance")}, %s, %s, %s, %s FROM upd'
+            f') SELECT {returning} FROM upd'
+        )
+        return sql, [f.attname for f in bal_meta.concrete_fields]
+
+    def _try_post(self, user_id, amount, transaction_type, description, payment_reference):
+        sql, attnames = self._post_sql()
+        used = -amount if transaction_type == 'usage' else 0
+        purchased = amount if transaction_type == 'purchase' else 0
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [
+                amount, used, purchased, now, user_id, amount,
+                amount, transaction_type, description[:255], payment_reference, now,
+            ])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return self.balance_model.from_db(connection.alias, attnames, row)
+
+    def post(self, user, amount, transaction_type, description, payment_reference=''):
+        """Apply ``amount`` and record it.  Returns ``(ok, balance_row_or_current_balance)``.
+
+        ``ok`` is False — and nothing is written — when the posting would take
+        the balance below zero; the second item is then the current balance.
+        """
+        bal = self._try_post(user.pk, amount, transaction_type, description, payment_reference)
+        if bal is None:
+            account = self.open_account(user)
+            if account.balance + amount < 0:
+                return False, account.balance
+            # The account was just opened (or topped up meanwhile) — try once more.
+            bal = self._try_post(user.pk, amount, transaction_type, description, payment_reference)
+            if bal is None:
+                return False, self.balance_model.objects.get(**{self.owner: user}).balance
+        self._cache_written(user.pk, bal.balance)
+        return True, bal
+
+    # ── Reconciliation ─────────────────────────────────────────
+
+    def reconcile(self):
+        """Balance rows whose balance differs from the sum of their ledger rows.
+
+        Returns ``[(owner_id, balance, ledger_total), …]``.  Owners with ledger
+        rows but no balance row are reported with ``balance=None``.
+        """
+        Balance, Ledger = self.balance_model, self.ledger_model
+        owner_id = f'{self.owner}_id'
+        totals = (
+            Ledger.objects.filter(**{owner_id: OuterRef(owner_id)})
+            .order_by().values(owner_id).annotate(total=Sum('amount')).values('total')
+        )
+        mismatched = [
+            tuple(row) for row in
+            Balance.objects.annotate(
+                ledger_total=Coalesce(Subquery(totals, output_field=IntegerField()), Value(0)),
+            ).exclude(balance=F('ledger_total')).values_list(owner_id, 'balance', 'ledger_total')
+        ]
+        orphans = (
+            Ledger.objects.exclude(**{f'{owner_id}__in': Balance.objects.values(owner_id)})
+            .order_by().values(owner_id).annotate(total=Sum('amount')).exclude(total=0)
+        )
+        mismatched += [(row[owner_id], None, row['total']) for row in orphans]
+        return mismatched
@@ -0,0 +1,239 @@
+"""
+Document rendering service for DOCX, PDF and PPTX downloads.
+
+Exam papers, lesson plans, slide decks and payment receipts were each built
+inside their view: python-docx / ReportLab / python-pptx imported on the
+request path, fonts and paragraph styles rebuilt for every download, and
+the same file regenerated every time someone clicked the link again.  Views
+now describe a document as a JSON-serialisable *payload* and name a
+*renderer*, and this module does the rest:
+
+  * **Renderers** are plain functions ``render(payload, progress) -> bytes``
+    referenced by dotted path and imported only when a file actually has to
+    be built, so the heavy libraries stay out of cold starts.  Renderer
+    modules keep their style sheets and base templates in per-process
+    ``lru_cache``s.  A renderer may carry a ``version`` attribute; bump it
+    when its output changes.
+  * **Artifact cache**: the finished file is stored under
+    ``documents/<sha256 of renderer, version and payload>.<ext>`` in the
+    default storage.  Downloading an unchanged exam paper again — or the
+    same receipt from another device — is a storage read.
+  * **Background generation**: when the caller says the document is large
+    (``size`` above ``DOCUMENT_ASYNC_THRESHOLD``) and it is not cached yet,
+    it is built on a daemon thread as an ``ExportJob`` and the user is sent
+    to the job's status page, which polls ``progress`` and offers the
+    download when it is ready.
+
+Usage::
+
+    from accounts.documents import document_response
+
+    payload = exam_paper_payload(paper, school)
+    return document_response(
+        request, 'teachers.documents.exam_paper_pdf', payload,
+        filename='Mid-Term.pdf', size=len(payload['questions']),
+    )
+
+Settings:
+  DOCUMENT_CACHE_ENABLED     Keep finished files in storage (default True)
+  DOCUMENT_ASYNC_THRESHOLD   Items (questions, slides) above which an uncached
+                             document is built in the background (default 150)
+"""
+import hashlib
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import FileResponse, HttpResponse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+}
+
+_INDEX_PREFIX = 'document:'
+_INDEX_TTL = 60 * 60 * 24
+
+
+def _fmt(filename):
+    fmt = filename.rsplit('.', 1)[-1].lower()
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f'Unsupported document format: {filename}')
+    return fmt
+
+
+def artifact_name(renderer, payload, fmt):
+    """Storage name of the file ``renderer`` makes from ``payload``."""
+    version = getattr(import_string(renderer), 'version', 1)
+    blob = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    digest = hashlib.sha256(f'{renderer}:{version}:{blob}'.encode()).hexdigest()
+    return f'documents/{digest[:2]}/{digest}.{fmt}'
+
+
+# ── Artifact cache ─────────────────────────────────────────────
+
+def _cache_enabled():
+    return getattr(settings, 'DOCUMENT_CACHE_ENABLED', True)
+
+
+def cached_artifact(name):
+    """True when ``name`` is already in storage (checked via the cache first)."""
+    from django.core.files.storage import default_storage
+    if not _cache_enabled():
+        return False
+    if cache.get(_INDEX_PREFIX + name):
+        return True
+    try:
+        found = default_storage.exists(name)
+    except Exception:
+        logger.warning('Document storage unavailable', exc_info=True)
+        return False
+    if found:
+        cache.set(_INDEX_PREFIX + name, 1, _INDEX_TTL)
+    return found
+
+
+def _store(name, data):
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    if not _cache_enabled():
+        return None
+    try:
+        stored = default_storage.save(name, ContentFile(data))
+    except Exception:
+        logger.warning('Document %s could not be stored', name, exc_info=True)
+        return None
+    cache.set(_INDEX_PREFIX + stored, 1, _INDEX_TTL)
+    return stored
+
+
+def render(renderer, payload, fmt, progress=None):
+    """Build the document and store it.  Returns ``(storage name or None, bytes)``."""
+    data = import_string(renderer)(payload, progress or (lambda fraction: None))
+    return _store(artifact_name(renderer, payload, fmt), data), data
+
+
+# ── Responses ──────────────────────────────────────────────────
+
+def _attachment(data, filename, fmt):
+    response = HttpResponse(data, content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def document_response(request, renderer, payload, filename, size=0):
+    """Serve the stored file, build it now, or queue it when ``size`` is large."""
+    from django.core.files.storage import default_storage
+    fmt = _fmt(filename)
+    name = artifact_name(renderer, payload, fmt)
+    if cached_artifact(name):
+        try:
+            return FileResponse(
+                default_storage.open(name, 'rb'), as_attachment=True,
+                filename=filename, content_type=CONTENT_TYPES[fmt],
+            )
+        except Exception:
+            cache.delete(_INDEX_PREFIX + name)
+            logger.warning('Stored document %s unreadable — rebuilding', name, exc_info=True)
+
+    if size > getattr(settings, 'DOCUMENT_ASYNC_THRESHOLD', 150):
+        from django.shortcuts import redirect
+        job = start_document_job(request.user, renderer, payload, filename, size)
+        return redirect('accounts:export_job_status', token=job.token)
+
+    _name, data = render(renderer, payload, fmt)
+    return _attachment(data, filename, fmt)
+
+
+# ── Background jobs ────────────────────────────────────────────
+
+def start_document_job(user, renderer, payload, filename, size=0):
+    """Create an ``ExportJob`` and build the document on a daemon thread."""
+    from django.db import connection, transaction
+    from django.urls import reverse
+    from accounts.models import ExportJob
+
+    job = ExportJob.objects.create(
+        requested_by=user, name=filename, fmt=_fmt(filename), row_count=size,
+    )
+    schema_name = getattr(connection, 'schema_name', None)
+    # Reversed here: the tenant's script prefix is set on the request thread only.
+    link = reverse('accounts:export_job_status', kwargs={'token': job.token})
+
+    def _worker():
+        from django.db import close_old_connections
+        try:
+            if schema_name:
+                from django_tenants.utils import schema_context
+                with schema_context(schema_name):
+                    run_document_job(job.pk, renderer, payload, link)
+            else:
+                run_document_job(job.pk, renderer, payload, link)
+        finally:
+            close_old_connections()
+
+    # The job row must be committed before the worker looks it up.
+    transaction.on_commit(lambda: threading.Thread(target=_worker, daemon=True).start())
+    return job
+
+
+def run_document_job(job_id, renderer, payload, link=''):
+    """Render the document for ``job_id``, reporting progress on the job row.
+
+    Renderers work from the payload alone; every query here runs in its own
+    short transaction (pgBouncer transaction mode) so progress is visible
+    as it is made.  ``link`` is the status page for the ready notification.
+    """
+    from django.core.files.base import ContentFile
+    from django.db import transaction
+    from django.utils import timezone
+    from accounts.models import ExportJob
+
+    with transaction.atomic():
+        job = ExportJob.objects.get(pk=job_id)
+        job.status = 'running'
+        job.save(update_fields=['status'])
+    reported = [0]
+
+    def progress(fraction):
+        percent = min(int(fraction * 100), 99)
+        if percent >= reported[0] + 5:
+            reported[0] = percent
+            with transaction.atomic():
+                ExportJob.objects.filter(pk=job_id).update(progress=percent)
+
+    try:
+        stored, data = render(renderer, payload, job.fmt, progress)
+        if stored:
+            job.file.name = stored
+        else:
+            job.file.save(job.name, ContentFile(data), save=False)
+        job.status = 'done'
+        job.progress = 100
+    except Exception as exc:
+        logger.exception('Document job %s failed', job_id)
+        job.status = 'failed'
+        job.error = str(exc)[:500]
+    job.finished_at = timezone.now()
+    with transaction.atomic():
+        job.save(update_fields=['status', 'file', 'error', 'progress', 'finished_at'])
+
+    if job.status == 'done':
+        try:
+            from announcements.models import Notification
+            with transaction.atomic():
+                Notification.objects.create(
+                    recipient_id=job.requested_by_id,
+                    message=f'Your document {job.name} is ready to download.',
+                    link=link,
+                    alert_type='general',
+                )
+        except Exception:
+            logger.debug('Document ready notification skipped', exc_info=True)
+    return job
@@ -0,0 +1,366 @@
+"""
+Staged bulk CSV imports.
+
+Student, teacher and grade-sheet uploads used to walk the file row by row —
+one ``User`` insert, a class lookup by name, username/admission-number
+probing and a profile insert per line — so a 1,500-student term start took
+minutes and died mid-file on serverless timeouts, leaving half a class
+imported.  Uploads now go through four stages:
+
+  1. **Stage**     the file is parsed into ``ImportRow`` staging rows
+                   (one ``bulk_create``).
+  2. **Validate**  the importer for the batch's kind checks every row at
+                   once: lookups (classes, students, subjects, parents,
+                   taken usernames and codes) are resolved with a handful
+                   of set-based queries, and each bad row gets a precise
+                   error instead of aborting the file.
+  3. **Commit**    valid rows are written ``IMPORT_CHUNK_SIZE`` at a time
+                   with ``bulk_create`` / ``bulk_update``; each chunk
+                   commits in its own transaction and flips its rows to
+                   ``imported``.
+  4. **Resume**    a run stops cleanly after ``IMPORT_TIME_BUDGET`` seconds
+                   (or dies); the batch page continues from the first row
+                   not yet imported.
+
+Importers live next to their models (``students.imports``,
+``teachers.imports``) and are looked up through ``IMPORTERS``.  Upload views
+are decorated with ``import_view``: the view body runs in one transaction
+as under ATOMIC_REQUESTS, and the stages ``finish_import`` asks for run
+after it has committed, each stage (and each chunk) in its own
+transaction — pgBouncer transaction mode needs every query inside one,
+and chunks must commit on their own to be resumable.
+
+Usage::
+
+    from accounts.imports import finish_import, import_view, stage_upload
+
+    @import_view
+    @login_required
+    def import_students_csv(request):
+        ...
+        batch = stage_upload(request.user, 'students', csv_file,
+                         {'default_class_id': 3}, next_url='students:student_list')
+    return finish_import(request, batch)
+
+Settings:
+  IMPORT_CHUNK_SIZE    Rows written per transaction (default 500)
+  IMPORT_TIME_BUDGET   Seconds one request spends importing before handing
+                       over to the resumable batch page (default 20)
+"""
+import csv
+import io
+import logging
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+IMPORTERS = {
+    'students': 'students.imports.StudentImporter',
+    'teachers': 'teachers.imports.TeacherImporter',
+    'grades': 'students.imports.GradeImporter',
+}
+
+# Cell values treated as "not provided".
+BLANK_VALUES = frozenset({'', 'N/A', 'NA'})
+
+# Usernames probed per query when allocating new ones.
+_PREFIX_BATCH = 200
+
+
+def chunk_size():
+    return getattr(settings, 'IMPORT_CHUNK_SIZE', 500)
+
+
+def get_importer(kind):
+    return import_string(IMPORTERS[kind])()
+
+
+# ── Row helpers ────────────────────────────────────────────────
+
+def pick(data, *aliases):
+    """First non-empty value among the header ``aliases`` (stripped)."""
+    for alias in aliases:
+        value = (data.get(alias) or '').strip()
+        if value:
+            return value
+    return ''
+
+
+def is_blank(value):
+    return (value or '').strip().upper() in BLANK_VALUES
+
+
+def username_base(first_name, last_name):
+    base = f'{first_name.lower()}.{last_name.lower()}' if last_name else first_name.lower()
+    return base.replace(' ', '').replace('-', '')
+
+
+class UsernameAllocator:
+    """Hands out ``base``, ``base1``, ``base2`` … without a query per probe.
+
+    Existing usernames sharing a base are loaded up front (one query per
+    ``_PREFIX_BATCH`` bases); ``reserved`` holds names already promised to
+    other rows of the batch.
+    """
+
+    def __init__(self, bases, reserved=()):
+        from accounts.models import User
+        self.taken = set(reserved)
+        bases = sorted(set(filter(None, bases)))
+        for i in range(0, len(bases), _PREFIX_BATCH):
+            query = Q()
+            for base in bases[i:i + _PREFIX_BATCH]:
+                query |= Q(username__startswith=base)
+            self.taken.update(User.objects.filter(query).values_list('username', flat=True))
+
+    def allocate(self, base):
+        username, counter = base, 1
+        while username in self.taken:
+            username = f'{base}{counter}'
+            counter += 1
+        self.taken.add(username)
+        return username
+
+
+class CodeAllocator:
+    """Random ``PREFIX1234`` codes (admission numbers, employee IDs) unused so far."""
+
+    def __init__(self, prefix, taken):
+        self.prefix = prefix
+        self.taken = set(taken)
+
+    def allocate(self):
+        for _ in range(100):  # Try up to 100 times
+            candidate = f"{self.prefix}{''.join(random.choices('0123456789', k=4))}"
+            if candidate not in self.taken:
+                self.taken.add(candidate)
+                return candidate
+        return None
+
+
+def allocate_email(email, username, taken):
+    """The row's email, or a ``@school.local`` placeholder, unique within ``taken``."""
+    if is_blank(email):
+        email = f'{username}@school.local'
+    if email in taken:
+        email = f'{username}{random.randint(1, 999)}@school.local'
+    taken.add(email)
+    return email
+
+
+class Importer:
+    """One kind of import.  Subclasses implement ``validate`` and ``commit``."""
+    noun = 'row'
+
+    def validate(self, batch, rows):
+        """Set ``row.resolved`` or ``row.error`` on every row using set-based lookups."""
+        raise NotImplementedError
+
+    def commit(self, batch, rows):
+        """Write ``rows`` (all valid) with bulk operations."""
+        raise NotImplementedError
+
+    @staticmethod
+    def reserved(batch, rows, key):
+        """``resolved[key]`` of the batch's other valid rows (promised, not yet written)."""
+        ids = [r.pk for r in rows]
+        return {
+            value for value in
+            batch.rows.filter(status='valid').exclude(pk__in=ids)
+            .values_list(f'resolved__{key}', flat=True)
+            if value
+        }
+
+
+# ── Stages ─────────────────────────────────────────────────────
+
+def stage_upload(user, kind, uploaded_file, options=None, next_url=''):
+    """Parse ``uploaded_file`` into staging rows and return the ``ImportBatch``.
+
+    Raises ``UnicodeDecodeError`` / ``csv.Error`` for unreadable files.
+    """
+    from accounts.models import ImportBatch, ImportRow
+
+    text = uploaded_file.read().decode('utf-8-sig')
+    reader = csv.DictReader(io.StringIO(text))
+    with transaction.atomic():
+        batch = ImportBatch.objects.create(
+            kind=kind,
+            requested_by=user,
+            filename=(uploaded_file.name or '')[:255],
+            options={**(options or {}), 'next': next_url},
+        )
+        rows = [
+            ImportRow(
+                batch=batch,
+                row_number=row_num,
+                data={k.strip(): (v or '') for k, v in row.items() if isinstance(k, str)},
+            )
+            for row_num, row in enumerate(reader, start=2)  # Start at 2 (header is row 1)
+        ]
+        ImportRow.objects.bulk_create(rows, batch_size=1000)
+        batch.total_rows = len(rows)
+        batch.save(update_fields=['total_rows'])
+    return batch
+
+
+def validate_batch(batch, rows=None):
+    """Validate ``rows`` (default: every pending row) and store the results."""
+    from accounts.models import ImportRow
+
+    with transaction.atomic():
+        if rows is None:
+            rows = list(batch.rows.filter(status='pending'))
+        for row in rows:
+            row.resolved, row.error = {}, ''
+        get_importer(batch.kind).validate(batch, rows)
+        for row in rows:
+            row.status = 'invalid' if row.error else 'valid'
+            row.error = row.error[:255]
+        ImportRow.objects.bulk_update(rows, ['resolved', 'status', 'error'], batch_size=500)
+        batch.invalid_rows = batch.rows.filter(status='invalid').count()
+        if batch.status == 'staged':
+            batch.status = 'validated'
+        batch.save(update_fields=['invalid_rows', 'status'])
+
+
+def commit_batch(batch, budget=None):
+    """Import the batch's valid rows chunk by chunk.  Returns True when finished."""
+    from django.utils import timezone
+    from accounts.models import ImportRow
+
+    importer = get_importer(batch.kind)
+    deadline = time.monotonic() + budget if budget else None
+    batch.status = 'importing'
+    with transaction.atomic():
+        batch.save(update_fields=['status'])
+
+    retried = set()
+    finished = True
+    while True:
+        # Each chunk — its SELECT, the writes and a re-validation — is one transaction.
+        with transaction.atomic():
+            chunk = list(batch.rows.filter(status='valid').order_by('row_number')[:chunk_size()])
+            if not chunk:
+                break
+            try:
+                with transaction.atomic():
+                    importer.commit(batch, chunk)
+                    ImportRow.objects.filter(pk__in=[r.pk for r in chunk]).update(status='imported')
+            except IntegrityError as exc:
+                first = chunk[0].pk
+                if first in retried:
+                    ImportRow.objects.filter(pk__in=[r.pk for r in chunk]).update(
+                        status='invalid', error=str(exc)[:255],
+                    )
+                    continue
+                # Something changed since validation (a concurrent import took a
+                # username, a student was deleted …) — re-check this chunk only.
+                logger.info('Import batch %s: re-validating rows from %s', batch.pk, chunk[0].row_number)
+                retried.add(first)
+                validate_batch(batch, chunk)
+                continue
+            if deadline and time.monotonic() > deadline:
+                finished = not batch.rows.filter(status='valid').exists()
+                break
+
+    with transaction.atomic():
+        batch.imported_rows = batch.rows.filter(status='imported').count()
+        batch.invalid_rows = batch.rows.filter(status='invalid').count()
+        update_fields = ['imported_rows', 'invalid_rows']
+        if finished:
+            batch.status = 'done'
+            batch.finished_at = timezone.now()
+            update_fields += ['status', 'finished_at']
+        batch.save(update_fields=update_fields)
+    return finished
+
+
+def run_import(batch, budget=None):
+    """Validate anything still pending, then commit.  Returns True when finished."""
+    try:
+        with transaction.atomic():
+            pending = batch.rows.filter(status='pending').exists()
+        if pending:
+            validate_batch(batch)
+        return commit_batch(batch, budget)
+    except Exception as exc:
+        logger.exception('Import batch %s failed', batch.pk)
+        batch.status = 'failed'
+        batch.error = str(exc)[:500]
+        with transaction.atomic():
+            batch.save(update_fields=['status', 'error'])
+        return False
+
+
+# ── Views helpers ──────────────────────────────────────────────
+
+def add_result_messages(request, batch):
+    """Flash the same summary the row-by-row importers used to show."""
+    from django.contrib import messages
+
+    noun = get_importer(batch.kind).noun
+    if batch.imported_rows > 0:
+        messages.success(request, f'Successfully imported {batch.imported_rows} {noun}(s).')
+    if batch.invalid_rows > 0:
+        messages.warning(request, f'Skipped {batch.invalid_rows} row(s) due to errors.')
+        errors = [
+            f'Row {n}: {e}' for n, e in
+            batch.rows.filter(status='invalid').values_list('row_number', 'error')[:10]
+        ]
+        if batch.invalid_rows <= 10:
+            for error in errors:
+                messages.error(request, error)
+        else:
+            messages.error(request, f'{batch.invalid_rows} errors occurred. First 10: {", ".join(errors)}')
+
+
+class _PendingImport:
+    """What ``finish_import`` returns inside an ``import_view``: run me after the commit."""
+
+    def __init__(self, batch):
+        self.batch = batch
+
+
+def finish_import(request, batch):
+    """Run ``batch`` within the time budget and redirect to the result.
+
+    Inside an ``import_view`` the run is deferred until the view's
+    transaction has committed.
+    """
+    from django.shortcuts import redirect
+
+    if getattr(request, '_defer_import', False):
+        return _PendingImport(batch)
+    budget = getattr(settings, 'IMPORT_TIME_BUDGET', 20)
+    if run_import(batch, budget):
+        with transaction.atomic():
+            add_result_messages(request, batch)
+        return redirect(batch.options.get('next') or 'dashboard')
+    return redirect('accounts:import_batch_status', token=batch.token)
+
+
+def import_view(view):
+    """Make an upload view non-atomic without running it in autocommit.
+
+    The view runs in one transaction; a ``finish_import`` it returns runs
+    after that commits, with a transaction per stage and per chunk.  Put it
+    above ``login_required`` so the user lookup is inside the transaction.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request._defer_import = True
+        with transaction.atomic():
+            response = view(request, *args, **kwargs)
+        request._defer_import = False
+        if isinstance(response, _PendingImport):
+            return finish_import(request, response.batch)
+        return response
+    return transaction.non_atomic_requests(wrapper)
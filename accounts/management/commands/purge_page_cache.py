@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from accounts.page_cache import purge, purge_all
+
+
+class Command(BaseCommand):
+    help = 'Drop cached anonymous pages (all schools, or one schema with --schema)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help='Only purge pages of this tenant schema')
+
+    def handle(self, *args, **options):
+        schema = options.get('schema')
+        if schema:
+            purge(schema)
+            self.stdout.write(self.style.SUCCESS(f'Purged cached pages for {schema}'))
+        else:
+            purge_all()
+            self.stdout.write(self.style.SUCCESS('Purged all cached pages'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import get_public_schema_name, schema_context
+
+
+class Command(BaseCommand):
+    help = 'Check that every AI credit balance equals the sum of its ledger rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help='Only check teacher credits of this tenant schema')
+
+    def handle(self, *args, **options):
+        from individual_users.credit_utils import LEDGER as INDIVIDUAL_LEDGER
+        from teachers.addon_utils import LEDGER as TEACHER_LEDGER
+        from tenants.models import School
+
+        public = get_public_schema_name()
+        checks = []
+        if not options.get('schema'):
+            checks.append((public, INDIVIDUAL_LEDGER))
+            schemas = School.objects.exclude(schema_name=public).values_list('schema_name', flat=True)
+        else:
+            schemas = [options['schema']]
+        checks += [(schema, TEACHER_LEDGER) for schema in schemas]
+
+        problems = 0
+        for schema, ledger in checks:
+            with schema_context(schema):
+                mismatched = ledger.reconcile()
+                for owner_id, balance, total in mismatched:
+                    ledger.forget(owner_id)
+                    self.stdout.write(self.style.ERROR(
+                        f'{schema} {ledger.name} user #{owner_id}: balance {balance}, ledger {total}'
+                    ))
+            problems += len(mismatched)
+
+        if problems:
+            raise CommandError(f'{problems} credit balance(s) disagree with the ledger')
+        self.stdout.write(self.style.SUCCESS(f'Checked {len(checks)} ledger(s): all balances agree'))
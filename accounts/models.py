@@ -1,4 +1,6 @@
 # accounts/models.py
+import uuid
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
@@ -67,4 +69,90 @@ class OnboardingProgress(models.Model):
         if step_id not in self.steps_completed:
             self.steps_completed.append(step_id)
             return True
-        return False
\ No newline at end of file
+        return False
+
+
+class ExportJob(models.Model):
+    """A large export or document built in the background (accounts.exports, accounts.documents)."""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Ready'),
+        ('failed', 'Failed'),
+    )
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    requested_by = models.ForeignKey('User', on_delete=models.CASCADE, related_name='export_jobs')
+    name = models.CharField(max_length=200)
+    fmt = models.CharField(max_length=4, default='csv')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    row_count = models.PositiveIntegerField(default=0)
+    progress = models.PositiveSmallIntegerField(default=0)  # percent, documents only
+    file = models.FileField(upload_to='exports/', blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class ImportBatch(models.Model):
+    """One uploaded CSV moving through the staged import pipeline (accounts.imports)."""
+    KIND_CHOICES = (
+        ('students', 'Students'),
+        ('teachers', 'Teachers'),
+        ('grades', 'Grades'),
+    )
+    STATUS_CHOICES = (
+        ('staged', 'Staged'),
+        ('validated', 'Validated'),
+        ('importing', 'Importing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    requested_by = models.ForeignKey('User', on_delete=models.CASCADE, related_name='import_batches')
+    filename = models.CharField(max_length=255, blank=True)
+    options = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='staged')
+    total_rows = models.PositiveIntegerField(default=0)
+    invalid_rows = models.PositiveIntegerField(default=0)
+    imported_rows = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} import {self.filename} ({self.status})"
+
+
+class ImportRow(models.Model):
+    """A staged CSV row with its validation result."""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('valid', 'Valid'),
+        ('invalid', 'Invalid'),
+        ('imported', 'Imported'),
+    )
+    batch = models.ForeignKey(ImportBatch, on_delete=models.CASCADE, related_name='rows')
+    row_number = models.PositiveIntegerField()
+    data = models.JSONField(default=dict)
+    resolved = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    error = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ['row_number']
+        indexes = [
+            models.Index(fields=['batch', 'status', 'row_number'], name='importrow_batch_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Row {self.row_number} ({self.status})"
@@ -0,0 +1,261 @@
+"""
+Anonymous full-page cache for the public marketing and SEO surfaces.
+
+The landing page, school homepages, pricing, blog, city pages, ``sitemap.xml``
+and ``robots.txt`` were rendered from scratch — context processors, plan and
+addon queries included — for every anonymous visitor and crawler hit, so a
+crawler spike competed with paying schools for database connections.
+Views decorated with ``anonymous_page_cache`` now serve anonymous GET/HEAD
+requests from the shared cache:
+
+  * **Keys** vary by tenant schema, language, host and full path (query
+    string included), plus a purge generation and ``PAGE_CACHE_VERSION``
+    (set it to the release SHA so templates changed by a deploy — blog
+    posts, SEO copy — are never served stale).
+  * **Stale-while-revalidate**: an entry is fresh for ``PAGE_CACHE_TIMEOUT``
+    seconds and kept ``PAGE_CACHE_STALE`` seconds longer.  When it goes
+    stale, the first request to take a short lock re-renders it while every
+    other request keeps getting the stale copy.
+  * **Conditional GET**: responses carry ``ETag`` / ``Last-Modified``;
+    matching ``If-None-Match`` / ``If-Modified-Since`` get a 304.
+  * **Purge hooks**: receivers in ``accounts.signals`` call ``purge()``
+    (one school) or ``purge_all()`` when promo banners, platform settings,
+    plans, add-ons or school homepage content change; ``python manage.py
+    purge_page_cache`` does it by hand.
+  * **Bypass**: authenticated sessions, requests with pending flash
+    messages, non-GET methods and any response that is not a plain 200
+    without cookies are never cached.
+
+CSRF tokens and the CSP nonce rendered into a page are swapped for
+placeholders before storing and re-issued for each visitor when served, so
+cached forms keep working.
+
+Usage::
+
+    from accounts.page_cache import anonymous_page_cache
+
+    @anonymous_page_cache()
+    def pricing_page(request): ...
+
+Settings:
+  PAGE_CACHE_ENABLED   Turn the cache off entirely (default True)
+  PAGE_CACHE_TIMEOUT   Seconds an entry is fresh (default 300)
+  PAGE_CACHE_STALE     Extra seconds a stale entry may be served (default 3600)
+  PAGE_CACHE_VERSION   Release identifier mixed into every key (default '')
+"""
+import functools
+import hashlib
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = 'page:'
+_GEN_PREFIX = 'page_gen:'
+_LOCK_PREFIX = 'page_lock:'
+_ALL = '*'
+_REFRESH_LOCK_SECONDS = 30
+
+CSRF_PLACEHOLDER = '__PAGE_CACHE_CSRF__'
+NONCE_PLACEHOLDER = '__PAGE_CACHE_NONCE__'
+_TOKEN_RE = re.compile(r'\b[a-zA-Z0-9]{64}\b')
+
+# Response headers never replayed from the cache.
+_SKIP_HEADERS = frozenset({'set-cookie', 'vary', 'etag', 'last-modified', 'cache-control', 'expires'})
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _schema(request):
+    tenant = getattr(request, 'tenant', None)
+    if tenant is not None:
+        return tenant.schema_name
+    from django.db import connection
+    return getattr(connection, 'schema_name', 'public')
+
+
+# ── Purging ────────────────────────────────────────────────────
+
+def _bump(scope):
+    key = f'{_GEN_PREFIX}{scope}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+    except Exception:
+        logger.warning('Page cache purge failed for %s', scope, exc_info=True)
+
+
+def purge(schema):
+    """Drop every cached page of one tenant schema."""
+    _bump(schema)
+
+
+def purge_all():
+    """Drop every cached page of every tenant."""
+    _bump(_ALL)
+
+
+# ── Keys & eligibility ─────────────────────────────────────────
+
+def is_cacheable_request(request):
+    if not _setting('PAGE_CACHE_ENABLED', True) or request.method not in ('GET', 'HEAD'):
+        return False
+    if request.COOKIES.get('messages'):
+        return False
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return False
+        session = getattr(request, 'session', None)
+        if session is not None and session.get('_messages'):
+            return False
+    return True
+
+
+def _cache_key(request):
+    schema = _schema(request)
+    gens = cache.get_many([f'{_GEN_PREFIX}{_ALL}', f'{_GEN_PREFIX}{schema}'])
+    signature = '|'.join([
+        str(_setting('PAGE_CACHE_VERSION', '')),
+        str(gens.get(f'{_GEN_PREFIX}{_ALL}', 0)),
+        str(gens.get(f'{_GEN_PREFIX}{schema}', 0)),
+        getattr(request, 'LANGUAGE_CODE', settings.LANGUAGE_CODE),
+        request.get_host(),
+        request.get_full_path(),
+    ])
+    return f'{_PREFIX}{schema}:{hashlib.md5(signature.encode()).hexdigest()}'
+
+
+# ── Per-visitor tokens ─────────────────────────────────────────
+
+def _strip_tokens(request, text):
+    """Replace this request's CSP nonce and masked CSRF tokens with placeholders."""
+    nonce = getattr(request, 'csp_nonce', '')
+    if nonce:
+        text = text.replace(nonce, NONCE_PLACEHOLDER)
+    secret = request.META.get('CSRF_COOKIE')
+    if not secret:
+        return text
+    from django.middleware.csrf import _unmask_cipher_token
+
+    def _swap(match):
+        token = match.group(0)
+        try:
+            return CSRF_PLACEHOLDER if _unmask_cipher_token(token) == secret else token
+        except Exception:
+            return token
+
+    return _TOKEN_RE.sub(_swap, text)
+
+
+# ── Entries ────────────────────────────────────────────────────
+
+def _store(request, key, response):
+    """Cache ``response`` if it is safe to share.  Returns the entry or None."""
+    if (response.status_code != 200 or response.streaming or response.cookies
+            or response.has_header('Cache-Control') and 'private' in response['Cache-Control']):
+        return None
+    charset = response.charset or 'utf-8'
+    try:
+        text = response.content.decode(charset)
+    except UnicodeDecodeError:
+        return None
+    text = _strip_tokens(request, text)
+    body = text.encode(charset)
+    now = time.time()
+    entry = {
+        'body': body,
+        'headers': [(k, v) for k, v in response.items() if k.lower() not in _SKIP_HEADERS],
+        'etag': quote_etag(hashlib.md5(body).hexdigest()),
+        'last_modified': int(now),
+        'fresh_until': now + _setting('PAGE_CACHE_TIMEOUT', 300),
+        'csrf': CSRF_PLACEHOLDER in text or bool(request.META.get('CSRF_COOKIE_NEEDS_UPDATE')),
+    }
+    try:
+        cache.set(key, entry, _setting('PAGE_CACHE_TIMEOUT', 300) + _setting('PAGE_CACHE_STALE', 3600))
+    except Exception:
+        logger.warning('Page cache write failed', exc_info=True)
+    return entry
+
+
+def _patch_headers(response):
+    # Signed-in visitors see different pages at the same URL, so shared
+    # caches must key on the cookie too.
+    patch_cache_control(
+        response, public=True, max_age=_setting('PAGE_CACHE_TIMEOUT', 300),
+        stale_while_revalidate=_setting('PAGE_CACHE_STALE', 3600),
+    )
+    patch_vary_headers(response, ('Cookie', 'Accept-Language'))
+
+
+def _serve(request, entry, state):
+    body = entry['body']
+    if entry['csrf']:
+        from django.middleware.csrf import get_token
+        token = get_token(request)  # also (re)sets the visitor's CSRF cookie
+        if CSRF_PLACEHOLDER.encode() in body:
+            body = body.replace(CSRF_PLACEHOLDER.encode(), token.encode())
+    if NONCE_PLACEHOLDER.encode() in body:
+        body = body.replace(NONCE_PLACEHOLDER.encode(), getattr(request, 'csp_nonce', '').encode())
+    response = HttpResponse(body)
+    for header, value in entry['headers']:
+        response[header] = value
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    response['X-Page-Cache'] = state
+    _patch_headers(response)
+    return get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified'], response=response,
+    )
+
+
+def anonymous_page_cache():
+    """Cache the decorated view's anonymous GET responses (see module docstring)."""
+
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+            try:
+                key = _cache_key(request)
+                entry = cache.get(key)
+            except Exception:
+                logger.warning('Page cache unavailable', exc_info=True)
+                return view_func(request, *args, **kwargs)
+
+            if entry is not None:
+                if time.time() < entry['fresh_until']:
+                    return _serve(request, entry, 'HIT')
+                # Stale: one request re-renders, the rest keep the stale copy.
+                if not cache.add(f'{_LOCK_PREFIX}{key}', 1, _REFRESH_LOCK_SECONDS):
+                    return _serve(request, entry, 'STALE')
+
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            fresh = _store(request, key, response)
+            cache.delete(f'{_LOCK_PREFIX}{key}')
+            if fresh is None:
+                return response
+            response['ETag'] = fresh['etag']
+            response['Last-Modified'] = http_date(fresh['last_modified'])
+            response['X-Page-Cache'] = 'MISS'
+            _patch_headers(response)
+            return get_conditional_response(
+                request, etag=fresh['etag'], last_modified=fresh['last_modified'], response=response,
+            )
+
+        return _wrapped
+
+    return decorator
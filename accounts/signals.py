@@ -1,5 +1,7 @@
-"""Audit logging signals for authentication events."""
+"""Audit logging signals for authentication events and page-cache purges."""
 from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 
@@ -20,3 +22,30 @@ def audit_login_failed(sender, credentials, request, **kwargs):
     from tenants.subscription_models import AuditLog
     uname = credentials.get('username', '???')
     AuditLog.log('login_failed', request=request, detail=f'username={uname}')
+
+
+# ── Anonymous page cache purges ──────────────────────────────
+# Platform-wide content (landing, pricing, banners) drops every cached page;
+# school homepage content drops the school's own pages only.
+
+_PLATFORM_PAGE_MODELS = ('tenants.PromoBanner', 'tenants.PlatformSettings', 'tenants.SubscriptionPlan', 'tenants.AddOn')
+_SCHOOL_PAGE_MODELS = ('academics.SchoolInfo', 'academics.Activity', 'academics.GalleryImage')
+
+
+def purge_platform_pages(sender, **kwargs):
+    from accounts.page_cache import purge_all
+    transaction.on_commit(purge_all)
+
+
+def purge_school_pages(sender, **kwargs):
+    from accounts.page_cache import purge
+    schema = getattr(connection, 'schema_name', 'public')
+    transaction.on_commit(lambda: purge(schema))
+
+
+for _model in _PLATFORM_PAGE_MODELS:
+    post_save.connect(purge_platform_pages, sender=_model, dispatch_uid=f'page_cache_{_model}_save')
+    post_delete.connect(purge_platform_pages, sender=_model, dispatch_uid=f'page_cache_{_model}_delete')
+for _model in _SCHOOL_PAGE_MODELS:
+    post_save.connect(purge_school_pages, sender=_model, dispatch_uid=f'page_cache_{_model}_save')
+    post_delete.connect(purge_school_pages, sender=_model, dispatch_uid=f'page_cache_{_model}_delete')
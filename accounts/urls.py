@@ -14,4 +14,10 @@ urlpatterns = [
     path('onboarding/complete-step/', views.onboarding_complete_step, name='onboarding_complete_step'),
     # Activity Feed
     path('activity-feed/', views.admin_activity_feed, name='admin_activity_feed'),
+    # Background exports
+    path('exports/<uuid:token>/', views.export_job_status, name='export_job_status'),
+    path('exports/<uuid:token>/download/', views.export_job_download, name='export_job_download'),
+    # Staged imports
+    path('imports/<uuid:token>/', views.import_batch_status, name='import_batch_status'),
+    path('imports/<uuid:token>/resume/', views.import_batch_resume, name='import_batch_resume'),
 ]
@@ -17,6 +17,8 @@ from django.db.models.functions import RowNumber
 from django.db import connection, transaction
 from django.utils import timezone
 from django.views.decorators.csrf import ensure_csrf_cookie
+from accounts.page_cache import anonymous_page_cache
+from accounts.imports import import_view
 import calendar
 import datetime
 import json
@@ -325,6 +327,7 @@ GHANA_CITIES = [
 CITY_MAP = {c['slug']: c for c in GHANA_CITIES}
 
 
+@anonymous_page_cache()
 def city_landing(request, city_slug):
     """SEO landing page for a specific Ghanaian city."""
     city = CITY_MAP.get(city_slug)
@@ -337,6 +340,7 @@ def city_landing(request, city_slug):
     })
 
 
+@anonymous_page_cache()
 def city_index(request):
     """Index page listing all city landing pages."""
     return render(request, 'home/city_index.html', {
@@ -345,6 +349,7 @@ def city_index(request):
 
 
 @ensure_csrf_cookie
+@anonymous_page_cache()
 def homepage(request):
     # Route logic for different tenants
     is_public = False
@@ -760,22 +765,14 @@ def dashboard(request):
         chart_labels_attendance = []
         chart_data_attendance = []
         try:
-            attendance_stats = Attendance.objects.filter(
-                date__gte=date_7_days_ago,
-                status='present'
-            ).values('date').annotate(
-                present_count=Count('id')
-            ).order_by('date')
+            from academics import analytics
+            daily_presence = analytics.attendance_by_day(date_7_days_ago, today)
 
             # Fill in missing dates with 0
-            daily_presence = {}
-            for item in attendance_stats:
-                daily_presence[item['date']] = item['present_count']
-
             for i in range(7):
                 d = date_7_days_ago + datetime.timedelta(days=i)
                 chart_labels_attendance.append(d.strftime("%a"))  # Mon, Tue...
-                chart_data_attendance.append(daily_presence.get(d, 0))
+                chart_data_attendance.append(daily_presence.get(d) or 0)
         except (OperationalError, ProgrammingError, Exception):
             for i in range(7):
                 d = date_7_days_ago + datetime.timedelta(days=i)
@@ -1882,9 +1879,8 @@ def school_analytics(request):
         messages.error(request, 'Access denied.')
         return redirect('dashboard')
 
-    from finance.models import StudentFee, Payment
-    from students.models import Grade
-    from django.db.models import Avg, Sum
+    from finance.models import Payment
+    from academics import analytics
 
     today = timezone.now().date()
     current_year = AcademicYear.objects.filter(is_current=True).first()
@@ -1918,67 +1914,32 @@ def school_analytics(request):
         class_labels = [r['current_class__name'] for r in class_qs]
         class_data = [r['count'] for r in class_qs]
 
-        # --- Fee collection summary ---
-        fee_status = {
-            'paid': StudentFee.objects.filter(status='paid').count(),
-            'partial': StudentFee.objects.filter(status='partial').count(),
-            'unpaid': StudentFee.objects.filter(status='unpaid').count(),
-        }
-        fee_total_expected = StudentFee.objects.aggregate(
-            total=Sum('amount_payable')
-        )['total'] or 0
-        fee_total_collected = Payment.objects.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        # --- Fee collection summary, attendance and grades (analytics cubes) ---
+        fees = analytics.fee_summary()
+        fee_status = fees['status']
+        fee_total_expected = fees['expected']
+        fee_total_collected = fees['collected']
 
         # --- 30-day attendance heatmap (present count per day) ---
         date_30_ago = today - datetime.timedelta(days=29)
-        attendance_qs = Attendance.objects.filter(
-            date__gte=date_30_ago, status='present'
-        ).values('date').annotate(count=Count('id')).order_by('date')
-        attendance_map = {r['date']: r['count'] for r in attendance_qs}
+        attendance_map = analytics.attendance_by_day(date_30_ago, today)
         for i in range(30):
             d = date_30_ago + datetime.timedelta(days=i)
             heatmap_labels.append(d.strftime('%b %d'))
-            heatmap_data.append(attendance_map.get(d, 0))
+            heatmap_data.append(attendance_map.get(d) or 0)
 
         # --- Average grade per class ---
-        grade_qs = Grade.objects.values(
-            'student__current_class__name'
-        ).annotate(avg=Avg('total_score')).order_by('-avg').exclude(
-            student__current_class__isnull=True
-        )
-        grade_labels = [r['student__current_class__name'] for r in grade_qs]
-        grade_data = [round(float(r['avg']), 1) if r['avg'] else 0 for r in grade_qs]
+        class_averages = analytics.class_grade_averages()
+        grade_labels = [name for name, _avg in class_averages]
+        grade_data = [avg for _name, avg in class_averages]
 
         # --- Grade distribution (A+ through F) ---
-        all_grades = Grade.objects.all()
-        if current_year:
-            all_grades = all_grades.filter(academic_year=current_year)
-        grade_buckets = {'A+': 0, 'A': 0, 'B+': 0, 'B': 0, 'C': 0, 'F': 0}
-        for g in all_grades.values_list('total_score', flat=True):
-            if g is None:
-                continue
-            pct = float(g)
-            if pct >= 90:
-                grade_buckets['A+'] += 1
-            elif pct >= 80:
-                grade_buckets['A'] += 1
-            elif pct >= 70:
-                grade_buckets['B+'] += 1
-            elif pct >= 60:
-                grade_buckets['B'] += 1
-            elif pct >= 50:
-                grade_buckets['C'] += 1
-            else:
-                grade_buckets['F'] += 1
+        grade_buckets = analytics.grade_distribution(current_year)
         grade_dist_labels = list(grade_buckets.keys())
         grade_dist_data = list(grade_buckets.values())
 
         # --- Overall attendance rate ---
-        total_records = Attendance.objects.count()
-        present_records = Attendance.objects.filter(status='present').count()
-        attendance_rate = round((present_records / total_records * 100), 1) if total_records else 0
+        attendance_rate = analytics.attendance_rate()
 
         # --- Recent 10 payments ---
         recent_payments = list(Payment.objects.select_related(
@@ -2251,6 +2212,73 @@ def admin_activity_feed(request):
     })
 
 
+# ── Background exports ───────────────────────────────────────────────────────
+
+def _get_export_job(request, token):
+    from accounts.models import ExportJob
+    job = get_object_or_404(ExportJob, token=token)
+    if job.requested_by_id != request.user.id and request.user.user_type != 'admin':
+        raise Http404
+    return job
+
+
+@login_required
+def export_job_status(request, token):
+    """Progress page for an export or document built in the background."""
+    job = _get_export_job(request, token)
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({
+            'status': job.status,
+            'rows': job.row_count,
+            'progress': job.progress,
+            'error': job.error,
+        })
+    return render(request, 'accounts/export_job.html', {'job': job})
+
+
+@login_required
+def export_job_download(request, token):
+    from django.http import FileResponse
+    job = _get_export_job(request, token)
+    if job.status != 'done' or not job.file:
+        raise Http404
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=job.name)
+
+
+# ── Staged imports ───────────────────────────────────────────────────────────
+
+def _get_import_batch(request, token):
+    from accounts.models import ImportBatch
+    batch = get_object_or_404(ImportBatch, token=token)
+    if batch.requested_by_id != request.user.id and request.user.user_type != 'admin':
+        raise Http404
+    return batch
+
+
+@login_required
+def import_batch_status(request, token):
+    """Progress page for an import that did not finish in one request (accounts.imports)."""
+    batch = _get_import_batch(request, token)
+    errors = batch.rows.filter(status='invalid').values_list('row_number', 'error')[:50]
+    return render(request, 'accounts/import_batch.html', {
+        'batch': batch,
+        'errors': errors,
+        'remaining': batch.rows.filter(status__in=['pending', 'valid']).count(),
+    })
+
+
+@import_view
+@login_required
+@require_POST
+def import_batch_resume(request, token):
+    """Continue importing from the first row not yet written."""
+    from accounts.imports import finish_import
+    batch = _get_import_batch(request, token)
+    if batch.status == 'done':
+        return redirect(batch.options.get('next') or 'dashboard')
+    return finish_import(request, batch)
+
+
 # ── Error Handlers ───────────────────────────────────────────────────────────
 
 def error_400(request, exception):
@@ -0,0 +1,230 @@
+"""
+Coalesced parent notifications.
+
+The post_save receivers in ``students.signals`` fire once per Grade /
+Attendance / StudentFee row.  Outside a digest scope each event is written
+straight away; inside ``parent_digest()`` events are queued and flushed
+together when the outermost scope exits:
+
+  * parent links for every affected student are resolved in one query,
+  * events are grouped per (parent, student) into a single Notification,
+    all written with one ``bulk_create``,
+  * each parent receives one push (and, if enabled, one SMS) summarising
+    everything queued for them.
+
+``ParentDigestMiddleware`` opens a scope around every request, so a teacher
+saving a whole class of grades costs a constant number of extra queries
+instead of several per row.  Management commands and scripts can use the
+context manager directly::
+
+    from announcements.digest import parent_digest
+    with parent_digest():
+        for row in rows:
+            Grade.objects.create(...)
+
+Settings:
+  PARENT_NOTIFICATION_DIGEST  'immediate' (default) sends the push/SMS when
+                              the scope flushes; 'daily' writes the in-app
+                              rows only and leaves push/SMS to the
+                              ``send_parent_digests`` command.
+  PARENT_DIGEST_SMS           Also send the digest by SMS (default False).
+"""
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+# Notification.message is a CharField(max_length=255)
+MESSAGE_MAX_LENGTH = 255
+
+
+def digest_mode():
+    mode = getattr(settings, 'PARENT_NOTIFICATION_DIGEST', 'immediate')
+    return mode if mode in ('immediate', 'daily') else 'immediate'
+
+
+def _truncate(text, limit=MESSAGE_MAX_LENGTH):
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + '…'
+
+
+class _ParentEvent:
+    __slots__ = ('student_id', 'student_name', 'message', 'link', 'alert_type')
+
+    def __init__(self, student_id, student_name, message, link='', alert_type='general'):
+        self.student_id = student_id
+        self.student_name = student_name
+        self.message = message
+        self.link = link
+        self.alert_type = alert_type
+
+
+@contextmanager
+def parent_digest():
+    """Queue parent notifications until the outermost scope exits.
+
+    Nested scopes share the outer queue.  If the block raises, queued events
+    are discarded — the rows that triggered them were rolled back too.
+    """
+    depth = getattr(_local, 'depth', 0)
+    if depth == 0:
+        _local.events = []
+    _local.depth = depth + 1
+    try:
+        yield
+    except BaseException:
+        if depth == 0:
+            _local.events = []
+        raise
+    finally:
+        _local.depth = depth
+        if depth == 0:
+            events, _local.events = _local.events, []
+    if depth == 0 and events:
+        try:
+            flush_parent_events(events)
+        except Exception:
+            logger.exception('Parent digest flush failed (%d events)', len(events))
+
+
+def digest_active():
+    return getattr(_local, 'depth', 0) > 0
+
+
+def discard_parent_events():
+    """Drop everything queued in the current scope (e.g. after a rollback)."""
+    if digest_active():
+        _local.events = []
+
+
+def notify_parents(student, message, link='', alert_type='general'):
+    """Notify every parent linked to ``student``.
+
+    Queued when a ``parent_digest()`` scope is active, written immediately
+    otherwise.  Never raises — a failed notification must not break a save.
+    """
+    try:
+        event = _ParentEvent(
+            student_id=student.pk,
+            student_name=student.user.get_full_name(),
+            message=message,
+            link=link,
+            alert_type=alert_type,
+        )
+        if digest_active():
+            _local.events.append(event)
+        else:
+            flush_parent_events([event])
+    except Exception:
+        logger.exception('Parent notification failed for student %s', getattr(student, 'pk', None))
+
+
+def _summarise(student_name, events):
+    """One line for all events about one student."""
+    if len(events) == 1:
+        return _truncate(events[0].message)
+    head = f"{len(events)} updates for {student_name}: "
+    return _truncate(head + '; '.join(e.message for e in events))
+
+
+def flush_parent_events(events):
+    """Write queued events and send one digest per parent.
+
+    Returns the number of Notification rows created.
+    """
+    if not events:
+        return 0
+
+    from announcements.models import Notification
+    from parents.models import Parent
+
+    # Runs outside the view's ATOMIC_REQUESTS transaction when flushed from
+    # middleware — keep all tenant queries on one connection (pgBouncer).
+    with transaction.atomic():
+        student_ids = {e.student_id for e in events}
+        links = (
+            Parent.children.through.objects
+            .filter(student_id__in=student_ids)
+            .values_list('student_id', 'parent__user_id', 'parent__user__phone')
+        )
+        parents_by_student = defaultdict(list)
+        phone_by_user = {}
+        for student_id, user_id, phone in links:
+            parents_by_student[student_id].append(user_id)
+            phone_by_user[user_id] = phone or ''
+
+        # (parent_user_id, student_id) -> [events], preserving arrival order
+        grouped = OrderedDict()
+        for event in events:
+            for user_id in parents_by_student.get(event.student_id, ()):
+                grouped.setdefault((user_id, event.student_id), []).append(event)
+
+        if not grouped:
+            return 0
+
+        notifications = []
+        lines_by_parent = defaultdict(list)
+        link_by_parent = {}
+        for (user_id, _student_id), student_events in grouped.items():
+            first = student_events[0]
+            line = _summarise(first.student_name, student_events)
+            notifications.append(Notification(
+                recipient_id=user_id,
+                message=line,
+                link=first.link if len(student_events) == 1 else '',
+                alert_type=first.alert_type if len(student_events) == 1 else 'general',
+            ))
+            lines_by_parent[user_id].append(line)
+            link_by_parent.setdefault(user_id, first.link)
+
+        Notification.objects.bulk_create(notifications)
+
+    if digest_mode() == 'immediate':
+        send_parent_digests(
+            {uid: (lines, link_by_parent.get(uid) or '/') for uid, lines in lines_by_parent.items()},
+            phone_by_user,
+        )
+    return len(notifications)
+
+
+def _digest_body(lines):
+    if len(lines) == 1:
+        return lines[0]
+    return _truncate(f"{len(lines)} new updates — " + ' | '.join(lines), 500)
+
+
+def send_parent_digests(digests, phone_by_user=None):
+    """Send one push (and optionally one SMS) per parent.
+
+    ``digests`` maps parent user id to ``(lines, url)``.
+    """
+    if not digests:
+        return
+    from announcements.views import send_push_batch
+
+    send_push_batch([
+        (user_id, 'School Notification', _digest_body(lines), url)
+        for user_id, (lines, url) in digests.items()
+    ])
+
+    if not getattr(settings, 'PARENT_DIGEST_SMS', False) or not phone_by_user:
+        return
+    from announcements.sms_service import normalize_phone, send_sms
+
+    def _sms_worker(items):
+        for phone, body in items:
+            send_sms([phone], body)
+
+    items = []
+    for user_id, (lines, _url) in digests.items():
+        phone = normalize_phone(phone_by_user.get(user_id, ''))
+        if phone:
+            items.append((phone, _truncate(_digest_body(lines), 300)))
+    if items:
+        threading.Thread(target=_sms_worker, args=(items,), daemon=True).start()
@@ -0,0 +1,189 @@
+"""
+Notification store: per-user unread counters, a cached bell and retention.
+
+Every page rendered the bell through ``user_notifications`` (a six-row
+slice plus a ``COUNT`` once there were more than five unread) and every
+open tab polled ``notifications_unread_count`` (a ``COUNT`` and a
+latest-row query) — on a table that only ever grew, with announcements,
+fee reminders and schedule alerts each adding a row per recipient.
+
+  * **Counters**: ``NotificationCounter`` holds each user's unread count.
+    ``Notification.save()`` (inserts) and the ``bulk_create``,
+    ``mark_read`` and ``delete`` methods of ``Notification.objects`` move it
+    with ``F()`` updates in the same transaction as the rows they touch.
+    Mark-read is one ``UPDATE`` per recipient, so its row count is exactly
+    what the counter loses.
+  * **Bell**: ``badge(user)`` returns ``{'count', 'unread'}`` — the counter
+    and the five newest unread rows as dicts — from one cache entry that
+    every change for that user drops.  A miss costs the counter row and a
+    five-row index scan, whatever the size of the table.  Counters that
+    drifted (cascade deletes, raw updates) are corrected whenever the
+    five-row scan proves the exact number.
+  * **Retention**: ``archive(...)`` moves read notifications past
+    ``NOTIFICATION_RETENTION_DAYS`` — and unread ones past
+    ``NOTIFICATION_UNREAD_RETENTION_DAYS`` — into ``NotificationArchive`` in
+    batches (``manage.py archive_notifications``), keeping the live table
+    to recent rows.  The notification centre shows the archive in its own
+    tab.
+
+Usage::
+
+    from announcements import inbox
+
+    bell = inbox.badge(request.user)          # {'count': 12, 'unread': [...5 dicts]}
+    request.user.notifications.filter(alert_type='message').mark_read()
+
+Settings:
+  NOTIFICATION_BADGE_CACHE_SECONDS     Lifetime of a cached bell (default 300)
+  NOTIFICATION_RETENTION_DAYS          Age at which read rows are archived (default 90)
+  NOTIFICATION_UNREAD_RETENTION_DAYS   Age at which unread rows are archived (default 365)
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BADGE_SIZE = 5
+BADGE_FIELDS = ('id', 'message', 'link', 'alert_type', 'created_at')
+
+
+def _key(user_id):
+    return f'notif:{getattr(connection, "schema_name", "public")}:{user_id}'
+
+
+def invalidate(user_ids):
+    """Drop the cached bells of ``user_ids`` (again after commit, if in a transaction)."""
+    keys = [_key(uid) for uid in set(user_ids)]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# ── Counters ───────────────────────────────────────────────────
+
+def _shift(deltas):
+    """Apply ``{user_id: delta}`` to the counters — one UPDATE per distinct delta."""
+    from announcements.models import NotificationCounter
+
+    deltas = {uid: d for uid, d in deltas.items() if d}
+    if not deltas:
+        return
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        by_delta[delta].append(user_id)
+    with transaction.atomic():
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=uid) for uid in deltas], ignore_conflicts=True,
+        )
+        for delta, user_ids in by_delta.items():
+            NotificationCounter.objects.filter(user_id__in=user_ids).update(
+                unread=Greatest(F('unread') + delta, Value(0)),
+            )
+    invalidate(deltas)
+
+
+def added(recipient_ids):
+    """New unread notifications for ``recipient_ids`` (one id per row)."""
+    _shift(Counter(recipient_ids))
+
+
+def removed(counts):
+    """``{recipient_id: n}`` unread notifications were read or deleted."""
+    _shift({uid: -n for uid, n in counts.items()})
+
+
+def recount(user_ids=None):
+    """Set counters from the rows themselves — for all users, or ``user_ids``."""
+    from django.db.models import Count
+    from announcements.models import Notification, NotificationCounter
+
+    unread = Notification.objects.filter(is_read=False)
+    counters = NotificationCounter.objects.all()
+    if user_ids is not None:
+        unread, counters = unread.filter(recipient_id__in=user_ids), counters.filter(user_id__in=user_ids)
+    actual = dict(
+        unread.order_by().values('recipient_id').annotate(n=Count('pk')).values_list('recipient_id', 'n')
+    )
+    stored = dict(counters.values_list('user_id', 'unread'))
+    fixed = {uid: n for uid, n in actual.items() if stored.get(uid) != n}
+    fixed.update({uid: 0 for uid, n in stored.items() if n and uid not in actual})
+    with transaction.atomic():
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=uid, unread=n) for uid, n in fixed.items()],
+            update_conflicts=True, unique_fields=['user'], update_fields=['unread'],
+        )
+    invalidate(fixed)
+    return len(fixed)
+
+
+# ── Bell ───────────────────────────────────────────────────────
+
+def _load(user_id):
+    from announcements.models import Notification, NotificationCounter
+
+    unread = list(
+        Notification.objects.filter(recipient_id=user_id, is_read=False)
+        .order_by('-created_at').values(*BADGE_FIELDS)[:BADGE_SIZE + 1]
+    )
+    count = NotificationCounter.objects.filter(user_id=user_id).values_list('unread', flat=True).first()
+    if len(unread) <= BADGE_SIZE:
+        exact = len(unread)  # the scan saw every unread row
+    elif count is None or count <= BADGE_SIZE:
+        exact = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+    else:
+        exact = count
+    if exact != count:
+        NotificationCounter.objects.update_or_create(user_id=user_id, defaults={'unread': exact})
+    return {'count': exact, 'unread': unread[:BADGE_SIZE]}
+
+
+def badge(user):
+    """``{'count': unread total, 'unread': newest unread rows as dicts}`` for the bell."""
+    key = _key(user.pk)
+    data = cache.get(key)
+    if data is None:
+        data = _load(user.pk)
+        cache.set(key, data, getattr(settings, 'NOTIFICATION_BADGE_CACHE_SECONDS', 300))
+    return data
+
+
+# ── Retention ──────────────────────────────────────────────────
+
+def archive(read_days=None, unread_days=None, batch_size=5000):
+    """Move old notifications into ``NotificationArchive``.  Returns how many moved."""
+    from announcements.models import Notification, NotificationArchive
+
+    if read_days is None:
+        read_days = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90)
+    if unread_days is None:
+        unread_days = getattr(settings, 'NOTIFICATION_UNREAD_RETENTION_DAYS', 365)
+    now = timezone.now()
+    old = Notification.objects.filter(
+        Q(is_read=True, created_at__lt=now - timedelta(days=read_days))
+        | Q(created_at__lt=now - timedelta(days=unread_days))
+    )
+    fields = ('id', 'recipient_id', 'message', 'is_read', 'created_at', 'link', 'alert_type')
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(old.order_by('pk').values(*fields)[:batch_size])
+            if not rows:
+                break
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**row) for row in rows], ignore_conflicts=True,
+            )
+            # Goes through NotificationQuerySet.delete, so unread counters follow.
+            Notification.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+        logger.info('Archived %d notification(s)', moved)
+    return moved
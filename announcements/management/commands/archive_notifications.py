@@ -0,0 +1,33 @@
+"""
+Move old notifications into the archive table (announcements.inbox).
+
+Run nightly per school so the live notification table stays small:
+    python manage.py all_tenants_command archive_notifications
+    python manage.py tenant_command archive_notifications --schema=<school>
+    python manage.py archive_notifications --read-days 30 --recount
+"""
+from django.core.management.base import BaseCommand
+
+from announcements import inbox
+
+
+class Command(BaseCommand):
+    help = 'Archive old notifications and optionally recompute unread counters for the current schema'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--read-days', type=int, default=None,
+                            help='Archive read notifications older than this (default NOTIFICATION_RETENTION_DAYS)')
+        parser.add_argument('--unread-days', type=int, default=None,
+                            help='Archive unread notifications older than this '
+                                 '(default NOTIFICATION_UNREAD_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows moved per transaction (default 5000)')
+        parser.add_argument('--recount', action='store_true',
+                            help='Recompute every unread counter from the notifications afterwards')
+
+    def handle(self, *args, **options):
+        moved = inbox.archive(options['read_days'], options['unread_days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} notification(s).'))
+        if options['recount']:
+            fixed = inbox.recount()
+            self.stdout.write(self.style.SUCCESS(f'Corrected {fixed} unread counter(s).'))
@@ -0,0 +1,62 @@
+import datetime
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from announcements.models import Notification
+
+
+class Command(BaseCommand):
+    help = (
+        'Send one push (and optional SMS) digest per parent summarising unread '
+        'notifications from the last period. Use with PARENT_NOTIFICATION_DIGEST=daily.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Look-back window in hours (default 24)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print what would happen without sending anything',
+        )
+
+    def handle(self, *args, **options):
+        from announcements.digest import send_parent_digests
+
+        since = timezone.now() - datetime.timedelta(hours=options['hours'])
+        rows = (
+            Notification.objects
+            .filter(
+                recipient__user_type='parent',
+                is_read=False,
+                created_at__gte=since,
+            )
+            .order_by('recipient_id', 'created_at')
+            .values_list('recipient_id', 'recipient__phone', 'message', 'link')
+        )
+
+        lines = defaultdict(list)
+        first_link = {}
+        phones = {}
+        for user_id, phone, message, link in rows:
+            lines[user_id].append(message)
+            first_link.setdefault(user_id, link or '/')
+            phones[user_id] = phone or ''
+
+        if options['dry_run']:
+            for user_id, msgs in lines.items():
+                self.stdout.write(f"[DRY RUN] Parent #{user_id}: {len(msgs)} update(s)")
+        else:
+            send_parent_digests(
+                {uid: (msgs, first_link[uid]) for uid, msgs in lines.items()},
+                phones,
+            )
+
+        action = 'Would send' if options['dry_run'] else 'Sent'
+        self.stdout.write(self.style.SUCCESS(f"{action} {len(lines)} parent digest(s)."))
@@ -0,0 +1,22 @@
+from announcements.digest import discard_parent_events, parent_digest
+
+
+class ParentDigestMiddleware:
+    """
+    Coalesces parent notifications raised while handling a request.
+
+    Grade / attendance / fee signals queue their events instead of writing a
+    Notification and starting a push thread per row; the queue is flushed once
+    when the response is ready (see announcements.digest).  On a 5xx response
+    the queued events are dropped along with the rolled-back rows.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with parent_digest():
+            response = self.get_response(request)
+            if response.status_code >= 500:
+                discard_parent_events()
+        return response
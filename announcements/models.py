@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
+from django.db.models import Count
 from accounts.models import User
 
 class Announcement(models.Model):
@@ -28,6 +30,38 @@ class Announcement(models.Model):
         return self.title
 
 
+class NotificationQuerySet(models.QuerySet):
+    """Keeps ``NotificationCounter`` in step with bulk inserts, reads and deletes."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from announcements import inbox
+        objs = super().bulk_create(objs, *args, **kwargs)
+        inbox.added(n.recipient_id for n in objs if not n.is_read)
+        return objs
+
+    def mark_read(self):
+        """Mark the unread rows read (one UPDATE per recipient).  Returns how many changed."""
+        from announcements import inbox
+        unread = self.filter(is_read=False)
+        changed = {}
+        for recipient_id in unread.order_by().values_list('recipient_id', flat=True).distinct():
+            n = unread.filter(recipient_id=recipient_id).update(is_read=True)
+            if n:
+                changed[recipient_id] = n
+        inbox.removed(changed)
+        return sum(changed.values())
+
+    def delete(self):
+        from announcements import inbox
+        unread = dict(
+            self.filter(is_read=False).order_by().values('recipient_id')
+            .annotate(n=Count('pk')).values_list('recipient_id', 'n')
+        )
+        result = super().delete()
+        inbox.removed(unread)
+        return result
+
+
 class Notification(models.Model):
     ALERT_CHOICES = [
         ('45_min', '45 Minutes Before Class'),
@@ -48,15 +82,67 @@ class Notification(models.Model):
     announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
     alert_type = models.CharField(max_length=20, choices=ALERT_CHOICES, default='general')
 
+    objects = NotificationQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient', 'is_read', '-created_at'], name='notif_recip_read_idx'),
+            # Retention sweeps scan by age; rows arrive in created_at order.
+            BrinIndex(fields=['created_at'], name='notif_created_brin'),
         ]
 
     def __str__(self):
         return f"Notification for {self.recipient}: {self.message}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding and not self.is_read:
+            from announcements import inbox
+            inbox.added([self.recipient_id])
+
+
+class NotificationCounter(models.Model):
+    """Unread notifications per user, moved with F() updates (see announcements.inbox)."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                related_name='notification_counter')
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user}: {self.unread} unread"
+
+
+class NotificationArchive(models.Model):
+    """Notifications moved out of the live table by ``archive_notifications``."""
+    id = models.BigIntegerField(primary_key=True)  # the original Notification id
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    message = models.CharField(max_length=255)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    link = models.CharField(max_length=500, blank=True, default='')
+    alert_type = models.CharField(max_length=20, choices=Notification.ALERT_CHOICES, default='general')
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at'], name='notif_archive_recip_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived notification for {self.recipient}: {self.message}"
+
+
+class DeliveryClaim(models.Model):
+    """Idempotency key of one scheduled send: the run that inserts it sends (tenants.scheduler.claim)."""
+    key = models.CharField(max_length=150, unique=True)
+    run = models.CharField(max_length=32, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.key
+
 
 class PushSubscription(models.Model):
     """WebPush subscription endpoint + keys for a given user/device."""
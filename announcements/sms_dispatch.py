@@ -0,0 +1,255 @@
+"""
+Batched SMS dispatcher.
+
+Attendance alerts, fee reminders, notification rules and homework reminders
+used to call ``send_sms`` once per student — one SDK initialisation and one
+sequential HTTPS call each.  ``SMSDispatcher`` accepts a stream of
+``(phone, message)`` pairs and on ``send()``:
+
+  * normalises and de-duplicates phone numbers per message,
+  * groups identical messages into multi-recipient API calls,
+  * chunks each group to the provider's recipient limit,
+  * runs the API calls concurrently on a bounded thread pool,
+  * records every recipient's outcome in ``communication.SMSMessage``
+    with one ``bulk_create`` (tenant schema only).
+
+Usage::
+
+    from announcements.sms_dispatch import SMSDispatcher
+
+    sms = SMSDispatcher(sent_by=request.user)
+    for student in absentees:
+        sms.add(student.emergency_contact, attendance_sms_text(student, 'absent', d))
+    sms.send_async()          # or: result = sms.send()
+
+Providers are looked up from ``SMS_PROVIDER``: ``'africastalking'`` (default)
+or ``'fake'`` (in-memory, for tests and local development).
+
+Settings:
+  SMS_PROVIDER        'africastalking' | 'fake'
+  SMS_BATCH_SIZE      Max recipients per API call (default 100)
+  SMS_MAX_WORKERS     Concurrent API calls (default 4)
+"""
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils import timezone
+
+from announcements.sms_service import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+
+# ── Providers ──────────────────────────────────────────────────
+
+class AfricasTalkingProvider:
+    """Africa's Talking bulk SMS. The SDK is initialised once per process."""
+
+    name = 'africastalking'
+    max_recipients = 100
+
+    _lock = threading.Lock()
+    _client = None
+    _client_key = None
+
+    def _sms_client(self):
+        username = getattr(settings, 'AFRICASTALKING_USERNAME', 'sandbox')
+        api_key = getattr(settings, 'AFRICASTALKING_API_KEY', '')
+        if not api_key:
+            raise RuntimeError('AFRICASTALKING_API_KEY not set')
+        key = (username, api_key)
+        cls = type(self)
+        if cls._client is None or cls._client_key != key:
+            with cls._lock:
+                if cls._client is None or cls._client_key != key:
+                    import africastalking
+                    africastalking.initialize(username, api_key)
+                    cls._client = africastalking.SMS
+                    cls._client_key = key
+        return cls._client
+
+    def send(self, recipients, message, sender_id=''):
+        """Return ``{phone: (ok, detail)}`` for every recipient."""
+        kwargs = {'message': message, 'recipients': list(recipients)}
+        if sender_id:
+            kwargs['senderId'] = sender_id
+        response = self._sms_client().send(**kwargs)
+
+        outcome = {phone: (False, 'no status returned') for phone in recipients}
+        data = (response or {}).get('SMSMessageData', {}) if isinstance(response, dict) else {}
+        for row in data.get('Recipients', []) or []:
+            number = row.get('number', '')
+            status = row.get('status', '')
+            ok = status == 'Success' or row.get('statusCode') in (100, 101, 102)
+            detail = f"{status} {row.get('messageId', '')}".strip()
+            outcome[number] = (ok, detail)
+        return outcome
+
+
+class FakeSMSProvider:
+    """In-memory provider: records every call, always succeeds."""
+
+    name = 'fake'
+    max_recipients = 100
+    outbox = []  # [(tuple(recipients), message)] — shared, cleared by tests
+
+    def send(self, recipients, message, sender_id=''):
+        FakeSMSProvider.outbox.append((tuple(recipients), message))
+        return {phone: (True, 'fake') for phone in recipients}
+
+
+_PROVIDERS = {
+    'africastalking': AfricasTalkingProvider,
+    'fake': FakeSMSProvider,
+}
+
+
+def get_provider(name=None):
+    name = name or getattr(settings, 'SMS_PROVIDER', 'africastalking')
+    return _PROVIDERS.get(name, AfricasTalkingProvider)()
+
+
+# ── Dispatcher ─────────────────────────────────────────────────
+
+class SMSDispatchResult:
+    def __init__(self):
+        self.outcomes = []  # (phone, message, ok, detail)
+        self.api_calls = 0
+
+    @property
+    def sent(self):
+        return sum(1 for o in self.outcomes if o[2])
+
+    @property
+    def failed(self):
+        return sum(1 for o in self.outcomes if not o[2])
+
+
+class SMSDispatcher:
+    """Collects (phone, message) pairs and sends them in grouped batches."""
+
+    def __init__(self, provider=None, batch_size=None, max_workers=None,
+                 sender_id='', sent_by=None, record=True):
+        self.provider = provider or get_provider()
+        limit = getattr(self.provider, 'max_recipients', 100)
+        self.batch_size = min(batch_size or getattr(settings, 'SMS_BATCH_SIZE', 100), limit)
+        self.max_workers = max(1, max_workers or getattr(settings, 'SMS_MAX_WORKERS', 4))
+        self.sender_id = sender_id
+        self.sent_by = sent_by
+        self.record = record
+        # message -> ordered set of phones
+        self._groups = OrderedDict()
+
+    def __len__(self):
+        return sum(len(p) for p in self._groups.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.send()
+        return False
+
+    def add(self, phone, message):
+        """Queue one message; blank numbers are ignored. Returns True if queued."""
+        phone = normalize_phone(phone)
+        if not phone or not message:
+            return False
+        self._groups.setdefault(message, OrderedDict())[phone] = None
+        return True
+
+    def batches(self):
+        """``[(message, [phones])]`` — identical messages share a batch."""
+        out = []
+        for message, phones in self._groups.items():
+            phone_list = list(phones)
+            for i in range(0, len(phone_list), self.batch_size):
+                out.append((message, phone_list[i:i + self.batch_size]))
+        return out
+
+    def _send_batch(self, message, phones):
+        try:
+            outcome = self.provider.send(phones, message, self.sender_id)
+        except Exception as exc:
+            logger.warning('SMS batch failed (%d recipients): %s', len(phones), exc)
+            return [(p, message, False, str(exc)) for p in phones]
+        return [(p, message, *outcome.get(p, (False, 'no status returned'))) for p in phones]
+
+    def send(self):
+        """Send everything queued and return an ``SMSDispatchResult``."""
+        result = SMSDispatchResult()
+        batches = self.batches()
+        self._groups = OrderedDict()
+        if not batches:
+            return result
+        result.api_calls = len(batches)
+
+        if len(batches) == 1 or self.max_workers == 1:
+            for message, phones in batches:
+                result.outcomes.extend(self._send_batch(message, phones))
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+                for rows in pool.map(lambda b: self._send_batch(*b), batches):
+                    result.outcomes.extend(rows)
+
+        logger.info(
+            'SMS dispatch: %d sent, %d failed in %d API call(s)',
+            result.sent, result.failed, len(batches),
+        )
+        if self.record:
+            record_sms_results(result, sent_by=self.sent_by)
+        return result
+
+    def send_async(self, on_done=None):
+        """Run ``send`` in a daemon thread inside the caller's tenant schema."""
+        from django.db import connection
+        schema_name = getattr(connection, 'schema_name', None)
+
+        def _worker():
+            from django.db import close_old_connections
+            try:
+                if schema_name:
+                    from django_tenants.utils import schema_context
+                    with schema_context(schema_name):
+                        result = self.send()
+                else:
+                    result = self.send()
+                if on_done:
+                    on_done(result)
+            except Exception:
+                logger.exception('Background SMS dispatch failed')
+            finally:
+                close_old_connections()
+
+        if not self._groups:
+            return None
+        thread = threading.Thread(target=_worker, daemon=True)
+        thread.start()
+        return thread
+
+
+def record_sms_results(result, sent_by=None):
+    """Persist one ``SMSMessage`` row per recipient in a single insert."""
+    from django.db import connection
+    if getattr(connection, 'schema_name', 'public') == 'public':
+        return  # SMSMessage lives in tenant schemas only
+    try:
+        from communication.models import SMSMessage
+        now = timezone.now()
+        SMSMessage.objects.bulk_create([
+            SMSMessage(
+                recipient_number=phone,
+                message_body=message,
+                status='sent' if ok else 'failed',
+                provider_response=detail,
+                sent_at=now if ok else None,
+                sent_by=sent_by,
+            )
+            for phone, message, ok, detail in result.outcomes
+        ], batch_size=500)
+    except Exception:
+        logger.exception('Could not record SMS results')
@@ -8,6 +8,9 @@ Required env vars (set in .env or Vercel / Railway dashboard):
 
 Install the SDK:
   pip install africastalking
+
+For anything sent to more than a handful of numbers use
+announcements.sms_dispatch.SMSDispatcher, which batches and parallelises calls.
 """
 import logging
 from django.conf import settings
@@ -32,7 +35,6 @@ def send_sms(recipients: list[str], message: str, sender_id: str = '') -> dict:
         from announcements.sms_service import send_sms
         result = send_sms(['+233201234567'], 'Hello from SchoolPadi!')
     """
-    username = getattr(settings, 'AFRICASTALKING_USERNAME', 'sandbox')
     api_key  = getattr(settings, 'AFRICASTALKING_API_KEY',  '')
 
     if not api_key:
@@ -43,17 +45,9 @@ def send_sms(recipients: list[str], message: str, sender_id: str = '') -> dict:
         return {'error': 'No recipients', 'sent': 0}
 
     try:
-        import africastalking  # noqa: F401 — optional dependency
-    except ImportError:
-        logger.error(
-            'africastalking package is not installed. '
-            'Run: pip install africastalking'
-        )
-        return {'error': 'africastalking package not installed', 'sent': 0}
-
-    try:
-        africastalking.initialize(username, api_key)
-        sms = africastalking.SMS
+        # SDK is initialised once per process (see sms_dispatch)
+        from announcements.sms_dispatch import AfricasTalkingProvider
+        sms = AfricasTalkingProvider()._sms_client()
 
         kwargs = dict(
             message=message,
@@ -66,80 +60,77 @@ def send_sms(recipients: list[str], message: str, sender_id: str = '') -> dict:
         logger.info('SMS sent to %d recipients. Response: %s', len(recipients), response)
         return {'sent': len(recipients), 'response': response}
 
+    except ImportError:
+        logger.error(
+            'africastalking package is not installed. '
+            'Run: pip install africastalking'
+        )
+        return {'error': 'africastalking package not installed', 'sent': 0}
     except Exception as exc:
         logger.exception('SMS sending failed: %s', exc)
         return {'error': str(exc), 'sent': 0}
 
 
-def send_attendance_alert(student, status: str, date_str: str) -> dict:
-    """
-    Send an attendance SMS to the student's emergency contact.
-
-    Args:
-        student:   Student model instance
-        status:    'present' | 'absent' | 'late'
-        date_str:  Date string, e.g. '2025-01-15'
-    """
-    phone = getattr(student, 'emergency_contact', '').strip()
-    if not phone:
-        return {'error': 'No emergency contact for student', 'sent': 0}
-
-    # Normalise to E.164 (basic attempt for GH numbers)
-    if phone.startswith('0') and len(phone) == 10:
-        phone = '+233' + phone[1:]
-    elif not phone.startswith('+'):
-        phone = '+' + phone
-
+def attendance_sms_text(student, status: str, date_str: str) -> str:
+    """Body of the attendance SMS sent to a student's guardian."""
     name     = student.user.get_full_name()
     cls_name = student.current_class.name if student.current_class else 'their class'
-    status_lbl = status.capitalize()
 
     if status == 'absent':
-        msg = (
+        return (
             f"ATTENDANCE ALERT: {name} was marked ABSENT from {cls_name} "
             f"on {date_str}. Please contact the school if this is unexpected."
         )
-    elif status == 'late':
-        msg = (
+    if status == 'late':
+        return (
             f"ATTENDANCE ALERT: {name} arrived LATE to {cls_name} "
             f"on {date_str}."
         )
-    else:
-        msg = (
-            f"ATTENDANCE: {name} was marked PRESENT in {cls_name} "
-            f"on {date_str}."
-        )
-
-    return send_sms([phone], msg)
+    return (
+        f"ATTENDANCE: {name} was marked PRESENT in {cls_name} "
+        f"on {date_str}."
+    )
 
 
-def send_fee_sms_reminder(student, fee) -> dict:
+def send_attendance_alert(student, status: str, date_str: str) -> dict:
     """
-    Send an SMS fee reminder to the student's emergency contact.
+    Send an attendance SMS to the student's emergency contact.
 
     Args:
-        student: Student instance
-        fee:     StudentFee instance
+        student:   Student model instance
+        status:    'present' | 'absent' | 'late'
+        date_str:  Date string, e.g. '2025-01-15'
     """
-    phone = getattr(student, 'emergency_contact', '').strip()
+    phone = _resolve_phone(student)
     if not phone:
-        return {'error': 'No emergency contact', 'sent': 0}
+        return {'error': 'No emergency contact for student', 'sent': 0}
+    return send_sms([phone], attendance_sms_text(student, status, date_str))
 
-    if phone.startswith('0') and len(phone) == 10:
-        phone = '+233' + phone[1:]
-    elif not phone.startswith('+'):
-        phone = '+' + phone
 
+def fee_sms_text(student, fee) -> str:
+    """Body of the fee reminder SMS sent to a student's guardian."""
     name      = student.user.get_full_name()
     balance   = fee.balance
     head_name = fee.fee_structure.head.name
-
-    msg = (
+    return (
         f"FEE REMINDER: Dear parent/guardian, {name} has an outstanding "
         f"balance of GHS {balance:.2f} for {head_name}. "
         f"Please make payment at your earliest convenience. Thank you."
     )
-    return send_sms([phone], msg)
+
+
+def send_fee_sms_reminder(student, fee) -> dict:
+    """
+    Send an SMS fee reminder to the student's emergency contact.
+
+    Args:
+        student: Student instance
+        fee:     StudentFee instance
+    """
+    phone = _resolve_phone(student)
+    if not phone:
+        return {'error': 'No emergency contact', 'sent': 0}
+    return send_sms([phone], fee_sms_text(student, fee))
 
 
 # ── WhatsApp via Africa's Talking ──────────────────────────────
@@ -204,9 +195,9 @@ def send_whatsapp(recipients: list[str], message: str) -> dict:
         return {'error': str(exc), 'sent': 0}
 
 
-def _resolve_phone(student) -> str:
-    """Normalise student emergency contact to E.164."""
-    phone = getattr(student, 'emergency_contact', '').strip()
+def normalize_phone(phone: str) -> str:
+    """Normalise a Ghanaian local or bare international number to E.164."""
+    phone = (phone or '').strip()
     if not phone:
         return ''
     if phone.startswith('0') and len(phone) == 10:
@@ -216,6 +207,11 @@ def _resolve_phone(student) -> str:
     return phone
 
 
+def _resolve_phone(student) -> str:
+    """Normalise student emergency contact to E.164."""
+    return normalize_phone(getattr(student, 'emergency_contact', ''))
+
+
 def send_whatsapp_attendance_alert(student, status: str, date_str: str) -> dict:
     """WhatsApp attendance alert to parent/guardian."""
     phone = _resolve_phone(student)
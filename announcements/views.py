@@ -1,7 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .models import Announcement, Notification, PushSubscription
+from .models import Announcement, Notification, NotificationArchive, PushSubscription
 from .forms import AnnouncementForm
 from django.db.models import Q
 from django.http import JsonResponse
@@ -10,8 +10,6 @@ from django.views.decorators.http import require_POST, require_http_methods
 from django.utils.http import url_has_allowed_host_and_scheme
 from accounts.models import User
 from django.db.utils import OperationalError, ProgrammingError, DatabaseError
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 import logging
 import json
 import threading
@@ -63,57 +61,48 @@ def _create_announcement_notifications(announcement):
 
 
 def _email_announcement(announcement, recipients_qs):
-    """Send announcement email to all recipients in a background thread."""
+    """Send announcement email to all recipients in a background thread.
+
+    Uses the bulk mailer: the HTML template is compiled once and messages go
+    out in chunks over reused SMTP connections.
+    """
+    from communication.bulk_mail import BulkMailer, Recipient
+
     # Snapshot the data we need before leaving the request thread
     title = announcement.title
-    content = announcement.content
-    audience = announcement.get_target_audience_display()
     created_by = announcement.created_by.get_full_name() or announcement.created_by.username
-
-    recipient_list = list(
-        recipients_qs.exclude(email='').values_list('email', 'first_name', 'last_name', 'username')
-    )
+    shared = {
+        'title': title,
+        'content': announcement.content,
+        'audience': announcement.get_target_audience_display(),
+        'posted_by': created_by,
+    }
+
+    recipient_list = [
+        Recipient(email_addr, {'recipient_name': f"{first} {last}".strip() or uname}, user_id=pk)
+        for pk, email_addr, first, last, uname in recipients_qs.exclude(email='').values_list(
+            'pk', 'email', 'first_name', 'last_name', 'username'
+        )
+    ]
     if not recipient_list:
         return
 
-    def _send():
-        sent = 0
-        for email_addr, first, last, uname in recipient_list:
-            name = f"{first} {last}".strip() or uname
-            ctx = {
-                'recipient_name': name,
-                'title': title,
-                'content': content,
-                'audience': audience,
-                'posted_by': created_by,
-            }
-            text_body = (
-                f"Dear {name},\n\n"
-                f"New Announcement: {title}\n\n"
-                f"{content}\n\n"
-                f"— {created_by}"
-            )
-            try:
-                html_body = render_to_string('announcements/emails/announcement.html', ctx)
-            except Exception:
-                html_body = None
-
-            try:
-                msg = EmailMultiAlternatives(
-                    subject=f"📢 {title}",
-                    body=text_body,
-                    to=[email_addr],
-                )
-                if html_body:
-                    msg.attach_alternative(html_body, 'text/html')
-                msg.send(fail_silently=True)
-                sent += 1
-            except Exception as exc:
-                logger.warning('Announcement email failed for %s: %s', email_addr, exc)
-        logger.info('Sent %d announcement email(s) for "%s"', sent, title)
-
-    thread = threading.Thread(target=_send, daemon=True)
-    thread.start()
+    mailer = BulkMailer(
+        subject='📢 {{ title }}',
+        text_template=(
+            'Dear {{ recipient_name }},\n\n'
+            'New Announcement: {{ title }}\n\n'
+            '{{ content }}\n\n'
+            '— {{ posted_by }}'
+        ),
+        html_template_name='announcements/emails/announcement.html',
+    )
+    mailer.send_async(
+        recipient_list,
+        shared_context=shared,
+        record_source='announcement',
+        on_done=lambda r: logger.info('Sent %d announcement email(s) for "%s"', r.sent, title),
+    )
 
 
 @login_required
@@ -190,11 +179,10 @@ def manage_announcements(request):
 def notifications_unread_count(request):
     """Return the unread notification count + latest unread link as JSON (for client-side polling)."""
     try:
-        qs = request.user.notifications.filter(is_read=False).order_by('-created_at')
-        count = qs.count()
-        latest = qs.values('link', 'message').first()
-        latest_link = (latest.get('link') or '') if latest else ''
-        return JsonResponse({'count': count, 'latest_link': latest_link})
+        from .inbox import badge
+        bell = badge(request.user)
+        latest_link = (bell['unread'][0]['link'] or '') if bell['unread'] else ''
+        return JsonResponse({'count': bell['count'], 'latest_link': latest_link})
     except (ProgrammingError, OperationalError, DatabaseError):
         # Tenant schema may not have announcements tables yet.
         logger.warning(
@@ -208,8 +196,7 @@ def notifications_unread_count(request):
 @login_required
 def mark_notification_read(request, notification_id):
     notification = get_object_or_404(Notification, id=notification_id, recipient=request.user)
-    notification.is_read = True
-    notification.save()
+    Notification.objects.filter(pk=notification.pk).mark_read()
     # Route to contextually relevant page based on notification type
     if notification.alert_type == 'announcement':
         if request.user.user_type == 'admin':
@@ -233,7 +220,7 @@ def mark_notification_read(request, notification_id):
 
 @login_required
 def mark_all_notifications_read(request):
-    request.user.notifications.filter(is_read=False).update(is_read=True)
+    request.user.notifications.mark_read()
     return redirect('dashboard')
 
 
@@ -244,7 +231,15 @@ def mark_all_notifications_read(request):
 @login_required
 def notification_centre(request):
     """Full inbox — all notifications for the logged-in user, newest first."""
-    filter_tab = request.GET.get('tab', 'all')  # 'all' | 'unread'
+    filter_tab = request.GET.get('tab', 'all')  # 'all' | 'unread' | 'archive'
+
+    if filter_tab == 'archive':
+        # Older notifications moved out by `manage.py archive_notifications`
+        return render(request, 'announcements/notification_centre.html', {
+            'notifications': NotificationArchive.objects.filter(recipient=request.user)[:500],
+            'active_tab': filter_tab,
+            'unread_ids': set(),
+        })
 
     qs = Notification.objects.filter(recipient=request.user).order_by('-created_at')
 
@@ -314,34 +309,11 @@ def send_push_notification(user, title, body, url='/'):
     Helper to send a web-push notification to all of a user's subscriptions.
     Call from signal handlers or management commands.
     """
-    from django.conf import settings
+    from announcements.push_engine import deliver_to_users
     try:
-        from pywebpush import webpush, WebPushException
+        return deliver_to_users([(user.pk, title, body, url)])
     except ImportError:
-        import logging
-        logging.getLogger(__name__).warning('pywebpush not installed — push notification skipped')
-        return
-    import json as _json
-
-    subscriptions = PushSubscription.objects.filter(user=user)
-    private_key_pem = settings.VAPID_PRIVATE_KEY_PEM
-    claims = settings.VAPID_CLAIMS
-
-    for sub in subscriptions:
-        try:
-            webpush(
-                subscription_info={
-                    'endpoint': sub.endpoint,
-                    'keys': {'p256dh': sub.p256dh, 'auth': sub.auth},
-                },
-                data=_json.dumps({'title': title, 'body': body, 'url': url}),
-                vapid_private_key=private_key_pem,
-                vapid_claims=claims,
-            )
-        except WebPushException as ex:
-            # Subscription expired — clean up
-            if ex.response and ex.response.status_code in (404, 410):
-                sub.delete()
+        logger.warning('pywebpush not installed — push notification skipped')
 
 
 def send_push_to_users(user_ids, title, body, url='/'):
@@ -351,42 +323,43 @@ def send_push_to_users(user_ids, title, body, url='/'):
     """
     if not user_ids:
         return
+    send_push_batch([(uid, title, body, url) for uid in user_ids])
 
-    def _push_worker(_user_ids, _title, _body, _url):
-        from django.conf import settings
-        try:
-            from pywebpush import webpush, WebPushException
-        except ImportError:
-            return
-        import json as _json
 
-        subs = PushSubscription.objects.filter(user_id__in=_user_ids).select_related('user')
-        private_key_pem = settings.VAPID_PRIVATE_KEY_PEM
-        claims = settings.VAPID_CLAIMS
-        payload = _json.dumps({'title': _title, 'body': _body, 'url': _url})
+def send_push_batch(items):
+    """
+    Send per-user push notifications in ONE background thread.
+
+    ``items`` is an iterable of ``(user_id, title, body, url)`` tuples, so
+    each recipient can get a different message (e.g. parent digests).
+    Delivery is concurrent — see announcements.push_engine.
+    """
+    from django.db import connection
+
+    # Snapshot as a list to avoid queryset issues across threads
+    item_list = [tuple(i) for i in items]
+    if not item_list:
+        return
+    schema_name = getattr(connection, 'schema_name', None)
+
+    def _push_worker(_items):
+        from django.db import close_old_connections
+        from announcements.push_engine import deliver_to_users
+        try:
+            if schema_name:
+                from django_tenants.utils import schema_context
+                with schema_context(schema_name):
+                    deliver_to_users(_items)
+            else:
+                deliver_to_users(_items)
+        except Exception:
+            logger.exception('Background push fan-out failed')
+        finally:
+            close_old_connections()
 
-        for sub in subs:
-            try:
-                webpush(
-                    subscription_info={
-                        'endpoint': sub.endpoint,
-                        'keys': {'p256dh': sub.p256dh, 'auth': sub.auth},
-                    },
-                    data=payload,
-                    vapid_private_key=private_key_pem,
-                    vapid_claims=claims,
-                )
-            except WebPushException as ex:
-                if ex.response and ex.response.status_code in (404, 410):
-                    sub.delete()
-            except Exception:
-                pass
-
-    # Snapshot IDs as a list to avoid queryset issues across threads
-    uid_list = list(user_ids)
     thread = threading.Thread(
         target=_push_worker,
-        args=(uid_list, title, body, url),
+        args=(item_list,),
         daemon=True,
     )
     thread.start()
@@ -472,7 +445,7 @@ def push_campaign(request):
             messages.error(request, 'Title and message body are required.')
         else:
             # Build recipient queryset
-            subs = PushSubscription.objects.select_related('user').all()
+            subs = PushSubscription.objects.all()
 
             if target == 'teachers':
                 subs = subs.filter(user__user_type='teacher')
@@ -489,46 +462,20 @@ def push_campaign(request):
                 ).values_list('user_id', flat=True)
                 subs = subs.filter(user_id__in=student_user_ids)
 
-            # Send push notifications
-            from django.conf import settings as _settings
+            # Send push notifications — concurrent, one VAPID signature per origin
             try:
-                from pywebpush import webpush, WebPushException
+                from announcements.push_engine import deliver
             except ImportError:
                 messages.error(request, 'pywebpush not installed.')
                 return redirect('announcements:push_campaign')
 
-            private_key = _settings.VAPID_PRIVATE_KEY_PEM
-            claims = _settings.VAPID_CLAIMS
             payload = json.dumps({'title': title, 'body': body, 'url': url})
-
-            sent_count = 0
-            failed_count = 0
-            expired_ids = []
-
-            for sub in subs:
-                try:
-                    webpush(
-                        subscription_info={
-                            'endpoint': sub.endpoint,
-                            'keys': {'p256dh': sub.p256dh, 'auth': sub.auth},
-                        },
-                        data=payload,
-                        vapid_private_key=private_key,
-                        vapid_claims=claims,
-                    )
-                    sent_count += 1
-                except WebPushException as ex:
-                    if ex.response and ex.response.status_code in (404, 410):
-                        expired_ids.append(sub.id)
-                    failed_count += 1
-                except Exception as ex:
-                    import logging
-                    logging.getLogger(__name__).warning('Push send error for sub %s: %s', sub.id, ex)
-                    failed_count += 1
-
-            # Clean up expired subscriptions
-            if expired_ids:
-                PushSubscription.objects.filter(id__in=expired_ids).delete()
+            stats = deliver(
+                subs.values_list('id', 'endpoint', 'p256dh', 'auth', 'user_id'),
+                lambda _uid: payload,
+            )
+            sent_count = stats.delivered
+            failed_count = stats.failed + stats.expired
 
             if sent_count:
                 messages.success(request, f'Push notification sent to {sent_count} device(s).')
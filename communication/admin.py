@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SMSMessage, EmailCampaign
+from .models import SMSMessage, EmailCampaign, EmailDelivery
 
 @admin.register(SMSMessage)
 class SMSMessageAdmin(admin.ModelAdmin):
@@ -11,3 +11,9 @@ class SMSMessageAdmin(admin.ModelAdmin):
 class EmailCampaignAdmin(admin.ModelAdmin):
     list_display = ('subject', 'recipient_group', 'status', 'created_at')
     list_filter = ('status', 'recipient_group')
+
+@admin.register(EmailDelivery)
+class EmailDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('recipient_email', 'source', 'status', 'campaign', 'created_at')
+    list_filter = ('status', 'source', 'created_at')
+    search_fields = ('recipient_email', 'error')
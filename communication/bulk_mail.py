@@ -0,0 +1,231 @@
+"""
+Bulk email engine.
+
+Announcement, fee-reminder, broadcast and landlord promo emails used to call
+``render_to_string`` and open a fresh SMTP session for every recipient.
+``BulkMailer`` compiles its templates once, renders each recipient's context
+against the compiled templates, and sends in chunks over a small number of
+reused connections, pausing between chunks to stay inside the Brevo relay
+limits.  Every recipient gets a delivery status in the returned result.
+
+Usage::
+
+    from communication.bulk_mail import BulkMailer, Recipient
+
+    mailer = BulkMailer(
+        subject='📢 {{ title }}',
+        text_template='Dear {{ recipient_name }},\\n\\n{{ content }}',
+        html_template_name='announcements/emails/announcement.html',
+    )
+    result = mailer.send([Recipient('ama@example.com', {'recipient_name': 'Ama'})],
+                         shared_context={'title': 'PTA Meeting', 'content': '...'})
+    result.sent, result.failed
+
+Tenant callers can persist per-recipient rows (``EmailDelivery``) with
+``record_source=...``; ``send_async`` does the same from a daemon thread,
+re-entering the caller's tenant schema first.
+
+Settings:
+  EMAIL_BULK_CHUNK_SIZE    Messages per chunk (default 50)
+  EMAIL_BULK_CHUNK_PAUSE   Seconds to sleep between chunks (default 1.0)
+  EMAIL_BULK_CONNECTIONS   Parallel SMTP connections per batch (default 2)
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template import engines
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+
+class Recipient:
+    __slots__ = ('email', 'context', 'user_id')
+
+    def __init__(self, email, context=None, user_id=None):
+        self.email = email
+        self.context = context or {}
+        self.user_id = user_id
+
+
+class BulkMailResult:
+    """Per-recipient outcome of a bulk send."""
+
+    def __init__(self):
+        self.statuses = []  # (email, user_id, 'sent' | 'failed', error)
+        self._lock = threading.Lock()
+
+    def add(self, recipient, ok, error=''):
+        with self._lock:
+            self.statuses.append((recipient.email, recipient.user_id, 'sent' if ok else 'failed', error))
+
+    @property
+    def sent(self):
+        return sum(1 for s in self.statuses if s[2] == 'sent')
+
+    @property
+    def failed(self):
+        return sum(1 for s in self.statuses if s[2] == 'failed')
+
+
+def _compile_string(source):
+    if source is None:
+        return None
+    return engines['django'].from_string(source)
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class BulkMailer:
+    """Render-once, connect-once sender for one message to many recipients.
+
+    ``subject`` and ``text_template`` are Django template strings (plain
+    text — autoescaping is switched off for them); ``html_template_name`` is
+    an optional template file for the HTML alternative.
+    """
+
+    def __init__(self, subject, text_template='', html_template_name=None,
+                 from_email=None, chunk_size=None, chunk_pause=None, connections=None):
+        self.subject_tpl = _compile_string('{% autoescape off %}' + subject + '{% endautoescape %}')
+        self.text_tpl = _compile_string('{% autoescape off %}' + (text_template or '') + '{% endautoescape %}')
+        self.html_tpl = get_template(html_template_name) if html_template_name else None
+        self.from_email = from_email or settings.DEFAULT_FROM_EMAIL
+        self.chunk_size = chunk_size or getattr(settings, 'EMAIL_BULK_CHUNK_SIZE', 50)
+        self.chunk_pause = (
+            chunk_pause if chunk_pause is not None
+            else getattr(settings, 'EMAIL_BULK_CHUNK_PAUSE', 1.0)
+        )
+        self.connections = max(1, connections or getattr(settings, 'EMAIL_BULK_CONNECTIONS', 2))
+
+    # ── rendering ─────────────────────────────────────────────
+    def build_message(self, recipient, shared_context=None, connection=None):
+        ctx = dict(shared_context or {})
+        ctx.update(recipient.context)
+        subject = ' '.join(self.subject_tpl.render(ctx).split())
+        msg = EmailMultiAlternatives(
+            subject=subject,
+            body=self.text_tpl.render(ctx),
+            from_email=self.from_email,
+            to=[recipient.email],
+            connection=connection,
+        )
+        if self.html_tpl is not None:
+            try:
+                msg.attach_alternative(self.html_tpl.render(ctx), 'text/html')
+            except Exception as exc:
+                logger.warning('HTML render failed for %s: %s', recipient.email, exc)
+        return msg
+
+    # ── sending ───────────────────────────────────────────────
+    def _send_chunks(self, chunks, shared_context, result):
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as exc:
+            logger.warning('Bulk mail: could not open connection: %s', exc)
+            for chunk in chunks:
+                for recipient in chunk:
+                    result.add(recipient, False, str(exc))
+            return
+        try:
+            for n, chunk in enumerate(chunks):
+                if n and self.chunk_pause:
+                    time.sleep(self.chunk_pause)
+                for recipient in chunk:
+                    try:
+                        msg = self.build_message(recipient, shared_context, connection)
+                        ok = bool(connection.send_messages([msg]))
+                        result.add(recipient, ok, '' if ok else 'not accepted')
+                    except Exception as exc:
+                        result.add(recipient, False, str(exc)[:255])
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def send(self, recipients, shared_context=None, record_source=None, campaign=None):
+        """Send to every recipient and return a ``BulkMailResult``.
+
+        Duplicate and blank addresses are dropped.  With ``record_source``
+        an ``EmailDelivery`` row is written per recipient (tenant schema).
+        """
+        seen = set()
+        unique = []
+        for r in recipients:
+            key = (r.email or '').strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                unique.append(r)
+
+        result = BulkMailResult()
+        chunks = list(_chunks(unique, self.chunk_size))
+        if chunks:
+            # Round-robin chunks over the connection pool
+            lanes = [chunks[i::self.connections] for i in range(min(self.connections, len(chunks)))]
+            if len(lanes) == 1:
+                self._send_chunks(lanes[0], shared_context, result)
+            else:
+                with ThreadPoolExecutor(max_workers=len(lanes)) as pool:
+                    for lane in lanes:
+                        pool.submit(self._send_chunks, lane, shared_context, result)
+
+        logger.info('Bulk mail: %d sent, %d failed', result.sent, result.failed)
+        if record_source:
+            record_deliveries(result, record_source, campaign=campaign)
+        return result
+
+    def send_async(self, recipients, shared_context=None, record_source=None,
+                   campaign=None, on_done=None):
+        """Run ``send`` in a daemon thread inside the caller's tenant schema."""
+        from django.db import connection
+        schema_name = getattr(connection, 'schema_name', None)
+        recipients = list(recipients)
+
+        def _worker():
+            from django.db import close_old_connections
+            try:
+                if schema_name:
+                    from django_tenants.utils import schema_context
+                    with schema_context(schema_name):
+                        result = self.send(recipients, shared_context, record_source, campaign)
+                        if on_done:
+                            on_done(result)
+                else:
+                    result = self.send(recipients, shared_context, record_source, campaign)
+                    if on_done:
+                        on_done(result)
+            except Exception:
+                logger.exception('Background bulk mail failed')
+            finally:
+                close_old_connections()
+
+        thread = threading.Thread(target=_worker, daemon=True)
+        thread.start()
+        return thread
+
+
+def record_deliveries(result, source, campaign=None):
+    """Persist one ``EmailDelivery`` row per recipient in a single insert."""
+    from communication.models import EmailDelivery
+    try:
+        EmailDelivery.objects.bulk_create([
+            EmailDelivery(
+                campaign=campaign,
+                source=source,
+                recipient_email=email,
+                recipient_id=user_id,
+                status=status,
+                error=error or '',
+            )
+            for email, user_id, status, error in result.statuses
+        ], batch_size=500)
+    except Exception:
+        logger.exception('Could not record email deliveries for %s', source)
@@ -115,6 +115,33 @@ class EmailCampaign(models.Model):
         return f"Email: {self.subject}"
 
 
+class EmailDelivery(models.Model):
+    """Per-recipient outcome of a bulk email send (see communication.bulk_mail)."""
+    STATUS_CHOICES = (
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    campaign = models.ForeignKey(
+        EmailCampaign, on_delete=models.CASCADE, null=True, blank=True, related_name='deliveries'
+    )
+    source = models.CharField(max_length=30, help_text='e.g. announcement, fee_reminder, campaign')
+    recipient_email = models.EmailField()
+    recipient = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    error = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['source', 'status', '-created_at'], name='emaildel_src_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient_email} ({self.status})"
+
+
 # ──────────────────────────────────────────────
 # AUTO PARENT NOTIFICATION RULES
 # ──────────────────────────────────────────────
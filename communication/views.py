@@ -109,8 +109,7 @@ def conversation_view(request, user_id):
         recipient=request.user,
         alert_type='message',
         link=str(other_user.pk),
-        is_read=False,
-    ).update(is_read=True)
+    ).mark_read()
 
     if request.method == 'POST':
         content = request.POST.get('content', '').strip()
@@ -288,43 +287,19 @@ def send_sms(request):
                     django_messages.warning(request, "No valid phone numbers found.")
                     return redirect('communication:send_sms')
 
-                from announcements.sms_service import send_sms as at_send_sms
-                import logging
-                _log = logging.getLogger(__name__)
-
-                sent_count = 0
-                failed_count = 0
-                phone_list = list(recipients)
-
-                # Send in batches of 20 to avoid API limits
-                for i in range(0, len(phone_list), 20):
-                    batch = phone_list[i:i + 20]
-                    result = at_send_sms(batch, message_body)
-                    if result.get('error'):
-                        # API not configured — fall back to recording as queued
-                        for phone in batch:
-                            SMSMessage.objects.create(
-                                recipient_number=phone,
-                                message_body=message_body,
-                                status='queued',
-                                provider_response=result['error'],
-                                sent_by=request.user,
-                            )
-                        failed_count += len(batch)
-                    else:
-                        for phone in batch:
-                            SMSMessage.objects.create(
-                                recipient_number=phone,
-                                message_body=message_body,
-                                status='sent',
-                                provider_response=str(result),
-                                sent_at=timezone.now(),
-                                sent_by=request.user,
-                            )
-                        sent_count += len(batch)
+                from announcements.sms_dispatch import SMSDispatcher
+
+                # One multi-recipient API call per batch, batches sent
+                # concurrently; every outcome is recorded as an SMSMessage.
+                dispatcher = SMSDispatcher(sent_by=request.user)
+                for phone in recipients:
+                    dispatcher.add(phone, message_body)
+                result = dispatcher.send()
+                sent_count = result.sent
+                failed_count = result.failed
 
                 if failed_count and not sent_count:
-                    django_messages.warning(request, f"SMS gateway unavailable. {failed_count} message(s) queued for retry.")
+                    django_messages.warning(request, f"SMS gateway unavailable. {failed_count} message(s) failed.")
                 elif failed_count:
                     django_messages.warning(request, f"Sent {sent_count}, failed {failed_count} SMS message(s).")
                 else:
@@ -351,47 +326,38 @@ def send_email(request):
             campaign.save()
 
             # Resolve recipient emails based on group
-            from django.core.mail import send_mass_mail
-            import logging
-            _log = logging.getLogger(__name__)
-
-            email_list = []
-            group = campaign.recipient_group
-            if group == 'staff':
-                email_list = list(
-                    User.objects.filter(user_type__in=['admin', 'teacher'])
-                    .exclude(email='')
-                    .values_list('email', flat=True)
-                )
-            elif group == 'parents':
-                email_list = list(
-                    User.objects.filter(user_type='parent')
-                    .exclude(email='')
-                    .values_list('email', flat=True)
+            from communication.bulk_mail import BulkMailer, Recipient
+
+            user_types = {
+                'staff': ['admin', 'teacher'],
+                'parents': ['parent'],
+                'students': ['student'],
+            }.get(campaign.recipient_group, [])
+            recipients = [
+                Recipient(addr, user_id=pk)
+                for pk, addr in User.objects.filter(user_type__in=user_types)
+                .exclude(email='')
+                .values_list('pk', 'email')
+            ]
+
+            if recipients:
+                def _finish(result, campaign=campaign):
+                    campaign.status = 'sent' if result.sent else 'draft'
+                    campaign.save(update_fields=['status'])
+
+                # Campaign body is sent verbatim, not treated as a template
+                BulkMailer(subject='{{ subject }}', text_template='{{ body }}').send_async(
+                    recipients,
+                    shared_context={'subject': campaign.subject, 'body': campaign.body},
+                    record_source='campaign',
+                    campaign=campaign,
+                    on_done=_finish,
                 )
-            elif group == 'students':
-                email_list = list(
-                    User.objects.filter(user_type='student')
-                    .exclude(email='')
-                    .values_list('email', flat=True)
+                django_messages.success(
+                    request,
+                    f"Email queued for {len(recipients)} recipient(s). "
+                    f"Delivery status is recorded per recipient.",
                 )
-
-            if email_list:
-                from_addr = settings.DEFAULT_FROM_EMAIL
-                messages_to_send = [
-                    (campaign.subject, campaign.body, from_addr, [addr])
-                    for addr in email_list
-                ]
-                try:
-                    send_mass_mail(messages_to_send, fail_silently=False)
-                    campaign.status = 'sent'
-                    campaign.save(update_fields=['status'])
-                    django_messages.success(request, f"Email sent to {len(email_list)} recipient(s).")
-                except Exception as exc:
-                    _log.exception('Email campaign send failed')
-                    campaign.status = 'draft'
-                    campaign.save(update_fields=['status'])
-                    django_messages.warning(request, f"Email sending failed: {exc}. Campaign saved as draft.")
             else:
                 campaign.status = 'sent'
                 campaign.save(update_fields=['status'])
@@ -657,6 +623,9 @@ def _evaluate_single_rule(rule):
     ).values_list('student_id', flat=True)
     cooled_students = set(recent_logs)
 
+    from announcements.sms_dispatch import SMSDispatcher
+    sms = SMSDispatcher()
+
     for sid, message in matched_students:
         if sid in cooled_students:
             continue
@@ -668,11 +637,11 @@ def _evaluate_single_rule(rule):
         if not parent_users:
             # Fallback: try emergency contact for SMS
             if rule.channel in ('sms', 'all'):
-                _send_emergency_sms(student, rule, message)
+                _send_emergency_sms(student, rule, message, sms=sms)
             continue
 
         for parent_user in parent_users:
-            _dispatch_notification(rule, student, parent_user, message)
+            _dispatch_notification(rule, student, parent_user, message, sms=sms)
             NotificationRuleLog.objects.create(
                 rule=rule,
                 student=student,
@@ -682,11 +651,16 @@ def _evaluate_single_rule(rule):
             )
             sent_count += 1
 
+    sms.send_async()
     return {'matched': len(matched_students), 'sent': sent_count}
 
 
-def _dispatch_notification(rule, student, parent_user, message):
-    """Send via the configured channel(s)."""
+def _dispatch_notification(rule, student, parent_user, message, sms=None):
+    """Send via the configured channel(s).
+
+    SMS messages are queued on ``sms`` (an SMSDispatcher) when given so the
+    caller can send a whole rule run in batched calls.
+    """
     student_name = student.user.get_full_name()
     full_msg = f"[{rule.name}] {student_name}: {message}"
 
@@ -710,30 +684,27 @@ def _dispatch_notification(rule, student, parent_user, message):
                     fail_silently=True,
                 )
             elif ch == 'sms' and parent_user.phone:
-                from announcements.sms_service import send_sms as at_send_sms
-                phone = parent_user.phone.strip()
-                if phone.startswith('0') and len(phone) == 10:
-                    phone = '+233' + phone[1:]
-                elif not phone.startswith('+'):
-                    phone = '+' + phone
-                at_send_sms([phone], full_msg)
+                if sms is not None:
+                    sms.add(parent_user.phone, full_msg)
+                else:
+                    from announcements.sms_service import normalize_phone, send_sms as at_send_sms
+                    at_send_sms([normalize_phone(parent_user.phone)], full_msg)
         except Exception as exc:
             _logger.exception('Notification dispatch failed (%s): %s', ch, exc)
 
 
-def _send_emergency_sms(student, rule, message):
+def _send_emergency_sms(student, rule, message, sms=None):
     """Fallback: send SMS to student emergency_contact if no parent user found."""
     phone = getattr(student, 'emergency_contact', '').strip()
     if not phone:
         return
-    if phone.startswith('0') and len(phone) == 10:
-        phone = '+233' + phone[1:]
-    elif not phone.startswith('+'):
-        phone = '+' + phone
 
     full_msg = f"[{rule.name}] {student.user.get_full_name()}: {message}"
+    if sms is not None:
+        sms.add(phone, full_msg)
+        return
     try:
-        from announcements.sms_service import send_sms as at_send_sms
-        at_send_sms([phone], full_msg)
+        from announcements.sms_service import normalize_phone, send_sms as at_send_sms
+        at_send_sms([normalize_phone(phone)], full_msg)
     except Exception as exc:
         _logger.exception('Emergency SMS failed: %s', exc)
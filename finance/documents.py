@@ -0,0 +1,74 @@
+"""
+Renderers for finance documents (accounts.documents): A5 payment receipts.
+"""
+import io
+from functools import lru_cache
+
+
+def receipt_payload(payment):
+    sf = payment.student_fee
+    student = sf.student
+    return {
+        'rows': [
+            ['Receipt No.:', f'RCT-{payment.id:05d}', 'Date:', payment.date.strftime('%d %b %Y')],
+            ['Student:', student.user.get_full_name(), 'Class:',
+             student.current_class.name if student.current_class else 'N/A'],
+            ['Fee Item:', sf.fee_structure.head.name, 'Term:', sf.fee_structure.term.title()],
+            ['Amount Paid:', f'₵{payment.amount:.2f}', 'Balance After:', f'₵{sf.balance:.2f}'],
+            ['Payment Status:', sf.get_status_display(), 'Method:', payment.method],
+        ],
+    }
+
+
+@lru_cache(maxsize=1)
+def _receipt_styles():
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+    return {
+        'ctr': ParagraphStyle('c', parent=styles['Normal'], fontSize=11, alignment=TA_CENTER,
+                              fontName='Helvetica-Bold'),
+        'sub': ParagraphStyle('s', parent=styles['Normal'], fontSize=8, alignment=TA_CENTER,
+                              textColor=colors.HexColor('#555555')),
+    }
+
+
+def receipt_pdf(payload, progress):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A5
+    from reportlab.lib.units import cm
+    from reportlab.platypus import HRFlowable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    BLUE   = colors.HexColor('#1d4ed8')
+    LIGHT  = colors.HexColor('#eff6ff')
+    BORDER = colors.HexColor('#d1d5db')
+    s = _receipt_styles()
+
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A5, leftMargin=1.5*cm, rightMargin=1.5*cm,
+                            topMargin=1.2*cm, bottomMargin=1.2*cm)
+    story = [
+        Paragraph('PAYMENT RECEIPT', s['ctr']),
+        Spacer(1, 6),
+        HRFlowable(width='100%', thickness=2, color=BLUE, spaceAfter=8),
+    ]
+    table = Table(payload['rows'], colWidths=[3*cm, 4.5*cm, 2.5*cm, 4*cm])
+    table.setStyle(TableStyle([
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+        ('FONTSIZE', (0,0), (-1,-1), 8.5),
+        ('FONTNAME', (0,0), (0,-1), 'Helvetica-Bold'),
+        ('FONTNAME', (2,0), (2,-1), 'Helvetica-Bold'),
+        ('BACKGROUND', (0,0), (-1,-1), LIGHT),
+        ('GRID', (0,0), (-1,-1), 0.4, BORDER),
+        ('TOPPADDING', (0,0), (-1,-1), 4),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+    ]))
+    story.append(table)
+    story.append(Spacer(1, 14))
+    story.append(HRFlowable(width='100%', thickness=0.5, color=BORDER, spaceAfter=4))
+    story.append(Paragraph('Thank you for your payment. Keep this receipt for your records.', s['sub']))
+
+    doc.build(story)
+    return buf.getvalue()
@@ -0,0 +1,140 @@
+"""
+Fee reminders: in-app notifications for students and emails to parents.
+
+``send_fee_reminders`` ran a ``Notification.exists()`` per outstanding fee
+and sent each parent email over its own SMTP connection.  Reminders now
+claim one key per fee and period (``tenants.scheduler.claim``) and insert
+the notifications for the keys they won in one ``bulk_create``; parent
+emails go out through one ``BulkMailer`` batch.
+
+  * ``send_due(since, until)`` is the scheduled job: fees whose due date
+    fell in the window since its last run, reminded once per due date.
+  * ``remind(fees, period)`` is the blanket reminder behind
+    ``manage.py send_fee_reminders``: once per fee per ``period`` (an ISO
+    week by default), however often it runs.
+
+Usage::
+
+    from finance import reminders
+
+    created, skipped, emails = reminders.remind(reminders.outstanding(), reminders.week())
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+
+def outstanding():
+    from finance.models import StudentFee
+
+    return (
+        StudentFee.objects
+        .filter(status__in=['unpaid', 'partial'])
+        .select_related(
+            'student', 'student__user',
+            'fee_structure', 'fee_structure__head', 'fee_structure__class_name',
+        )
+        .prefetch_related('payments')
+    )
+
+
+def week(day=None):
+    """The default reminder period: ``2026-W42``."""
+    year, number, _ = (day or timezone.localdate()).isocalendar()
+    return f'{year}-W{number:02d}'
+
+
+def message(fee):
+    return (
+        f"Fee Reminder: You have an outstanding balance of ₵{fee.balance:.2f} "
+        f"for {fee.fee_structure.head.name}. Please make payment at your earliest convenience."
+    )
+
+
+def _link(student):
+    try:
+        return reverse('finance:student_fees', args=[student.id])
+    except Exception:
+        return '/finance/'
+
+
+def _parent_emails(fees):
+    """Parent email recipients for ``fees`` — one query for all their students.
+
+    A parent gets one email per child, covering all of that child's fees.
+    """
+    from collections import defaultdict
+    from communication.bulk_mail import Recipient
+    from parents.models import Parent
+
+    by_student = defaultdict(list)
+    for fee in fees:
+        by_student[fee.student_id].append(fee)
+    recipients = []
+    links = Parent.children.through.objects.filter(student_id__in=by_student).select_related('parent__user')
+    for link in links:
+        user, owed = link.parent.user, by_student[link.student_id]
+        if not user.email:
+            continue
+        first = owed[0]
+        due_dates = [fee.fee_structure.due_date for fee in owed if fee.fee_structure.due_date]
+        recipients.append(Recipient(user.email, {
+            'parent_name': user.get_full_name() or user.username,
+            'student_name': first.student.user.get_full_name(),
+            'head_name': ', '.join(fee.fee_structure.head.name for fee in owed),
+            'balance': sum(fee.balance for fee in owed),
+            'due_date': min(due_dates) if due_dates else None,
+            'class_name': getattr(first.fee_structure.class_name, 'name', ''),
+        }, user_id=user.pk))
+    return recipients
+
+
+def remind(fees, period, email=True):
+    """Remind the students of ``fees`` not yet reminded in ``period``.
+
+    Returns ``(notifications created, fees skipped, parent emails sent)``.
+    """
+    from announcements.models import Notification
+    from communication.bulk_mail import BulkMailer
+    from tenants import scheduler
+
+    fees = list(fees)
+    keys = {f'fee:{fee.pk}:{period}': fee for fee in fees}
+    with transaction.atomic():
+        won = scheduler.claim(keys, scheduler.new_run())
+        chosen = [fee for key, fee in keys.items() if key in won]
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=fee.student.user,
+                message=message(fee),
+                alert_type='general',
+                link=_link(fee.student),
+            )
+            for fee in chosen
+        ])
+    emails = _parent_emails(chosen) if email and chosen else []
+    if emails:
+        BulkMailer(
+            subject='Fee Payment Reminder — {{ student_name }}',
+            text_template=(
+                'Dear {{ parent_name }},\n\nThis is a reminder that {{ student_name }} has an outstanding '
+                'fee balance of ₵{{ balance|floatformat:2 }} for {{ head_name }}'
+                '{% if due_date %} (due {{ due_date }}){% endif %}.\n\n'
+                'Please contact the school to arrange payment.\n\nThank you.'
+            ),
+            html_template_name='finance/emails/fee_reminder.html',
+        ).send(emails, record_source='fee_reminder')
+    return len(chosen), len(fees) - len(chosen), len(emails)
+
+
+def send_due(since, until):
+    """Scheduled job: remind fees that fell due in ``(since, until]``."""
+    today = timezone.localdate(until)
+    start = timezone.localdate(since) if since else today - timedelta(days=1)
+    fees = outstanding().filter(fee_structure__due_date__gt=start, fee_structure__due_date__lte=today)
+    created = 0
+    for due_date in sorted(set(fees.values_list('fee_structure__due_date', flat=True))):
+        created += remind(fees.filter(fee_structure__due_date=due_date), f'due-{due_date}')[0]
+    return created
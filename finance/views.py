@@ -2,7 +2,7 @@ import json
 import logging
 from decimal import Decimal
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, JsonResponse
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
@@ -14,6 +14,8 @@ from .forms import FeeHeadForm, FeeStructureForm, PaymentForm
 from students.models import Student
 from teachers.models import Teacher
 from academics.models import Class, AcademicYear, SchoolInfo
+from academics.analytics import mark_stale
+from accounts.exports import chunk_size, export_response, full_name
 
 logger = logging.getLogger(__name__)
 from announcements.models import Notification
@@ -138,8 +140,7 @@ def fee_collected_students(request, structure_id):
 
 @login_required
 def fee_collected_students_csv(request, structure_id):
-    """Download a CSV of fully-paid students for a fee structure."""
-    import csv
+    """Download a CSV (or ``?format=xlsx``) of fully-paid students for a fee structure."""
     if request.user.user_type != 'admin':
         return redirect('dashboard')
 
@@ -151,29 +152,29 @@ def fee_collected_students_csv(request, structure_id):
     paid_fees = (
         StudentFee.objects
         .filter(fee_structure=structure, status='paid')
-        .select_related('student__user', 'student__current_class')
+        .order_by('student__user__last_name', 'student__user__first_name')
+        .values('id')
         .annotate(
             total_paid_amount=Coalesce(Sum('payments__amount'), Decimal('0')),
             latest_payment_date=Max('payments__date'),
         )
-        .order_by('student__user__last_name', 'student__user__first_name')
+        .values_list(
+            'student__user__first_name', 'student__user__last_name', 'student__current_class__name',
+            'total_paid_amount', 'latest_payment_date',
+        )
     )
 
-    filename = f"paid_{structure.head.name}_{structure.class_level}_{structure.term}.csv".replace(' ', '_')
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    writer = csv.writer(response)
-    writer.writerow(['#', 'Student Name', 'Class', 'Amount Paid (GHS)', 'Last Payment Date', 'Status'])
+    def rows():
+        fees = paid_fees.iterator(chunk_size=chunk_size())
+        for idx, (first, last, class_name, amount, last_date) in enumerate(fees, start=1):
+            yield (idx, full_name(first, last), class_name or '-', amount,
+                   last_date.strftime('%Y-%m-%d') if last_date else '-', 'Paid')
 
-    for idx, sf in enumerate(paid_fees, start=1):
-        student_name = sf.student.user.get_full_name()
-        class_name = sf.student.current_class.name if sf.student.current_class else '-'
-        amount = sf.total_paid_amount
-        last_date = sf.latest_payment_date.strftime('%Y-%m-%d') if sf.latest_payment_date else '-'
-        writer.writerow([idx, student_name, class_name, amount, last_date, 'Paid'])
-
-    return response
+    return export_response(
+        request, f"paid_{structure.head.name}_{structure.class_level}_{structure.term}",
+        ['#', 'Student Name', 'Class', 'Amount Paid (GHS)', 'Last Payment Date', 'Status'],
+        rows, count=StudentFee.objects.filter(fee_structure=structure, status='paid').count(),
+    )
 
 
 @login_required
@@ -248,6 +249,7 @@ def create_fee_structure(request):
                     if student.pk not in existing_student_ids
                 ]
                 StudentFee.objects.bulk_create(new_fees)
+                mark_stale('fees', 'all')
                 count = len(new_fees)
                 messages.success(request, f'Fee Structure created and assigned to {count} students.')
             else:
@@ -467,8 +469,12 @@ def send_fee_reminders(request):
 
     if request.method == 'POST':
         from django.urls import reverse as url_reverse
+        from communication.bulk_mail import BulkMailer, Recipient
+        from announcements.sms_dispatch import SMSDispatcher
+        sms = SMSDispatcher(sent_by=request.user)
         created = 0
         skipped = 0
+        email_recipients = []
         for fee in pending_fees:
             student = fee.student
             user = student.user
@@ -504,28 +510,23 @@ def send_fee_reminders(request):
             )
             created += 1
 
-            # Also send email if student has an email address
+            # Queue email if student has an email address (sent in bulk below)
             if user.email:
-                try:
-                    from django.core.mail import send_mail
-                    send_mail(
-                        subject=f'Fee Reminder: {head_name}',
-                        message=message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[user.email],
-                        fail_silently=True,
-                    )
-                except Exception:
-                    pass  # Email failure shouldn't block the loop
-
-            # Also send SMS if emergency_contact phone is available
-            phone = getattr(student, 'emergency_contact', '').strip()
-            if phone:
-                try:
-                    from announcements.sms_service import send_sms as at_send_sms
-                    at_send_sms([phone], message)
-                except Exception:
-                    pass  # SMS failure shouldn't block the loop
+                email_recipients.append(Recipient(
+                    user.email,
+                    {'head_name': head_name, 'message': message},
+                    user_id=user.pk,
+                ))
+
+            # Also queue SMS if emergency_contact phone is available
+            sms.add(getattr(student, 'emergency_contact', ''), message)
+
+        if email_recipients:
+            BulkMailer(
+                subject='Fee Reminder: {{ head_name }}',
+                text_template='{{ message }}',
+            ).send_async(email_recipients, record_source='fee_reminder')
+        sms.send_async()
 
         messages.success(
             request,
@@ -590,6 +591,7 @@ def bulk_assign_fees(request):
                         ))
 
             StudentFee.objects.bulk_create(new_fees)
+            mark_stale('fees', 'all')
             assigned = len(new_fees)
             skipped = (len(structures_map) * students_in_class.count()) - assigned
 
@@ -613,13 +615,8 @@ def bulk_assign_fees(request):
 @login_required
 def payment_receipt_pdf(request, payment_id):
     """Download a payment receipt as a PDF using ReportLab."""
-    from io import BytesIO
-    from reportlab.lib.pagesizes import A5
-    from reportlab.lib import colors
-    from reportlab.lib.units import cm
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, HRFlowable
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+    from accounts.documents import document_response
+    from finance.documents import receipt_payload
 
     payment = get_object_or_404(Payment, id=payment_id)
     if request.user.user_type not in ['admin', 'teacher']:
@@ -639,57 +636,9 @@ def payment_receipt_pdf(request, payment_id):
             messages.error(request, 'Access denied.')
             return redirect('dashboard')
 
-    buf = BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=A5, leftMargin=1.5*cm, rightMargin=1.5*cm,
-                            topMargin=1.2*cm, bottomMargin=1.2*cm)
-    styles = getSampleStyleSheet()
-    BLUE   = colors.HexColor('#1d4ed8')
-    GREEN  = colors.HexColor('#059669')
-    LIGHT  = colors.HexColor('#eff6ff')
-    BORDER = colors.HexColor('#d1d5db')
-
-    ctr  = ParagraphStyle('c', parent=styles['Normal'], fontSize=11, alignment=TA_CENTER, fontName='Helvetica-Bold')
-    sub  = ParagraphStyle('s', parent=styles['Normal'], fontSize=8,  alignment=TA_CENTER, textColor=colors.HexColor('#555555'))
-    body = ParagraphStyle('b', parent=styles['Normal'], fontSize=9)
-
-    story = []
-    sf = payment.student_fee
-    student = sf.student
-
-    story.append(Paragraph('PAYMENT RECEIPT', ctr))
-    story.append(Spacer(1, 6))
-    story.append(HRFlowable(width='100%', thickness=2, color=BLUE, spaceAfter=8))
-
-    data = [
-        ['Receipt No.:', f'RCT-{payment.id:05d}', 'Date:', payment.date.strftime('%d %b %Y')],
-        ['Student:', student.user.get_full_name(), 'Class:', student.current_class.name if student.current_class else 'N/A'],
-        ['Fee Item:', sf.fee_structure.head.name, 'Term:', sf.fee_structure.term.title()],
-        ['Amount Paid:', f'₵{payment.amount:.2f}', 'Balance After:', f'₵{sf.balance:.2f}'],
-        ['Payment Status:', sf.get_status_display(), 'Method:', payment.method],
-
-    ]
-    table = Table(data, colWidths=[3*cm, 4.5*cm, 2.5*cm, 4*cm])
-    table.setStyle(TableStyle([
-        ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
-        ('FONTSIZE', (0,0), (-1,-1), 8.5),
-        ('FONTNAME', (0,0), (0,-1), 'Helvetica-Bold'),
-        ('FONTNAME', (2,0), (2,-1), 'Helvetica-Bold'),
-        ('BACKGROUND', (0,0), (-1,-1), LIGHT),
-        ('GRID', (0,0), (-1,-1), 0.4, BORDER),
-        ('TOPPADDING', (0,0), (-1,-1), 4),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-    ]))
-    story.append(table)
-    story.append(Spacer(1, 14))
-    story.append(HRFlowable(width='100%', thickness=0.5, color=BORDER, spaceAfter=4))
-    story.append(Paragraph('Thank you for your payment. Keep this receipt for your records.', sub))
-
-    doc.build(story)
-    buf.seek(0)
+    student = payment.student_fee.student
     fname = f"receipt_{student.user.last_name}_{payment.id}.pdf".replace(' ', '_')
-    response = HttpResponse(buf, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{fname}"'
-    return response
+    return document_response(request, 'finance.documents.receipt_pdf', receipt_payload(payment), fname)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -837,53 +786,39 @@ def paystack_callback(request):
 
 @csrf_exempt
 def paystack_webhook(request):
-    """Receive Paystack charge.success webhook and auto-record the payment."""
-    import hmac
-    import hashlib
-    import json as _json
-
-    if request.method != 'POST':
-        return HttpResponse(status=405)
-
-    secret_key = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
-    signature  = request.META.get('HTTP_X_PAYSTACK_SIGNATURE', '')
-    body       = request.body
-
-    # Verify HMAC-SHA512 signature
-    expected = hmac.new(secret_key.encode(), body, hashlib.sha512).hexdigest()
-    if not hmac.compare_digest(expected, signature):
-        return HttpResponse(status=400)
+    """Receive Paystack charge.success webhooks; payments are recorded by ``handle_paystack_event``."""
+    from tenants import webhooks
+    return webhooks.receive(request, 'finance')
+
+
+def handle_paystack_event(data):
+    """Webhook handler (tenants.webhooks): auto-record a fee payment."""
+    from tenants.webhooks import Ignore
+
+    reference = data.get('reference', '')
+    fee_id    = (data.get('metadata') or {}).get('fee_id')
+    if not (fee_id and reference):
+        raise Ignore('not a fee payment')
+
+    fee = StudentFee.objects.filter(id=fee_id).first()
+    if not fee:
+        return f'fee {fee_id} not found'
+    amount_paid = Decimal(str(data['amount'])) / 100
+    _, created = Payment.objects.get_or_create(
+        reference=reference,
+        defaults={
+            'student_fee': fee,
+            'amount': amount_paid,
+            'method': 'Bank Transfer',
+            'remarks': 'Auto-recorded via Paystack webhook',
+        },
+    )
+    return 'recorded' if created else 'already recorded'
 
-    try:
-        payload = _json.loads(body)
-    except (ValueError, _json.JSONDecodeError):
-        logger.warning('Paystack webhook: invalid JSON payload')
-        return HttpResponse(status=400)
 
-    if payload.get('event') != 'charge.success':
-        return HttpResponse(status=200)
-
-    trx       = payload['data']
-    reference = trx.get('reference', '')
-    meta      = trx.get('metadata', {})
-    fee_id    = meta.get('fee_id')
-
-    if fee_id and reference:
-        fee = StudentFee.objects.filter(id=fee_id).first()
-        if fee:
-            from decimal import Decimal
-            amount_paid = Decimal(str(trx['amount'])) / 100
-            Payment.objects.get_or_create(
-                reference=reference,
-                defaults={
-                    'student_fee': fee,
-                    'amount': amount_paid,
-                    'method': 'Bank Transfer',
-                    'remarks': 'Auto-recorded via Paystack webhook',
-                },
-            )
-
-    return HttpResponse(status=200)
+def paystack_references(references):
+    """Webhook reconciler: which of ``references`` have a recorded payment."""
+    return Payment.objects.filter(reference__in=references).values_list('reference', flat=True)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -905,19 +840,16 @@ def send_sms_fee_reminders(request):
     )
 
     if request.method == 'POST':
-        from announcements.sms_service import send_fee_sms_reminder
-        sent = failed = skipped = 0
+        from announcements.sms_dispatch import SMSDispatcher
+        from announcements.sms_service import fee_sms_text
+        sms = SMSDispatcher(sent_by=request.user)
+        skipped = 0
         for fee in pending_fees:
             student = fee.student
-            phone = getattr(student, 'emergency_contact', '').strip()
-            if not phone:
+            if not sms.add(getattr(student, 'emergency_contact', ''), fee_sms_text(student, fee)):
                 skipped += 1
-                continue
-            result = send_fee_sms_reminder(student, fee)
-            if result.get('sent'):
-                sent += 1
-            else:
-                failed += 1
+        result = sms.send()
+        sent, failed = result.sent, result.failed
 
         messages.success(
             request,
@@ -0,0 +1,166 @@
+"""
+Homework deadline reminders.
+
+``evaluate_deadline_reminders`` walked every active ``ReminderSetting`` and
+every matching homework, loaded the class, then ran a ``ReminderLog``
+``exists()``, one insert per channel and a parent query for each pending
+student — and only when someone pressed the button.
+
+  * ``evaluate(days)`` matches every active setting against homework due
+    ``days_before`` after each of ``days``.  Classes, submissions and
+    parents are loaded in one query each.
+  * One key per setting, homework and student is claimed
+    (``tenants.scheduler.claim``), so a reminder goes out once however
+    often — or however concurrently — it runs.  Reminders already in
+    ``ReminderLog`` are skipped too.
+  * In-app notifications are inserted with one ``bulk_create``.  Emails go
+    through one ``BulkMailer`` batch and texts through one
+    ``SMSDispatcher`` batch.
+  * ``send_due(since, until)`` is the scheduled job: every day in the
+    window since its last run, for homework not yet due.
+
+Usage::
+
+    from homework import reminders
+
+    results = reminders.evaluate([timezone.localdate()], sent_by=request.user)
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+
+class Outbox:
+    """Reminders collected during one evaluation: ``save()`` the in-app ones, ``deliver()`` the rest."""
+
+    def __init__(self, sent_by=None):
+        from announcements.sms_dispatch import SMSDispatcher
+
+        self.notifications = []
+        self.emails = []
+        self.sms = SMSDispatcher(sent_by=sent_by)
+
+    def add(self, user, message, channel, homework):
+        from announcements.models import Notification
+        from communication.bulk_mail import Recipient
+
+        channels = ['in_app', 'email', 'sms'] if channel == 'all' else [channel]
+        if 'in_app' in channels:
+            self.notifications.append(Notification(recipient=user, message=message[:255], alert_type='general'))
+        if 'email' in channels and user.email:
+            self.emails.append(Recipient(user.email, {'title': homework.title, 'message': message}, user_id=user.pk))
+        if 'sms' in channels:
+            phone = getattr(user, 'phone', '') or ''
+            if phone:
+                self.sms.add(phone if phone.startswith('+') else f'+233{phone.lstrip("0")}', message)
+
+    def save(self):
+        from announcements.models import Notification
+        Notification.objects.bulk_create(self.notifications)
+
+    def deliver(self, background=False):
+        """Send the emails and texts (from a background thread if asked)."""
+        from communication.bulk_mail import BulkMailer
+
+        if self.emails:
+            mailer = BulkMailer(subject='Homework Reminder: {{ title }}', text_template='{{ message }}')
+            if background:
+                mailer.send_async(self.emails, record_source='homework_reminder')
+            else:
+                mailer.send(self.emails, record_source='homework_reminder')
+        if background:
+            self.sms.send_async()
+        else:
+            self.sms.send()
+
+
+def message(homework, days_before):
+    days_txt = (
+        'is due TODAY' if days_before == 0
+        else f'is due in {days_before} day{"s" if days_before != 1 else ""}'
+    )
+    return (
+        f'📚 Reminder: "{homework.title}" ({homework.subject or "General"}) {days_txt} '
+        f'({homework.due_date.strftime("%b %d")}). Please submit before the deadline!'
+    )
+
+
+def evaluate(days, sent_by=None, background=False):
+    """Send the reminders every active setting calls for on each of ``days``.
+
+    Returns ``[{'setting', 'students_matched', 'reminders_sent'}]`` per setting.
+    """
+    from homework.models import Homework, ReminderLog, ReminderSetting, Submission
+    from parents.models import Parent
+    from students.models import Student
+    from tenants import scheduler
+
+    days = sorted(set(days))
+    today = timezone.localdate()
+    active = list(ReminderSetting.objects.filter(is_active=True))
+    wanted = {d + timedelta(days=s.days_before) for s in active for d in days}
+    homework = list(
+        Homework.objects.filter(due_date__in=wanted, due_date__gte=today)
+        .select_related('subject')
+    )
+    students = defaultdict(list)
+    for student in (Student.objects.filter(current_class__in={hw.target_class_id for hw in homework})
+                    .select_related('user')):
+        students[student.current_class_id].append(student)
+    submitted = set(Submission.objects.filter(homework__in=homework).values_list('homework_id', 'student_id'))
+    logged = set(ReminderLog.objects.filter(homework__in=homework).values_list('setting_id', 'homework_id', 'student_id'))
+
+    # (setting, homework, student) still owed a reminder, by claim key
+    owed, matched = {}, defaultdict(int)
+    for setting in active:
+        due_dates = {d + timedelta(days=setting.days_before) for d in days}
+        for hw in homework:
+            if hw.due_date not in due_dates:
+                continue
+            for student in students[hw.target_class_id]:
+                if (hw.pk, student.pk) in submitted:
+                    continue
+                matched[setting.pk] += 1
+                if (setting.pk, hw.pk, student.pk) not in logged:
+                    owed[f'hw:{setting.pk}:{hw.pk}:{student.pk}'] = (setting, hw, student)
+
+    parents = defaultdict(list)
+    notify = {student.pk for setting, _, student in owed.values() if setting.notify_parents}
+    if notify:
+        for link in Parent.children.through.objects.filter(student_id__in=notify).select_related('parent__user'):
+            parents[link.student_id].append(link.parent.user)
+
+    outbox = Outbox(sent_by)
+    sent = defaultdict(int)
+    with transaction.atomic():
+        won = scheduler.claim(owed, scheduler.new_run())
+        logs = []
+        for key in won:
+            setting, hw, student = owed[key]
+            text = message(hw, setting.days_before)
+            outbox.add(student.user, text, setting.channel, hw)
+            if setting.notify_parents:
+                for parent in parents[student.pk]:
+                    outbox.add(parent, text, setting.channel, hw)
+            logs.append(ReminderLog(setting=setting, homework=hw, student=student, channel=setting.channel))
+            sent[setting.pk] += 1
+        ReminderLog.objects.bulk_create(logs, ignore_conflicts=True)
+        outbox.save()
+    outbox.deliver(background=background)
+
+    return [
+        {'setting': s.name, 'students_matched': matched[s.pk], 'reminders_sent': sent[s.pk]}
+        for s in active
+    ]
+
+
+def send_due(since, until):
+    """Scheduled job: evaluate every day in ``(since, until]`` (just today the first time)."""
+    last = timezone.localdate(until)
+    first = timezone.localdate(since) + timedelta(days=1) if since else last
+    days = [first + timedelta(days=n) for n in range((last - first).days + 1)]
+    if not days:
+        return 0
+    return sum(r['reminders_sent'] for r in evaluate(days))
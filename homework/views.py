@@ -1,20 +1,20 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponseForbidden, HttpResponse, JsonResponse
+from django.http import HttpResponseForbidden, JsonResponse
 from django.utils import timezone
 from django.conf import settings
 from django.db.models import Sum
 import json
 import re
 import math
-import csv
 from decimal import Decimal
 from .models import Homework, Question, Choice, Submission, Answer, ReminderSetting, ReminderLog
 from .forms import HomeworkForm
 from teachers.models import Teacher
 from students.models import Student, Grade
 from academics.models import AcademicYear
+from accounts.exports import chunk_size, export_response, full_name
 from academics.ai_tutor import (
     _get_openai_api_key,
     _post_chat_completion,
@@ -689,17 +689,14 @@ def homework_solve(request, pk):
                 _pct = float(total_score) / float(_hw_total_points) * 100
                 if _pct >= 50:
                     _xp_amount = max(5, min(25, int(_pct / 4)))  # 12–25 XP range
-                    from academics.gamification_models import StudentXP, check_and_unlock_achievements
+                    from academics.gamification import award
                     from announcements.models import Notification
-                    _xp_profile, _ = StudentXP.objects.get_or_create(student=student)
-                    _leveled_up = _xp_profile.add_xp(_xp_amount)
-                    _xp_profile.update_streak()
                     _extra = ['homework-ace'] if _pct >= 90 else []
-                    check_and_unlock_achievements(student, _xp_profile, extra_slugs=_extra)
-                    if _leveled_up:
+                    _xp_award = award(student, _xp_amount, extra_slugs=_extra)
+                    if _xp_award.leveled_up:
                         Notification.objects.create(
                             recipient=student.user,
-                            message=f'⭐ Level Up! You reached Level {_xp_profile.level} — keep it up!',
+                            message=f'⭐ Level Up! You reached Level {_xp_award.level} — keep it up!',
                             alert_type='general',
                             link='../../students/padi-portfolio/',
                         )
@@ -919,26 +916,27 @@ def homework_export_csv(request, pk):
         return redirect('homework:homework_class_results', pk=pk)
 
     total_points = homework.questions.aggregate(total=Sum('points'))['total'] or 0
-    submissions = Submission.objects.filter(homework=homework).select_related('student__user')
-
-    response = HttpResponse(content_type='text/csv')
-    safe_title = re.sub(r'[^\w\s-]', '', homework.title)[:40].strip().replace(' ', '_')
-    response['Content-Disposition'] = f'attachment; filename="results_{safe_title}.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(['Student Name', 'Admission No', 'Score', 'Total Points', 'Percentage', 'Grade', 'Submitted At'])
-
-    rows = []
-    for sub in submissions:
-        pct = round(float(sub.score) / float(total_points) * 100, 1) if total_points > 0 else 0
-        grade_letter = 'A' if pct >= 80 else 'B' if pct >= 70 else 'C' if pct >= 60 else 'D' if pct >= 50 else 'F'
-        rows.append((sub.student.user.get_full_name(), getattr(sub.student, 'admission_number', ''), sub.score, total_points, pct, grade_letter, sub.submitted_at.strftime('%Y-%m-%d %H:%M')))
+    # Percentage is monotonic in score, so the ranking is done in SQL.
+    submissions = (
+        Submission.objects.filter(homework=homework)
+        .order_by('-score')
+        .values_list('student__user__first_name', 'student__user__last_name',
+                     'student__admission_number', 'score', 'submitted_at')
+    )
 
-    rows.sort(key=lambda r: r[4], reverse=True)
-    for row in rows:
-        writer.writerow(row)
+    def rows():
+        for first, last, admission, score, submitted_at in submissions.iterator(chunk_size=chunk_size()):
+            pct = round(float(score) / float(total_points) * 100, 1) if total_points > 0 else 0
+            grade_letter = 'A' if pct >= 80 else 'B' if pct >= 70 else 'C' if pct >= 60 else 'D' if pct >= 50 else 'F'
+            yield (full_name(first, last), admission or '', score, total_points, pct, grade_letter,
+                   submitted_at.strftime('%Y-%m-%d %H:%M'))
 
-    return response
+    safe_title = re.sub(r'[^\w\s-]', '', homework.title)[:40].strip().replace(' ', '_')
+    return export_response(
+        request, f'results_{safe_title}',
+        ['Student Name', 'Admission No', 'Score', 'Total Points', 'Percentage', 'Grade', 'Submitted At'],
+        rows, count=submissions.count(),
+    )
 
 
 # ──────────────────────────────────────────────────────────
@@ -1032,114 +1030,7 @@ def evaluate_deadline_reminders(request):
     if request.method != 'POST':
         return JsonResponse({'ok': False, 'error': 'POST required'}, status=405)
 
-    active_settings = ReminderSetting.objects.filter(is_active=True)
-    today = timezone.localdate()
-    results = []
-
-    for setting in active_settings:
-        target_date = today + timezone.timedelta(days=setting.days_before)
-        # Also include homework due today (days_before=0)
-        upcoming_hw = Homework.objects.filter(due_date=target_date).select_related(
-            'target_class', 'subject', 'teacher__user',
-        )
-
-        hw_sent = 0
-        hw_matched = 0
-
-        for hw in upcoming_hw:
-            # Students in the target class who haven't submitted
-            all_students = Student.objects.filter(
-                current_class=hw.target_class,
-            ).select_related('user')
-            submitted_ids = set(
-                Submission.objects.filter(homework=hw).values_list('student_id', flat=True)
-            )
-            pending = [s for s in all_students if s.pk not in submitted_ids]
-            hw_matched += len(pending)
-
-            for student in pending:
-                # Check dedup
-                already_sent = ReminderLog.objects.filter(
-                    setting=setting, homework=hw, student=student,
-                ).exists()
-                if already_sent:
-                    continue
-
-                # Build message
-                days_txt = (
-                    'is due TODAY' if setting.days_before == 0
-                    else f'is due in {setting.days_before} day{"s" if setting.days_before != 1 else ""}'
-                )
-                msg = f'📚 Reminder: "{hw.title}" ({hw.subject or "General"}) {days_txt} ({hw.due_date.strftime("%b %d")}). Please submit before the deadline!'
-
-                # Send to student
-                _send_reminder(student.user, msg, setting.channel, hw)
-
-                # Send to parents
-                if setting.notify_parents:
-                    _send_parent_reminders(student, msg, setting.channel)
-
-                # Log
-                ReminderLog.objects.create(
-                    setting=setting,
-                    homework=hw,
-                    student=student,
-                    channel=setting.channel,
-                )
-                hw_sent += 1
-
-        results.append({
-            'setting': setting.name,
-            'students_matched': hw_matched,
-            'reminders_sent': hw_sent,
-        })
+    from homework import reminders
 
+    results = reminders.evaluate([timezone.localdate()], sent_by=request.user, background=True)
     return JsonResponse({'ok': True, 'results': results})
-
-
-def _send_reminder(user, message, channel, homework):
-    """Dispatch a reminder to a single user via the specified channel(s)."""
-    from announcements.models import Notification
-    from django.core.mail import send_mail as django_send_mail
-
-    channels = ['in_app', 'email', 'sms'] if channel == 'all' else [channel]
-
-    for ch in channels:
-        if ch == 'in_app':
-            Notification.objects.create(
-                recipient=user,
-                message=message[:255],
-                alert_type='general',
-            )
-        elif ch == 'email' and user.email:
-            try:
-                django_send_mail(
-                    subject=f'Homework Reminder: {homework.title}',
-                    message=message,
-                    from_email=None,
-                    recipient_list=[user.email],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
-        elif ch == 'sms':
-            phone = getattr(user, 'phone', '') or ''
-            if phone:
-                try:
-                    from announcements.sms_service import send_sms as at_send_sms
-                    normalized = phone if phone.startswith('+') else f'+233{phone.lstrip("0")}'
-                    at_send_sms([normalized], message)
-                except Exception:
-                    pass
-
-
-def _send_parent_reminders(student, message, channel):
-    """Send the same reminder to all linked parents of a student."""
-    try:
-        from parents.models import Parent
-        parents = Parent.objects.filter(children=student).select_related('user')
-        for parent in parents:
-            _send_reminder(parent.user, message, channel, None)
-    except Exception:
-        pass
-
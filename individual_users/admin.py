@@ -6,11 +6,12 @@ from individual_users.models import (
     ToolQuestion, ToolExamPaper, ToolLessonPlan,
     ToolPresentation, ToolSlide,
     AITutorConversation, AITutorMessage,
-    LicensureQuestion, LicensureQuizAttempt, LicensureAnswer,
+    LicensureQuestion, LicensureBankQuestion, LicensureBankOverlay, LicensureQuizAttempt, LicensureAnswer,
     GESLetter,
     MarkingSession, StudentMark,
     ReportCardSet, ReportCardEntry,
     CompuThinkActivity, LiteracyExercise, CitizenEdActivity, TVETProject,
+    AICachedResponse,
 )
 
 
@@ -41,8 +42,8 @@ class AddonSubscriptionAdmin(admin.ModelAdmin):
 
 @admin.register(APIKey)
 class APIKeyAdmin(admin.ModelAdmin):
-    list_display = ('name', 'profile', 'prefix', 'is_active', 'calls_total', 'last_used_at')
-    list_filter = ('is_active',)
+    list_display = ('name', 'profile', 'prefix', 'is_active', 'tier', 'daily_quota', 'calls_today', 'calls_total', 'last_used_at')
+    list_filter = ('is_active', 'tier')
     search_fields = ('name', 'prefix', 'profile__user__username')
     readonly_fields = ('prefix', 'hashed_key', 'calls_today', 'calls_total')
 
@@ -182,12 +183,31 @@ class LicensureQuestionAdmin(admin.ModelAdmin):
         return obj.question_text[:80]
 
 
+@admin.register(LicensureBankQuestion)
+class LicensureBankQuestionAdmin(admin.ModelAdmin):
+    list_display = ('question_text_short', 'domain', 'topic', 'difficulty', 'correct_option', 'created_at')
+    list_filter = ('domain', 'difficulty', 'source')
+    search_fields = ('question_text', 'topic', 'content_hash')
+    readonly_fields = ('content_hash', 'random_bucket')
+
+    @admin.display(description='Question')
+    def question_text_short(self, obj):
+        return obj.question_text[:80]
+
+
+@admin.register(LicensureBankOverlay)
+class LicensureBankOverlayAdmin(admin.ModelAdmin):
+    list_display = ('profile', 'question', 'flagged', 'hidden', 'times_seen', 'times_correct', 'last_seen_at')
+    list_filter = ('flagged', 'hidden')
+    raw_id_fields = ('profile', 'question')
+
+
 class LicensureAnswerInline(admin.TabularInline):
     model = LicensureAnswer
     extra = 0
-    fields = ('question', 'selected_option', 'is_correct', 'time_spent_seconds')
+    fields = ('question', 'bank_question', 'selected_option', 'is_correct', 'time_spent_seconds')
     readonly_fields = ('is_correct',)
-    raw_id_fields = ('question',)
+    raw_id_fields = ('question', 'bank_question')
 
 
 @admin.register(LicensureQuizAttempt)
@@ -201,9 +221,9 @@ class LicensureQuizAttemptAdmin(admin.ModelAdmin):
 
 @admin.register(LicensureAnswer)
 class LicensureAnswerAdmin(admin.ModelAdmin):
-    list_display = ('attempt', 'question', 'selected_option', 'is_correct')
+    list_display = ('attempt', 'question', 'bank_question', 'selected_option', 'is_correct')
     list_filter = ('is_correct',)
-    raw_id_fields = ('attempt', 'question')
+    raw_id_fields = ('attempt', 'question', 'bank_question')
 
 
 # ── GES Letter Writer ────────────────────────────────────────────────────────
@@ -306,3 +326,12 @@ class TVETProjectAdmin(admin.ModelAdmin):
     list_filter = ('project_type', 'level', 'strand', 'ai_generated')
     search_fields = ('title', 'topic', 'profile__user__username')
     raw_id_fields = ('profile',)
+
+
+@admin.register(AICachedResponse)
+class AICachedResponseAdmin(admin.ModelAdmin):
+    list_display = ('tool', 'normalized_text', 'hit_count', 'created_at', 'last_hit_at')
+    list_filter = ('tool',)
+    search_fields = ('normalized_text',)
+    exclude = ('embedding',)
+    readonly_fields = ('tool', 'group_key', 'normalized_text', 'response', 'hit_count', 'created_at', 'last_hit_at')
@@ -1,16 +1,41 @@
 """Semantic cache for AI-generated content.
 
-Hashes (system_prompt, user_prompt, model, temperature) into a cache key.
+Two tiers:
+
+1. **Exact** — hashes (system_prompt, user_prompt, model, temperature) into a
+   cache key, with runs of whitespace collapsed first.  Uses Django's cache
+   framework (Redis in production, LocMemCache in dev).
+
+2. **Near-duplicate** — for generators that pass ``tool=``, the request is
+   split into *structured fields* (subject, class, difficulty …) and the
+   *free text* (usually the topic).  Fields are normalised and hashed into a
+   ``group_key`` that must match exactly; the free text is casefolded,
+   stripped of punctuation and stop words, and embedded with a deterministic
+   feature-hashing embedder (word unigrams + character trigrams, no network,
+   no model download).  The nearest ``AICachedResponse`` in the group is a
+   hit when its cosine similarity clears the tool's threshold — so
+   "Fractions  for beginners" and "beginners fractions" share one answer
+   while "B4" vs "B5" (a structured field) never do.
+
 On hit → return cached raw text (no API call, no credit cost).
-On miss → call OpenAI, strip markdown fences, cache, return.
+On miss → call OpenAI, strip markdown fences, cache both tiers, return.
+
+Hit-rate statistics per tool: ``cache_stats()``.
 
-Uses Django's cache framework (Redis in production, LocMemCache in dev).
+Settings:
+  AI_SEMANTIC_CACHE_THRESHOLDS  {tool: min cosine similarity}; tools not
+                                listed use the exact tier only.
 """
 import hashlib
 import json
 import logging
+import math
+import re
+import unicodedata
+from array import array
 
 from django.core.cache import cache
+from django.db import transaction
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +44,84 @@ logger = logging.getLogger(__name__)
 CACHE_TTL = 60 * 60 * 24 * 7  # 7 days
 
 _PREFIX = 'ai:'
+_STATS_PREFIX = 'ai_stats:'
+
+EMBEDDING_DIM = 256
+# Candidates compared per lookup (most recent first within the group).
+MAX_CANDIDATES = 200
+
+DEFAULT_THRESHOLDS = {
+    'lesson_plan': 0.90,
+    'quiz': 0.92,
+    'slides': 0.90,
+}
+
+_STOP_WORDS = frozenset(
+    'a an and are as at be by for from in into is it of on or the to with '
+    'about introduction intro lesson topic'.split()
+)
+_TOKEN_RE = re.compile(r'[^\w]+', re.UNICODE)
+_SPACE_RE = re.compile(r'\s+')
 
 
+# ── Normalisation & embedding ─────────────────────────────────
+
+def normalize_text(text: str) -> str:
+    """Casefold, strip punctuation and collapse whitespace."""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    return ' '.join(_TOKEN_RE.sub(' ', text).split())
+
+
+def normalize_fields(fields: dict) -> str:
+    """Stable, case- and whitespace-insensitive encoding of structured fields."""
+    return json.dumps(
+        {str(k): normalize_text(str(v)) for k, v in (fields or {}).items()},
+        sort_keys=True,
+        ensure_ascii=True,
+    )
+
+
+def _features(text: str):
+    for word in normalize_text(text).split():
+        if word in _STOP_WORDS:
+            continue
+        yield f'w:{word}', 1.0
+        padded = f'#{word}#'
+        for i in range(len(padded) - 2):
+            yield f'c:{padded[i:i + 3]}', 0.5
+
+
+def embed(text: str, dim: int = EMBEDDING_DIM):
+    """Deterministic L2-normalised feature-hashing embedding of ``text``."""
+    vec = [0.0] * dim
+    for feature, weight in _features(text):
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+        vec[h % dim] += weight if (h >> 63) & 1 else -weight
+    norm = math.sqrt(sum(v * v for v in vec))
+    return [v / norm for v in vec] if norm else vec
+
+
+def _pack(vec) -> bytes:
+    return array('f', vec).tobytes()
+
+
+def _unpack(blob) -> array:
+    vec = array('f')
+    vec.frombytes(bytes(blob))
+    return vec
+
+
+def cosine(a, b) -> float:
+    """Cosine similarity of two L2-normalised vectors."""
+    return sum(x * y for x, y in zip(a, b))
+
+
+# ── Keys ──────────────────────────────────────────────────────
+
 def _make_key(system: str, prompt: str, model: str, temperature: float) -> str:
     """Build a deterministic cache key from the full prompt signature."""
     blob = json.dumps(
-        [system, prompt, model, str(temperature)],
+        [_SPACE_RE.sub(' ', system).strip(), _SPACE_RE.sub(' ', prompt).strip(), model, str(temperature)],
         sort_keys=True,
         ensure_ascii=True,
     )
@@ -32,6 +129,89 @@ def _make_key(system: str, prompt: str, model: str, temperature: float) -> str:
     return f'{_PREFIX}{digest}'
 
 
+def _group_key(system: str, model: str, temperature: float, fields: dict) -> str:
+    blob = json.dumps(
+        [_SPACE_RE.sub(' ', system).strip(), model, str(temperature), normalize_fields(fields)],
+        ensure_ascii=True,
+    )
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _threshold(tool):
+    from django.conf import settings
+    thresholds = {**DEFAULT_THRESHOLDS, **getattr(settings, 'AI_SEMANTIC_CACHE_THRESHOLDS', {})}
+    return thresholds.get(tool) if tool else None
+
+
+# ── Statistics ────────────────────────────────────────────────
+
+def _record(tool, outcome):
+    key = f'{_STATS_PREFIX}{tool or "other"}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+    except Exception:
+        pass
+
+
+def cache_stats(tools=None):
+    """``{tool: {'exact': n, 'semantic': n, 'miss': n, 'hit_rate': 0-1}}``."""
+    tools = tools or sorted({*DEFAULT_THRESHOLDS, 'other'})
+    outcomes = ('exact', 'semantic', 'miss')
+    keys = [f'{_STATS_PREFIX}{t}:{o}' for t in tools for o in outcomes]
+    found = cache.get_many(keys)
+    stats = {}
+    for tool in tools:
+        row = {o: found.get(f'{_STATS_PREFIX}{tool}:{o}', 0) for o in outcomes}
+        total = sum(row.values())
+        row['hit_rate'] = round((row['exact'] + row['semantic']) / total, 3) if total else 0.0
+        stats[tool] = row
+    return stats
+
+
+# ── Semantic tier ─────────────────────────────────────────────
+
+def _semantic_lookup(tool, group_key, text, threshold):
+    """Return the best ``(AICachedResponse, similarity)`` above ``threshold``."""
+    from datetime import timedelta
+    from django.utils import timezone
+    from individual_users.models import AICachedResponse
+
+    query = embed(text)
+    cutoff = timezone.now() - timedelta(seconds=CACHE_TTL)
+    candidates = (
+        AICachedResponse.objects
+        .filter(tool=tool, group_key=group_key, created_at__gte=cutoff)
+        .order_by('-created_at')
+        .only('id', 'embedding', 'response')[:MAX_CANDIDATES]
+    )
+    best, best_sim = None, threshold
+    for row in candidates:
+        sim = cosine(query, _unpack(row.embedding))
+        if sim >= best_sim:
+            best, best_sim = row, sim
+    return (best, best_sim) if best else (None, 0.0)
+
+
+def _semantic_store(tool, group_key, text, raw_text):
+    from datetime import timedelta
+    from django.utils import timezone
+    from individual_users.models import AICachedResponse
+
+    AICachedResponse.objects.filter(
+        tool=tool, group_key=group_key,
+        created_at__lt=timezone.now() - timedelta(seconds=CACHE_TTL),
+    ).delete()
+    AICachedResponse.objects.create(
+        tool=tool,
+        group_key=group_key,
+        normalized_text=normalize_text(text),
+        embedding=_pack(embed(text)),
+        response=raw_text,
+    )
+
+
 def _strip_fences(text: str) -> str:
     """Remove markdown code fences from AI output."""
     if text.startswith('```'):
@@ -42,20 +222,55 @@ def _strip_fences(text: str) -> str:
 
 
 def get_cached(*, system: str, prompt: str, model: str = 'gpt-4o-mini',
-               temperature: float = 0.7):
-    """Check for a cached AI response. Returns raw_text or None."""
+               temperature: float = 0.7, tool: str = None, text: str = None,
+               fields: dict = None):
+    """Check for a cached AI response. Returns raw_text or None.
+
+    ``tool`` enables the near-duplicate tier: ``text`` is the free-text part
+    of the request (defaults to ``prompt``) and ``fields`` the structured
+    parameters that must match exactly.
+    """
     key = _make_key(system, prompt, model, temperature)
     hit = cache.get(key)
     if hit is not None:
         logger.info('AI cache HIT  %s', key)
-    return hit
+        _record(tool, 'exact')
+        return hit
+
+    threshold = _threshold(tool)
+    if threshold is not None:
+        try:
+            with transaction.atomic():
+                row, sim = _semantic_lookup(
+                    tool, _group_key(system, model, temperature, fields),
+                    text if text is not None else prompt, threshold,
+                )
+        except Exception:
+            logger.warning('AI semantic cache lookup failed', exc_info=True)
+            row = None
+        if row is not None:
+            from django.db.models import F
+            from django.utils import timezone
+            from individual_users.models import AICachedResponse
+            AICachedResponse.objects.filter(pk=row.pk).update(
+                hit_count=F('hit_count') + 1, last_hit_at=timezone.now(),
+            )
+            cache.set(key, row.response, CACHE_TTL)
+            logger.info('AI cache SEMANTIC HIT %s (%s, sim=%.3f)', key, tool, sim)
+            _record(tool, 'semantic')
+            return row.response
+
+    _record(tool, 'miss')
+    return None
 
 
 def call_and_cache(*, system: str, prompt: str, model: str = 'gpt-4o-mini',
-                   temperature: float = 0.7, max_tokens: int = 3000):
+                   temperature: float = 0.7, max_tokens: int = 3000,
+                   tool: str = None, text: str = None, fields: dict = None):
     """Call OpenAI, strip markdown fences, cache the result, and return raw text.
 
-    Raises on API / network errors (caller should handle).
+    With ``tool`` the response is also stored in the near-duplicate tier
+    (see ``get_cached``).  Raises on API / network errors (caller should handle).
     """
     import openai
     from django.conf import settings
@@ -81,4 +296,12 @@ def call_and_cache(*, system: str, prompt: str, model: str = 'gpt-4o-mini',
     cache.set(key, raw_text, CACHE_TTL)
     logger.info('AI cache MISS %s (stored)', key)
 
+    if _threshold(tool) is not None:
+        try:
+            with transaction.atomic():
+                _semantic_store(tool, _group_key(system, model, temperature, fields),
+                                text if text is not None else prompt, raw_text)
+        except Exception:
+            logger.warning('AI semantic cache store failed', exc_info=True)
+
     return raw_text
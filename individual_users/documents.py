@@ -0,0 +1,202 @@
+"""
+Renderers for individual-portal documents (accounts.documents): the B7
+weekly lesson plan as a PDF.
+"""
+import io
+from functools import lru_cache
+
+
+def lesson_plan_payload(plan):
+    """The B7 lesson plan fields, with the GES defaults filled in."""
+    b7 = plan.b7_meta or {}
+    subject = plan.get_subject_display()
+    return {
+        'title': plan.title,
+        'target_class': plan.target_class or '',
+        'date': plan.created_at.strftime('%d/%m/%Y') if plan.created_at else '',
+        'period': b7.get('period', '1'),
+        'duration': plan.duration_minutes,
+        'strand': b7.get('strand', plan.topic or ''),
+        'class_size': b7.get('class_size', ''),
+        'subject': subject,
+        'sub_strand': plan.sub_strand or plan.topic or '',
+        'objectives': plan.objectives or '',
+        'indicator': b7.get('indicator', plan.indicator or 'See Content Standard'),
+        'lesson_of': b7.get('lesson_of', '1 of 3'),
+        'perf_indicator': b7.get('perf_indicator', b7.get('performance_indicator', '')),
+        'core_competencies': b7.get('core_competencies', 'CP 5.1, CC 8.1'),
+        'references': b7.get('references', f'National {subject} Curriculum'),
+        'keywords': b7.get('keywords', plan.topic or ''),
+        'materials': plan.materials or '',
+        'introduction': plan.introduction or '',
+        'development': plan.development or '',
+        'assessment': plan.assessment or '',
+        'notes': plan.notes or '',
+        'closure': plan.closure or '',
+    }
+
+
+def _esc(text):
+    return (str(text).replace('&', '&amp;').replace('<', '&lt;')
+            .replace('>', '&gt;').replace('\n', '<br/>'))
+
+
+@lru_cache(maxsize=1)
+def _b7_styles():
+    from reportlab.lib.colors import black
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+    s = {}
+    s['title'] = ParagraphStyle('B7Title', parent=styles['Title'], fontSize=13,
+        fontName='Times-Bold', alignment=TA_CENTER, spaceAfter=2, textColor=black)
+    s['sub'] = ParagraphStyle('B7Sub', parent=styles['Normal'], fontSize=11,
+        fontName='Times-Bold', alignment=TA_CENTER, spaceAfter=6, textColor=black)
+    s['cell'] = ParagraphStyle('Cell', parent=styles['Normal'], fontSize=10,
+        fontName='Times-Roman', leading=13, spaceAfter=0, spaceBefore=0)
+    s['cell_b'] = ParagraphStyle('CellB', parent=s['cell'], fontName='Times-Bold')
+    s['hdr'] = ParagraphStyle('Hdr', parent=s['cell'], fontName='Times-Bold', fontSize=10)
+    s['phase'] = ParagraphStyle('Phase', parent=s['cell'], fontName='Times-Bold', fontSize=10)
+    return s
+
+
+def lesson_plan_pdf(payload, progress):
+    """B7 weekly lesson plan: metadata, curriculum standards and three-phase tables."""
+    from reportlab.lib.colors import HexColor, black
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    p = payload
+    s = _b7_styles()
+    s_cell, s_cell_b, s_hdr, s_phase = s['cell'], s['cell_b'], s['hdr'], s['phase']
+
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buf, pagesize=A4,
+        topMargin=1.2 * cm, bottomMargin=1.2 * cm,
+        leftMargin=1.5 * cm, rightMargin=1.5 * cm,
+    )
+    avail_w = A4[0] - 3 * cm
+    header_bg = HexColor('#faeadd')
+
+    story = []
+    story.append(Paragraph(
+        f'WEEKLY LESSON PLAN &ndash; {_esc(p["target_class"] or "Class")}', s['title']))
+    story.append(Paragraph(_esc(p['title']), s['sub']))
+
+    # ── Table 1: Metadata ──
+    meta_data = [
+        [Paragraph('<b>Date:</b>', s_cell_b), Paragraph(p['date'], s_cell),
+         Paragraph('<b>Period:</b>', s_cell_b), Paragraph(_esc(p['period']), s_cell)],
+        [Paragraph('<b>Duration:</b>', s_cell_b), Paragraph(f'{p["duration"]} Mins', s_cell),
+         Paragraph('<b>Strand:</b>', s_cell_b), Paragraph(_esc(p['strand']), s_cell)],
+        [Paragraph('<b>Class:</b>', s_cell_b), Paragraph(_esc(p['target_class']), s_cell),
+         Paragraph('<b>Class Size:</b>', s_cell_b), Paragraph(_esc(p['class_size']), s_cell)],
+        [Paragraph('<b>Subject:</b>', s_cell_b), Paragraph(_esc(p['subject']), s_cell),
+         Paragraph('<b>Sub Strand:</b>', s_cell_b), Paragraph(_esc(p['sub_strand']), s_cell)],
+    ]
+    cw = [avail_w * 0.15, avail_w * 0.35, avail_w * 0.15, avail_w * 0.35]
+    meta_table = Table(meta_data, colWidths=cw)
+    meta_style = [
+        ('BOX', (0, 0), (-1, -1), 1, black),
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, black),
+        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 5),
+    ]
+    for r in range(4):
+        meta_style.append(('BACKGROUND', (0, r), (0, r), header_bg))
+        meta_style.append(('BACKGROUND', (2, r), (2, r), header_bg))
+    meta_table.setStyle(TableStyle(meta_style))
+    story.append(meta_table)
+
+    # ── Table 2: Curriculum Standards ──
+    cur_data = [
+        [Paragraph('<b>Content Standard:</b>', s_hdr),
+         Paragraph('<b>Indicator:</b>', s_hdr),
+         Paragraph('<b>Lesson:</b>', s_hdr)],
+        [Paragraph(_esc(p['objectives']), s_cell),
+         Paragraph(_esc(p['indicator']), s_cell),
+         Paragraph(_esc(p['lesson_of']), s_cell)],
+        [Paragraph('<b>Performance Indicator:</b>', s_hdr),
+         '', Paragraph('<b>Core Competencies:</b>', s_hdr)],
+        [Paragraph(_esc(p['perf_indicator']), s_cell),
+         '', Paragraph(_esc(p['core_competencies']), s_cell)],
+        [Paragraph(f'<b>References:</b> {_esc(p["references"])}', s_cell), '', ''],
+        [Paragraph(f'<b>Keywords:</b> {_esc(p["keywords"])}', s_cell), '', ''],
+    ]
+    cur_table = Table(cur_data, colWidths=[avail_w * 0.50, avail_w * 0.30, avail_w * 0.20])
+    cur_table.setStyle(TableStyle([
+        ('BOX', (0, 0), (-1, -1), 1, black),
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, black),
+        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 5),
+        ('BACKGROUND', (0, 0), (-1, 0), header_bg),
+        ('BACKGROUND', (0, 2), (0, 2), header_bg),
+        ('BACKGROUND', (2, 2), (2, 2), header_bg),
+        ('SPAN', (0, 2), (1, 2)),  # Perf Indicator header spans 2 cols
+        ('SPAN', (0, 3), (1, 3)),  # Perf Indicator value spans 2 cols
+        ('SPAN', (0, 4), (2, 4)),  # References full width
+        ('SPAN', (0, 5), (2, 5)),  # Keywords full width
+        ('BACKGROUND', (0, 4), (0, 4), header_bg),
+        ('BACKGROUND', (0, 5), (0, 5), header_bg),
+    ]))
+    story.append(Spacer(1, -1))
+    story.append(cur_table)
+
+    # ── Table 3: Three-Phase Pedagogy ──
+    # Each phase is its own table so long content can split across pages.
+    cw3 = [avail_w * 0.20, avail_w * 0.50, avail_w * 0.30]
+    ped_hdr = Table(
+        [[Paragraph('<b>Phase / Duration</b>', s_hdr),
+          Paragraph('<b>Learner Activities</b>', s_hdr),
+          Paragraph('<b>Resources</b>', s_hdr)]],
+        colWidths=cw3,
+    )
+    ped_hdr.setStyle(TableStyle([
+        ('BOX', (0, 0), (-1, -1), 1, black),
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, black),
+        ('BACKGROUND', (0, 0), (-1, 0), header_bg),
+        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 5),
+    ]))
+    phase_style = TableStyle([
+        ('BOX', (0, 0), (-1, -1), 1, black),
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, black),
+        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 5),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ])
+    phases = (
+        ('PHASE 1: STARTER', '10 Mins', _esc(p['introduction']), _esc(p['materials'])),
+        ('PHASE 2: NEW LEARNING', '40 Mins',
+         f'{_esc(p["development"])}<br/><br/><b>Assessment:</b><br/>{_esc(p["assessment"])}', ''),
+        ('PHASE 3: REFLECTION', '10 Mins',
+         f'{_esc(p["notes"])}<br/><br/><b>Homework:</b><br/>{_esc(p["closure"])}', ''),
+    )
+
+    story.append(Spacer(1, 2))
+    story.append(ped_hdr)
+    for name, minutes, activities, resources in phases:
+        phase = Table(
+            [[Paragraph(f'<b>{name}</b><br/><font size="8">({minutes})</font>', s_phase),
+              Paragraph(activities, s_cell),
+              Paragraph(resources, s_cell)]],
+            colWidths=cw3,
+        )
+        phase.setStyle(phase_style)
+        story.append(Spacer(1, -1))
+        story.append(phase)
+
+    doc.build(story)
+    return buf.getvalue()
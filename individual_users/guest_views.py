@@ -554,9 +554,15 @@ def guest_generate(request):
 
     try:
         # Check cache first to avoid unnecessary API calls
-        raw = get_cached(system=system_prompt, prompt=user_prompt)
+        semantic = {
+            'tool': 'lesson_plan',
+            'text': topic or sub_strand,
+            'fields': {'subject': subject, 'class': target_class, 'indicator': indicator,
+                       'sub_strand': sub_strand},
+        }
+        raw = get_cached(system=system_prompt, prompt=user_prompt, **semantic)
         if raw is None:
-            raw = call_and_cache(system=system_prompt, prompt=user_prompt)
+            raw = call_and_cache(system=system_prompt, prompt=user_prompt, **semantic)
         # Parse JSON from the AI response
         text = raw.strip()
         if text.startswith('```'):
@@ -707,9 +713,10 @@ def guest_demo_questions(request):
     )
 
     try:
-        raw = get_cached(system=system_prompt, prompt=user_prompt)
+        semantic = {'tool': 'quiz', 'text': topic, 'fields': {'subject': subject, 'class': target_class}}
+        raw = get_cached(system=system_prompt, prompt=user_prompt, **semantic)
         if raw is None:
-            raw = call_and_cache(system=system_prompt, prompt=user_prompt)
+            raw = call_and_cache(system=system_prompt, prompt=user_prompt, **semantic)
         text = raw.strip()
         if text.startswith('```'):
             text = text.split('\n', 1)[-1].rsplit('```', 1)[0].strip()
@@ -764,9 +771,10 @@ def guest_demo_slides(request):
     )
 
     try:
-        raw = get_cached(system=system_prompt, prompt=user_prompt)
+        semantic = {'tool': 'slides', 'text': topic, 'fields': {'subject': subject, 'class': target_class}}
+        raw = get_cached(system=system_prompt, prompt=user_prompt, **semantic)
         if raw is None:
-            raw = call_and_cache(system=system_prompt, prompt=user_prompt)
+            raw = call_and_cache(system=system_prompt, prompt=user_prompt, **semantic)
         text = raw.strip()
         if text.startswith('```'):
             text = text.split('\n', 1)[-1].rsplit('```', 1)[0].strip()
@@ -0,0 +1,185 @@
+"""
+Shared GTLE question bank, per-teacher overlays and random-bucket sampling.
+
+"Load practice bank" used to copy every question of ``gtle_question_bank.py``
+into ``LicensureQuestion`` rows for the teacher who clicked it — the same 80
+questions stored once per teacher — and every quiz start picked its
+questions with ``ORDER BY random()``, sorting the teacher's whole pool.
+
+  * **One canonical copy**: ``LicensureBankQuestion`` holds each bank
+    question once, keyed by ``content_hash`` (normalised question, options
+    and answer), so ``sync_bank()`` is idempotent and re-running it after the
+    bank file changes only inserts what is new.
+  * **Overlays**: a teacher's flags, hidden questions, wording edits and
+    seen/correct counters live in a small ``LicensureBankOverlay`` row that
+    exists only for questions they have touched.  ``apply_overlays()``
+    layers the edits onto the shared rows for display and marking.
+  * **Sampling**: every question carries a ``random_bucket``.  A draw seeks
+    to a random bucket on the ``(…, domain, random_bucket)`` index and reads
+    forward (wrapping around), so its cost depends on the number of
+    questions asked for, not the size of the pool.  ``stratified_sample()``
+    splits the draws over domains — and over the shared and own pools — in
+    proportion to their size, so a 20-question mock exam mirrors the bank.
+
+Usage::
+
+    from individual_users import licensure_bank
+
+    picks = licensure_bank.stratified_sample(licensure_bank.pools(profile), 20)
+    licensure_bank.apply_overlays(profile, [ans.bank_question for ans in answers])
+"""
+import hashlib
+import random
+import re
+
+from django.db.models import Count, F
+
+# Fields a teacher may reword on their view of a shared question.
+EDITABLE_FIELDS = (
+    'topic', 'question_text', 'option_a', 'option_b', 'option_c', 'option_d',
+    'correct_option', 'explanation',
+)
+_HASHED_FIELDS = ('question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_option')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def content_hash(item):
+    """Stable identity of a question dict/object: its wording, options and answer."""
+    def get(field):
+        value = item.get(field, '') if isinstance(item, dict) else getattr(item, field, '')
+        return _SPACE_RE.sub(' ', str(value or '')).strip().casefold()
+    return hashlib.sha1('\x1f'.join(get(f) for f in _HASHED_FIELDS).encode()).hexdigest()
+
+
+# ── Shared bank ────────────────────────────────────────────────
+
+def sync_bank(items=None):
+    """Insert bank questions not stored yet.  Returns how many were added."""
+    from individual_users.models import LicensureBankQuestion
+    if items is None:
+        from individual_users.gtle_question_bank import GTLE_QUESTION_BANK as items
+    wanted = {content_hash(item): item for item in items}
+    existing = set(
+        LicensureBankQuestion.objects.filter(content_hash__in=wanted).values_list('content_hash', flat=True)
+    )
+    fields = {f.name for f in LicensureBankQuestion._meta.concrete_fields}
+    new = [
+        LicensureBankQuestion(content_hash=key, **{k: v for k, v in item.items() if k in fields})
+        for key, item in wanted.items() if key not in existing
+    ]
+    LicensureBankQuestion.objects.bulk_create(new, ignore_conflicts=True)
+    return len(new)
+
+
+# ── Overlays ───────────────────────────────────────────────────
+
+def clean_edits(edits):
+    """Only editable fields, as text; a correct option must be A–D."""
+    cleaned = {}
+    for field, value in (edits or {}).items():
+        if field not in EDITABLE_FIELDS or value is None:
+            continue
+        value = str(value).strip()
+        if field == 'correct_option':
+            value = value.upper()
+            if value not in ('A', 'B', 'C', 'D'):
+                continue
+        cleaned[field] = value[:500] if field.startswith('option_') else value
+    return cleaned
+
+
+def apply_edits(question, edits):
+    for field, value in clean_edits(edits).items():
+        setattr(question, field, value)
+    return question
+
+
+def apply_overlays(profile, questions):
+    """Layer ``profile``'s edits onto shared ``questions`` in place (one query).
+
+    Each question also gets an ``overlay`` attribute (None when untouched).
+    The edited instances are for display and marking only — never save them.
+    """
+    from individual_users.models import LicensureBankOverlay
+    questions = [q for q in questions if q is not None]
+    overlays = {
+        o.question_id: o for o in
+        LicensureBankOverlay.objects.filter(profile=profile, question__in=[q.pk for q in questions])
+    }
+    for question in questions:
+        overlay = question.overlay = overlays.get(question.pk)
+        if overlay is not None and overlay.edits:
+            apply_edits(question, overlay.edits)
+    return questions
+
+
+def record_progress(profile, seen_ids, correct_ids):
+    """Bump seen/correct counters on ``profile``'s overlays (three queries)."""
+    from django.utils import timezone
+    from individual_users.models import LicensureBankOverlay
+    seen_ids = set(seen_ids)
+    if not seen_ids:
+        return
+    LicensureBankOverlay.objects.bulk_create(
+        [LicensureBankOverlay(profile=profile, question_id=pk) for pk in seen_ids],
+        ignore_conflicts=True,
+    )
+    mine = LicensureBankOverlay.objects.filter(profile=profile)
+    mine.filter(question_id__in=seen_ids).update(
+        times_seen=F('times_seen') + 1, last_seen_at=timezone.now(),
+    )
+    correct_ids = seen_ids & set(correct_ids)
+    if correct_ids:
+        mine.filter(question_id__in=correct_ids).update(times_correct=F('times_correct') + 1)
+
+
+# ── Sampling ───────────────────────────────────────────────────
+
+def pools(profile, domain=''):
+    """``{'bank': …, 'own': …}`` querysets a quiz for ``profile`` draws from."""
+    from individual_users.models import LicensureBankQuestion, LicensureQuestion
+    bank = LicensureBankQuestion.objects.exclude(
+        pk__in=profile.licensure_overlays.filter(hidden=True).values('question_id'),
+    )
+    own = LicensureQuestion.objects.filter(profile=profile)
+    if domain:
+        bank, own = bank.filter(domain=domain), own.filter(domain=domain)
+    return {'bank': bank, 'own': own}
+
+
+def allocate(counts, k):
+    """Split ``k`` draws over strata in proportion to ``counts`` (largest remainder)."""
+    total = sum(counts.values())
+    if total <= k:
+        return dict(counts)
+    shares = {stratum: k * n / total for stratum, n in counts.items()}
+    quota = {stratum: int(share) for stratum, share in shares.items()}
+    by_remainder = sorted(shares, key=lambda s: shares[s] - quota[s], reverse=True)
+    for stratum in by_remainder[:k - sum(quota.values())]:
+        quota[stratum] += 1
+    return quota
+
+
+def draw(queryset, n, rng=random):
+    """``n`` primary keys from ``queryset``, read forward from a random bucket."""
+    from individual_users.models import LICENSURE_RANDOM_BUCKETS
+    start = rng.randrange(LICENSURE_RANDOM_BUCKETS)
+    ordered = queryset.order_by('random_bucket', 'pk').values_list('pk', flat=True)
+    picked = list(ordered.filter(random_bucket__gte=start)[:n])
+    if len(picked) < n:
+        picked += ordered.filter(random_bucket__lt=start)[:n - len(picked)]
+    return picked
+
+
+def stratified_sample(pools, k, field='domain', rng=random):
+    """Up to ``k`` ``(pool name, pk)`` pairs, spread over ``field`` values, shuffled."""
+    counts = {}
+    for name, queryset in pools.items():
+        for value, n in queryset.order_by().values_list(field).annotate(n=Count('pk')):
+            counts[(name, value)] = n
+    picks = []
+    for (name, value), n in allocate(counts, k).items():
+        if n:
+            picks += [(name, pk) for pk in draw(pools[name].filter(**{field: value}), n, rng)]
+    rng.shuffle(picks)
+    return picks
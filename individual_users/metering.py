@@ -0,0 +1,412 @@
+"""
+API-key metering: cached key lookups, buffered usage counters, quotas.
+
+``api_status`` looked the key up by hash and then ``save()``d
+``last_used_at``, ``calls_today`` and ``calls_total`` on every call — one
+row write per request, a hot row on busy keys, and ``calls_today`` was
+never reset at all.
+
+  * **Lookups**: ``lookup(raw_key)`` keeps what a call needs to know about
+    its key in the cache for ``API_KEY_CACHE_SECONDS``; saving or revoking
+    a key drops the entry (``forget``).
+  * **Counters**: each call is counted in Redis (``HINCRBY`` on the day's
+    hash, so the day's count is exact across workers) or, without Redis,
+    in process memory.  Nothing is written to Postgres per call.
+  * **Flush**: ``flush()`` writes the counts in one set-based statement — an
+    upsert of the ``APIKeyUsage`` daily rollups and an update of the keys'
+    ``calls_total`` and ``last_used_at`` from the difference — then one
+    statement re-syncs ``calls_today`` with today's rollup, which is also
+    what resets it at midnight.  Redis counts are absolute, so a flush that
+    is repeated after a crash changes nothing (``GREATEST``).  The
+    scheduler flushes every minute; without Redis each worker flushes its
+    own counts after a request, once per ``API_METER_FLUSH_SECONDS``.
+  * **Edge**: ``@metered`` authenticates the Bearer key, applies the key's
+    tier rate through ``school_system.ratelimit`` and its daily quota
+    before the view runs, and answers 401/429 without touching the view.
+  * **Charts**: ``usage(keys, days)`` returns the daily series from the rollups.
+
+Usage::
+
+    from individual_users.metering import metered
+
+    @metered
+    def api_status(request):
+        key = request.api_key   # the cached key info
+        ...
+
+Settings:
+  API_KEY_CACHE_SECONDS     Seconds a key lookup is cached (default 120)
+  API_METER_BACKEND         'auto' (Redis when it is the cache, else memory), 'redis' or 'local'
+  API_METER_FLUSH_SECONDS   How often a worker flushes in-memory counts (default 60)
+"""
+import functools
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import JsonResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Per-tier rate (school_system.ratelimit syntax) and daily quota.
+TIERS = {
+    'free': {'rate': '60/m', 'daily': 1000},
+    'pro': {'rate': '300/m', 'daily': 20000},
+    'business': {'rate': '1200/m', 'daily': 200000},
+}
+
+_LOOKUP = 'apikey:{}'
+
+
+# ── Lookups ────────────────────────────────────────────────────
+
+def _load(hashed):
+    from individual_users.models import APIKey, APIKeyUsage
+
+    key = (APIKey.objects.select_related('profile__user')
+           .filter(hashed_key=hashed, is_active=True).first())
+    if key is None:
+        return False  # cached too, so a flood of bad keys does not reach the database
+    today = timezone.localdate()
+    used = APIKeyUsage.objects.filter(key=key, day=today).values_list('calls', flat=True).first() or 0
+    tier = TIERS.get(key.tier, TIERS['free'])
+    return {
+        'id': key.pk,
+        'profile_id': key.profile_id,
+        'name': key.name,
+        'user': key.profile.user.get_full_name(),
+        'email': key.profile.user.email,
+        'tier': key.tier,
+        'rate': tier['rate'],
+        'quota': key.daily_quota or tier['daily'],
+        'day': today.isoformat(),
+        'used': used,
+    }
+
+
+def lookup(raw_key):
+    """The cached info of the active key ``raw_key``, or None."""
+    from individual_users.models import APIKey
+
+    hashed = APIKey.hash_key(raw_key)
+    info = cache.get(_LOOKUP.format(hashed))
+    if info is None:
+        info = _load(hashed)
+        cache.set(_LOOKUP.format(hashed), info, getattr(settings, 'API_KEY_CACHE_SECONDS', 120))
+    return info or None
+
+
+def forget(hashes):
+    """Drop cached lookups, e.g. after a key is revoked or its tier changes."""
+    hashes = [h for h in hashes if h]
+    if not hashes:
+        return
+    names = [_LOOKUP.format(h) for h in hashes]
+    cache.delete_many(names)
+    if connection.in_atomic_block:  # and again once the change is visible
+        transaction.on_commit(lambda: cache.delete_many(names))
+
+
+# ── Counters ───────────────────────────────────────────────────
+
+class LocalCounter:
+    """Per-process counts of calls not yet flushed; flushed as increments."""
+
+    additive = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)  # (key id, day) -> calls
+        self._seen = {}                  # key id -> last call, epoch seconds
+
+    def hit(self, key_id, day, now):
+        with self._lock:
+            self._counts[key_id, day] += 1
+            self._seen[key_id] = now
+            return self._counts[key_id, day]
+
+    def undo(self, key_id, day):
+        with self._lock:
+            self._counts[key_id, day] -= 1
+
+    def take(self):
+        """The pending counts, removed from the counter, and a callback that puts them back."""
+        with self._lock:
+            counts, seen = self._counts, self._seen
+            self._counts, self._seen = defaultdict(int), {}
+        rows = [(key_id, day, calls, seen.get(key_id)) for (key_id, day), calls in counts.items() if calls > 0]
+
+        def restore():
+            with self._lock:
+                for (key_id, day), calls in counts.items():
+                    self._counts[key_id, day] += calls
+                for key_id, at in seen.items():
+                    self._seen[key_id] = max(at, self._seen.get(key_id, 0))
+        return rows, restore, lambda: None
+
+
+class RedisCounter:
+    """Absolute day counts on the cache's Redis, shared by every worker.
+
+    ``apimeter:day:<date>`` holds ``{key id: calls}``, ``apimeter:seen``
+    the last call per key and ``apimeter:dirty`` the ``<date>:<key id>``
+    pairs changed since the last flush.  A flush renames the dirty set to a
+    batch and deletes it once the write has committed; a batch left by a
+    crash is flushed again, harmlessly.
+    """
+
+    additive = False
+    TTL = 3 * 86400
+
+    @staticmethod
+    def _r():
+        return cache._cache.get_client(write=True)
+
+    @staticmethod
+    def _k(name):
+        return cache.make_key(f'apimeter:{name}')
+
+    def hit(self, key_id, day, now):
+        day_key = self._k(f'day:{day}')
+        pipe = self._r().pipeline(transaction=False)
+        pipe.hincrby(day_key, key_id, 1)
+        pipe.expire(day_key, self.TTL)
+        pipe.hset(self._k('seen'), key_id, int(now))
+        pipe.sadd(self._k('dirty'), f'{day}:{key_id}')
+        return int(pipe.execute()[0])
+
+    def undo(self, key_id, day):
+        self._r().hincrby(self._k(f'day:{day}'), key_id, -1)
+
+    def take(self):
+        from redis.exceptions import ResponseError
+
+        r = self._r()
+        batch = self._k('batch')
+        if not r.exists(batch):
+            try:
+                r.rename(self._k('dirty'), batch)
+            except ResponseError:  # nothing dirty
+                return [], lambda: None, lambda: None
+        pairs = sorted({tuple((m.decode() if isinstance(m, bytes) else m).split(':')) for m in r.smembers(batch)})
+        by_day = defaultdict(list)
+        for day, key_id in pairs:
+            by_day[day].append(key_id)
+        seen = dict(zip([k for _, k in pairs], r.hmget(self._k('seen'), [k for _, k in pairs]))) if pairs else {}
+        rows = []
+        for day, ids in by_day.items():
+            for key_id, calls in zip(ids, r.hmget(self._k(f'day:{day}'), ids)):
+                if calls is not None and int(calls) > 0:
+                    at = seen.get(key_id)
+                    rows.append((int(key_id), day, int(calls), float(at) if at else None))
+        return rows, lambda: None, lambda: r.delete(batch)
+
+
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def counter():
+    name = getattr(settings, 'API_METER_BACKEND', 'auto')
+    if name == 'auto':
+        name = 'redis' if 'redis' in settings.CACHES.get('default', {}).get('BACKEND', '').lower() else 'local'
+    found = _counters.get(name)
+    if found is None:
+        with _counters_lock:
+            found = _counters.get(name)
+            if found is None:
+                found = _counters[name] = {'redis': RedisCounter, 'local': LocalCounter}[name]()
+    return found
+
+
+_fallback = LocalCounter()
+
+
+def record(info):
+    """Count one call for ``info``'s key.  Returns ``(allowed, calls today)`` against its quota."""
+    now = time.time()
+    day = timezone.localdate().isoformat()
+    meter = counter()
+    try:
+        calls = meter.hit(info['id'], day, now)
+    except Exception:
+        logger.warning('API meter backend unavailable — counting in process', exc_info=True)
+        meter = _fallback
+        calls = meter.hit(info['id'], day, now)
+    if meter.additive:
+        # Pending calls of this worker on top of what had been flushed when the key was looked up.
+        calls += info['used'] if info.get('day') == day else 0
+    if calls > info['quota']:
+        meter.undo(info['id'], day)
+        return False, calls - 1
+    return True, calls
+
+
+# ── Flush ──────────────────────────────────────────────────────
+
+def _write(rows, additive):
+    """Upsert ``[(key id, day, calls, last call epoch)]``; returns the hashes of the keys touched."""
+    from individual_users.models import APIKey, APIKeyUsage
+
+    keys, usage = APIKey._meta.db_table, APIKeyUsage._meta.db_table
+    params = []
+    for key_id, day, calls, at in rows:
+        params += [key_id, day, calls, datetime.fromtimestamp(at, dt_timezone.utc) if at else None]
+    values = ', '.join(['(%s::bigint, %s::date, %s::integer, %s::timestamptz)'] * len(rows))
+    merged = 'u.calls + EXCLUDED.calls' if additive else 'GREATEST(u.calls, EXCLUDED.calls)'
+    added = 'l.calls' if additive else 'up.calls - COALESCE(b.calls, 0)'
+    sql = f"""
+        WITH incoming (key_id, day, calls, last_used) AS (VALUES {values}),
+        live AS (
+            SELECT i.* FROM incoming i JOIN {keys} k ON k.id = i.key_id
+        ),
+        before AS (
+            SELECT u.key_id, u.day, u.calls FROM {usage} u
+            JOIN live l ON l.key_id = u.key_id AND l.day = u.day
+        ),
+        up AS (
+            INSERT INTO {usage} AS u (key_id, day, calls)
+            SELECT key_id, day, calls FROM live
+            ON CONFLICT (key_id, day) DO UPDATE SET calls = {merged}
+            RETURNING u.key_id, u.day, u.calls
+        ),
+        delta AS (
+            SELECT up.key_id, SUM({added}) AS added, MAX(l.last_used) AS last_used
+            FROM up
+            JOIN live l ON l.key_id = up.key_id AND l.day = up.day
+            LEFT JOIN before b ON b.key_id = up.key_id AND b.day = up.day
+            GROUP BY up.key_id
+        )
+        UPDATE {keys} k
+        SET calls_total = k.calls_total + d.added,
+            last_used_at = GREATEST(k.last_used_at, d.last_used)
+        FROM delta d
+        WHERE k.id = d.key_id
+        RETURNING k.hashed_key
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def sync_today(day=None):
+    """Set every key's ``calls_today`` from ``day``'s rollup (0 when it has none) in one statement."""
+    from individual_users.models import APIKey, APIKeyUsage
+
+    keys, usage = APIKey._meta.db_table, APIKeyUsage._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE {keys} k SET calls_today = COALESCE(u.calls, 0)
+            FROM {keys} k2 LEFT JOIN {usage} u ON u.key_id = k2.id AND u.day = %s
+            WHERE k.id = k2.id AND k.calls_today <> COALESCE(u.calls, 0)
+        """, [day or timezone.localdate()])
+        return cursor.rowcount
+
+
+def flush(meter=None):
+    """Write pending counts and re-sync ``calls_today``.  Returns the number of (key, day) rows written."""
+    from django_tenants.utils import get_public_schema_name, schema_context
+
+    meter = meter or counter()
+    lock = 'apimeter:flush-lock'
+    if not cache.add(lock, 1, 60):
+        return 0
+    try:
+        rows, restore, done = meter.take()
+        try:
+            with schema_context(get_public_schema_name()), transaction.atomic():
+                touched = _write(rows, meter.additive) if rows else []
+                sync_today()
+        except Exception:
+            restore()
+            raise
+        done()
+    finally:
+        cache.delete(lock)
+    forget(touched)  # lookups carry today's flushed count
+    if meter is not _fallback and _fallback._counts:
+        flush(_fallback)
+    return len(rows)
+
+
+def _flush_due():
+    """Without Redis: flush this worker's counts once per ``API_METER_FLUSH_SECONDS``."""
+    meter = counter()
+    now = time.monotonic()
+    if not meter.additive or now - _last_flush[0] < getattr(settings, 'API_METER_FLUSH_SECONDS', 60):
+        return
+    _last_flush[0] = now
+
+    def run():
+        try:
+            flush(meter)
+        except Exception:
+            logger.warning('API usage flush failed; counts kept for the next one', exc_info=True)
+
+    if connection.in_atomic_block:
+        transaction.on_commit(run)
+    else:
+        run()
+
+
+_last_flush = [time.monotonic()]
+
+
+# ── Edge ───────────────────────────────────────────────────────
+
+def metered(view_func):
+    """Authenticate the Bearer API key and enforce its rate and daily quota.
+
+    The view gets the cached key info as ``request.api_key``; responses
+    carry ``X-Quota-Limit`` and ``X-Quota-Remaining``.
+    """
+    from school_system import ratelimit
+
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        auth_header = request.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return JsonResponse({'error': 'Missing Bearer token'}, status=401)
+        info = lookup(auth_header[7:])
+        if info is None:
+            return JsonResponse({'error': 'Invalid or revoked API key'}, status=401)
+
+        decision = ratelimit.check(request, 'api_key', info['rate'], key=lambda r: f"k{info['id']}")
+        if not decision.allowed:
+            return decision.response({'error': 'Rate limit exceeded', 'tier': info['tier']})
+        allowed, calls = record(info)
+        _flush_due()
+        if not allowed:
+            response = JsonResponse({'error': 'Daily quota exceeded', 'quota': info['quota']}, status=429)
+            tomorrow = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            response['Retry-After'] = str(int((tomorrow - timezone.localtime()).total_seconds()) + 1)
+        else:
+            request.api_key = info
+            response = view_func(request, *args, **kwargs)
+        response['X-Quota-Limit'] = str(info['quota'])
+        response['X-Quota-Remaining'] = str(max(0, info['quota'] - calls))
+        for name, value in decision.headers().items():
+            response[name] = value
+        return response
+    return wrapper
+
+
+# ── Charts ─────────────────────────────────────────────────────
+
+def usage(key_ids, days=14):
+    """``{key id: [(date, calls), …]}`` for the last ``days`` days, zero-filled, oldest first."""
+    from individual_users.models import APIKeyUsage
+
+    today = timezone.localdate()
+    dates = [today - timedelta(days=n) for n in range(days - 1, -1, -1)]
+    calls = {
+        (key_id, day): n for key_id, day, n in
+        APIKeyUsage.objects.filter(key_id__in=key_ids, day__gte=dates[0]).values_list('key_id', 'day', 'calls')
+    }
+    return {key_id: [(day, calls.get((key_id, day), 0)) for day in dates] for key_id in key_ids}
@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('individual_users', '0039_add_ges_fields_to_questions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AICachedResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tool', models.CharField(max_length=40)),
+                ('group_key', models.CharField(max_length=64)),
+                ('normalized_text', models.TextField()),
+                ('embedding', models.BinaryField()),
+                ('response', models.TextField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tool', 'group_key', '-created_at'], name='aicache_group_idx')],
+            },
+        ),
+    ]
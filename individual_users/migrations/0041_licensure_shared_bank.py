@@ -0,0 +1,108 @@
+# Generated by Django 5.0 on 2026-10-19 02:55
+
+import django.db.models.deletion
+import individual_users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('individual_users', '0040_ai_cached_response'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LicensureBankOverlay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flagged', models.BooleanField(default=False)),
+                ('hidden', models.BooleanField(default=False)),
+                ('edits', models.JSONField(blank=True, default=dict)),
+                ('times_seen', models.PositiveIntegerField(default=0)),
+                ('times_correct', models.PositiveIntegerField(default=0)),
+                ('last_seen_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Licensure Bank Overlay',
+            },
+        ),
+        migrations.CreateModel(
+            name='LicensureBankQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=40, unique=True)),
+                ('domain', models.CharField(choices=[('literacy', 'Literacy'), ('numeracy', 'Numeracy'), ('pedagogy', 'Pedagogical Knowledge'), ('management', 'Classroom Management')], max_length=20)),
+                ('topic', models.CharField(blank=True, default='', max_length=200)),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], default='medium', max_length=8)),
+                ('source', models.CharField(choices=[('gtle_2024', 'GTLE 2024'), ('gtle_2023', 'GTLE 2023'), ('gtle_2022', 'GTLE 2022'), ('gtle_2021', 'GTLE 2021'), ('gtle_2020', 'GTLE 2020'), ('practice', 'Practice'), ('ai_generated', 'AI Generated')], default='practice', max_length=20)),
+                ('question_text', models.TextField()),
+                ('option_a', models.CharField(max_length=500)),
+                ('option_b', models.CharField(max_length=500)),
+                ('option_c', models.CharField(max_length=500)),
+                ('option_d', models.CharField(max_length=500)),
+                ('correct_option', models.CharField(max_length=1)),
+                ('explanation', models.TextField(blank=True, default='')),
+                ('random_bucket', models.PositiveSmallIntegerField(default=individual_users.models.licensure_random_bucket)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Licensure Bank Question',
+                'ordering': ['domain', 'pk'],
+            },
+        ),
+        migrations.AddField(
+            model_name='licensurequestion',
+            name='random_bucket',
+            field=models.PositiveSmallIntegerField(default=individual_users.models.licensure_random_bucket),
+        ),
+        migrations.AlterField(
+            model_name='licensureanswer',
+            name='question',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='individual_users.licensurequestion'),
+        ),
+        migrations.AddIndex(
+            model_name='licensurequestion',
+            index=models.Index(fields=['profile', 'domain', 'random_bucket'], name='lic_q_profile_sample_idx'),
+        ),
+        migrations.AddField(
+            model_name='licensurebankoverlay',
+            name='profile',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='licensure_overlays', to='individual_users.individualprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='licensurebankquestion',
+            index=models.Index(fields=['domain', 'topic'], name='lic_bank_topic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='licensurebankquestion',
+            index=models.Index(fields=['domain', 'difficulty'], name='lic_bank_difficulty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='licensurebankquestion',
+            index=models.Index(fields=['domain', 'random_bucket'], name='lic_bank_sample_idx'),
+        ),
+        migrations.AddField(
+            model_name='licensurebankoverlay',
+            name='question',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='overlays', to='individual_users.licensurebankquestion'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='licensureanswer',
+            unique_together={('attempt', 'question')},
+        ),
+        migrations.AddField(
+            model_name='licensureanswer',
+            name='bank_question',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='individual_users.licensurebankquestion'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='licensureanswer',
+            unique_together={('attempt', 'bank_question'), ('attempt', 'question')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='licensurebankoverlay',
+            unique_together={('profile', 'question')},
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    """Seed the shared bank and fold per-teacher copies of it into answers on the shared rows."""
+    from individual_users.gtle_question_bank import GTLE_QUESTION_BANK
+    from individual_users.licensure_bank import content_hash
+    from individual_users.models import licensure_random_bucket
+
+    BankQuestion = apps.get_model('individual_users', 'LicensureBankQuestion')
+    Question = apps.get_model('individual_users', 'LicensureQuestion')
+    Answer = apps.get_model('individual_users', 'LicensureAnswer')
+
+    fields = {f.name for f in BankQuestion._meta.concrete_fields}
+    BankQuestion.objects.bulk_create([
+        BankQuestion(content_hash=content_hash(item), **{k: v for k, v in item.items() if k in fields})
+        for item in GTLE_QUESTION_BANK
+    ], ignore_conflicts=True)
+    bank_ids = dict(BankQuestion.objects.values_list('content_hash', 'id'))
+
+    copies = {}
+    for question in Question.objects.filter(source='practice').iterator():
+        bank_id = bank_ids.get(content_hash(question))
+        if bank_id is not None:
+            copies[question.pk] = bank_id
+    answers = list(Answer.objects.filter(question_id__in=list(copies)))
+    for answer in answers:
+        answer.bank_question_id = copies[answer.question_id]
+        answer.question_id = None
+    Answer.objects.bulk_update(answers, ['question', 'bank_question'], batch_size=500)
+    Question.objects.filter(pk__in=list(copies)).delete()
+
+    # AddField gave every surviving row the same bucket.
+    own = list(Question.objects.only('pk'))
+    for question in own:
+        question.random_bucket = licensure_random_bucket()
+    Question.objects.bulk_update(own, ['random_bucket'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('individual_users', '0041_licensure_shared_bank'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
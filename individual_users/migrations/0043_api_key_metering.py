@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-19 03:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('individual_users', '0042_licensure_bank_dedupe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apikey',
+            name='daily_quota',
+            field=models.PositiveIntegerField(blank=True, help_text="Calls per day; blank uses the tier's quota", null=True),
+        ),
+        migrations.AddField(
+            model_name='apikey',
+            name='tier',
+            field=models.CharField(choices=[('free', 'Free'), ('pro', 'Pro'), ('business', 'Business')], default='free', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='apikey',
+            name='hashed_key',
+            field=models.CharField(db_index=True, editable=False, max_length=128),
+        ),
+        migrations.CreateModel(
+            name='APIKeyUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('key', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage', to='individual_users.apikey')),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='apikeyusage',
+            constraint=models.UniqueConstraint(fields=('key', 'day'), name='apikey_usage_day'),
+        ),
+    ]
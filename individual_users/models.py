@@ -173,14 +173,27 @@ class AddonSubscription(models.Model):
 
 
 class APIKey(models.Model):
-    """API keys for individual users to access addon marketplace endpoints."""
+    """API keys for individual users to access addon marketplace endpoints.
+
+    Usage counters are maintained by individual_users.metering, not per call.
+    """
+    TIER_CHOICES = [
+        ('free', 'Free'),
+        ('pro', 'Pro'),
+        ('business', 'Business'),
+    ]
+
     profile = models.ForeignKey(
         IndividualProfile, on_delete=models.CASCADE, related_name='api_keys',
     )
     name = models.CharField(max_length=100, help_text='A label for this key')
     prefix = models.CharField(max_length=8, db_index=True, editable=False)
-    hashed_key = models.CharField(max_length=128, editable=False)
+    hashed_key = models.CharField(max_length=128, editable=False, db_index=True)
     is_active = models.BooleanField(default=True)
+    tier = models.CharField(max_length=20, choices=TIER_CHOICES, default='free')
+    daily_quota = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Calls per day; blank uses the tier's quota",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     last_used_at = models.DateTimeField(null=True, blank=True)
     calls_today = models.PositiveIntegerField(default=0)
@@ -211,6 +224,28 @@ class APIKey(models.Model):
         import hashlib
         return hashlib.sha256(raw_key.encode()).hexdigest()
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self.hashed_key:
+            from individual_users import metering
+            metering.forget([self.hashed_key])
+
+
+class APIKeyUsage(models.Model):
+    """Calls made with one API key on one day, flushed in bulk by individual_users.metering."""
+    key = models.ForeignKey(APIKey, on_delete=models.CASCADE, related_name='usage')
+    day = models.DateField()
+    calls = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'day'], name='apikey_usage_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.key_id} {self.day}: {self.calls}"
+
 
 # ── Credit System ────────────────────────────────────────────────────────────
 # Mirrors the teacher credit system for individual portal users.
@@ -672,8 +707,17 @@ class AITutorMessage(models.Model):
         return f'{self.role}: {self.content[:60]}'
 
 
+# Quiz sampling seeks to a random bucket and reads forward along an index
+# instead of sorting the whole pool with ORDER BY random().
+LICENSURE_RANDOM_BUCKETS = 1024
+
+
+def licensure_random_bucket():
+    return secrets.randbelow(LICENSURE_RANDOM_BUCKETS)
+
+
 class LicensureQuestion(models.Model):
-    """GTLE licensure exam practice / past question."""
+    """GTLE licensure exam question written for (or generated by) one teacher."""
 
     DOMAIN_CHOICES = [
         ('literacy', 'Literacy'),
@@ -715,11 +759,15 @@ class LicensureQuestion(models.Model):
     option_d = models.CharField(max_length=500)
     correct_option = models.CharField(max_length=1)  # A / B / C / D
     explanation = models.TextField(blank=True, default='')
+    random_bucket = models.PositiveSmallIntegerField(default=licensure_random_bucket)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Licensure Question'
+        indexes = [
+            models.Index(fields=['profile', 'domain', 'random_bucket'], name='lic_q_profile_sample_idx'),
+        ]
 
     @property
     def option_list(self):
@@ -734,6 +782,73 @@ class LicensureQuestion(models.Model):
         return self.question_text[:80]
 
 
+class LicensureBankQuestion(models.Model):
+    """Shared, read-only GTLE practice question — one row per distinct question.
+
+    Every teacher draws from the same rows; per-teacher progress, flags and
+    edits live in ``LicensureBankOverlay``.  See ``individual_users.licensure_bank``.
+    """
+
+    content_hash = models.CharField(max_length=40, unique=True)
+    domain = models.CharField(max_length=20, choices=LicensureQuestion.DOMAIN_CHOICES)
+    topic = models.CharField(max_length=200, blank=True, default='')
+    difficulty = models.CharField(
+        max_length=8, choices=LicensureQuestion.DIFFICULTY_CHOICES, default='medium',
+    )
+    source = models.CharField(
+        max_length=20, choices=LicensureQuestion.SOURCE_CHOICES, default='practice',
+    )
+    question_text = models.TextField()
+    option_a = models.CharField(max_length=500)
+    option_b = models.CharField(max_length=500)
+    option_c = models.CharField(max_length=500)
+    option_d = models.CharField(max_length=500)
+    correct_option = models.CharField(max_length=1)  # A / B / C / D
+    explanation = models.TextField(blank=True, default='')
+    random_bucket = models.PositiveSmallIntegerField(default=licensure_random_bucket)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['domain', 'pk']
+        verbose_name = 'Licensure Bank Question'
+        indexes = [
+            models.Index(fields=['domain', 'topic'], name='lic_bank_topic_idx'),
+            models.Index(fields=['domain', 'difficulty'], name='lic_bank_difficulty_idx'),
+            models.Index(fields=['domain', 'random_bucket'], name='lic_bank_sample_idx'),
+        ]
+
+    option_list = LicensureQuestion.option_list
+
+    def __str__(self):
+        return self.question_text[:80]
+
+
+class LicensureBankOverlay(models.Model):
+    """One teacher's progress, flags and edits on a shared bank question."""
+
+    profile = models.ForeignKey(
+        IndividualProfile, on_delete=models.CASCADE,
+        related_name='licensure_overlays',
+    )
+    question = models.ForeignKey(
+        LicensureBankQuestion, on_delete=models.CASCADE, related_name='overlays',
+    )
+    flagged = models.BooleanField(default=False)
+    hidden = models.BooleanField(default=False)  # left out of this teacher's quizzes
+    edits = models.JSONField(default=dict, blank=True)  # {field: replacement text}
+    times_seen = models.PositiveIntegerField(default=0)
+    times_correct = models.PositiveIntegerField(default=0)
+    last_seen_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('profile', 'question')
+        verbose_name = 'Licensure Bank Overlay'
+
+    def __str__(self):
+        return f'{self.profile_id} · {self.question_id}'
+
+
 class LicensureQuizAttempt(models.Model):
     """A quiz/mock exam attempt by a teacher."""
 
@@ -781,8 +896,12 @@ class LicensureAnswer(models.Model):
     attempt = models.ForeignKey(
         LicensureQuizAttempt, on_delete=models.CASCADE, related_name='answers',
     )
+    # Exactly one of ``question`` (the teacher's own) / ``bank_question`` (shared) is set.
     question = models.ForeignKey(
-        LicensureQuestion, on_delete=models.CASCADE,
+        LicensureQuestion, on_delete=models.CASCADE, null=True, blank=True,
+    )
+    bank_question = models.ForeignKey(
+        LicensureBankQuestion, on_delete=models.CASCADE, null=True, blank=True,
     )
     selected_option = models.CharField(max_length=1, blank=True, default='')
     is_correct = models.BooleanField(default=False)
@@ -790,7 +909,12 @@ class LicensureAnswer(models.Model):
 
     class Meta:
         ordering = ['pk']
-        unique_together = ('attempt', 'question')
+        unique_together = [('attempt', 'question'), ('attempt', 'bank_question')]
+
+    @property
+    def item(self):
+        """The question answered — own or shared (with overlay edits applied)."""
+        return self.question if self.question_id else self.bank_question
 
 
 # ── GES Letter Writer ────────────────────────────────────────────────────────
@@ -1764,3 +1888,28 @@ class IndividualLiveQuizResponse(models.Model):
 
     def __str__(self):
         return f"{self.player_name}: {self.choice}"
+
+
+class AICachedResponse(models.Model):
+    """Semantic tier of the AI response cache (see individual_users.ai_cache).
+
+    Requests with the same tool, model, system prompt and structured fields
+    share a ``group_key``; within a group the free-text part is matched by
+    cosine similarity of its locally computed hashing embedding.
+    """
+    tool = models.CharField(max_length=40)
+    group_key = models.CharField(max_length=64)
+    normalized_text = models.TextField()
+    embedding = models.BinaryField()
+    response = models.TextField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tool', 'group_key', '-created_at'], name='aicache_group_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tool}: {self.normalized_text[:60]}"
@@ -14,6 +14,7 @@ from django.urls import reverse
 from datetime import date
 
 from .guest_views import GES_CURRICULUM
+from accounts.page_cache import anonymous_page_cache
 from accounts.views import GHANA_CITIES
 
 
@@ -22,6 +23,7 @@ def _base_url(request):
     return f"{request.scheme}://{request.headers.get('Host', 'schoolpadi.xyz')}"
 
 
+@anonymous_page_cache()
 def sitemap_xml(request):
     """Dynamic XML sitemap covering all public, guest, and SEO pages."""
     base = _base_url(request)
@@ -127,6 +129,7 @@ def sitemap_xml(request):
     return HttpResponse(xml, content_type='application/xml')
 
 
+@anonymous_page_cache()
 def robots_txt(request):
     """Dynamic robots.txt that blocks crawlers from authenticated/API routes."""
     base = _base_url(request)
@@ -176,6 +179,7 @@ def robots_txt(request):
     return HttpResponse('\n'.join(lines), content_type='text/plain')
 
 
+@anonymous_page_cache()
 def visual_sitemap(request):
     """HTML sitemap page — acts as a funnel from curiosity to signup."""
     # Build curriculum links
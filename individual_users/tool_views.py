@@ -16,12 +16,14 @@ from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
 from django.db import connection
 from django.db.models import Count, ExpressionWrapper, F, FloatField, Max, Q
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.views.decorators.http import require_POST
 
+from individual_users import licensure_bank
 from individual_users.ai_cache import call_and_cache, get_cached
 from individual_users.credit_utils import deduct_credits
 from individual_users.models import (
@@ -49,6 +51,8 @@ from individual_users.models import (
     IndividualStudyGuide,
     IndividualTaskCard,
     LicensureAnswer,
+    LicensureBankOverlay,
+    LicensureBankQuestion,
     LicensureQuestion,
     LicensureQuizAttempt,
     LiteracyExercise,
@@ -795,16 +799,15 @@ def _rate_limit_ai(max_per_minute=10):
     def decorator(view_func):
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
-            from django.core.cache import cache
-            profile = request.user.individual_profile
-            key = f'ai_rl:{profile.pk}:{view_func.__name__}'
-            hits = cache.get(key, 0)
-            if hits >= max_per_minute:
-                return JsonResponse(
+            from school_system.ratelimit import check
+            decision = check(
+                request, f'ai:{view_func.__name__}', f'{max_per_minute}/m',
+                key=lambda r: f'p{r.user.individual_profile.pk}',
+            )
+            if not decision.allowed:
+                return decision.response(
                     {'error': 'Rate limit exceeded. Please wait a moment and try again.'},
-                    status=429,
                 )
-            cache.set(key, hits + 1, 60)
             return view_func(request, *args, **kwargs)
         return wrapper
     return decorator
@@ -1163,7 +1166,13 @@ def question_ai_generate(request):
         "No markdown, no extra text."
     )
 
-    cached = get_cached(system=_sys, prompt=prompt)
+    semantic = {
+        'tool': 'quiz',
+        'text': topic,
+        'fields': {'subject': subject, 'class': target_class, 'format': question_format,
+                   'difficulty': difficulty, 'count': count},
+    }
+    cached = get_cached(system=_sys, prompt=prompt, **semantic)
     if cached is None:
         # Deduct credits before AI generation
         ok, err = deduct_credits(request.user, 'question_gen')
@@ -1171,7 +1180,9 @@ def question_ai_generate(request):
             return JsonResponse(err, status=403)
 
     try:
-        raw_text = cached if cached is not None else call_and_cache(system=_sys, prompt=prompt, max_tokens=3000)
+        raw_text = cached if cached is not None else call_and_cache(
+            system=_sys, prompt=prompt, max_tokens=3000, **semantic,
+        )
         items = json.loads(raw_text)
     except Exception as exc:
         logger.warning('AI question generation failed: %s', exc)
@@ -1510,216 +1521,22 @@ def lesson_plan_print(request, pk):
 @_require_tool('lesson-planner')
 def lesson_plan_pdf(request, pk):
     """Download the lesson plan as a B7 Weekly PDF (ReportLab)."""
-    import io
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.units import cm, mm
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.colors import HexColor, black
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-    )
-
-    from django.http import HttpResponse
+    from accounts.documents import document_response
+    from individual_users.documents import lesson_plan_payload
 
     profile = request.user.individual_profile
     plan = get_object_or_404(
         ToolLessonPlan.objects.select_related('profile__user'),
         pk=pk, profile=profile,
     )
-    b7 = plan.b7_meta or {}
-
-    def esc(text):
-        return (str(text).replace('&', '&amp;').replace('<', '&lt;')
-                .replace('>', '&gt;').replace('\n', '<br/>'))
-
-    buf = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buf, pagesize=A4,
-        topMargin=1.2 * cm, bottomMargin=1.2 * cm,
-        leftMargin=1.5 * cm, rightMargin=1.5 * cm,
-    )
-    avail_w = A4[0] - 3 * cm
-
-    styles = getSampleStyleSheet()
-    header_bg = HexColor('#faeadd')
-
-    s_title = ParagraphStyle('B7Title', parent=styles['Title'], fontSize=13,
-        fontName='Times-Bold', alignment=TA_CENTER, spaceAfter=2, textColor=black)
-    s_sub = ParagraphStyle('B7Sub', parent=styles['Normal'], fontSize=11,
-        fontName='Times-Bold', alignment=TA_CENTER, spaceAfter=6, textColor=black)
-    s_cell = ParagraphStyle('Cell', parent=styles['Normal'], fontSize=10,
-        fontName='Times-Roman', leading=13, spaceAfter=0, spaceBefore=0)
-    s_cell_b = ParagraphStyle('CellB', parent=s_cell, fontName='Times-Bold')
-    s_hdr = ParagraphStyle('Hdr', parent=s_cell, fontName='Times-Bold', fontSize=10)
-    s_phase = ParagraphStyle('Phase', parent=s_cell, fontName='Times-Bold', fontSize=10)
-
-    story = []
-    story.append(Paragraph(
-        f'WEEKLY LESSON PLAN &ndash; {esc(plan.target_class or "Class")}', s_title))
-    story.append(Paragraph(esc(plan.title), s_sub))
-
-    # ── Table 1: Metadata ──
-    meta_data = [
-        [Paragraph('<b>Date:</b>', s_cell_b),
-         Paragraph(plan.created_at.strftime('%d/%m/%Y') if plan.created_at else '', s_cell),
-         Paragraph('<b>Period:</b>', s_cell_b),
-         Paragraph(esc(b7.get('period', '1')), s_cell)],
-        [Paragraph('<b>Duration:</b>', s_cell_b),
-         Paragraph(f'{plan.duration_minutes} Mins', s_cell),
-         Paragraph('<b>Strand:</b>', s_cell_b),
-         Paragraph(esc(b7.get('strand', plan.topic or '')), s_cell)],
-        [Paragraph('<b>Class:</b>', s_cell_b),
-         Paragraph(esc(plan.target_class or ''), s_cell),
-         Paragraph('<b>Class Size:</b>', s_cell_b),
-         Paragraph(esc(b7.get('class_size', '')), s_cell)],
-        [Paragraph('<b>Subject:</b>', s_cell_b),
-         Paragraph(esc(plan.get_subject_display()), s_cell),
-         Paragraph('<b>Sub Strand:</b>', s_cell_b),
-         Paragraph(esc(plan.sub_strand or plan.topic or ''), s_cell)],
-    ]
-    cw = [avail_w * 0.15, avail_w * 0.35, avail_w * 0.15, avail_w * 0.35]
-    meta_table = Table(meta_data, colWidths=cw)
-    meta_style = [
-        ('BOX', (0, 0), (-1, -1), 1, black),
-        ('INNERGRID', (0, 0), (-1, -1), 0.5, black),
-        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ('LEFTPADDING', (0, 0), (-1, -1), 5),
-    ]
-    for r in range(4):
-        meta_style.append(('BACKGROUND', (0, r), (0, r), header_bg))
-        meta_style.append(('BACKGROUND', (2, r), (2, r), header_bg))
-    meta_table.setStyle(TableStyle(meta_style))
-    story.append(meta_table)
-
-    # ── Table 2: Curriculum Standards ──
-    ind_text = b7.get('indicator', plan.indicator or 'See Content Standard')
-    lesson_of = b7.get('lesson_of', '1 of 3')
-    perf_ind = b7.get('perf_indicator', b7.get('performance_indicator', ''))
-    core_comp = b7.get('core_competencies', 'CP 5.1, CC 8.1')
-    refs = b7.get('references', f"National {plan.get_subject_display()} Curriculum")
-    keywords = b7.get('keywords', plan.topic or '')
-
-    cur_data = [
-        [Paragraph('<b>Content Standard:</b>', s_hdr),
-         Paragraph('<b>Indicator:</b>', s_hdr),
-         Paragraph('<b>Lesson:</b>', s_hdr)],
-        [Paragraph(esc(plan.objectives or ''), s_cell),
-         Paragraph(esc(ind_text), s_cell),
-         Paragraph(esc(lesson_of), s_cell)],
-        [Paragraph('<b>Performance Indicator:</b>', s_hdr),
-         '', Paragraph('<b>Core Competencies:</b>', s_hdr)],
-        [Paragraph(esc(perf_ind), s_cell),
-         '', Paragraph(esc(core_comp), s_cell)],
-        [Paragraph(f'<b>References:</b> {esc(refs)}', s_cell), '', ''],
-        [Paragraph(f'<b>Keywords:</b> {esc(keywords)}', s_cell), '', ''],
-    ]
-    cw2 = [avail_w * 0.50, avail_w * 0.30, avail_w * 0.20]
-    cur_table = Table(cur_data, colWidths=cw2)
-    cur_style = [
-        ('BOX', (0, 0), (-1, -1), 1, black),
-        ('INNERGRID', (0, 0), (-1, -1), 0.5, black),
-        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ('LEFTPADDING', (0, 0), (-1, -1), 5),
-        ('BACKGROUND', (0, 0), (-1, 0), header_bg),
-        ('BACKGROUND', (0, 2), (0, 2), header_bg),
-        ('BACKGROUND', (2, 2), (2, 2), header_bg),
-        ('SPAN', (0, 2), (1, 2)),  # Perf Indicator header spans 2 cols
-        ('SPAN', (0, 3), (1, 3)),  # Perf Indicator value spans 2 cols
-        ('SPAN', (0, 4), (2, 4)),  # References full width
-        ('SPAN', (0, 5), (2, 5)),  # Keywords full width
-        ('BACKGROUND', (0, 4), (0, 4), header_bg),
-        ('BACKGROUND', (0, 5), (0, 5), header_bg),
-    ]
-    cur_table.setStyle(TableStyle(cur_style))
-    story.append(Spacer(1, -1))
-    story.append(cur_table)
-
-    # ── Table 3: Three-Phase Pedagogy ──
-    materials_text = esc(plan.materials or '')
-    intro_text = esc(plan.introduction or '')
-    dev_text = esc(plan.development or '')
-    assess_text = esc(plan.assessment or '')
-    reflect_text = esc(plan.notes or '')
-    closure_text = esc(plan.closure or '')
-
-    # Build each phase as a separate table so long content can split across pages
-    ped_hdr = Table(
-        [[Paragraph('<b>Phase / Duration</b>', s_hdr),
-          Paragraph('<b>Learner Activities</b>', s_hdr),
-          Paragraph('<b>Resources</b>', s_hdr)]],
-        colWidths=[avail_w * 0.20, avail_w * 0.50, avail_w * 0.30],
-    )
-    ped_hdr.setStyle(TableStyle([
-        ('BOX', (0, 0), (-1, -1), 1, black),
-        ('INNERGRID', (0, 0), (-1, -1), 0.5, black),
-        ('BACKGROUND', (0, 0), (-1, 0), header_bg),
-        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ('LEFTPADDING', (0, 0), (-1, -1), 5),
-    ]))
-
-    cw3 = [avail_w * 0.20, avail_w * 0.50, avail_w * 0.30]
-    phase_style = TableStyle([
-        ('BOX', (0, 0), (-1, -1), 1, black),
-        ('INNERGRID', (0, 0), (-1, -1), 0.5, black),
-        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ('LEFTPADDING', (0, 0), (-1, -1), 5),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ])
-
-    phase1 = Table(
-        [[Paragraph('<b>PHASE 1: STARTER</b><br/><font size="8">(10 Mins)</font>', s_phase),
-          Paragraph(intro_text, s_cell),
-          Paragraph(materials_text, s_cell)]],
-        colWidths=cw3,
-    )
-    phase1.setStyle(phase_style)
-
-    phase2 = Table(
-        [[Paragraph('<b>PHASE 2: NEW LEARNING</b><br/><font size="8">(40 Mins)</font>', s_phase),
-          Paragraph(f'{dev_text}<br/><br/><b>Assessment:</b><br/>{assess_text}', s_cell),
-          Paragraph('', s_cell)]],
-        colWidths=cw3,
-    )
-    phase2.setStyle(phase_style)
-
-    phase3 = Table(
-        [[Paragraph('<b>PHASE 3: REFLECTION</b><br/><font size="8">(10 Mins)</font>', s_phase),
-          Paragraph(f'{reflect_text}<br/><br/><b>Homework:</b><br/>{closure_text}', s_cell),
-          Paragraph('', s_cell)]],
-        colWidths=cw3,
-    )
-    phase3.setStyle(phase_style)
-
-    story.append(Spacer(1, 2))
-    story.append(ped_hdr)
-    story.append(Spacer(1, -1))
-    story.append(phase1)
-    story.append(Spacer(1, -1))
-    story.append(phase2)
-    story.append(Spacer(1, -1))
-    story.append(phase3)
-
-    doc.build(story)
-    buf.seek(0)
 
     safe_title = ''.join(
         c for c in plan.title if c.isalnum() or c in ' _-'
     ).strip()[:80] or 'Lesson_Plan'
-    filename = f'{safe_title}_B7.pdf'
-
-    response = HttpResponse(buf.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
+    return document_response(
+        request, 'individual_users.documents.lesson_plan_pdf',
+        lesson_plan_payload(plan), f'{safe_title}_B7.pdf',
+    )
 
 
 @_tool_required
@@ -1886,14 +1703,21 @@ def lesson_plan_ai_generate(request):
             "No markdown fences, no extra text."
         )
 
-    cached = get_cached(system=_sys, prompt=prompt)
+    semantic = {
+        'tool': 'lesson_plan',
+        'text': topic,
+        'fields': {'subject': subject, 'class': target_class, 'duration': duration, 'section': section},
+    }
+    cached = get_cached(system=_sys, prompt=prompt, **semantic)
     if cached is None:
         ok, err = deduct_credits(request.user, 'lesson_gen')
         if not ok:
             return JsonResponse(err, status=403)
 
     try:
-        raw_text = cached if cached is not None else call_and_cache(system=_sys, prompt=prompt, max_tokens=2000)
+        raw_text = cached if cached is not None else call_and_cache(
+            system=_sys, prompt=prompt, max_tokens=2000, **semantic,
+        )
         data = json.loads(raw_text)
     except Exception as exc:
         logger.warning('AI lesson plan generation failed: %s', exc)
@@ -2671,8 +2495,6 @@ def deck_api(request):
         system_prompt = (
             "You are an expert teaching assistant who creates rich, "
             "presentation-ready slide decks.\n\n"
-            f"Generate a complete teaching slide deck for {class_name} "
-            f"{subject_label} on the topic: \"{topic}\".\n\n"
             "Return a JSON object with EXACTLY this structure:\n"
             "{\n"
             "  \"slides\": [\n"
@@ -2697,13 +2519,20 @@ def deck_api(request):
             "- Every slide must have 3-4 bullets\n"
             "- Speaker notes are for the TEACHER"
         )
+        # Topic, class and subject stay out of the system prompt: it is part of
+        # the semantic cache's group key, which must be shared across topics.
         user_prompt = (
-            f"Create a complete presentation on '{topic}' for "
-            f"{class_name} {subject_label}. "
+            f"Generate a complete teaching slide deck for {class_name} "
+            f"{subject_label} on the topic: \"{topic}\". "
             "Fill every slide with real content ready to present."
         )
 
-        cached = get_cached(system=system_prompt, prompt=user_prompt)
+        semantic = {
+            'tool': 'slides',
+            'text': topic,
+            'fields': {'subject': subject_label, 'class': class_name},
+        }
+        cached = get_cached(system=system_prompt, prompt=user_prompt, **semantic)
         if cached is None:
             ok, err = deduct_credits(request.user, 'slide_gen')
             if not ok:
@@ -2711,7 +2540,7 @@ def deck_api(request):
 
         try:
             raw_text = cached if cached is not None else call_and_cache(
-                system=system_prompt, prompt=user_prompt, max_tokens=3000,
+                system=system_prompt, prompt=user_prompt, max_tokens=3000, **semantic,
             )
             result = json.loads(raw_text)
         except Exception as exc:
@@ -4121,13 +3950,12 @@ def licensure_dashboard(request):
     """Main dashboard for GTLE prep – stats, domain breakdown, recent quizzes."""
     profile = request.user.individual_profile
 
-    # Question bank stats (1 query: count + per-domain breakdown)
-    domain_counts = dict(
-        LicensureQuestion.objects.filter(profile=profile)
-        .values_list('domain')
-        .annotate(c=Count('id'))
-        .values_list('domain', 'c')
-    )
+    # Question bank stats — own + shared questions, per domain (2 queries)
+    pools = licensure_bank.pools(profile)
+    domain_counts = defaultdict(int)
+    for qs in pools.values():
+        for code, c in qs.order_by().values_list('domain').annotate(c=Count('id')):
+            domain_counts[code] += c
     total_qs = sum(domain_counts.values())
 
     # Attempt stats (1 query)
@@ -4141,13 +3969,14 @@ def licensure_dashboard(request):
             attempt__profile=profile,
             attempt__completed=True,
         )
-        .values('question__domain')
+        .annotate(domain=Coalesce('question__domain', 'bank_question__domain'))
+        .values('domain')
         .annotate(
             total=Count('id'),
             correct=Count('id', filter=Q(is_correct=True)),
         )
     )
-    perf_map = {row['question__domain']: row for row in perf_rows}
+    perf_map = {row['domain']: row for row in perf_rows}
     domain_perf = {}
     for code, label in LicensureQuestion.DOMAIN_CHOICES:
         stats = perf_map.get(code, {'total': 0, 'correct': 0})
@@ -4176,15 +4005,16 @@ def licensure_dashboard(request):
         )
         best = round(best_row) if best_row is not None else None
 
-    # Group questions by domain — single query, group in Python
-    all_domain_qs = (
-        LicensureQuestion.objects.filter(profile=profile)
-        .order_by('-created_at')
-    )
+    # Group questions by domain — own (newest first), then shared; group in Python
     domain_buckets = defaultdict(list)
-    for q in all_domain_qs.iterator():
-        if len(domain_buckets[q.domain]) < 50:
-            domain_buckets[q.domain].append(q)
+    shared = []
+    for name, order in (('own', '-created_at'), ('bank', 'pk')):
+        for q in pools[name].order_by(order).iterator():
+            if len(domain_buckets[q.domain]) < 50:
+                domain_buckets[q.domain].append(q)
+                if name == 'bank':
+                    shared.append(q)
+    licensure_bank.apply_overlays(profile, shared)
     questions_by_domain = {}
     for code, label in LicensureQuestion.DOMAIN_CHOICES:
         bucket = domain_buckets.get(code)
@@ -4221,14 +4051,10 @@ def licensure_quiz_start(request):
     num_q = min(int(request.POST.get('num_questions', 20)), 100)
     time_limit = int(request.POST.get('time_limit', 0))
 
-    qs = LicensureQuestion.objects.filter(profile=profile)
-    if domain:
-        qs = qs.filter(domain=domain)
-
-    # Random selection
-    question_ids = list(qs.order_by('?').values_list('id', flat=True)[:num_q])
+    # Random selection, stratified by domain across own + shared questions
+    picks = licensure_bank.stratified_sample(licensure_bank.pools(profile, domain), num_q)
 
-    if not question_ids:
+    if not picks:
         messages.warning(
             request,
             'No questions available. Generate some questions first using the AI Generator.',
@@ -4239,14 +4065,14 @@ def licensure_quiz_start(request):
         profile=profile,
         mode=mode,
         domain_filter=domain,
-        total_questions=len(question_ids),
+        total_questions=len(picks),
         time_limit_minutes=time_limit,
     )
 
     # Create answer stubs
     answers = [
-        LicensureAnswer(attempt=attempt, question_id=qid)
-        for qid in question_ids
+        LicensureAnswer(attempt=attempt, **{'bank_question_id' if pool == 'bank' else 'question_id': qid})
+        for pool, qid in picks
     ]
     LicensureAnswer.objects.bulk_create(answers)
 
@@ -4262,10 +4088,11 @@ def licensure_quiz_take(request, pk):
         LicensureQuizAttempt, pk=pk, profile=profile, completed=False,
     )
 
-    answer_objs = attempt.answers.select_related('question').order_by('pk')
+    answer_objs = list(attempt.answers.select_related('question', 'bank_question').order_by('pk'))
+    licensure_bank.apply_overlays(profile, [ans.bank_question for ans in answer_objs])
     questions_json = []
     for ans in answer_objs:
-        q = ans.question
+        q = ans.item
         questions_json.append({
             'answer_id': ans.pk,
             'question_id': q.pk,
@@ -4315,21 +4142,32 @@ def licensure_api(request):
             LicensureQuizAttempt, pk=attempt_id, profile=profile, completed=False,
         )
 
-        correct = 0
+        stubs = {
+            ans.pk: ans for ans in
+            attempt.answers.select_related('question', 'bank_question')
+        }
+        licensure_bank.apply_overlays(profile, [ans.bank_question for ans in stubs.values()])
+        marked = {}
         for ans_data in answers:
             try:
-                ans = LicensureAnswer.objects.select_related('question').get(
-                    pk=ans_data.get('answer_id'), attempt=attempt,
-                )
-            except LicensureAnswer.DoesNotExist:
+                ans = stubs[int(ans_data.get('answer_id'))]
+            except (KeyError, TypeError, ValueError):
                 continue
             selected = str(ans_data.get('selected', '')).upper()
             ans.selected_option = selected
-            ans.is_correct = (selected == ans.question.correct_option.upper())
+            ans.is_correct = (selected == ans.item.correct_option.upper())
             ans.time_spent_seconds = int(ans_data.get('time_spent', 0))
-            ans.save()
-            if ans.is_correct:
-                correct += 1
+            marked[ans.pk] = ans
+        LicensureAnswer.objects.bulk_update(
+            marked.values(), ['selected_option', 'is_correct', 'time_spent_seconds'],
+        )
+        correct = sum(ans.is_correct for ans in marked.values())
+        shared = [ans for ans in marked.values() if ans.bank_question_id]
+        licensure_bank.record_progress(
+            profile,
+            [ans.bank_question_id for ans in shared],
+            [ans.bank_question_id for ans in shared if ans.is_correct],
+        )
 
         from django.utils import timezone
         attempt.correct_count = correct
@@ -4347,6 +4185,23 @@ def licensure_api(request):
             'passed': attempt.passed,
         })
 
+    # ── Flag / hide / reword a shared bank question ──────────────────────
+    if action == 'bank_overlay':
+        question = get_object_or_404(LicensureBankQuestion, pk=data.get('question_id'))
+        overlay, _ = LicensureBankOverlay.objects.get_or_create(profile=profile, question=question)
+        for flag in ('flagged', 'hidden'):
+            if flag in data:
+                setattr(overlay, flag, bool(data[flag]))
+        if 'edits' in data:
+            overlay.edits = licensure_bank.clean_edits(data['edits'])
+        overlay.save()
+        return JsonResponse({
+            'ok': True,
+            'flagged': overlay.flagged,
+            'hidden': overlay.hidden,
+            'edits': overlay.edits,
+        })
+
     # ── AI Generate Questions ────────────────────────────────────────────
     if action == 'ai_generate':
         domain = data.get('domain', 'pedagogy')
@@ -4435,14 +4290,15 @@ def licensure_quiz_review(request, pk):
         LicensureQuizAttempt, pk=pk, profile=profile, completed=True,
     )
 
-    answer_objs = attempt.answers.select_related('question').order_by('pk')
+    answer_objs = list(attempt.answers.select_related('question', 'bank_question').order_by('pk'))
+    licensure_bank.apply_overlays(profile, [ans.bank_question for ans in answer_objs])
 
     # Domain breakdown
     domain_stats = {}
     for ans in answer_objs:
-        d = ans.question.domain
+        d = ans.item.domain
         if d not in domain_stats:
-            domain_stats[d] = {'label': ans.question.get_domain_display(), 'total': 0, 'correct': 0}
+            domain_stats[d] = {'label': ans.item.get_domain_display(), 'total': 0, 'correct': 0}
         domain_stats[d]['total'] += 1
         if ans.is_correct:
             domain_stats[d]['correct'] += 1
@@ -4481,38 +4337,17 @@ def licensure_history(request):
 @_require_tool('licensure-prep')
 @require_POST
 def licensure_load_bank(request):
-    """Load the built-in GTLE practice question bank into user's profile."""
-    from .gtle_question_bank import GTLE_QUESTION_BANK
-
+    """Make sure the shared GTLE practice bank is stored; every teacher draws from it."""
+    licensure_bank.sync_bank()
     profile = request.user.individual_profile
-    existing = LicensureQuestion.objects.filter(
-        profile=profile, source='practice',
-    ).count()
-
-    if existing >= len(GTLE_QUESTION_BANK):
-        messages.info(request, 'Practice question bank is already loaded.')
-        return redirect('individual:licensure_dashboard')
-
-    # Avoid duplicates — check by question_text
-    existing_texts = set(
-        LicensureQuestion.objects.filter(profile=profile)
-        .values_list('question_text', flat=True)
-    )
-
-    new_qs = []
-    for q in GTLE_QUESTION_BANK:
-        if q['question_text'] not in existing_texts:
-            new_qs.append(LicensureQuestion(profile=profile, **q))
-
-    if new_qs:
-        LicensureQuestion.objects.bulk_create(new_qs)
-        messages.success(
+    restored = profile.licensure_overlays.filter(hidden=True).update(hidden=False)
+    if restored:
+        messages.success(request, f'{restored} hidden practice questions restored to your question bank.')
+    else:
+        messages.info(
             request,
-            f'{len(new_qs)} GTLE practice questions loaded into your question bank!',
+            f'All {LicensureBankQuestion.objects.count()} GTLE practice questions are in your question bank.',
         )
-    else:
-        messages.info(request, 'All practice questions are already in your bank.')
-
     return redirect('individual:licensure_dashboard')
 
 
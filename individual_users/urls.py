@@ -1,7 +1,10 @@
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
 from individual_users import guest_views, views
-from individual_users import tool_views
+from school_system.startup import lazy_views
+
+# ~8k lines; imported when one of its views is first dispatched.
+tool_views = lazy_views('individual_users.tool_views')
 
 app_name = 'individual'
 
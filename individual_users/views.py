@@ -1,5 +1,3 @@
-import hashlib
-import hmac
 import json
 import logging
 import uuid
@@ -19,6 +17,8 @@ from django.views.decorators.http import require_POST
 
 from school_system.ratelimit import ratelimit
 
+from individual_users import metering
+from individual_users.metering import metered
 from individual_users.forms import (
     APIKeyForm,
     EmailSigninForm,
@@ -548,30 +548,13 @@ def send_individual_push(user, title, body, url='/u/dashboard/'):
 
     def _worker(_user_id, _title, _body, _url):
         try:
-            from pywebpush import webpush, WebPushException
-        except ImportError:
-            return
-        import json as _json
-        subs = IndividualPushSubscription.objects.filter(user_id=_user_id)
-        private_key = settings.VAPID_PRIVATE_KEY_PEM
-        claims = settings.VAPID_CLAIMS
-        payload = _json.dumps({'title': _title, 'body': _body, 'url': _url})
-        for sub in subs:
-            try:
-                webpush(
-                    subscription_info={
-                        'endpoint': sub.endpoint,
-                        'keys': {'p256dh': sub.p256dh, 'auth': sub.auth},
-                    },
-                    data=payload,
-                    vapid_private_key=private_key,
-                    vapid_claims=claims,
-                )
-            except WebPushException as ex:
-                if ex.response and ex.response.status_code in (404, 410):
-                    sub.delete()
-            except Exception:
-                pass
+            from announcements.push_engine import deliver_to_users
+            deliver_to_users(
+                [(_user_id, _title, _body, _url)],
+                model=IndividualPushSubscription,
+            )
+        except Exception:
+            pass
 
     threading.Thread(
         target=_worker,
@@ -1390,6 +1373,8 @@ def delete_account_view(request):
     from individual_users.models import IndividualCreditTransaction, IndividualCreditBalance
     IndividualCreditTransaction.objects.filter(user=user).delete()
     IndividualCreditBalance.objects.filter(user=user).delete()
+    from individual_users.credit_utils import LEDGER
+    LEDGER.forget(user.pk)
     OnboardingProgress.objects.filter(user=user).delete()
     UserSettings.objects.filter(user=user).delete()
     user_pk = user.pk
@@ -1683,10 +1668,16 @@ def api_keys_view(request):
     else:
         form = APIKeyForm()
 
-    keys = APIKey.objects.filter(profile=profile)
+    keys = list(APIKey.objects.filter(profile=profile))
+    series = metering.usage([k.id for k in keys])
+    for key in keys:
+        key.usage = series[key.id]
+        key.usage_peak = max([calls for _, calls in key.usage] + [1])
+        key.quota = key.daily_quota or metering.TIERS.get(key.tier, metering.TIERS['free'])['daily']
     ctx = {
         'form': form,
         'keys': keys,
+        'api_keys': keys,
         'new_key_raw': new_key_raw,
         'profile': profile,
         'role': profile.role,
@@ -1699,44 +1690,30 @@ def api_keys_view(request):
 def revoke_api_key(request):
     profile = request.user.individual_profile
     key_id = request.POST.get('key_id')
-    APIKey.objects.filter(profile=profile, id=key_id).update(is_active=False)
+    revoked = APIKey.objects.filter(profile=profile, id=key_id)
+    hashes = list(revoked.values_list('hashed_key', flat=True))
+    revoked.update(is_active=False)
+    metering.forget(hashes)
     return JsonResponse({'ok': True})
 
 
 # ── Lightweight API Endpoint (for testing keys) ─────────────────────────────
 
+@metered
 def api_status(request):
     """Public endpoint: verify an API key and return account info."""
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        return JsonResponse({'error': 'Missing Bearer token'}, status=401)
-
-    raw_key = auth_header[7:]
-    hashed = APIKey.hash_key(raw_key)
-
+    key = request.api_key
     _ensure_public_schema()
-    try:
-        key = APIKey.objects.select_related('profile__user').get(
-            hashed_key=hashed, is_active=True,
-        )
-    except APIKey.DoesNotExist:
-        return JsonResponse({'error': 'Invalid or revoked API key'}, status=401)
-
-    # Update usage
-    key.last_used_at = timezone.now()
-    key.calls_today += 1
-    key.calls_total += 1
-    key.save(update_fields=['last_used_at', 'calls_today', 'calls_total'])
-
     subs = list(
-        AddonSubscription.objects.filter(profile=key.profile, status='active')
+        AddonSubscription.objects.filter(profile_id=key['profile_id'], status='active')
         .values('addon_slug', 'plan')
     )
     return JsonResponse({
         'ok': True,
-        'user': key.profile.user.get_full_name(),
-        'email': key.profile.user.email,
-        'key_name': key.name,
+        'user': key['user'],
+        'email': key['email'],
+        'key_name': key['name'],
+        'tier': key['tier'],
         'active_addons': subs,
     })
 
@@ -1813,32 +1790,34 @@ def verify_addon_payment(request):
 @csrf_exempt
 @ratelimit(key='ip', rate='30/m')
 def paystack_individual_webhook(request):
-    """Paystack webhook for individual user addon payments. HMAC-verified."""
-    if request.method != 'POST':
-        return JsonResponse({'error': 'POST only'}, status=405)
+    """Paystack webhook for individual user addon payments. HMAC-verified; processed by ``handle_paystack_event``."""
+    from tenants import webhooks
+    return webhooks.receive(request, 'individual')
 
-    secret = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
-    sig = request.headers.get('X-Paystack-Signature', '')
-    expected = hmac.new(secret.encode(), request.body, hashlib.sha512).hexdigest()
-    if not hmac.compare_digest(sig, expected):
-        return JsonResponse({'error': 'Bad signature'}, status=403)
 
-    try:
-        payload = json.loads(request.body)
-    except (json.JSONDecodeError, ValueError):
-        return JsonResponse({'error': 'Bad JSON'}, status=400)
+def handle_paystack_event(data):
+    """Webhook handler (tenants.webhooks): route a charge by its reference prefix."""
+    from tenants.webhooks import Ignore
 
-    event = payload.get('event')
-    data = payload.get('data', {})
+    reference = data.get('reference', '')
+    if reference.startswith('IU-'):
+        _handle_individual_addon_payment(reference, data)
+    elif reference.startswith('IC-'):
+        _handle_individual_credit_payment(reference, data)
+    else:
+        raise Ignore('not an individual payment')
 
-    if event == 'charge.success':
-        reference = data.get('reference', '')
-        if reference.startswith('IU-'):
-            _handle_individual_addon_payment(reference, data)
-        elif reference.startswith('IC-'):
-            _handle_individual_credit_payment(reference, data)
 
-    return JsonResponse({'ok': True})
+def paystack_references(references):
+    """Webhook reconciler: which of ``references`` activated an addon or bought credits."""
+    from individual_users.models import IndividualCreditTransaction
+
+    _ensure_public_schema()
+    found = set(AddonSubscription.objects.filter(payment_reference__in=references)
+                .values_list('payment_reference', flat=True))
+    found.update(IndividualCreditTransaction.objects.filter(payment_reference__in=references)
+                 .values_list('payment_reference', flat=True))
+    return found
 
 
 def _handle_individual_addon_payment(reference, data):
@@ -0,0 +1,366 @@
+"""
+Live-session state store: hashes, presence and write-behind queues.
+
+Presentation sessions, live quizzes, Pulse check-ins and the study-group
+arena are polled by every student every few seconds.  Their current state
+is kept here rather than re-read from Postgres on each tick;
+``teachers.live`` and ``academics.arena_feed`` decide what is stored.
+
+  * **Backends**: hashes, sets and sorted sets on the cache's Redis, or an
+    in-process store under ``DEBUG``.  In production without Redis there is
+    no store (``store()`` returns None) and callers use the database —
+    per-worker memory would show each worker a different classroom.
+  * **Values** are JSON.  Keys live under ``live:<schema>:`` and expire
+    ``LIVE_STATE_TTL`` seconds after their session's last write.
+  * **Write-behind**: ``queue()`` adds entries to a session's ``pending``
+    hash.  ``drain()`` renames it to a batch under a lock, hands the batch
+    to an idempotent writer and deletes it once the write has committed,
+    so a batch left by a crash is replayed by the next ``drain()`` before
+    anything newer.
+  * **Dirty index**: sessions with pending entries are listed per schema,
+    so ``manage.py flush_live_state`` writes what no request got to.
+
+Usage::
+
+    from school_system import livestate
+
+    st = livestate.store()
+    if st is not None:
+        st.hset(livestate.key('quiz:AB12CD', 'answers'), {'7:Ama': ['B', True]})
+        livestate.queue(st, 'quiz:AB12CD', {'7:Ama': ['B', True]})
+        if livestate.due(st, 'quiz:AB12CD'):
+            livestate.drain(st, 'quiz:AB12CD', write_answers)
+
+Settings:
+  LIVE_STATE_BACKEND        'auto' (Redis when it is the cache, in-process
+                            under DEBUG, otherwise off), 'redis', 'local' or 'off'
+  LIVE_STATE_TTL            Seconds state outlives its last write (default 21600)
+  LIVE_STATE_FLUSH_SECONDS  Longest a pending entry waits for a write (default 30)
+  LIVE_STATE_FLUSH_BATCH    Pending entries that trigger a write at once (default 50)
+"""
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _enc(value):
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+def _dec(raw):
+    if raw is None:
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode()
+    return json.loads(raw)
+
+
+def _str(raw):
+    return raw.decode() if isinstance(raw, bytes) else raw
+
+
+# ── Backends ───────────────────────────────────────────────────
+
+class LocalStore:
+    """In-process hashes, sets and sorted sets — development only (one worker's view)."""
+
+    def __init__(self):
+        self._data = {}
+        self._expires = {}
+        self._lock = threading.RLock()
+
+    def _read(self, key, kind):
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline < time.time():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return self._data.get(key) or kind()
+
+    def _write(self, key, kind):
+        self._read(key, kind)
+        return self._data.setdefault(key, kind())
+
+    def hgetall(self, key):
+        with self._lock:
+            return {field: _dec(raw) for field, raw in self._read(key, dict).items()}
+
+    def hget(self, key, field):
+        with self._lock:
+            return _dec(self._read(key, dict).get(field))
+
+    def hset(self, key, mapping):
+        if mapping:
+            with self._lock:
+                self._write(key, dict).update({str(f): _enc(v) for f, v in mapping.items()})
+
+    def hsetnx(self, key, field, value):
+        with self._lock:
+            fields = self._write(key, dict)
+            if str(field) in fields:
+                return False
+            fields[str(field)] = _enc(value)
+            return True
+
+    def hlen(self, key):
+        with self._lock:
+            return len(self._read(key, dict))
+
+    def hincr(self, key, field, amount):
+        with self._lock:
+            fields = self._write(key, dict)
+            value = (_dec(fields.get(str(field))) or 0) + amount
+            fields[str(field)] = _enc(value)
+            return value
+
+    def zadd(self, key, member, score):
+        with self._lock:
+            self._write(key, dict)[str(member)] = score
+
+    def zsince(self, key, min_score):
+        with self._lock:
+            return [m for m, score in sorted(self._read(key, dict).items(), key=lambda i: i[1])
+                    if score >= min_score]
+
+    def zdrop(self, key, score):
+        with self._lock:
+            members = self._read(key, dict)
+            for m in [m for m, s in members.items() if s == score]:
+                del members[m]
+
+    def zkeep(self, key, n):
+        with self._lock:
+            members = self._read(key, dict)
+            for m, _ in sorted(members.items(), key=lambda i: i[1])[:-n or None]:
+                del members[m]
+
+    def sadd(self, key, member):
+        with self._lock:
+            self._write(key, set).add(str(member))
+
+    def srem(self, key, member):
+        with self._lock:
+            self._read(key, set).discard(str(member))
+
+    def scard(self, key):
+        with self._lock:
+            return len(self._read(key, set))
+
+    def smembers(self, key):
+        with self._lock:
+            return set(self._read(key, set))
+
+    def exists(self, key):
+        with self._lock:
+            return bool(self._read(key, dict))
+
+    def rename(self, src, dst):
+        with self._lock:
+            if not self._read(src, dict):
+                return False
+            self._data[dst] = self._data.pop(src)
+            self._expires[dst] = self._expires.pop(src, None)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+                self._expires.pop(key, None)
+
+    def expire(self, keys, seconds):
+        with self._lock:
+            deadline = time.time() + seconds
+            for key in keys:
+                if key in self._data:
+                    self._expires[key] = deadline
+
+
+class RedisStore:
+    """The same operations on the cache's Redis.
+
+    Always the write client, so a batch ``RENAME`` stays on one server.
+    """
+
+    @staticmethod
+    def _r():
+        return cache._cache.get_client(write=True)
+
+    @staticmethod
+    def _k(key):
+        return cache.make_key(key)
+
+    def hgetall(self, key):
+        return {_str(f): _dec(raw) for f, raw in self._r().hgetall(self._k(key)).items()}
+
+    def hget(self, key, field):
+        return _dec(self._r().hget(self._k(key), str(field)))
+
+    def hset(self, key, mapping):
+        if mapping:
+            self._r().hset(self._k(key), mapping={str(f): _enc(v) for f, v in mapping.items()})
+
+    def hsetnx(self, key, field, value):
+        return bool(self._r().hsetnx(self._k(key), str(field), _enc(value)))
+
+    def hlen(self, key):
+        return self._r().hlen(self._k(key))
+
+    def hincr(self, key, field, amount):
+        return float(self._r().hincrbyfloat(self._k(key), str(field), amount))
+
+    def zadd(self, key, member, score):
+        self._r().zadd(self._k(key), {str(member): score})
+
+    def zsince(self, key, min_score):
+        return [_str(m) for m in self._r().zrangebyscore(self._k(key), min_score, '+inf')]
+
+    def zdrop(self, key, score):
+        self._r().zremrangebyscore(self._k(key), score, score)
+
+    def zkeep(self, key, n):
+        """Keep the ``n`` highest-scored members."""
+        self._r().zremrangebyrank(self._k(key), 0, -n - 1)
+
+    def sadd(self, key, member):
+        self._r().sadd(self._k(key), str(member))
+
+    def srem(self, key, member):
+        self._r().srem(self._k(key), str(member))
+
+    def scard(self, key):
+        return self._r().scard(self._k(key))
+
+    def smembers(self, key):
+        return {_str(m) for m in self._r().smembers(self._k(key))}
+
+    def exists(self, key):
+        return bool(self._r().exists(self._k(key)))
+
+    def rename(self, src, dst):
+        from redis.exceptions import ResponseError
+        try:
+            self._r().rename(self._k(src), self._k(dst))
+        except ResponseError:  # no such key
+            return False
+        return True
+
+    def delete(self, *keys):
+        if keys:
+            self._r().delete(*(self._k(key) for key in keys))
+
+    def expire(self, keys, seconds):
+        pipe = self._r().pipeline(transaction=False)
+        for key in keys:
+            pipe.expire(self._k(key), int(seconds))
+        pipe.execute()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def store():
+    """The configured store, or None when live state should go to the database."""
+    name = getattr(settings, 'LIVE_STATE_BACKEND', 'auto')
+    if name == 'auto':
+        if 'redis' in settings.CACHES.get('default', {}).get('BACKEND', '').lower():
+            name = 'redis'
+        elif settings.DEBUG:
+            name = 'local'
+        else:
+            return None
+    if name == 'off':
+        return None
+    found = _stores.get(name)
+    if found is None:
+        with _stores_lock:
+            found = _stores.get(name)
+            if found is None:
+                found = _stores[name] = {'redis': RedisStore, 'local': LocalStore}[name]()
+    return found
+
+
+# ── Keys and write-behind ──────────────────────────────────────
+
+def key(session, *parts):
+    """``live:<schema>:<session>[:<part>…]``."""
+    return ':'.join(['live', getattr(connection, 'schema_name', 'public'), str(session), *map(str, parts)])
+
+
+def ttl():
+    return getattr(settings, 'LIVE_STATE_TTL', 21600)
+
+
+def touch(st, session, *parts):
+    """Push back the expiry of ``session``'s main hash, ``parts`` and its queue."""
+    names = [key(session)] + [key(session, p) for p in parts] + [key(session, 'pending'), key(session, 'batch')]
+    st.expire(names, ttl())
+
+
+def queue(st, session, entries):
+    """Add ``{field: value}`` to ``session``'s pending writes."""
+    st.hset(key(session, 'pending'), entries)
+    st.sadd(key('dirty'), session)
+
+
+def due(st, session):
+    """Whether ``session``'s pending writes should be written now — by size, or
+    once per ``LIVE_STATE_FLUSH_SECONDS``."""
+    if st.hlen(key(session, 'pending')) >= getattr(settings, 'LIVE_STATE_FLUSH_BATCH', 50):
+        return True
+    return cache.add(key(session, 'tick'), 1, getattr(settings, 'LIVE_STATE_FLUSH_SECONDS', 30))
+
+
+def dirty(st):
+    """Sessions of this schema with pending writes."""
+    return st.smembers(key('dirty'))
+
+
+def drain(st, session, write):
+    """Write one batch of ``session``'s pending entries with ``write(entries)``.
+
+    A batch left behind by a crashed drain is written first.  Returns the
+    number of entries written, or None if another drain holds the lock.
+    ``write`` runs in a transaction and must be idempotent: a batch is
+    deleted, and the lock released, only after the write commits, and a
+    drain in between writes it again.
+    """
+    lock = key(session, 'lock')
+    if not cache.add(lock, 1, 60):
+        return None
+    pending, batch = key(session, 'pending'), key(session, 'batch')
+    try:
+        if not st.exists(batch) and not st.rename(pending, batch):
+            st.srem(key('dirty'), session)
+            cache.delete(lock)
+            return 0
+        entries = st.hgetall(batch)
+        if entries:
+            with transaction.atomic():
+                write(entries)
+    except BaseException:
+        cache.delete(lock)
+        raise
+
+    def done():
+        try:
+            st.delete(batch)
+            if not st.exists(pending):
+                st.srem(key('dirty'), session)
+                if st.exists(pending):  # queued in between
+                    st.sadd(key('dirty'), session)
+        finally:
+            cache.delete(lock)
+
+    if connection.in_atomic_block:
+        transaction.on_commit(done)
+    else:
+        done()
+    return len(entries)
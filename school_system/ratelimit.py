@@ -1,28 +1,69 @@
-"""Lightweight rate-limiting decorator using Django's cache framework.
+"""Rate limiting shared by every throttled endpoint.
 
-Usage:
-    from school_system.ratelimit import ratelimit
+The ``ratelimit`` decorator, the login limiter and the hand-rolled AI
+limiters each did ``cache.get`` followed by ``cache.set``/``incr`` — a burst
+of parallel requests all read the same count and all got through — and
+with LocMemCache every Vercel instance kept its own counts.  All of them now
+go through ``check()``:
 
-    @ratelimit(key='ip', rate='5/m')    # 5 requests per minute per IP
-    @ratelimit(key='ip', rate='20/h')   # 20 requests per hour per IP
+  * **GCRA** (the token bucket expressed as one "theoretical arrival time"
+    per key): ``N/period`` lets a burst of N through, then one request per
+    ``period / N``.  Each check is a single atomic step on the backend —
+    a Lua script on Redis, an ``INSERT … ON CONFLICT DO UPDATE … WHERE``
+    on Postgres (``tenants.RateLimitBucket``, public schema) when Redis is
+    not configured, or a locked dict in-process for development.
+  * **Composite keys**: any of ``'tenant'``, ``'user'``, ``'ip'`` — or a
+    callable — plus the endpoint's scope (the view's dotted name unless
+    given), so one school's burst cannot spend another's allowance.
+  * **Rejections** answer 429 with ``Retry-After``, are logged, and are
+    counted per scope and hour (``rejections()``).
+  * If the shared backend fails, the error is logged and the check falls
+    back to in-process buckets — per-worker limits, as before, rather than
+    a site-wide outage or no limits at all.
+
+Usage::
+
+    from school_system.ratelimit import ratelimit, check
+
+    @ratelimit(key='ip', rate='5/m', method='POST')       # per IP and view
+    @ratelimit(key=('tenant', 'user'), rate='30/m')       # per school user
     def my_view(request):
         ...
+
+    decision = check(request, 'voice_vision_analyze', '6/m')
+    if not decision.allowed:
+        return decision.response({'error': 'Too many requests'})
+
+Settings:
+  RATELIMIT_BACKEND   'auto' (Redis when it is the cache, else Postgres),
+                      'redis', 'db' or 'local' (default 'auto')
 """
 
+import contextlib
 import functools
-import hashlib
+import logging
+import math
+import re
+import threading
+import time
 
+from django.conf import settings
 from django.core.cache import cache
 from django.http import JsonResponse
 
+logger = logging.getLogger(__name__)
+
+_RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])', re.IGNORECASE)
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
 
 def _parse_rate(rate_str):
-    """Parse '5/m', '20/h', '100/d' into (count, seconds)."""
-    count, period = rate_str.split('/')
-    count = int(count)
-    multipliers = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
-    seconds = multipliers.get(period[0].lower(), 60)
-    return count, seconds
+    """Parse '5/m', '20/h', '100/d', '5/300s' into (count, seconds)."""
+    match = _RATE_RE.match(rate_str.strip())
+    if not match:
+        raise ValueError(f'Invalid rate: {rate_str!r}')
+    count, multiple, period = match.groups()
+    return int(count), int(multiple or 1) * _PERIODS[period.lower()]
 
 
 def _get_client_ip(request):
@@ -33,50 +74,336 @@ def _get_client_ip(request):
     return request.META.get('REMOTE_ADDR', '0.0.0.0')
 
 
-def ratelimit(key='ip', rate='10/m', method=None, block=True):
+# ── Decisions ──────────────────────────────────────────────────
+
+class Decision:
+    """Outcome of one check: allowed or not, what is left, and when to retry."""
+
+    __slots__ = ('allowed', 'limit', 'remaining', 'retry_after')
+
+    def __init__(self, allowed, limit, remaining=0, retry_after=0.0):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+    def __bool__(self):
+        return self.allowed
+
+    def headers(self):
+        headers = {'X-RateLimit-Limit': str(self.limit), 'X-RateLimit-Remaining': str(self.remaining)}
+        if not self.allowed:
+            headers['Retry-After'] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+    def response(self, payload=None):
+        """A 429 ``JsonResponse`` carrying ``Retry-After``."""
+        response = JsonResponse(
+            payload or {'error': 'Too many requests. Please try again later.'}, status=429,
+        )
+        for name, value in self.headers().items():
+            response[name] = value
+        return response
+
+
+def gcra(tat, now, interval, window):
+    """One GCRA step.  Returns ``(allowed, new_tat, retry_after)``.
+
+    ``tat`` is the stored theoretical arrival time (None when unseen); a
+    request is allowed when the bucket would not run more than ``window``
+    seconds ahead of ``now``.  The Redis script and the SQL mirror this.
+    """
+    new_tat = max(tat or now, now) + interval
+    if new_tat - now > window:
+        return False, tat, new_tat - window - now
+    return True, new_tat, 0.0
+
+
+# ── Backends ───────────────────────────────────────────────────
+
+class LocalBackend:
+    """In-process buckets — development and tests only (not shared between workers)."""
+
+    def __init__(self):
+        self._tats = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, interval, window):
+        with self._lock:
+            now = time.time()
+            allowed, new_tat, retry_after = gcra(self._tats.get(key), now, interval, window)
+            if allowed:
+                self._tats[key] = new_tat
+            return allowed, (new_tat or now) - now, retry_after
+
+    def peek(self, key, interval, window):
+        allowed, _, retry_after = gcra(self._tats.get(key), time.time(), interval, window)
+        return allowed, retry_after
+
+    def reset(self, key):
+        with self._lock:
+            self._tats.pop(key, None)
+
+
+_REDIS_GCRA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+if new_tat - now > window then
+  return {0, tostring(tat - now), tostring(new_tat - window - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, tostring(new_tat - now), '0'}
+"""
+
+
+class RedisBackend:
+    """One Lua script per check, using Redis' clock, on the cache's Redis."""
+
+    def __init__(self):
+        self._scripts = {}
+
+    def _client(self, key):
+        cache_key = cache.make_and_validate_key(key)
+        client = cache._cache.get_client(cache_key, write=True)
+        script = self._scripts.get(id(client))
+        if script is None:
+            script = self._scripts[id(client)] = client.register_script(_REDIS_GCRA)
+        return cache_key, client, script
+
+    def hit(self, key, interval, window):
+        cache_key, client, script = self._client(key)
+        allowed, ahead, retry_after = script(keys=[cache_key], args=[interval, window], client=client)
+        return bool(int(allowed)), float(ahead), float(retry_after)
+
+    def peek(self, key, interval, window):
+        cache_key, client, _ = self._client(key)
+        tat = client.get(cache_key)
+        allowed, _, retry_after = gcra(float(tat) if tat else None, time.time(), interval, window)
+        return allowed, retry_after
+
+    def reset(self, key):
+        cache.delete(key)
+
+
+class DatabaseBackend:
+    """One upsert per check on ``tenants.RateLimitBucket`` in the public schema.
+
+    Runs on its own autocommit connection (one per thread, reused while it
+    is usable): under ``ATOMIC_REQUESTS`` the request's connection would
+    hold the bucket row lock until the view returned, and roll the hit back
+    if it raised.
+    """
+
+    PRUNE_EVERY = 500
+
+    def __init__(self):
+        self._hits = 0
+        self._local = threading.local()
+
+    @staticmethod
+    def _table():
+        from django_tenants.utils import get_public_schema_name
+        from tenants.models import RateLimitBucket
+        return f'"{get_public_schema_name()}"."{RateLimitBucket._meta.db_table}"'
+
+    @contextlib.contextmanager
+    def _cursor(self):
+        from django.db import DEFAULT_DB_ALIAS, connections
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = connections.create_connection(DEFAULT_DB_ALIAS)
+            # CONN_MAX_AGE=0 (serverless) would make every check reconnect;
+            # this connection serves nothing else, so keep it up to a minute.
+            max_age = conn.settings_dict.get('CONN_MAX_AGE') or 60
+            conn.settings_dict = dict(conn.settings_dict, CONN_MAX_AGE=max_age)
+            self._local.connection = conn
+        # Drops a connection past its max age or left broken; the next
+        # cursor() opens a fresh one.
+        conn.close_if_unusable_or_obsolete()
+        try:
+            with conn.cursor() as cursor:
+                yield cursor
+        except Exception:
+            conn.close()  # never reuse a connection that just failed
+            raise
+
+    def hit(self, key, interval, window):
+        table = self._table()
+        with self._cursor() as cursor:
+            # Allowed: the row is inserted/advanced and its new tat returned.
+            # Rejected: the WHERE fails, nothing is returned.
+            cursor.execute(f"""
+                INSERT INTO {table} AS b (key, tat)
+                SELECT %s, c.now + %s
+                FROM (SELECT EXTRACT(EPOCH FROM clock_timestamp())::float8 AS now) c
+                ON CONFLICT (key) DO UPDATE
+                SET tat = GREATEST(b.tat, EXCLUDED.tat - %s) + %s
+                WHERE GREATEST(b.tat, EXCLUDED.tat - %s) + %s - (EXCLUDED.tat - %s) <= %s
+                RETURNING tat - EXTRACT(EPOCH FROM clock_timestamp())::float8
+            """, [key, interval, interval, interval, interval, interval, interval, window])
+            row = cursor.fetchone()
+            if row is not None:
+                self._maybe_prune(cursor, table)
+                return True, row[0], 0.0
+            cursor.execute(
+                f'SELECT tat - EXTRACT(EPOCH FROM clock_timestamp())::float8 FROM {table} WHERE key = %s',
+                [key],
+            )
+            row = cursor.fetchone()
+        ahead = row[0] if row else window
+        return False, ahead, max(0.0, ahead + interval - window)
+
+    def _maybe_prune(self, cursor, table):
+        self._hits += 1
+        if self._hits % self.PRUNE_EVERY == 0:
+            # Buckets whose tat has passed are the same as no bucket.
+            cursor.execute(f'DELETE FROM {table} WHERE tat < EXTRACT(EPOCH FROM clock_timestamp()) - 60')
+
+    def peek(self, key, interval, window):
+        with self._cursor() as cursor:
+            cursor.execute(
+                f'SELECT tat, EXTRACT(EPOCH FROM clock_timestamp())::float8 FROM {self._table()} WHERE key = %s',
+                [key],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return True, 0.0
+        allowed, _, retry_after = gcra(row[0], row[1], interval, window)
+        return allowed, retry_after
+
+    def reset(self, key):
+        with self._cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self._table()} WHERE key = %s', [key])
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+_fallback = LocalBackend()
+
+
+def get_backend():
+    name = getattr(settings, 'RATELIMIT_BACKEND', 'auto')
+    if name == 'auto':
+        redis = 'redis' in settings.CACHES.get('default', {}).get('BACKEND', '').lower()
+        name = 'redis' if redis else 'db'
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = _backends[name] = {
+                    'redis': RedisBackend, 'db': DatabaseBackend, 'local': LocalBackend,
+                }[name]()
+    return backend
+
+
+# ── Keys, checks and metrics ───────────────────────────────────
+
+def _part(request, part):
+    if callable(part):
+        return str(part(request))
+    if part == 'ip':
+        return _get_client_ip(request)
+    if part == 'user':
+        user = getattr(request, 'user', None)
+        return f'u{user.pk}' if user is not None and user.is_authenticated else 'anon'
+    if part == 'tenant':
+        from django.db import connection
+        return getattr(connection, 'schema_name', 'public')
+    raise ValueError(f'Unknown rate-limit key part: {part!r}')
+
+
+def make_key(request, scope, key=('tenant', 'user', 'ip')):
+    parts = (key,) if isinstance(key, str) or callable(key) else key
+    return ':'.join(['rl', scope] + [_part(request, part) for part in parts])
+
+
+def _call(method, *args):
+    """Run ``method`` on the configured backend, or in-process if that fails."""
+    try:
+        return getattr(get_backend(), method)(*args)
+    except Exception:
+        logger.warning('Rate limiter backend unavailable — using in-process buckets', exc_info=True)
+        return getattr(_fallback, method)(*args)
+
+
+def _count_rejection(scope):
+    metric = f'rl:rejected:{scope}:{time.strftime("%Y%m%d%H", time.gmtime())}'
+    try:
+        if not cache.add(metric, 1, 60 * 60 * 48):
+            cache.incr(metric)
+    except Exception:
+        pass
+
+
+def rejections(scopes, hours=24):
+    """``{scope: rejected calls in the last ``hours`` hours}`` from the hourly counters."""
+    now = time.time()
+    stamps = [time.strftime('%Y%m%d%H', time.gmtime(now - h * 3600)) for h in range(hours)]
+    keys = {f'rl:rejected:{scope}:{stamp}': scope for scope in scopes for stamp in stamps}
+    totals = dict.fromkeys(scopes, 0)
+    for metric, count in cache.get_many(list(keys)).items():
+        totals[keys[metric]] += count
+    return totals
+
+
+def check(request, scope, rate, key=('tenant', 'user', 'ip')):
+    """Count one call against ``rate`` for ``scope`` and return the ``Decision``."""
+    limit, period = _parse_rate(rate)
+    interval = period / limit
+    bucket = make_key(request, scope, key)
+    allowed, ahead, retry_after = _call('hit', bucket, interval, period)
+    if allowed:
+        return Decision(True, limit, max(0, int((period - ahead) // interval)))
+    logger.warning('rate_limited scope=%s key=%s retry_after=%.1f', scope, bucket, retry_after)
+    _count_rejection(scope)
+    return Decision(False, limit, 0, retry_after)
+
+
+def peek(request, scope, rate, key=('tenant', 'user', 'ip')):
+    """The ``Decision`` the next call would get, without counting it."""
+    limit, period = _parse_rate(rate)
+    allowed, retry_after = _call('peek', make_key(request, scope, key), period / limit, period)
+    return Decision(allowed, limit, 0, retry_after)
+
+
+def reset(request, scope, key=('tenant', 'user', 'ip')):
+    _call('reset', make_key(request, scope, key))
+
+
+def ratelimit(key='ip', rate='10/m', method=None, block=True, scope=None):
     """Decorator that rate-limits a view.
 
     Args:
-        key: 'ip' (default) or 'user' (requires authentication).
-        rate: 'N/period' where period is s/m/h/d.
+        key: 'ip' (default), 'user', 'tenant', a callable(request), or a
+             tuple of these.
+        rate: 'N/period' where period is s/m/h/d, optionally with a
+              multiple ('5/15m').
         method: Limit only specific HTTP methods (e.g. 'POST'). None = all.
         block: If True, return 429 response. If False, set request.limited = True.
+        scope: Name the limit is counted under (default: the view's dotted path).
     """
-    max_requests, window = _parse_rate(rate)
+    _parse_rate(rate)  # fail at import time on a bad rate
 
     def decorator(view_func):
+        name = scope or f'{view_func.__module__}.{view_func.__name__}'
+
         @functools.wraps(view_func)
         def wrapper(request, *args, **kwargs):
             # Skip rate limiting for specific methods if configured
             if method and request.method != method.upper():
                 return view_func(request, *args, **kwargs)
 
-            # Build cache key
-            if key == 'user' and hasattr(request, 'user') and request.user.is_authenticated:
-                ident = str(request.user.pk)
-            else:
-                ident = _get_client_ip(request)
-
-            path_hash = hashlib.md5(
-                request.path.encode(), usedforsecurity=False,
-            ).hexdigest()[:8]
-            cache_key = f'rl:{path_hash}:{ident}'
-
-            # Check and increment
-            current = cache.get(cache_key, 0)
-            if current >= max_requests:
+            decision = check(request, name, rate, key)
+            if not decision.allowed:
                 if block:
-                    return JsonResponse(
-                        {'error': 'Too many requests. Please try again later.'},
-                        status=429,
-                    )
+                    return decision.response()
                 request.limited = True
-            else:
-                # Increment with TTL
-                try:
-                    cache.incr(cache_key)
-                except ValueError:
-                    cache.set(cache_key, 1, window)
 
             return view_func(request, *args, **kwargs)
         return wrapper
@@ -2,6 +2,7 @@
 Django settings for school_system project.
 """
 
+import json
 import os
 from pathlib import Path
 import dj_database_url
@@ -50,6 +51,25 @@ OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
 GEMINI_MODEL   = os.environ.get('GEMINI_MODEL', 'gemini-2.5-flash')
 AI_PROVIDER    = os.environ.get('AI_PROVIDER', 'openai')  # 'openai' | 'gemini'
+# Tutor prompt-context segments (academics.prompt_cache); signals invalidate early
+TUTOR_CONTEXT_CACHE_TTL = int(os.environ.get('TUTOR_CONTEXT_CACHE_TTL', 6 * 60 * 60))
+# Compiled grading scales kept per process (academics.grading), keyed by schema + version
+GRADING_SCALE_LRU_SIZE = int(os.environ.get('GRADING_SCALE_LRU_SIZE', 256))
+# Seconds a grading scale version is trusted; bounds staleness under per-process LocMemCache
+GRADING_SCALE_VERSION_TTL = int(os.environ.get('GRADING_SCALE_VERSION_TTL', 300))
+# Near-duplicate AI response cache (individual_users.ai_cache): per-tool minimum
+# cosine similarity, e.g. '{"lesson_plan": 0.9, "quiz": 0.95}'. Unset → module defaults.
+AI_SEMANTIC_CACHE_THRESHOLDS = json.loads(os.environ.get('AI_SEMANTIC_CACHE_THRESHOLDS', '{}'))
+# Anonymous full-page cache (accounts.page_cache) for landing/pricing/blog/sitemap.
+# PAGE_CACHE_VERSION should change per deploy so template edits are never served stale.
+PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'True') == 'True'
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', 300))
+PAGE_CACHE_STALE = int(os.environ.get('PAGE_CACHE_STALE', 3600))
+PAGE_CACHE_VERSION = os.environ.get('PAGE_CACHE_VERSION') or os.environ.get('VERCEL_GIT_COMMIT_SHA', '')
+# Cached AI credit balances (accounts.credit_ledger); ledger postings refresh them
+CREDIT_BALANCE_CACHE_TTL = int(os.environ.get('CREDIT_BALANCE_CACHE_TTL', 600))
+# ID-card render processes per web process (academics.id_cards); 0/1 renders inline
+ID_CARD_WORKERS = int(os.environ.get('ID_CARD_WORKERS', min(4, os.cpu_count() or 1)))
 
 # Paystack Payment Gateway
 PAYSTACK_SECRET_KEY = os.environ.get('PAYSTACK_SECRET_KEY', '')
@@ -61,6 +81,16 @@ PAYSTACK_CURRENCY  = os.environ.get('PAYSTACK_CURRENCY', 'GHS')
 AFRICASTALKING_USERNAME = os.environ.get('AFRICASTALKING_USERNAME') or os.environ.get('AT_USERNAME', 'sandbox')
 AFRICASTALKING_API_KEY  = os.environ.get('AFRICASTALKING_API_KEY') or os.environ.get('AT_API_KEY', '')
 AT_WHATSAPP_PRODUCT_ID  = os.environ.get('AT_WHATSAPP_PRODUCT_ID', '')
+# Batched SMS dispatch (announcements.sms_dispatch): 'africastalking' | 'fake'
+SMS_PROVIDER    = os.environ.get('SMS_PROVIDER', 'africastalking')
+SMS_BATCH_SIZE  = int(os.environ.get('SMS_BATCH_SIZE', 100))
+SMS_MAX_WORKERS = int(os.environ.get('SMS_MAX_WORKERS', 4))
+
+# Parent notification digests (announcements.digest)
+# 'immediate' — one push per parent per request/batch; 'daily' — in-app only,
+# push/SMS sent by the send_parent_digests command.
+PARENT_NOTIFICATION_DIGEST = os.environ.get('PARENT_NOTIFICATION_DIGEST', 'immediate')
+PARENT_DIGEST_SMS = os.environ.get('PARENT_DIGEST_SMS', '').lower() in ('1', 'true', 'yes', 'on')
 
 # Web Push / VAPID Configuration
 # Generate new keys: python -c "from py_vapid import Vapid; v=Vapid(); v.generate_keys(); ..."
@@ -72,6 +102,9 @@ VAPID_PRIVATE_KEY_PEM = os.environ.get('VAPID_PRIVATE_KEY_PEM', '')
 if VAPID_PRIVATE_KEY_PEM:
     VAPID_PRIVATE_KEY_PEM = VAPID_PRIVATE_KEY_PEM.replace('\\n', '\n')  # env vars store literal \n — convert to real newlines
 VAPID_CLAIMS = {'sub': os.environ.get('VAPID_ADMIN_EMAIL', 'mailto:admin@schoolpadi.xyz')}
+# Push fan-out (announcements.push_engine)
+PUSH_MAX_WORKERS = int(os.environ.get('PUSH_MAX_WORKERS', 16))
+PUSH_TTL = int(os.environ.get('PUSH_TTL', 86400))
 
 # =====================
 # ALLOWED HOSTS & CSRF
@@ -195,6 +228,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'school_system.csp_middleware.CSPMiddleware',
     'accounts.middleware.OnboardingAutoMarkMiddleware',
+    'announcements.middleware.ParentDigestMiddleware',
 ]
 
 ROOT_URLCONF = 'school_system.urls'
@@ -396,6 +430,68 @@ if STATIC_ROOT and os.environ.get('VERCEL') != '1':
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Streaming CSV/XLSX exports (accounts.exports): larger exports are built in
+# the background and offered as a download link.
+EXPORT_ASYNC_THRESHOLD = int(os.environ.get('EXPORT_ASYNC_THRESHOLD', 20000))
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+# Staged CSV imports (accounts.imports): rows per transaction, and seconds one
+# request imports before handing over to the resumable batch page.
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 500))
+IMPORT_TIME_BUDGET = int(os.environ.get('IMPORT_TIME_BUDGET', 20))
+# Rendered documents (accounts.documents): keep finished files in storage, and
+# items (questions, slides) above which an uncached document is built in the background.
+DOCUMENT_CACHE_ENABLED = os.environ.get('DOCUMENT_CACHE_ENABLED', 'True') == 'True'
+DOCUMENT_ASYNC_THRESHOLD = int(os.environ.get('DOCUMENT_ASYNC_THRESHOLD', 150))
+# XP leaderboards (academics.gamification): seconds a cached top-N lives
+# without an award in its class or school.
+LEADERBOARD_CACHE_SECONDS = int(os.environ.get('LEADERBOARD_CACHE_SECONDS', 300))
+# Notification bell and retention (announcements.inbox): cached bell lifetime,
+# and the ages at which read / unread notifications move to the archive.
+NOTIFICATION_BADGE_CACHE_SECONDS = int(os.environ.get('NOTIFICATION_BADGE_CACHE_SECONDS', 300))
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+NOTIFICATION_UNREAD_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_UNREAD_RETENTION_DAYS', 365))
+# Rate limiting (school_system.ratelimit): 'auto' uses Redis when it is the
+# cache and the public-schema bucket table otherwise; 'redis', 'db' or 'local'.
+RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', 'auto')
+# Live classroom state (school_system.livestate, teachers.live): 'auto' keeps it in
+# Redis when that is the cache (in-process under DEBUG, otherwise the database);
+# queued votes are written every FLUSH_SECONDS or once FLUSH_BATCH are waiting.
+LIVE_STATE_BACKEND = os.environ.get('LIVE_STATE_BACKEND', 'auto')
+LIVE_STATE_TTL = int(os.environ.get('LIVE_STATE_TTL', 21600))
+LIVE_STATE_FLUSH_SECONDS = int(os.environ.get('LIVE_STATE_FLUSH_SECONDS', 30))
+LIVE_STATE_FLUSH_BATCH = int(os.environ.get('LIVE_STATE_FLUSH_BATCH', 50))
+LIVE_PRESENCE_SECONDS = int(os.environ.get('LIVE_PRESENCE_SECONDS', 10))
+# Study-group arena: messages kept per room in the live-state store (academics.arena_feed).
+ARENA_FEED_SIZE = int(os.environ.get('ARENA_FEED_SIZE', 100))
+# Scheduled jobs (tenants.scheduler): schemas run at once, and how long run
+# history and idempotency claims are kept.
+SCHEDULER_CONCURRENCY = int(os.environ.get('SCHEDULER_CONCURRENCY', 4))
+SCHEDULER_HISTORY_DAYS = int(os.environ.get('SCHEDULER_HISTORY_DAYS', 30))
+SCHEDULER_CLAIM_DAYS = int(os.environ.get('SCHEDULER_CLAIM_DAYS', 90))
+
+# Database backups (tenants.backups): dumps go to private storage, never MEDIA_ROOT.
+# BACKUP_STORAGE takes a dotted storage class (e.g. an S3 backend); default is BACKUP_ROOT on disk.
+BACKUP_STORAGE = os.environ.get('BACKUP_STORAGE', '')
+BACKUP_ROOT = os.environ.get('BACKUP_ROOT', str(BASE_DIR / 'backups'))
+BACKUP_CONCURRENCY = int(os.environ.get('BACKUP_CONCURRENCY', 1))
+BACKUP_RETENTION_DAYS = int(os.environ.get('BACKUP_RETENTION_DAYS', 30))
+BACKUP_KEEP_MIN = int(os.environ.get('BACKUP_KEEP_MIN', 3))
+BACKUP_NIGHTLY = os.environ.get('BACKUP_NIGHTLY', '').lower() in ('1', 'true', 'yes', 'on')
+
+# Payment webhooks (tenants.webhooks): automatic retries before an event waits for
+# `manage.py replay_webhooks`, and how long processed events stay in the ledger.
+WEBHOOK_MAX_ATTEMPTS = int(os.environ.get('WEBHOOK_MAX_ATTEMPTS', 6))
+WEBHOOK_RETENTION_DAYS = int(os.environ.get('WEBHOOK_RETENTION_DAYS', 180))
+
+# API-key metering (individual_users.metering): lookup cache lifetime, counter backend
+# ('auto' = Redis when it is the cache, else per-process memory) and in-memory flush interval.
+API_KEY_CACHE_SECONDS = int(os.environ.get('API_KEY_CACHE_SECONDS', 120))
+API_METER_BACKEND = os.environ.get('API_METER_BACKEND', 'auto')
+API_METER_FLUSH_SECONDS = int(os.environ.get('API_METER_FLUSH_SECONDS', 60))
+
+# Cold start (school_system.startup): p95 boot time `manage.py profile_startup` accepts; 0 = no limit.
+STARTUP_BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', 0))
+
 # Cloudinary cloud name (always available for upload widget)
 CLOUDINARY_CLOUD_NAME = os.environ.get('CLOUDINARY_CLOUD_NAME', '')
 
@@ -503,6 +599,11 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'School Admin <noreply@school.com>')
 
+# Bulk email (communication.bulk_mail) — Brevo relay throttling
+EMAIL_BULK_CHUNK_SIZE = int(os.environ.get('EMAIL_BULK_CHUNK_SIZE', 50))
+EMAIL_BULK_CHUNK_PAUSE = float(os.environ.get('EMAIL_BULK_CHUNK_PAUSE', 1.0))
+EMAIL_BULK_CONNECTIONS = int(os.environ.get('EMAIL_BULK_CONNECTIONS', 2))
+
 # =====================
 # SESSION PERSISTENCE
 # =====================
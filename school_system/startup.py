@@ -0,0 +1,262 @@
+"""
+Cold-start helpers: lazy URL-conf views, a startup profile and build-time assets.
+
+On Vercel every cold start imports the URL conf before the first response,
+and with it every view module it names — ``teachers.views`` and
+``individual_users.tool_views`` alone are ~16k lines — plus whatever those
+import at module level.  The function's filesystem is read-only, so a module
+without shipped bytecode is compiled again on every cold start.
+
+  * **Lazy views**: ``views = lazy_views('teachers.views')`` stands in for
+    the module in a ``urls.py``.  ``views.teacher_list`` is a ``LazyView``
+    that imports ``teachers.views`` the first time one of its views is
+    dispatched.  Function views only; ``unresolved_views()`` (run by
+    ``manage.py profile_startup``) catches a misspelt name.
+  * **Heavy imports** — ReportLab, python-docx/pptx, PIL, OpenAI, pywebpush,
+    huggingface_hub and the question banks — are imported inside the
+    functions that use them.  ``COLD_FORBIDDEN`` lists what must stay out
+    of startup.
+  * **Profile**: ``profile()`` boots the WSGI app and loads the URL conf in
+    fresh interpreters, timing each run (p50/p95), and attributes import
+    time with ``-X importtime``.  ``manage.py profile_startup`` prints it
+    and fails on a forbidden import, a p95 over ``STARTUP_BUDGET_MS`` or a
+    regression against a saved baseline.
+  * **Build assets**: ``compile_bytecode()`` writes hash-checked ``.pyc``
+    files (valid whatever mtimes the deploy gives the sources), and
+    ``write_manifest()`` records every migration so the WSGI start-up hook
+    checks for pending ones with one query instead of importing all
+    migration modules.  ``manage.py build_startup_assets`` runs both.
+
+Usage::
+
+    # teachers/urls.py
+    from school_system.startup import lazy_views
+
+    views = lazy_views('teachers.views')
+    urlpatterns = [path('', views.teacher_list, name='teacher_list')]
+
+Settings:
+  STARTUP_BUDGET_MS   p95 boot time ``profile_startup`` accepts (default 0: no limit)
+"""
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from importlib import import_module
+from pathlib import Path
+
+from django.conf import settings
+
+# Modules that must not be imported before the first request.
+COLD_FORBIDDEN = (
+    'reportlab', 'pptx', 'docx', 'PIL', 'qrcode', 'openai', 'pywebpush', 'huggingface_hub',
+    'teachers.views', 'individual_users.tool_views', 'individual_users.seed_content',
+    'individual_users.gtle_question_bank', 'individual_users.promotion_question_bank',
+    'teachers.math_question_bank', 'teachers.english_question_bank', 'teachers.science_question_bank',
+    'teachers.social_studies_question_bank', 'teachers.rme_question_bank',
+)
+
+MANIFEST = Path(settings.BASE_DIR) / 'school_system' / 'migrations.json'
+
+# Directories compile_bytecode() skips.
+_SKIP_DIRS = re.compile(r'[/\\](\.[^/\\]+|node_modules|staticfiles|media|wheels|backups)([/\\]|$)')
+
+
+# ── Lazy views ─────────────────────────────────────────────────
+
+class LazyView:
+    """A function view imported on first dispatch; see ``lazy_views``."""
+
+    # Markers Django reads from a view when dispatching it; they load the view.
+    _markers = frozenset({'_non_atomic_requests'})
+
+    def __init__(self, module, name):
+        self.__module__ = module
+        self.__name__ = self.__qualname__ = name
+        self._view = None
+
+    def load(self):
+        if self._view is None:
+            self._view = getattr(import_module(self.__module__), self.__name__)
+        return self._view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.load()(request, *args, **kwargs)
+
+    def __getattr__(self, attr):
+        # Public attributes (csrf_exempt …) come from the real view.  Private
+        # and dunder probes — coroutine checks, functools.wraps, view_class —
+        # happen while the URL conf loads and must not import the module.
+        if attr in self._markers or not (attr.startswith('_') or attr.startswith('view_')):
+            return getattr(self.load(), attr)
+        raise AttributeError(attr)
+
+    def __repr__(self):
+        return f'<LazyView {self.__module__}.{self.__name__}>'
+
+
+class lazy_views:
+    """Stands in for a views module in ``urls.py``; every attribute is a ``LazyView``."""
+
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return LazyView(self._module, name)
+
+
+def unresolved_views(resolver=None):
+    """Import every lazy view in the URL conf; returns the dotted names that do not exist."""
+    from django.urls import URLResolver, get_resolver
+
+    missing = []
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+                continue
+            view = getattr(pattern.callback, '__wrapped__', pattern.callback)
+            if isinstance(view, LazyView):
+                try:
+                    view.load()
+                except (ImportError, AttributeError):
+                    missing.append(f'{view.__module__}.{view.__name__}')
+
+    walk((resolver or get_resolver()).url_patterns)
+    return sorted(set(missing))
+
+
+# ── Profile ────────────────────────────────────────────────────
+
+# What a cold start does before its first response: boot WSGI, load the URL conf.
+_BOOT = (
+    "import json, os, sys, time\n"
+    "t = time.perf_counter()\n"
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'school_system.settings')\n"
+    "from django.core.wsgi import get_wsgi_application\n"
+    "get_wsgi_application()\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+    "print(json.dumps({'ms': (time.perf_counter() - t) * 1000, 'modules': sorted(sys.modules)}))\n"
+)
+
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+def _boot(importtime=False):
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', _BOOT]
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'school_system.settings'))
+    proc = subprocess.run(args, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=300)
+    if proc.returncode:
+        raise RuntimeError(f'Boot failed:\n{proc.stderr[-2000:]}')
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def parse_importtime(text):
+    """``-X importtime`` output as ``[(module, self_us, cumulative_us, depth)]`` in report order."""
+    rows = []
+    for line in text.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            rows.append((name, int(own), int(cumulative), len(indent) // 2))
+    return rows
+
+
+def project_packages():
+    base = Path(settings.BASE_DIR)
+    return {p.name for p in base.iterdir() if (p / '__init__.py').exists()}
+
+
+def attribute(rows, packages):
+    """Split import time by top-level package and find what project code pulls in.
+
+    Returns ``(by_package, edges)``: self time per top-level package, and
+    ``(module, cumulative_us, importer)`` for each third-party import made
+    directly by a project module.  A child is reported before its parent,
+    so the importer is the next row with a smaller depth.
+    """
+    by_package = defaultdict(int)
+    edges = []
+    for i, (name, own, cumulative, depth) in enumerate(rows):
+        by_package[name.partition('.')[0]] += own
+        if name.partition('.')[0] in packages:
+            continue
+        parent = next((r[0] for r in rows[i + 1:] if r[3] < depth), None)
+        if parent and parent.partition('.')[0] in packages:
+            edges.append((name, cumulative, parent))
+    edges.sort(key=lambda e: -e[1])
+    return dict(by_package), edges
+
+
+def profile(runs=5):
+    """Boot ``runs`` fresh interpreters plus one under ``-X importtime``.
+
+    Returns a dict: ``samples`` (ms per run), ``p50``/``p95``, ``modules``
+    (count), ``forbidden`` (COLD_FORBIDDEN modules that were imported),
+    ``by_package`` (ms of import time per top-level package) and ``edges``
+    (third-party imports made by project modules, heaviest first).
+    """
+    samples, modules = [], []
+    for _ in range(max(runs, 1)):
+        result, _ = _boot()
+        samples.append(round(result['ms'], 1))
+        modules = result['modules']
+    _, stderr = _boot(importtime=True)
+    by_package, edges = attribute(parse_importtime(stderr), project_packages())
+    loaded = set(modules)
+    return {
+        'samples': samples,
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'modules': len(modules),
+        'forbidden': sorted(m for m in COLD_FORBIDDEN if m in loaded),
+        'by_package': {k: round(v / 1000, 1) for k, v in sorted(by_package.items(), key=lambda kv: -kv[1])},
+        'edges': [(m, round(us / 1000, 1), parent) for m, us, parent in edges],
+    }
+
+
+# ── Build assets ───────────────────────────────────────────────
+
+def compile_bytecode(root=None):
+    """Compile the project's sources to hash-checked ``.pyc``; returns True when all compiled."""
+    import compileall
+    import py_compile
+
+    return bool(compileall.compile_dir(
+        str(root or settings.BASE_DIR), quiet=1, workers=0, rx=_SKIP_DIRS,
+        invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH,
+    ))
+
+
+def write_manifest(path=MANIFEST):
+    """Record every migration in the code base; returns how many."""
+    from django.db.migrations.loader import MigrationLoader
+
+    nodes = sorted(MigrationLoader(None, ignore_no_migrations=True).graph.nodes)
+    Path(path).write_text(json.dumps(nodes))
+    return len(nodes)
+
+
+def pending_migrations(connection, path=MANIFEST):
+    """Whether ``connection`` lacks a migration in the manifest; None without a manifest."""
+    try:
+        expected = {tuple(node) for node in json.loads(Path(path).read_text())}
+    except (OSError, ValueError):
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT app, name FROM django_migrations')
+        applied = set(cursor.fetchall())
+    return bool(expected - applied)
@@ -11,6 +11,7 @@ from individual_users import seo_views
 import os
 from django.http import FileResponse, Http404
 from individual_users.urls import teacher_urlpatterns
+from accounts.page_cache import anonymous_page_cache
 
 
 BLOG_POSTS = {
@@ -33,6 +34,7 @@ BLOG_POSTS = {
 }
 
 
+@anonymous_page_cache()
 def blog_post_view(request, slug):
     from django.shortcuts import render
     post = BLOG_POSTS.get(slug)
@@ -41,6 +43,11 @@ def blog_post_view(request, slug):
     return render(request, post['template'], {'post': post})
 
 
+def _cached_page(template_name):
+    """Static marketing page served from the anonymous page cache."""
+    return anonymous_page_cache()(TemplateView.as_view(template_name=template_name))
+
+
 def sw_view(request):
     """Serve sw.js from the root path with Service-Worker-Allowed: / header."""
     # Try static source first, then staticfiles dir
@@ -72,19 +79,19 @@ urlpatterns = [
     path('sitemap/', seo_views.visual_sitemap, name='sitemap'),
     path('sw.js', sw_view, name='sw'),
     path('offline/', TemplateView.as_view(template_name='offline.html'), name='offline'),
-    path('about/', TemplateView.as_view(template_name='home/about.html'), name='about'),
-    path('contact/', TemplateView.as_view(template_name='home/contact.html'), name='contact'),
+    path('about/', _cached_page('home/about.html'), name='about'),
+    path('contact/', _cached_page('home/contact.html'), name='contact'),
     path('contact/submit/', account_views.contact_submit, name='contact_submit'),
-    path('privacy/', TemplateView.as_view(template_name='home/privacy.html'), name='privacy'),
-    path('terms/', TemplateView.as_view(template_name='home/terms.html'), name='terms'),
+    path('privacy/', _cached_page('home/privacy.html'), name='privacy'),
+    path('terms/', _cached_page('home/terms.html'), name='terms'),
     # Blog
-    path('blog/', TemplateView.as_view(template_name='blog/index.html'), name='blog_index'),
+    path('blog/', _cached_page('blog/index.html'), name='blog_index'),
     path('blog/<slug:slug>/', blog_post_view, name='blog_post'),
     # SEO: city landing pages, comparison, and pricing alias
     path('schools-in/', account_views.city_index, name='city_index'),
     path('schools-in/<slug:city_slug>/', account_views.city_landing, name='city_landing'),
-    path('compare/', TemplateView.as_view(template_name='home/compare.html'), name='compare'),
-    path('nacca-resources/', TemplateView.as_view(template_name='home/nacca_resources.html'), name='nacca_resources'),
+    path('compare/', _cached_page('home/compare.html'), name='compare'),
+    path('nacca-resources/', _cached_page('home/nacca_resources.html'), name='nacca_resources'),
     path('pricing/', tenant_views.pricing_page, name='pricing'),
     path('admin/', admin.site.urls),
     path('pwa-launch/', account_views.pwa_launch, name='pwa_launch'),
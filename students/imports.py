@@ -0,0 +1,292 @@
+"""
+Student and grade-sheet importers for the staged CSV pipeline (accounts.imports).
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.imports import (
+    CodeAllocator, Importer, UsernameAllocator, allocate_email, is_blank, pick, username_base,
+)
+
+
+def _class_ids_by_name():
+    """``{lowercased name: class id}``, current academic year winning ties."""
+    from academics.models import Class
+    by_name = {}
+    rows = Class.objects.values_list('name', 'id', 'academic_year__is_current').order_by('academic_year__is_current')
+    for name, class_id, _is_current in rows:
+        by_name[name.strip().lower()] = class_id
+    return by_name
+
+
+class StudentImporter(Importer):
+    noun = 'student'
+
+    def validate(self, batch, rows):
+        from accounts.models import User
+        from parents.models import Parent
+        from students.models import Student
+
+        parsed = []
+        for row in rows:
+            d = row.data
+            parsed.append({
+                'first_name': pick(d, 'First Name', 'first_name'),
+                'last_name': pick(d, 'Last Name', 'last_name'),
+                'admission_no': pick(d, 'Admission No', 'admission_number', 'admission_no').replace(' ', ''),
+                'class_name': pick(d, 'Class', 'class_name', 'class'),
+                'roll_no': pick(d, 'Roll No', 'roll_no', 'roll_number'),
+                'email': pick(d, 'Email', 'email'),
+                'emergency_contact': pick(d, 'Emergency Contact', 'emergency_contact'),
+                'age': pick(d, 'age', 'Age'),
+                'parent_email': pick(d, 'Parent Email', 'parent_email').lower(),
+            })
+
+        # ── One query per lookup ──
+        classes = _class_ids_by_name()
+        default_class_id = batch.options.get('default_class_id')
+        provided = {p['admission_no'] for p in parsed if not is_blank(p['admission_no'])}
+        taken_numbers = set(
+            Student.objects.filter(Q(admission_number__in=provided) | Q(admission_number__startswith='ADM'))
+            .values_list('admission_number', flat=True)
+        ) | self.reserved(batch, rows, 'admission_number')
+        usernames = UsernameAllocator(
+            [username_base(p['first_name'], p['last_name']) for p in parsed if p['first_name']],
+            reserved=self.reserved(batch, rows, 'username'),
+        )
+        emails = set(
+            User.objects.filter(email__in={p['email'] for p in parsed if not is_blank(p['email'])})
+            .values_list('email', flat=True)
+        ) | self.reserved(batch, rows, 'email')
+        parent_ids = dict(
+            Parent.objects.filter(user__email__in={p['parent_email'] for p in parsed if p['parent_email']})
+            .values_list('user__email', 'id')
+        )
+        generated = CodeAllocator('ADM', taken_numbers)
+
+        for row, p in zip(rows, parsed):
+            if not p['first_name']:
+                row.error = 'Missing first name'
+                continue
+
+            class_id = None
+            if p['class_name']:
+                class_id = classes.get(p['class_name'].lower())
+                if class_id is None and not default_class_id:
+                    row.error = f"Class '{p['class_name']}' not found"
+                    continue
+            class_id = class_id or default_class_id
+            if not class_id:
+                row.error = 'No class specified and no default class selected'
+                continue
+
+            if not is_blank(p['admission_no']):
+                admission_number = p['admission_no']
+                if admission_number in taken_numbers:
+                    row.error = f"Admission number '{admission_number}' already exists"
+                    continue
+                taken_numbers.add(admission_number)
+            else:
+                admission_number = generated.allocate()
+                if not admission_number:
+                    row.error = 'Could not generate unique admission number'
+                    continue
+
+            try:
+                age = int(p['age']) if p['age'] else 10
+            except ValueError:
+                age = 10
+            username = usernames.allocate(username_base(p['first_name'], p['last_name']))
+            roll = p['roll_no']
+            row.resolved = {
+                'username': username,
+                'first_name': p['first_name'],
+                'last_name': p['last_name'],
+                'email': allocate_email(p['email'], username, emails),
+                'admission_number': admission_number,
+                'class_id': class_id,
+                'date_of_birth': date(max(1900, date.today().year - age), 1, 1).isoformat(),
+                'emergency_contact': 'N/A' if is_blank(p['emergency_contact']) else p['emergency_contact'],
+                'roll_number': roll if roll.isdigit() else '',
+                'parent_id': parent_ids.get(p['parent_email']),
+            }
+
+    def commit(self, batch, rows):
+        from accounts.models import User
+        from parents.models import Parent
+        from students.models import Student
+
+        resolved = [row.resolved for row in rows]
+        users = User.objects.bulk_create([
+            User(
+                username=r['username'],
+                first_name=r['first_name'],
+                last_name=r['last_name'],
+                email=r['email'],
+                user_type='student',
+                password=make_password(None),
+            )
+            for r in resolved
+        ])
+        today = date.today()
+        students = Student.objects.bulk_create([
+            Student(
+                user=user,
+                admission_number=r['admission_number'],
+                date_of_birth=date.fromisoformat(r['date_of_birth']),
+                gender='male',  # Default, can be updated later
+                date_of_admission=today,
+                current_class_id=r['class_id'],
+                emergency_contact=r['emergency_contact'],
+                roll_number=r['roll_number'],
+            )
+            for user, r in zip(users, resolved)
+        ])
+        Through = Parent.children.through
+        Through.objects.bulk_create([
+            Through(parent_id=r['parent_id'], student_id=student.pk)
+            for student, r in zip(students, resolved) if r.get('parent_id')
+        ], ignore_conflicts=True)
+
+
+class GradeImporter(Importer):
+    """Grade-sheet uploads: creates or updates one Grade per student/subject/term."""
+    noun = 'grade'
+
+    def validate(self, batch, rows):
+        from academics.models import Subject
+        from students.models import Student
+        from students.utils import normalize_term
+
+        parsed = []
+        for row in rows:
+            d = row.data
+            parsed.append((
+                pick(d, 'Admission No.', 'Admission No', 'admission_number'),
+                pick(d, 'Subject', 'subject'),
+                (pick(d, 'Term', 'term') or 'first').lower(),
+                pick(d, 'Class Score (/30)', 'class_score') or '0',
+                pick(d, 'Exam Score (/70)', 'exams_score') or '0',
+            ))
+
+        students = dict(
+            Student.objects.filter(admission_number__in={p[0] for p in parsed if p[0]})
+            .values_list('admission_number', 'id')
+        )
+        subjects = {}
+        for subject_id, name in Subject.objects.values_list('id', 'name').order_by('-id'):
+            subjects[name.strip().lower()] = subject_id
+
+        for row, (admission_no, subject_name, raw_term, class_raw, exam_raw) in zip(rows, parsed):
+            if not admission_no or not subject_name:
+                row.error = 'Missing admission number or subject name'
+                continue
+            if admission_no not in students:
+                row.error = f'Student "{admission_no}" not found'
+                continue
+            if subject_name.lower() not in subjects:
+                row.error = f'Subject "{subject_name}" not found'
+                continue
+            try:
+                class_score, exams_score = Decimal(class_raw), Decimal(exam_raw)
+                if not (class_score.is_finite() and exams_score.is_finite()):
+                    raise InvalidOperation
+            except InvalidOperation:
+                row.error = f'Scores must be numbers (got "{class_raw}", "{exam_raw}")'
+                continue
+            row.resolved = {
+                'student_id': students[admission_no],
+                'subject_id': subjects[subject_name.lower()],
+                'term': normalize_term(raw_term) or 'first',
+                'class_score': str(class_score),
+                'exams_score': str(exams_score),
+            }
+
+    def commit(self, batch, rows):
+        from academics.analytics import grade_scope, mark_stale
+        from academics.models import Subject
+        from academics.prompt_cache import bump
+        from announcements.digest import parent_digest
+        from academics.grading import get_scale
+        from students.models import Grade, Student
+        from students.signals import grade_audit_entry, notify_parent_grade
+        from tenants.subscription_models import AuditLog
+
+        year_id = batch.options['academic_year_id']
+        # Later rows for the same student/subject/term win, as before.
+        wanted = {}
+        for row in rows:
+            r = row.resolved
+            wanted[(r['student_id'], r['subject_id'], r['term'])] = r
+
+        student_ids = {k[0] for k in wanted}
+        students = Student.objects.select_related('user').in_bulk(student_ids)
+        subjects = Subject.objects.in_bulk({k[1] for k in wanted})
+        existing = {
+            (g.student_id, g.subject_id, g.term): g
+            for g in Grade.objects.filter(
+                academic_year_id=year_id, exam_type__isnull=True,
+                student_id__in=student_ids,
+                subject_id__in={k[1] for k in wanted},
+                term__in={k[2] for k in wanted},
+            )
+        }
+
+        scale = get_scale()
+        now = timezone.now()
+        created, updated = [], []
+        for key, r in wanted.items():
+            grade = existing.get(key)
+            if grade is None:
+                grade = Grade(
+                    student_id=key[0], subject_id=key[1], term=key[2],
+                    academic_year_id=year_id, exam_type=None,
+                )
+                created.append(grade)
+            else:
+                updated.append(grade)
+            grade.class_score = Decimal(r['class_score'])
+            grade.exams_score = Decimal(r['exams_score'])
+            grade.apply_scores(scale)
+            grade.updated_at = now
+            grade.student = students[key[0]]
+            grade.subject = subjects[key[1]]
+
+        Grade.objects.bulk_create(created, batch_size=500)
+        Grade.objects.bulk_update(
+            updated,
+            ['class_score', 'exams_score', 'total_score', 'grade', 'remarks', 'updated_at'],
+            batch_size=500,
+        )
+
+        # Rankings once per subject/class/term instead of once per grade.
+        groups = defaultdict(set)
+        for grade in created + updated:
+            if grade.student.current_class_id:
+                groups[(grade.subject_id, grade.term)].add(grade.student.current_class_id)
+        for (subject_id, term), class_ids in groups.items():
+            for class_id in class_ids:
+                Grade.rerank(subject_id, year_id, term, class_id)
+
+        # Side effects of the per-row post_save receivers, in bulk.
+        mark_stale('grades', [grade_scope(year_id, term) for term in {k[2] for k in wanted}])
+        for student_id in student_ids:
+            bump('grades', student_id)
+        try:
+            with transaction.atomic():
+                AuditLog.objects.bulk_create(
+                    [grade_audit_entry(g, True) for g in created]
+                    + [grade_audit_entry(g, False) for g in updated],
+                    batch_size=500,
+                )
+        except Exception:
+            pass  # Never fail an import due to audit failure
+        with parent_digest():
+            for grade in created:
+                notify_parent_grade(Grade, grade, True)
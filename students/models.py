@@ -121,7 +121,14 @@ class Grade(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
+    def apply_scores(self, scale=None):
+        """Normalise the scores and derive ``total_score``, ``grade`` and ``remarks``.
+
+        ``scale`` (an ``academics.grading.CompiledScale``) lets bulk writers
+        resolve the school's grading scale once instead of per grade.
+        """
+        from academics.grading import DEFAULT_SCALE, get_scale
+
         # Convert scores to Decimal if they are strings or other types
         try:
             self.class_score = Decimal(str(self.class_score).strip())
@@ -140,60 +147,15 @@ class Grade(models.Model):
         
         # Determine grade based on total score
         # Use per-tenant GradingScale if configured, else Ghana default
-        graded = False
-        try:
-            from academics.models import GradingScale
-            from django.core.cache import cache as _grade_cache
-            cache_key = 'grading_scale_rows'
-            scale_rows = _grade_cache.get(cache_key)
-            if scale_rows is None:
-                scale_rows = list(GradingScale.objects.all())  # ordered by -min_score
-                _grade_cache.set(cache_key, scale_rows, 300)  # 5 min TTL
-            if scale_rows:
-                for row in scale_rows:
-                    if self.total_score >= row.min_score:
-                        self.grade = row.grade_label
-                        self.remarks = row.remarks
-                        graded = True
-                        break
-                if not graded:
-                    last = scale_rows[-1]
-                    self.grade = last.grade_label
-                    self.remarks = last.remarks
-                    graded = True
-        except Exception:
-            pass
+        if scale is None:
+            try:
+                scale = get_scale()
+            except Exception:
+                scale = DEFAULT_SCALE
+        self.grade, self.remarks = scale.lookup(self.total_score)
 
-        if not graded:
-            # Fallback: Ghana grading system (hardcoded default)
-            if self.total_score >= Decimal('80'):
-                self.grade = '1'
-                self.remarks = 'Highest'
-            elif self.total_score >= Decimal('70'):
-                self.grade = '2'
-                self.remarks = 'Higher'
-            elif self.total_score >= Decimal('65'):
-                self.grade = '3'
-                self.remarks = 'High'
-            elif self.total_score >= Decimal('60'):
-                self.grade = '4'
-                self.remarks = 'High Average'
-            elif self.total_score >= Decimal('55'):
-                self.grade = '5'
-                self.remarks = 'Average'
-            elif self.total_score >= Decimal('50'):
-                self.grade = '6'
-                self.remarks = 'Low Average'
-            elif self.total_score >= Decimal('45'):
-                self.grade = '7'
-                self.remarks = 'Low'
-            elif self.total_score >= Decimal('40'):
-                self.grade = '8'
-                self.remarks = 'Lower'
-            else:
-                self.grade = '9'
-                self.remarks = 'Lowest'
-        
+    def save(self, *args, **kwargs):
+        self.apply_scores()
         super().save(*args, **kwargs)
         
         # After saving, update rankings for this subject
@@ -203,13 +165,17 @@ class Grade(models.Model):
         """Update rankings for all students in the same class for this subject"""
         if not self.student.current_class:
             return  # Skip if student has no current class
-            
+        Grade.rerank(self.subject_id, self.academic_year_id, self.term, self.student.current_class_id)
+
+    @classmethod
+    def rerank(cls, subject_id, academic_year_id, term, class_id):
+        """Recompute ``subject_position`` for one subject in one class and term."""
         # Get all grades for this subject in the same class, academic year, and term
         grades_in_subject = list(Grade.objects.filter(
-            subject=self.subject,
-            academic_year=self.academic_year,
-            term=self.term,
-            student__current_class=self.student.current_class
+            subject_id=subject_id,
+            academic_year_id=academic_year_id,
+            term=term,
+            student__current_class_id=class_id
         ).exclude(total_score__isnull=True).order_by('-total_score'))
         
         # Assign positions (handle ties by giving same position to equal scores)
@@ -228,6 +194,11 @@ class Grade(models.Model):
 
         if to_update:
             Grade.objects.bulk_update(to_update, ['subject_position'], batch_size=200)
+            # bulk_update sends no post_save, so the tutor's cached grade
+            # segments (academics.prompt_cache) would keep the old ranks.
+            from academics.prompt_cache import bump
+            for student_id in {grade.student_id for grade in to_update}:
+                bump('grades', student_id)
     
     def get_term_display(self):
         """Returns the human-readable term name"""
@@ -4,33 +4,22 @@ Parent notification signals:
   - Grade saved → notify parent(s)
   - Attendance saved (absent/late) → notify parent(s)
   - StudentFee status changed → notify parent(s)
+
+Notifications are coalesced into per-parent digests (announcements.digest).
 """
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 
 def _notify_parents(student, message, link='', alert_type='general'):
-    """Create an announcements.Notification for every parent linked to student,
-    and fire a push notification to each parent in a background thread."""
-    try:
-        from announcements.models import Notification
-        from parents.models import Parent
-        parents = Parent.objects.filter(children=student).select_related('user')
-        parent_user_ids = []
-        for parent in parents:
-            Notification.objects.create(
-                recipient=parent.user,
-                message=message,
-                link=link,
-                alert_type=alert_type,
-            )
-            parent_user_ids.append(parent.user_id)
-        # Fire push notifications in background thread
-        if parent_user_ids:
-            from announcements.views import send_push_to_users
-            send_push_to_users(parent_user_ids, 'School Notification', message, link or '/')
-    except Exception:
-        pass  # Never crash a save due to notification failure
+    """Notify every parent linked to student.
+
+    Inside a request (or any ``parent_digest()`` block) events are coalesced
+    per (parent, student) and flushed with one bulk insert and a single push
+    per parent — see announcements.digest.
+    """
+    from announcements.digest import notify_parents
+    notify_parents(student, message, link=link, alert_type=alert_type)
 
 
 @receiver(post_save, sender='students.Grade')
@@ -49,32 +38,37 @@ def notify_parent_grade(sender, instance, created, **kwargs):
     _notify_parents(student, message, alert_type='general')
 
 
+def grade_audit_entry(instance, created):
+    """Unsaved ``AuditLog`` row for a grade write (bulk importers save these in one go)."""
+    from tenants.subscription_models import AuditLog
+    from django.db import connection
+    import json
+    student = instance.student
+    detail = json.dumps({
+        'student': student.user.get_full_name(),
+        'student_id': student.pk,
+        'subject': str(getattr(instance.subject, 'name', '')),
+        'term': instance.term,
+        'class_score': str(instance.class_score),
+        'exams_score': str(instance.exams_score),
+        'total': str(instance.total_score),
+        'grade': instance.grade,
+        'created': created,
+    })
+    return AuditLog(
+        action='grade_change',
+        user_id=student.user_id,
+        username=student.user.username,
+        tenant_schema=connection.schema_name,
+        detail=detail,
+    )
+
+
 @receiver(post_save, sender='students.Grade')
 def audit_grade_change(sender, instance, created, **kwargs):
     """Log grade creation/updates to the platform audit trail."""
     try:
-        from tenants.subscription_models import AuditLog
-        from django.db import connection
-        import json
-        student = instance.student
-        detail = json.dumps({
-            'student': student.user.get_full_name(),
-            'student_id': student.pk,
-            'subject': str(getattr(instance.subject, 'name', '')),
-            'term': instance.term,
-            'class_score': str(instance.class_score),
-            'exams_score': str(instance.exams_score),
-            'total': str(instance.total_score),
-            'grade': instance.grade,
-            'created': created,
-        })
-        AuditLog.objects.create(
-            action='grade_change',
-            user_id=student.user_id,
-            username=student.user.username,
-            tenant_schema=connection.schema_name,
-            detail=detail,
-        )
+        grade_audit_entry(instance, created).save()
     except Exception:
         pass  # Never crash a save due to audit failure
 
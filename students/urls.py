@@ -1,5 +1,10 @@
 from django.urls import path
-from . import views, views_ai
+
+from school_system.startup import lazy_views
+from . import views_ai
+
+# ~3k lines; imported when one of its views is first dispatched.
+views = lazy_views('students.views')
 
 app_name = 'students'
 
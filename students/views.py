@@ -1,7 +1,7 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
 from django.db.utils import ProgrammingError, OperationalError
 from django.db.models import Q, Count, Avg
 from django.utils import timezone
@@ -11,17 +11,17 @@ import logging
 from datetime import date, timedelta
 import calendar
 import csv
-import random
-import string
 from .models import Student, Attendance, Grade, ExamType
 from .forms import StudentForm, CSVImportForm, PadiPreferencesForm, ExamTypeForm
 from accounts.models import User
 
 from .utils import calculate_class_position, normalize_term, term_filter_values
 from academics.models import Class, AcademicYear, Timetable, Activity
+from academics.grading import grade_for
 from academics.gamification_models import StudentXP
 from teachers.models import Teacher
-from academics.tutor_models import generate_student_id_card, export_id_card_to_pdf, export_multiple_id_cards_to_pdf
+from accounts.exports import chunk_size, export_response, full_name
+from accounts.imports import finish_import, import_view, stage_upload
 
 logger = logging.getLogger(__name__)
 
@@ -580,27 +580,21 @@ def export_students(request):
     if request.user.user_type not in ['admin', 'teacher']:
         messages.error(request, 'Access denied.')
         return redirect('dashboard')
-    student_ids = request.GET.get('ids', '').split(',')
-    students = Student.objects.filter(id__in=student_ids).select_related('user', 'current_class')
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="students_export.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Admission No', 'First Name', 'Last Name', 'Class', 'Roll No', 'Email', 'Emergency Contact'])
-    
-    for student in students:
-        writer.writerow([
-            student.admission_number,
-            student.user.first_name,
-            student.user.last_name,
-            str(student.current_class) if student.current_class else '',
-            student.roll_number,
-            student.user.email,
-            student.emergency_contact
-        ])
-    
-    return response
+    student_ids = [i for i in request.GET.get('ids', '').split(',') if i.strip().isdigit()]
+    qs = Student.objects.filter(id__in=student_ids).values_list(
+        'admission_number', 'user__first_name', 'user__last_name', 'current_class__name',
+        'roll_number', 'user__email', 'emergency_contact',
+    )
+
+    def rows():
+        for admission, first, last, class_name, roll, email, contact in qs.iterator(chunk_size=chunk_size()):
+            yield admission, first, last, class_name or '', roll, email, contact
+
+    return export_response(
+        request, 'students_export',
+        ['Admission No', 'First Name', 'Last Name', 'Class', 'Roll No', 'Email', 'Emergency Contact'],
+        rows, count=len(student_ids),
+    )
 
 
 @login_required
@@ -643,7 +637,11 @@ def mark_attendance(request):
         if request.user.user_type == 'teacher' and class_obj not in allowed_classes:
             messages.error(request, 'You are not assigned to this class')
             return redirect('students:mark_attendance')
-        
+
+        from announcements.sms_dispatch import SMSDispatcher
+        from announcements.sms_service import attendance_sms_text
+        sms = SMSDispatcher(sent_by=request.user)
+
         for student_id in student_ids:
             status = request.POST.get(f'status_{student_id}')
             student = Student.objects.filter(id=student_id, current_class=class_obj).first()
@@ -659,14 +657,16 @@ def mark_attendance(request):
                 }
             )
 
-            # SMS alert for absences (non-blocking — failure does not break attendance saving)
+            # SMS alert for absences — queued and sent in one batch below
             if status == 'absent':
-                try:
-                    from announcements.sms_service import send_attendance_alert
-                    send_attendance_alert(student, status, str(attendance_date))
-                except Exception:
-                    pass
-        
+                sms.add(
+                    student.emergency_contact,
+                    attendance_sms_text(student, status, str(attendance_date)),
+                )
+
+        # Non-blocking — failure does not break attendance saving
+        sms.send_async()
+
         messages.success(request, f'Attendance marked successfully for {len(student_ids)} students')
         return redirect('students:mark_attendance')
     
@@ -960,34 +960,8 @@ def _get_student_report_context(student, academic_year, term, raw_term):
     else:
         average_percentage = 0
     
-    # Calculate overall grade based on average
-    if average_percentage >= 80:
-        overall_grade = '1'
-        overall_remarks = 'Highest'
-    elif average_percentage >= 70:
-        overall_grade = '2'
-        overall_remarks = 'Higher'
-    elif average_percentage >= 65:
-        overall_grade = '3'
-        overall_remarks = 'High'
-    elif average_percentage >= 60:
-        overall_grade = '4'
-        overall_remarks = 'High Average'
-    elif average_percentage >= 55:
-        overall_grade = '5'
-        overall_remarks = 'Average'
-    elif average_percentage >= 50:
-        overall_grade = '6'
-        overall_remarks = 'Low Average'
-    elif average_percentage >= 45:
-        overall_grade = '7'
-        overall_remarks = 'Low'
-    elif average_percentage >= 40:
-        overall_grade = '8'
-        overall_remarks = 'Lower'
-    else:
-        overall_grade = '9'
-        overall_remarks = 'Lowest'
+    # Calculate overall grade based on average, on the school's grading scale
+    overall_grade, overall_remarks = grade_for(round(average_percentage, 2))
     
     # Calculate class position
     class_position = calculate_class_position(student, academic_year, term)
@@ -1409,9 +1383,10 @@ def edit_student(request, student_id):
     return render(request, 'students/edit_student.html', {'form': form, 'student': student})
 
 
+@import_view
 @login_required
 def import_students_csv(request):
-    """Import students from CSV file"""
+    """Import students from CSV file (staged and resumable, see accounts.imports)"""
     if request.user.user_type != 'admin':
         messages.error(request, 'Access denied. Only admins can import students.')
         return redirect('students:student_list')
@@ -1427,165 +1402,16 @@ def import_students_csv(request):
                 messages.error(request, 'Please upload a valid CSV file.')
                 return redirect('students:import_csv')
             
-            # Read and process CSV
             try:
-                decoded_file = csv_file.read().decode('utf-8').splitlines()
-                reader = csv.DictReader(decoded_file)
-                
-                imported_count = 0
-                skipped_count = 0
-                errors = []
-                
-                for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
-                    try:
-                        # Handle both naming conventions: "First Name" or "first_name"
-                        first_name = (row.get('First Name') or row.get('first_name') or '').strip()
-                        last_name = (row.get('Last Name') or row.get('last_name') or '').strip()
-                        admission_no = (row.get('Admission No') or row.get('admission_number') or row.get('admission_no') or '').strip()
-                        class_name = (row.get('Class') or row.get('class_name') or row.get('class') or '').strip()
-                        roll_no = (row.get('Roll No') or row.get('roll_no') or row.get('roll_number') or '').strip()
-                        email = (row.get('Email') or row.get('email') or '').strip()
-                        emergency_contact = (row.get('Emergency Contact') or row.get('emergency_contact') or '').strip()
-                        age = (row.get('age') or row.get('Age') or '').strip()
-                        
-                        if not first_name:
-                            errors.append(f"Row {row_num}: Missing first name")
-                            skipped_count += 1
-                            continue
-                        
-                        # Last name is optional - some students might only have first name
-                        if not last_name:
-                            last_name = ''
-                        
-                        # Determine class
-                        student_class = None
-                        if class_name:
-                            try:
-                                student_class = Class.objects.get(name__iexact=class_name)
-                            except Class.DoesNotExist:
-                                errors.append(f"Row {row_num}: Class '{class_name}' not found")
-                        
-                        if not student_class:
-                            student_class = default_class
-                        
-                        if not student_class:
-                            errors.append(f"Row {row_num}: No class specified and no default class selected")
-                            skipped_count += 1
-                            continue
-                        
-                        # Parse age
-                        try:
-                            student_age = int(age) if age else 10
-                        except ValueError:
-                            student_age = 10
-                        
-                        # Generate username
-                        if last_name:
-                            base_username = f"{first_name.lower()}.{last_name.lower()}"
-                        else:
-                            base_username = first_name.lower()
-                        username = base_username.replace(' ', '').replace('-', '')
-                        counter = 1
-                        while User.objects.filter(username=username).exists():
-                            username = f"{base_username.replace(' ', '').replace('-', '')}{counter}"
-                            counter += 1
-                        
-                        # Use provided admission number or generate one
-                        admission_number = None
-                        if admission_no and admission_no.upper() not in ['N/A', 'NA', '']:
-                            # Clean up admission number
-                            admission_number = admission_no.strip().replace(' ', '')
-                            # Check if it already exists
-                            if Student.objects.filter(admission_number=admission_number).exists():
-                                errors.append(f"Row {row_num}: Admission number '{admission_number}' already exists")
-                                skipped_count += 1
-                                continue
-                        else:
-                            # Generate admission number
-                            prefix = 'ADM'
-                            for _ in range(100):  # Try up to 100 times
-                                suffix = ''.join(random.choices(string.digits, k=4))
-                                candidate = f"{prefix}{suffix}"
-                                if not Student.objects.filter(admission_number=candidate).exists():
-                                    admission_number = candidate
-                                    break
-                        
-                        if not admission_number:
-                            errors.append(f"Row {row_num}: Could not generate unique admission number")
-                            skipped_count += 1
-                            continue
-                        
-                        # Prepare email
-                        if not email or email.upper() in ['N/A', 'NA', '']:
-                            email = f"{username}@school.local"
-                        
-                        # Check if user with this email already exists
-                        if User.objects.filter(email=email).exists():
-                            email = f"{username}{random.randint(1, 999)}@school.local"
-                        
-                        # Prepare emergency contact
-                        if not emergency_contact or emergency_contact.upper() in ['N/A', 'NA', '']:
-                            emergency_contact = 'N/A'
-                        
-                        # Create user
-                        user = User.objects.create(
-                            username=username,
-                            first_name=first_name,
-                            last_name=last_name,
-                            email=email,
-                            user_type='student'
-                        )
-                        user.set_unusable_password()
-                        user.save()
-                        
-                        # Calculate date of birth
-                        dob_year = max(1900, date.today().year - student_age)
-                        date_of_birth = date(dob_year, 1, 1)
-                        
-                        # Create student
-                        student = Student.objects.create(
-                            user=user,
-                            admission_number=admission_number,
-                            date_of_birth=date_of_birth,
-                            gender='male',  # Default, can be updated later
-                            date_of_admission=date.today(),
-                            current_class=student_class,
-                            emergency_contact=emergency_contact
-                        )
-                        
-                        # Set roll number if provided
-                        if roll_no and roll_no.upper() not in ['N/A', 'NA', '']:
-                            try:
-                                student.roll_number = int(roll_no)
-                                student.save()
-                            except (ValueError, AttributeError):
-                                pass  # Skip if roll number is invalid or field doesn't exist
-                        
-                        imported_count += 1
-                        
-                    except Exception as e:
-                        errors.append(f"Row {row_num}: {str(e)}")
-                        skipped_count += 1
-                        continue
-                
-                # Show results
-                if imported_count > 0:
-                    messages.success(request, f'Successfully imported {imported_count} student(s).')
-                
-                if skipped_count > 0:
-                    messages.warning(request, f'Skipped {skipped_count} row(s) due to errors.')
-                
-                if errors and len(errors) <= 10:
-                    for error in errors:
-                        messages.error(request, error)
-                elif errors:
-                    messages.error(request, f'{len(errors)} errors occurred. First 10: {", ".join(errors[:10])}')
-                
-                return redirect('students:student_list')
-                
-            except Exception as e:
+                batch = stage_upload(
+                    request.user, 'students', csv_file,
+                    {'default_class_id': default_class.pk if default_class else None},
+                    next_url='students:student_list',
+                )
+            except (UnicodeDecodeError, csv.Error) as e:
                 messages.error(request, f'Error processing CSV file: {str(e)}')
                 return redirect('students:import_csv')
+            return finish_import(request, batch)
     else:
         form = CSVImportForm()
     
@@ -1611,6 +1437,8 @@ def student_id_card(request, student_id):
         messages.error(request, 'Access denied')
         return redirect('dashboard')
     
+    from academics.id_cards import generate_student_id_card
+
     # Generate card
     try:
         card = generate_student_id_card(student)
@@ -1640,6 +1468,8 @@ def student_id_card_pdf(request, student_id):
         messages.error(request, 'Access denied')
         return redirect('dashboard')
     
+    from academics.id_cards import export_id_card_to_pdf, generate_student_id_card
+
     # Generate card and convert to PDF
     try:
         card = generate_student_id_card(student)
@@ -1678,25 +1508,13 @@ def bulk_student_id_cards_pdf(request):
             messages.error(request, 'No students found')
             return redirect('students:student_list')
         
-        # Generate cards
-        card_list = []
-        for student in students:
-            try:
-                card = generate_student_id_card(student)
-                card_list.append((student.user.get_full_name(), card))
-            except Exception:
-                pass  # Skip students with errors
-        
-        if not card_list:
+        students = students.select_related('user', 'current_class')
+        class_name = students.first().current_class.name if class_id else 'bulk'
+        from academics.id_cards import id_cards_pdf_response
+        response = id_cards_pdf_response(students, 'student', f'student_ids_{class_name}.pdf')
+        if response is None:
             messages.error(request, 'Could not generate any ID cards')
             return redirect('students:student_list')
-        
-        # Export to PDF
-        pdf_buffer = export_multiple_id_cards_to_pdf(card_list)
-        
-        class_name = students.first().current_class.name if class_id else 'bulk'
-        response = HttpResponse(pdf_buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="student_ids_{class_name}.pdf"'
         return response
         
     except Exception as e:
@@ -1872,62 +1690,45 @@ def class_leaderboard_json(request):
     Returns top-20 classmates ranked by SchoolPadi XP for the logged-in student.
     The student's own entry is included and marked with `is_me: true`.
     """
+    from academics import gamification
     from academics.gamification_models import StudentXP
     from django.http import JsonResponse
 
     if request.user.user_type != 'student':
         return JsonResponse({'error': 'Forbidden'}, status=403)
 
-    student = Student.objects.filter(user=request.user).select_related('current_class').first()
-    if not student or not student.current_class:
+    student = Student.objects.filter(user=request.user).select_related('user').first()
+    if not student or not student.current_class_id:
         return JsonResponse({'leaderboard': [], 'my_rank': None})
 
-    # All classmates including self
-    classmates = Student.objects.filter(
-        current_class=student.current_class
-    ).select_related('user')
+    def _entry(row):
+        return {
+            'id': row['student_id'],
+            'name': row['name'],
+            'total_xp': row['total_xp'],
+            'level': row['level'],
+            'level_progress': row['level_progress'],
+            'current_streak': row['current_streak'],
+            'is_me': row['student_id'] == student.id,
+            'rank': row['rank'],
+        }
 
-    # Fetch XP records; default to 0 if missing
-    xp_map = {
-        xp.student_id: xp
-        for xp in StudentXP.objects.filter(student__in=classmates)
-    }
+    # Ranked from the XP index; cached until a classmate earns XP.
+    top20 = [_entry(r) for r in gamification.class_leaderboard(student.current_class_id, 20)]
+    my_rank = gamification.class_rank(student)
 
-    rows = []
-    for s in classmates:
-        xp = xp_map.get(s.id)
-        rows.append({
-            'id': s.id,
-            'name': s.user.get_full_name() or s.user.username,
+    # Always include the user's own entry if outside top 20
+    if not any(r['is_me'] for r in top20):
+        xp = StudentXP.objects.filter(student=student).first()
+        top20.append(_entry({
+            'student_id': student.id,
+            'name': student.user.get_full_name() or student.user.username,
             'total_xp': xp.total_xp if xp else 0,
             'level': xp.level if xp else 1,
             'level_progress': xp.level_progress if xp else 0,
             'current_streak': xp.current_streak if xp else 0,
-            'is_me': s.id == student.id,
-        })
-
-    # Sort by XP descending
-    rows.sort(key=lambda r: r['total_xp'], reverse=True)
-
-    # Assign ranks (tied XP shares the same rank)
-    my_rank = None
-    current_rank = 0
-    prev_xp = None
-    for i, row in enumerate(rows):
-        if row['total_xp'] != prev_xp:
-            current_rank = i + 1
-            prev_xp = row['total_xp']
-        row['rank'] = current_rank
-        if row['is_me']:
-            my_rank = current_rank
-
-    # Return top 20; always include the user's own entry if outside top 20
-    top20 = rows[:20]
-    me_in_top20 = any(r['is_me'] for r in top20)
-    if not me_in_top20:
-        me_row = next((r for r in rows if r['is_me']), None)
-        if me_row:
-            top20.append(me_row)
+            'rank': my_rank,
+        }))
 
     return JsonResponse({'leaderboard': top20, 'my_rank': my_rank})
 
@@ -1976,32 +1777,25 @@ def export_grades_csv(request):
     else:
         cls_name = 'all'
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = (
-        f'attachment; filename="grades_{cls_name}_{raw_term}_{academic_year.name}.csv"'
-        .replace(' ', '_')
+    qs = (
+        qs.order_by('student__user__last_name', 'subject__name')
+        .values_list(
+            'student__admission_number', 'student__user__first_name', 'student__user__last_name',
+            'subject__name', 'term', 'class_score', 'exams_score', 'total_score', 'grade', 'remarks',
+        )
     )
 
-    writer = csv.writer(response)
-    writer.writerow([
-        'Admission No.', 'Student Name', 'Subject', 'Term',
-        'Class Score (/30)', 'Exam Score (/70)', 'Total (/100)', 'Grade', 'Remarks',
-    ])
-
-    for g in qs.order_by('student__user__last_name', 'subject__name'):
-        writer.writerow([
-            g.student.admission_number,
-            g.student.user.get_full_name(),
-            g.subject.name,
-            g.term,
-            g.class_score,
-            g.exams_score,
-            g.total_score,
-            g.grade or '',
-            g.remarks or '',
-        ])
+    def rows():
+        for admission, first, last, subject, g_term, cls_score, exam, total, grade, remarks in qs.iterator(
+                chunk_size=chunk_size()):
+            yield admission, full_name(first, last), subject, g_term, cls_score, exam, total, grade or '', remarks or ''
 
-    return response
+    return export_response(
+        request, f'grades_{cls_name}_{raw_term}_{academic_year.name}',
+        ['Admission No.', 'Student Name', 'Subject', 'Term',
+         'Class Score (/30)', 'Exam Score (/70)', 'Total (/100)', 'Grade', 'Remarks'],
+        rows, count=qs.count(),
+    )
 
 
 @login_required
@@ -2101,7 +1895,7 @@ def export_attendance_csv(request):
 
     qs = Attendance.objects.filter(
         student__current_class=class_obj,
-    ).select_related('student__user').order_by('student__user__last_name', '-date')
+    ).order_by('student__user__last_name', '-date')
 
     period = 'all'
     if month_str:
@@ -2112,23 +1906,22 @@ def export_attendance_csv(request):
         except (ValueError, TypeError):
             pass
 
-    fname = f"attendance_{class_obj.name}_{period}.csv".replace(' ', '_')
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{fname}"'
-
-    writer = csv.writer(response)
-    writer.writerow(['Admission No', 'Student Name', 'Date', 'Status', 'Remarks'])
+    qs = qs.values_list(
+        'student__admission_number', 'student__user__first_name', 'student__user__last_name',
+        'date', 'status', 'remarks',
+    )
+    status_labels = dict(Attendance.STATUS_CHOICES)
 
-    for a in qs:
-        writer.writerow([
-            a.student.admission_number,
-            a.student.user.get_full_name(),
-            a.date.strftime('%Y-%m-%d'),
-            a.get_status_display(),
-            a.remarks or '',
-        ])
+    def rows():
+        for admission, first, last, day, status, remarks in qs.iterator(chunk_size=chunk_size()):
+            yield (admission, full_name(first, last), day.strftime('%Y-%m-%d'),
+                   status_labels.get(status, status), remarks or '')
 
-    return response
+    return export_response(
+        request, f'attendance_{class_obj.name}_{period}',
+        ['Admission No', 'Student Name', 'Date', 'Status', 'Remarks'],
+        rows, count=qs.count(),
+    )
 
 
 @login_required
@@ -2285,6 +2078,7 @@ def export_attendance_pdf(request):
     return response
 
 
+@import_view
 @login_required
 def import_grades_csv(request):
     """Upload a CSV file to bulk-create or update Grade records."""
@@ -2301,69 +2095,19 @@ def import_grades_csv(request):
             messages.error(request, 'Please upload a valid .csv file')
             return redirect('students:import_grades_csv')
 
-        decoded = csv_file.read().decode('utf-8').splitlines()
-        reader  = csv.DictReader(decoded)
-
-        created = updated = skipped = 0
-        errors  = []
-
-        from academics.models import Subject
-
-        for row_num, row in enumerate(reader, start=2):
-            try:
-                admission_no = (
-                    row.get('Admission No.') or row.get('Admission No') or
-                    row.get('admission_number') or ''
-                ).strip()
-                subject_name = (row.get('Subject') or row.get('subject') or '').strip()
-                raw_term     = (row.get('Term')    or row.get('term')    or 'first').strip().lower()
-                class_score_raw = (row.get('Class Score (/30)') or row.get('class_score') or '0').strip()
-                exam_score_raw  = (row.get('Exam Score (/70)')  or row.get('exams_score') or '0').strip()
-
-                if not admission_no or not subject_name:
-                    errors.append(f'Row {row_num}: Missing admission number or subject name — skipped')
-                    skipped += 1
-                    continue
-
-                student = Student.objects.filter(admission_number=admission_no).first()
-                if not student:
-                    errors.append(f'Row {row_num}: Student "{admission_no}" not found — skipped')
-                    skipped += 1
-                    continue
-
-                subject = Subject.objects.filter(name__iexact=subject_name).first()
-                if not subject:
-                    errors.append(f'Row {row_num}: Subject "{subject_name}" not found — skipped')
-                    skipped += 1
-                    continue
-
-                term = normalize_term(raw_term) or 'first'
-
-                grade_obj, was_created = Grade.objects.get_or_create(
-                    student=student,
-                    subject=subject,
-                    academic_year=academic_year,
-                    term=term,
-                    exam_type=None,
-                )
-                grade_obj.class_score  = float(class_score_raw)
-                grade_obj.exams_score  = float(exam_score_raw)
-                grade_obj.save()   # triggers auto-calc of total_score, grade, remarks
-
-                if was_created:
-                    created += 1
-                else:
-                    updated += 1
-
-            except Exception as exc:
-                errors.append(f'Row {row_num}: {exc}')
-                skipped += 1
-
-        summary = f'Import complete — {created} created, {updated} updated, {skipped} skipped.'
-        if errors:
-            summary += f' First error: {errors[0]}'
-        messages.success(request, summary)
-        return redirect('students:import_grades_csv')
+        if not academic_year:
+            messages.error(request, 'No academic year found')
+            return redirect('students:import_grades_csv')
+        try:
+            batch = stage_upload(
+                request.user, 'grades', csv_file,
+                {'academic_year_id': academic_year.pk},
+                next_url='students:import_grades_csv',
+            )
+        except (UnicodeDecodeError, csv.Error) as exc:
+            messages.error(request, f'Error processing CSV file: {exc}')
+            return redirect('students:import_grades_csv')
+        return finish_import(request, batch)
 
     return render(request, 'students/import_grades.html', {
         'academic_year': academic_year,
@@ -2899,8 +2643,8 @@ def class_analytics(request):
 
 @login_required
 def xp_leaderboard(request):
-    """Full XP leaderboard page — class-level for students, school-wide for admin/teacher."""
-    from academics.gamification_models import StudentXP
+    """Full XP leaderboard page — class-level for students, school-wide (top 100) for admin/teacher."""
+    from academics import gamification
 
     if request.user.user_type == 'student':
         try:
@@ -2912,54 +2656,36 @@ def xp_leaderboard(request):
             messages.error(request, "You are not assigned to a class.")
             return redirect('dashboard')
         scope_label = f"Class: {me.current_class.name}"
-        classmates = Student.objects.filter(current_class=me.current_class).select_related('user')
+        ranked = gamification.class_leaderboard(me.current_class_id, gamification.LEADERBOARD_PAGE_SIZE)
+        total_count = Student.objects.filter(current_class=me.current_class).count()
+        my_rank = gamification.class_rank(me)
     elif request.user.user_type in ['teacher', 'admin']:
         me = None
         # Show all students with XP records
         current_year = AcademicYear.objects.filter(is_current=True).first()
-        classmates = Student.objects.filter(
-            current_class__academic_year=current_year
-        ).select_related('user', 'current_class') if current_year else Student.objects.select_related('user', 'current_class').all()
+        ranked = gamification.school_leaderboard(gamification.LEADERBOARD_PAGE_SIZE, current_year)
+        total_count = (
+            Student.objects.filter(current_class__academic_year=current_year) if current_year
+            else Student.objects.all()
+        ).count()
+        my_rank = None
         scope_label = f"School-Wide ({current_year.name if current_year else 'All'})"
     else:
         return redirect('dashboard')
 
-    xp_map = {
-        xp.student_id: xp
-        for xp in StudentXP.objects.filter(student__in=classmates)
-    }
-
-    rows = []
-    for s in classmates:
-        xp = xp_map.get(s.id)
-        rows.append({
-            'student': s,
-            'total_xp': xp.total_xp if xp else 0,
-            'level': xp.level if xp else 1,
-            'level_progress': xp.level_progress if xp else 0,
-            'current_streak': xp.current_streak if xp else 0,
-            'is_me': me and s.id == me.id,
-        })
-
-    rows.sort(key=lambda r: r['total_xp'], reverse=True)
-
-    # Assign ranks
-    current_rank = 0
-    prev_xp = None
-    my_rank = None
-    for i, row in enumerate(rows):
-        if row['total_xp'] != prev_xp:
-            current_rank = i + 1
-            prev_xp = row['total_xp']
-        row['rank'] = current_rank
-        if row['is_me']:
-            my_rank = current_rank
+    students = Student.objects.select_related('user', 'current_class').in_bulk(
+        [r['student_id'] for r in ranked]
+    )
+    rows = [
+        dict(r, student=students[r['student_id']], is_me=me and r['student_id'] == me.id)
+        for r in ranked if r['student_id'] in students
+    ]
 
     return render(request, 'students/xp_leaderboard.html', {
         'rows': rows,
         'my_rank': my_rank,
         'scope_label': scope_label,
-        'total_count': len(rows),
+        'total_count': total_count,
     })
 
 
@@ -2972,79 +2698,20 @@ def pulse_poll(request):
     """
     Student polling endpoint — returns the active pulse for the student's class,
     or null if none exists / the student has already submitted.
-    Called every 3 s from the student dashboard JS.
+    Called every 3 s from the student dashboard JS; answered from the
+    live-state store (teachers.live) where one is configured.
     """
     if request.user.user_type != 'student':
         return JsonResponse({'session': None})
 
-    try:
-        from academics.pulse_models import PulseSession, PulseResponse
-        student = Student.objects.get(user=request.user)
-    except Exception:
-        return JsonResponse({'session': None})
+    from teachers import live
 
     # Some tenant schemas can be partially migrated; fail softly instead of 500.
     try:
-        student_class = student.current_class
-    except (ProgrammingError, OperationalError):
+        card = live.pulse_for_student(request.user)
+    except (Student.DoesNotExist, ProgrammingError, OperationalError):
         return JsonResponse({'session': None})
-
-    if not student_class:
-        return JsonResponse({'session': None})
-
-    from django.db.models import Q as _Q
-    try:
-        session = (
-            PulseSession.objects
-            .filter(
-                _Q(lesson_plan__school_class=student_class) |
-                _Q(target_class=student_class),
-                status='active',
-            )
-            .order_by('-created_at')
-            .first()
-        )
-    except (ProgrammingError, OperationalError):
-        return JsonResponse({'session': None})
-
-    if not session:
-        return JsonResponse({'session': None})
-
-    # Already submitted?
-    try:
-        already_done = PulseResponse.objects.filter(
-            session=session, student=student, submitted_at__isnull=False
-        ).exists()
-    except (ProgrammingError, OperationalError):
-        return JsonResponse({'session': None})
-    if already_done:
-        return JsonResponse({'session': None})
-
-    # Mark as typing (viewing the card) — upsert the response row
-    try:
-        PulseResponse.objects.get_or_create(session=session, student=student)
-        PulseResponse.objects.filter(session=session, student=student).update(is_typing=True)
-    except (ProgrammingError, OperationalError):
-        return JsonResponse({'session': None})
-
-    # Resolve topic label for the overlay
-    if session.lesson_plan_id:
-        topic = session.lesson_plan.topic
-    elif session.presentation_id:
-        topic = session.presentation.title
-    else:
-        topic = 'Pulse Check'
-
-    return JsonResponse({
-        'session': {
-            'id': session.pk,
-            'topic': topic,
-            'q1': session.q1_text,
-            'q2': session.q2_text,
-            'q3': session.q3_text,
-            'chips': session.q3_chips,
-        }
-    })
+    return JsonResponse({'session': card})
 
 
 @login_required
@@ -3056,39 +2723,31 @@ def pulse_submit(request, session_id):
         return JsonResponse({'error': 'Access denied'}, status=403)
 
     try:
-        from academics.pulse_models import PulseSession, PulseResponse
+        from teachers import live
         import json
         student = Student.objects.get(user=request.user)
     except Exception:
         return JsonResponse({'error': 'Error'}, status=500)
 
-    session = get_object_or_404(PulseSession, pk=session_id, status='active')
+    try:
+        meta = live.pulse_meta(session_id)
+    except (ProgrammingError, OperationalError):
+        meta = None
+    if meta is None or meta['status'] != 'active':
+        raise Http404('No active pulse session')
 
     # Security: student can submit only to pulse sessions targeting their own class.
     if not student.current_class_id:
         logger.warning('pulse_submit_denied reason=no_class uid=%s sid=%s', request.user.id, session_id)
         return JsonResponse({'error': 'No class assigned'}, status=403)
 
-    try:
-        lesson_plan_class_id = (
-            session.lesson_plan.school_class_id
-            if session.lesson_plan_id and session.lesson_plan
-            else None
-        )
-    except (ProgrammingError, OperationalError):
-        lesson_plan_class_id = None
-
-    allowed_for_student = (
-        (lesson_plan_class_id == student.current_class_id)
-        or (session.target_class_id == student.current_class_id)
-    )
-    if not allowed_for_student:
+    if student.current_class_id not in meta['class_ids']:
         logger.warning(
             'pulse_submit_denied reason=wrong_class uid=%s sid=%s student_class=%s target_class=%s',
             request.user.id,
             session_id,
             student.current_class_id,
-            session.target_class_id or lesson_plan_class_id,
+            meta['class_ids'],
         )
         return JsonResponse({'error': 'Forbidden for this class'}, status=403)
 
@@ -3106,16 +2765,7 @@ def pulse_submit(request, session_id):
     q2 = parse_bool(data.get('q2'))
     q3 = str(data.get('q3', ''))[:200]
 
-    PulseResponse.objects.update_or_create(
-        session=session, student=student,
-        defaults={
-            'q1_answer': q1,
-            'q2_answer': q2,
-            'q3_answer': q3,
-            'is_typing': False,
-            'submitted_at': timezone.now(),
-        }
-    )
+    live.pulse_answer(session_id, student, q1, q2, q3)
     return JsonResponse({'ok': True})
 
 
@@ -14,6 +14,7 @@ from django.core.cache import cache
 from django.db import connection
 from django.utils import timezone as dj_timezone
 from tenants.decorators import require_plan
+from school_system import ratelimit
 
 logger = logging.getLogger(__name__)
 
@@ -60,23 +61,12 @@ def _client_ip(request):
 
 
 def _rate_limit(request, scope, limit=30, window_seconds=60):
-    """Simple cache-backed limiter keyed by tenant + user + IP + scope."""
-    schema = connection.tenant.schema_name
-    uid = getattr(request.user, 'id', None) or 'anon'
-    ip = _client_ip(request)
-    key = f"{schema}:rl:{scope}:{uid}:{ip}"
-    added = cache.add(key, 1, timeout=window_seconds)
-    if added:
-        return False
-    try:
-        count = cache.incr(key)
-    except ValueError:
-        cache.set(key, 1, timeout=window_seconds)
-        count = 1
-    if count > limit:
-        logger.warning("rate_limited scope=%s uid=%s ip=%s count=%s", scope, uid, ip, count)
-        return True
-    return False
+    """Tenant + user + IP + scope limit (school_system.ratelimit).
+
+    Returns the rejecting ``Decision`` (use ``.response()``) or None.
+    """
+    decision = ratelimit.check(request, scope, f'{limit}/{window_seconds}s')
+    return None if decision.allowed else decision
 
 
 def _build_voice_xp_token(user_id, session_id):
@@ -316,7 +306,17 @@ def _build_student_context(student):
     Build a rich SchoolPadi Linguistic Profile for this student.
     This is injected into the Realtime API system instructions to prime
     SchoolPadi's vocabulary, cultural references, and pedagogical approach.
+
+    Served from the tutor prompt-context cache (academics.prompt_cache);
+    rebuilt only after the student's profile, grades or class subjects change.
     """
+    from academics.ai_tutor import _linguistic_segment
+    from academics.prompt_cache import load_segment
+    return load_segment(student, _linguistic_segment(student))
+
+
+def _compose_student_context(student):
+    """Uncached body of ``_build_student_context``."""
     lines = []
 
     student_name = student.user.get_full_name() or student.user.username
@@ -450,8 +450,9 @@ def voice_board_generate(request):
         return JsonResponse({'error': 'POST only'}, status=405)
     if request.user.user_type != 'student':
         return JsonResponse({'error': 'Students only'}, status=403)
-    if _rate_limit(request, 'voice_board_generate', limit=18, window_seconds=60):
-        return JsonResponse({'error': 'Too many requests'}, status=429)
+    limited = _rate_limit(request, 'voice_board_generate', limit=18, window_seconds=60)
+    if limited:
+        return limited.response({'error': 'Too many requests'})
 
     try:
         body = json.loads(request.body.decode('utf-8'))
@@ -536,8 +537,9 @@ def create_realtime_session(request):
     
     if request.user.user_type != 'student':
         return JsonResponse({"error": "Unauthorized"}, status=403)
-    if _rate_limit(request, 'create_realtime_session', limit=10, window_seconds=60):
-        return JsonResponse({"error": "Too many requests"}, status=429)
+    limited = _rate_limit(request, 'create_realtime_session', limit=10, window_seconds=60)
+    if limited:
+        return limited.response({"error": "Too many requests"})
     
     try:
         data = json.loads(request.body) if request.body else {}
@@ -728,12 +730,8 @@ def padi_arena_view(request):
 
     # Class leaderboard — top 10 students in same class by total XP
     try:
-        top_students = (
-            StudentXP.objects
-            .filter(student__current_class=student.current_class)
-            .select_related('student__user')
-            .order_by('-total_xp')[:10]
-        )
+        from academics.gamification import class_leaderboard
+        top_students = class_leaderboard(student.current_class_id, 10)
     except Exception:
         top_students = []
 
@@ -751,87 +749,58 @@ def padi_arena_api(request):
     if request.user.user_type != 'student':
         return JsonResponse({'error': 'Unauthorized'}, status=403)
 
-    if request.method == 'GET' and _rate_limit(request, 'padi_arena_api_get', limit=120, window_seconds=60):
-        return JsonResponse({'error': 'Too many requests'}, status=429)
-    if request.method == 'POST' and _rate_limit(request, 'padi_arena_api_post', limit=40, window_seconds=60):
-        return JsonResponse({'error': 'Too many requests'}, status=429)
-        
-    from students.models import Student
-    student = Student.objects.filter(user=request.user).first()
-    if not student or not student.current_class:
-        return JsonResponse({'error': 'No class assigned'}, status=400)
-        
-    room = StudyGroupRoom.objects.filter(student_class=student.current_class).first()
-    if not room:
-        return JsonResponse({'error': 'No room found'}, status=404)
-        
+    limited = None
     if request.method == 'GET':
+        limited = _rate_limit(request, 'padi_arena_api_get', limit=120, window_seconds=60)
+    elif request.method == 'POST':
+        limited = _rate_limit(request, 'padi_arena_api_post', limit=40, window_seconds=60)
+    if limited:
+        return limited.response({'error': 'Too many requests'})
+
+    if request.method == 'GET':
+        from academics import arena_feed, gamification
+
+        member = arena_feed.membership(request.user)
+        if not member:
+            return JsonResponse({'error': 'No class assigned'}, status=400)
+        student_id, class_id, room_id = member
+        if room_id is None:
+            return JsonResponse({'error': 'No room found'}, status=404)
         try:
-            last_id = int(request.GET.get('last_id', 0))
+            # ``last_id`` is the cursor's old name.
+            after_id = int(request.GET.get('after_id', request.GET.get('last_id', 0)))
         except (TypeError, ValueError):
-            last_id = 0
-        last_id = max(last_id, 0)
-        msgs = StudyGroupMessage.objects.filter(room=room, id__gt=last_id).order_by('created_at')
-        
-        data = []
-        for m in msgs:
-            reply_data = None
-            if m.reply_to_id:
-                rt = m.reply_to
-                if rt:
-                    reply_data = {
-                        'id': rt.id,
-                        'sender': rt.sender.get_full_name() if rt.sender else 'SchoolPadi',
-                        'content': rt.content[:120],
-                    }
-            data.append({
-                'id': m.id,
-                'content': m.content,
-                'sender': m.sender.get_full_name() if m.sender else 'SchoolPadi',
-                'is_aura': m.is_aura,
-                'is_battle': m.is_battle_question,
-                'battle_type': m.battle_type if m.is_battle_question else None,
-                'battle_xp': m.battle_xp if m.is_battle_question else None,
-                'battle_answered': m.battle_answered,
-                'winner': m.battle_winner.get_full_name() if m.battle_winner else None,
-                'time': m.created_at.strftime('%H:%M'),
-                'is_me': m.sender == request.user if m.sender else False,
-                'reply_to': reply_data,
-            })
+            after_id = 0
+        data = arena_feed.messages(room_id, max(after_id, 0), request.user)
 
-        from academics.gamification_models import StudentXP
-        xp_profile = StudentXP.objects.filter(student=student).first()
-        xp_snapshot = None
-        if xp_profile:
-            xp_snapshot = {
-                'total_xp': xp_profile.total_xp,
-                'level': xp_profile.level,
-                'level_progress': xp_profile.level_progress,
-                'xp_to_next_level': xp_profile.xp_to_next_level,
-            }
-
-        # Live leaderboard — top 10 for this room's class
-        from students.models import Student as _Student
-        top_raw = (
-            StudentXP.objects
-            .filter(student__current_class=student.current_class)
-            .order_by('-total_xp')
-            .select_related('student__user')[:10]
-        )
+        # Live leaderboard — top 10 for this room's class (cached until the next award)
         leaderboard = [
             {
-                'name': e.student.user.get_full_name(),
-                'initials': (e.student.user.first_name[:1] + e.student.user.last_name[:1]).upper(),
-                'total_xp': e.total_xp,
-                'streak': e.current_streak,
-                'is_me': e.student == student,
+                'name': e['name'],
+                'initials': e['initials'],
+                'total_xp': e['total_xp'],
+                'streak': e['current_streak'],
+                'is_me': e['student_id'] == student_id,
             }
-            for e in top_raw
+            for e in gamification.class_leaderboard(class_id, 10)
         ]
 
-        return JsonResponse({'messages': data, 'xp_snapshot': xp_snapshot, 'leaderboard': leaderboard})
+        return JsonResponse({
+            'messages': data,
+            'xp_snapshot': gamification.snapshot(student_id),
+            'leaderboard': leaderboard,
+        })
 
-    elif request.method == 'POST':
+    from students.models import Student
+    student = Student.objects.filter(user=request.user).first()
+    if not student or not student.current_class:
+        return JsonResponse({'error': 'No class assigned'}, status=400)
+        
+    room = StudyGroupRoom.objects.filter(student_class=student.current_class).first()
+    if not room:
+        return JsonResponse({'error': 'No room found'}, status=404)
+        
+    if request.method == 'POST':
         try:
             payload = json.loads(request.body.decode('utf-8')) if request.body else {}
         except (ValueError, TypeError):
@@ -879,22 +848,14 @@ def padi_arena_api(request):
 
         # ── Helper: award XP, check achievements, build snapshot ────────
         def _award_xp_and_snapshot(amount):
-            from academics.gamification_models import StudentXP, check_and_unlock_achievements, StudentAchievement
-            xp_profile, _ = StudentXP.objects.get_or_create(student=student)
-            already_unlocked = set(
-                StudentAchievement.objects.filter(student=student)
-                .values_list('achievement__slug', flat=True)
-            )
-            xp_profile.add_xp(amount)
-            xp_profile.update_streak()
-            check_and_unlock_achievements(student, xp_profile)
-            # Detect newly unlocked badges
-            newly_unlocked = list(
-                StudentAchievement.objects.filter(student=student)
-                .exclude(achievement__slug__in=already_unlocked)
-                .select_related('achievement')
-                .values('achievement__name', 'achievement__icon', 'achievement__xp_reward')
-            )
+            from academics.gamification import award
+            result = award(student, amount)
+            xp_profile = result.profile
+            newly_unlocked = [
+                {'achievement__name': a.name, 'achievement__icon': a.icon,
+                 'achievement__xp_reward': a.xp_reward}
+                for a in result.unlocked
+            ]
             return {
                 'total_xp': xp_profile.total_xp,
                 'level': xp_profile.level,
@@ -1342,8 +1303,9 @@ def voice_award_xp(request):
         return JsonResponse({'error': 'POST only'}, status=405)
     if request.user.user_type != 'student':
         return JsonResponse({'error': 'Students only'}, status=403)
-    if _rate_limit(request, 'voice_award_xp', limit=45, window_seconds=60):
-        return JsonResponse({'error': 'Too many requests'}, status=429)
+    limited = _rate_limit(request, 'voice_award_xp', limit=45, window_seconds=60)
+    if limited:
+        return limited.response({'error': 'Too many requests'})
     try:
         body = json.loads(request.body.decode('utf-8'))
         amount = int(body.get('amount', 0))
@@ -1417,12 +1379,10 @@ def voice_award_xp(request):
         logger.info('voice_xp_denied reason=session_cap_zero uid=%s sid=%s total=%s', request.user.id, session_id, awarded_total)
         return JsonResponse({'error': 'Session XP cap reached'}, status=429)
 
-    from academics.gamification_models import StudentXP, check_and_unlock_achievements
-    xp_profile, _ = StudentXP.objects.get_or_create(student=student)
-    leveled_up = xp_profile.add_xp(amount)
+    from academics.gamification import award
+    result = award(student, amount)  # also keeps voice streak in sync with text-chat streak
+    xp_profile, leveled_up = result.profile, result.leveled_up
     cache.set(total_key, awarded_total + amount, VOICE_XP_TOKEN_MAX_AGE_SECONDS)
-    xp_profile.update_streak()  # keep voice streak in sync with text-chat streak
-    check_and_unlock_achievements(student, xp_profile)
     if leveled_up:
         try:
             from announcements.models import Notification
@@ -1455,8 +1415,9 @@ def voice_vision_analyze(request):
         return JsonResponse({'error': 'POST only'}, status=405)
     if request.user.user_type != 'student':
         return JsonResponse({'error': 'Students only'}, status=403)
-    if _rate_limit(request, 'voice_vision_analyze', limit=6, window_seconds=60):
-        return JsonResponse({'error': 'Too many requests'}, status=429)
+    limited = _rate_limit(request, 'voice_vision_analyze', limit=6, window_seconds=60)
+    if limited:
+        return limited.response({'error': 'Too many requests'})
 
     try:
         body = json.loads(request.body.decode('utf-8'))
@@ -1593,8 +1554,9 @@ def log_power_words(request):
     if request.user.user_type != 'student':
         return JsonResponse({'error': 'Students only'}, status=403)
 
-    if _rate_limit(request, 'log_power_words', limit=24, window_seconds=60):
-        return JsonResponse({'error': 'Too many requests'}, status=429)
+    limited = _rate_limit(request, 'log_power_words', limit=24, window_seconds=60)
+    if limited:
+        return limited.response({'error': 'Too many requests'})
 
     try:
         body = json.loads(request.body.decode('utf-8'))
@@ -2,10 +2,11 @@
 from functools import wraps
 
 from django.contrib import messages
-from django.db import transaction
 from django.shortcuts import redirect
 from django.utils import timezone
 
+from accounts.credit_ledger import CreditLedger
+
 
 # ── Credit costs per AI action ──────────────────────────────────
 CREDIT_COSTS = {
@@ -179,30 +180,22 @@ def requires_addon(slug):
 FREE_GENERATION_LIMIT = WELCOME_BONUS_CREDITS  # backward compat alias
 
 
+LEDGER = CreditLedger(
+    'teachers.TeacherCreditBalance', 'teachers.CreditTransaction',
+    owner='teacher', welcome_bonus=WELCOME_BONUS_CREDITS, name='teacher',
+)
+
+
 def _get_or_create_balance(user):
     """Return the TeacherCreditBalance for *user*, creating with welcome bonus if new."""
-    from teachers.models import TeacherCreditBalance, CreditTransaction
-    bal, created = TeacherCreditBalance.objects.get_or_create(
-        teacher=user,
-        defaults={'balance': WELCOME_BONUS_CREDITS, 'total_purchased': 0, 'total_used': 0},
-    )
-    if created:
-        CreditTransaction.objects.create(
-            teacher=user,
-            amount=WELCOME_BONUS_CREDITS,
-            balance_after=WELCOME_BONUS_CREDITS,
-            transaction_type='bonus',
-            description=f'Welcome bonus — {WELCOME_BONUS_CREDITS} free AI credits',
-        )
-    return bal
+    return LEDGER.open_account(user)
 
 
 def get_credit_balance(user):
-    """Return the current credit balance for *user*."""
+    """Return the current credit balance for *user* (cached; no query per page view)."""
     if not user.is_authenticated or user.user_type != 'teacher':
         return 0
-    bal = _get_or_create_balance(user)
-    return bal.balance
+    return LEDGER.balance(user)
 
 
 def get_free_generation_count(user, action_type='lesson_gen'):
@@ -215,57 +208,29 @@ def get_free_generation_count(user, action_type='lesson_gen'):
 
 def deduct_credits(user, action_type, description=''):
     """Deduct credits for an AI action. Returns (success, error_dict_or_None)."""
-    from teachers.models import TeacherCreditBalance, CreditTransaction
     cost = CREDIT_COSTS.get(action_type, 1)
-
-    with transaction.atomic():
-        bal = TeacherCreditBalance.objects.select_for_update().get(teacher=user)
-        if bal.balance < cost:
-            return False, {
-                'status': 'error',
-                'error_code': 'insufficient_credits',
-                'message': (
-                    f'You need {cost} credit{"s" if cost != 1 else ""} for this action '
-                    f'but only have {bal.balance}. Buy more credits from the Add-on Store.'
-                ),
-                'balance': bal.balance,
-                'cost': cost,
-            }
-        bal.balance -= cost
-        bal.total_used += cost
-        bal.save(update_fields=['balance', 'total_used', 'updated_at'])
-
-        action_label = action_type.replace('_', ' ').title()
-        CreditTransaction.objects.create(
-            teacher=user,
-            amount=-cost,
-            balance_after=bal.balance,
-            transaction_type='usage',
-            description=description or f'{action_label} (-{cost} credit{"s" if cost != 1 else ""})',
-        )
+    action_label = action_type.replace('_', ' ').title()
+    ok, result = LEDGER.post(
+        user, -cost, 'usage',
+        description or f'{action_label} (-{cost} credit{"s" if cost != 1 else ""})',
+    )
+    if not ok:
+        return False, {
+            'status': 'error',
+            'error_code': 'insufficient_credits',
+            'message': (
+                f'You need {cost} credit{"s" if cost != 1 else ""} for this action '
+                f'but only have {result}. Buy more credits from the Add-on Store.'
+            ),
+            'balance': result,
+            'cost': cost,
+        }
     return True, None
 
 
 def add_credits(user, amount, transaction_type='purchase', description='', payment_reference=''):
     """Add credits to a teacher's balance."""
-    from teachers.models import TeacherCreditBalance, CreditTransaction
-
-    with transaction.atomic():
-        bal = _get_or_create_balance(user)
-        bal = TeacherCreditBalance.objects.select_for_update().get(teacher=user)
-        bal.balance += amount
-        if transaction_type == 'purchase':
-            bal.total_purchased += amount
-        bal.save(update_fields=['balance', 'total_purchased', 'updated_at'])
-
-        CreditTransaction.objects.create(
-            teacher=user,
-            amount=amount,
-            balance_after=bal.balance,
-            transaction_type=transaction_type,
-            description=description,
-            payment_reference=payment_reference,
-        )
+    _ok, bal = LEDGER.post(user, amount, transaction_type, description, payment_reference)
     return bal
 
 
@@ -277,10 +242,7 @@ def check_freemium_limit(user, slug, action_type='lesson_gen', free_limit=FREE_G
     if getattr(user, 'user_type', '') != 'teacher':
         return True, None
 
-    # Ensure balance exists (welcome bonus applied on first check)
-    _get_or_create_balance(user)
-
-    # Attempt to deduct credits
+    # Deduct credits (the ledger opens the account with the welcome bonus on first use)
     return deduct_credits(user, action_type)
 
 
@@ -296,24 +258,15 @@ def requires_addon_freemium(slug, free_limit=FREE_GENERATION_LIMIT, action_type=
             if request.user.user_type != 'teacher':
                 return view_fn(request, *args, **kwargs)
 
-            # Ensure balance exists
-            _get_or_create_balance(request.user)
-
             cost = CREDIT_COSTS.get(action_type, 1)
-            bal = get_credit_balance(request.user)
-
-            if bal >= cost:
-                # Deduct credits and proceed
-                ok, err = deduct_credits(request.user, action_type)
-                if ok:
-                    return view_fn(request, *args, **kwargs)
-                # Shouldn't happen (race condition), but handle
-                err_msg = err.get('message', 'Insufficient credits.')
-            else:
-                err_msg = (
-                    f'This action costs {cost} credit{"s" if cost != 1 else ""} '
-                    f'but you only have {bal}. Buy more credits from the Add-on Store.'
-                )
+            ok, err = deduct_credits(request.user, action_type)
+            if ok:
+                return view_fn(request, *args, **kwargs)
+            bal = err['balance']
+            err_msg = (
+                f'This action costs {cost} credit{"s" if cost != 1 else ""} '
+                f'but you only have {bal}. Buy more credits from the Add-on Store.'
+            )
 
             is_ajax = (
                 request.headers.get('X-Requested-With') == 'XMLHttpRequest'
@@ -325,7 +278,7 @@ def requires_addon_freemium(slug, free_limit=FREE_GENERATION_LIMIT, action_type=
                     'status': 'error',
                     'error_code': 'insufficient_credits',
                     'message': err_msg,
-                    'balance': get_credit_balance(request.user),
+                    'balance': bal,
                     'cost': cost,
                 }, status=403)
             messages.warning(request, err_msg)
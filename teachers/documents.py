@@ -0,0 +1,681 @@
+"""
+Renderers for teacher documents (accounts.documents): WAEC-style exam papers
+as DOCX and PDF, and slide decks as PPTX.
+
+Payload builders run in the view and turn model instances into plain data;
+the renderers only see that data.  python-docx, ReportLab and python-pptx
+are imported inside the functions that need them, and the paragraph styles
+and base document are built once per worker.
+"""
+import io
+import re
+from functools import lru_cache
+
+# Strip leading letter prefixes like "A) ", "A. ", "a) " from option text
+_OPT_PREFIX_RE = re.compile(r'^[A-Da-d][.)\]:]\s*')
+
+FORMAT_LABELS = {
+    'mcq': 'Multiple Choice', 'fill': 'Fill in the Blank',
+    'short': 'Short Answer', 'essay': 'Essay',
+    'truefalse': 'True or False',
+}
+
+
+def safe_title(title, default):
+    return ''.join(c for c in title if c.isalnum() or c in ' _-').strip()[:80] or default
+
+
+def _plural(n, word):
+    return f'{n} {word}{"s" if n != 1 else ""}'
+
+
+# ── Exam papers ────────────────────────────────────────────────
+
+def exam_paper_payload(paper, school_name='', school_motto=''):
+    """Everything an exam paper renderer needs, as JSON-serialisable data."""
+    questions = paper.questions.all().order_by('question_format', 'id')
+    return {
+        'school_name': school_name,
+        'school_motto': school_motto,
+        'title': paper.title,
+        'subject': paper.subject.name if paper.subject else '',
+        'class_name': paper.target_class.name if paper.target_class else '',
+        'duration': paper.duration_minutes,
+        'instructions': paper.instructions or '',
+        'questions': [
+            {
+                'format': q.question_format,
+                'text': q.question_text,
+                'options': [_OPT_PREFIX_RE.sub('', str(opt)) for opt in (q.options or [])],
+                'answer': q.correct_answer or '',
+                'explanation': q.explanation or '',
+            }
+            for q in questions
+        ],
+    }
+
+
+def _sections(questions):
+    """``[(letter, label, [(number, question), …]), …]`` — empty for a single format."""
+    grouped = {}
+    for number, q in enumerate(questions, 1):
+        grouped.setdefault(q['format'], []).append((number, q))
+    if len(grouped) <= 1:
+        return []
+    return [
+        (chr(65 + i), FORMAT_LABELS.get(fmt, fmt), numbered)
+        for i, (fmt, numbered) in enumerate(grouped.items())
+    ]
+
+
+def _meta_line(payload):
+    parts = [p for p in (payload['subject'], payload['class_name']) if p]
+    parts.append(f"Duration: {payload['duration']} mins")
+    parts.append(_plural(len(payload['questions']), 'Question'))
+    return '  |  '.join(parts)
+
+
+def _summary_parts(payload):
+    parts = [_plural(len(payload['questions']), 'question'), f"{payload['duration']} minutes"]
+    if payload['subject']:
+        parts.append(payload['subject'])
+    return parts
+
+
+@lru_cache(maxsize=1)
+def _docx_base():
+    """A4 Word document with the exam margins and Normal style, as bytes."""
+    from docx import Document
+    from docx.shared import Cm, Pt
+
+    doc = Document()
+    for section in doc.sections:
+        section.top_margin = Cm(1.5)
+        section.bottom_margin = Cm(1.8)
+        section.left_margin = Cm(2.0)
+        section.right_margin = Cm(2.0)
+    style = doc.styles['Normal']
+    style.font.name = 'Times New Roman'
+    style.font.size = Pt(11)
+    style.paragraph_format.space_after = Pt(2)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def _docx_borders(table, size, color):
+    from docx.oxml.ns import qn
+    tbl = table._tbl
+    tblPr = tbl.tblPr if tbl.tblPr is not None else tbl._add_tblPr()
+    borders = tblPr.find(qn('w:tblBorders'))
+    if borders is None:
+        borders = tblPr.makeelement(qn('w:tblBorders'), {})
+        tblPr.append(borders)
+    for edge in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'):
+        borders.append(borders.makeelement(qn(f'w:{edge}'), {
+            qn('w:val'): 'single', qn('w:sz'): size,
+            qn('w:space'): '0', qn('w:color'): color,
+        }))
+
+
+def _docx_paragraph_borders(p, edges):
+    from docx.oxml.ns import qn
+    pPr = p._p.get_or_add_pPr()
+    pBdr = pPr.makeelement(qn('w:pBdr'), {})
+    pPr.append(pBdr)
+    for edge_name, sz in edges:
+        pBdr.append(pBdr.makeelement(qn(f'w:{edge_name}'), {
+            qn('w:val'): 'single', qn('w:sz'): sz,
+            qn('w:space'): '1', qn('w:color'): '000000',
+        }))
+
+
+def exam_paper_docx(payload, progress):
+    """WAEC-standard Word document with a marking scheme on its own page."""
+    from docx import Document
+    from docx.enum.table import WD_TABLE_ALIGNMENT
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml.ns import qn
+    from docx.shared import Cm, Pt, RGBColor
+
+    doc = Document(io.BytesIO(_docx_base()))
+    questions = payload['questions']
+    sections = _sections(questions)
+    school_name = payload['school_name']
+
+    def add_centered(text, bold=False, size=None, caps=False, spacing=None, color=None):
+        p = doc.add_paragraph()
+        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        p.paragraph_format.space_before = Pt(0)
+        p.paragraph_format.space_after = Pt(spacing if spacing else 2)
+        run = p.add_run(text.upper() if caps else text)
+        run.bold = bold
+        if size:
+            run.font.size = Pt(size)
+        if color:
+            run.font.color.rgb = RGBColor(*color)
+        return p
+
+    def add_thin_line():
+        p = doc.add_paragraph()
+        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        p.paragraph_format.space_before = Pt(0)
+        p.paragraph_format.space_after = Pt(4)
+        run = p.add_run('─' * 50)
+        run.font.size = Pt(8)
+        run.font.color.rgb = RGBColor(0, 0, 0)
+
+    def add_lines(count):
+        for _ in range(count):
+            p = doc.add_paragraph()
+            p.paragraph_format.left_indent = Cm(1.4)
+            p.paragraph_format.space_before = Pt(0)
+            p.paragraph_format.space_after = Pt(0)
+            run = p.add_run('_' * 70)
+            run.font.size = Pt(9)
+            run.font.color.rgb = RGBColor(170, 170, 170)
+
+    def render_question(q, number):
+        p = doc.add_paragraph()
+        p.paragraph_format.space_before = Pt(4)
+        p.paragraph_format.space_after = Pt(2)
+        p.paragraph_format.left_indent = Cm(0.6)
+        p.paragraph_format.first_line_indent = Cm(-0.6)
+        run = p.add_run(f'{number}. ')
+        run.bold = True
+        run.font.size = Pt(11)
+        run = p.add_run(q['text'])
+        run.font.size = Pt(11)
+
+        fmt = q['format']
+        if fmt == 'mcq' and q['options']:
+            for idx, opt_text in enumerate(q['options']):
+                p = doc.add_paragraph()
+                p.paragraph_format.space_before = Pt(0)
+                p.paragraph_format.space_after = Pt(1)
+                p.paragraph_format.left_indent = Cm(1.4)
+                run = p.add_run(f'{chr(65 + idx)}. ')
+                run.bold = True
+                run.font.size = Pt(10)
+                run = p.add_run(opt_text)
+                run.font.size = Pt(10)
+        elif fmt in ('truefalse', 'fill'):
+            p = doc.add_paragraph()
+            p.paragraph_format.left_indent = Cm(1.4)
+            p.paragraph_format.space_after = Pt(2)
+            text = '☐ True          ☐ False' if fmt == 'truefalse' else 'Answer: ___________________________________'
+            p.add_run(text).font.size = Pt(10)
+        elif fmt == 'short':
+            add_lines(5)
+        elif fmt == 'essay':
+            add_lines(10)
+
+    # ── Masthead ──
+    if school_name:
+        add_centered(school_name, bold=True, size=14, caps=True, spacing=1)
+    if payload['school_motto']:
+        p = add_centered(f'"{payload["school_motto"]}"', size=9, spacing=4)
+        p.runs[0].italic = True
+        p.runs[0].font.color.rgb = RGBColor(85, 85, 85)
+
+    add_thin_line()
+    add_centered(payload['title'], bold=True, size=13, caps=True, spacing=2)
+    p = add_centered(_meta_line(payload), size=9, spacing=6)
+    p.runs[0].font.color.rgb = RGBColor(85, 85, 85)
+
+    # ── Candidate box (2×2 table) ──
+    table = doc.add_table(rows=2, cols=2)
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    _docx_borders(table, '6', '000000')
+    for i, label in enumerate(('NAME:', 'INDEX NO:', 'CLASS:', 'DATE:')):
+        p = table.cell(i // 2, i % 2).paragraphs[0]
+        p.paragraph_format.space_before = Pt(3)
+        p.paragraph_format.space_after = Pt(3)
+        run = p.add_run(label)
+        run.bold = True
+        run.font.size = Pt(8)
+        p.add_run('  _______________________________').font.size = Pt(9)
+
+    doc.add_paragraph()  # spacing
+
+    # ── Instructions ──
+    if payload['instructions']:
+        p = doc.add_paragraph()
+        p.paragraph_format.space_before = Pt(0)
+        p.paragraph_format.space_after = Pt(2)
+        run = p.add_run('INSTRUCTIONS TO CANDIDATES')
+        run.bold = True
+        run.font.size = Pt(8)
+        p = doc.add_paragraph()
+        p.paragraph_format.space_after = Pt(8)
+        p.add_run(payload['instructions']).font.size = Pt(10)
+
+    # ── Questions, by section when there is more than one format ──
+    total = len(questions) or 1
+    for letter, label, numbered in sections or [(None, None, list(enumerate(questions, 1)))]:
+        if letter:
+            p = doc.add_paragraph()
+            p.paragraph_format.space_before = Pt(10)
+            p.paragraph_format.space_after = Pt(4)
+            _docx_paragraph_borders(p, (('top', '12'), ('bottom', '4')))
+            run = p.add_run(f'SECTION {letter}: {label}')
+            run.bold = True
+            run.font.size = Pt(10)
+            run = p.add_run(f'    [{_plural(len(numbered), "question")}]')
+            run.font.size = Pt(9)
+            run.font.color.rgb = RGBColor(100, 100, 100)
+        for number, q in numbered:
+            render_question(q, number)
+            progress(number / total * 0.8)
+
+    # ── Footer ──
+    p = doc.add_paragraph()
+    p.paragraph_format.space_before = Pt(14)
+    _docx_paragraph_borders(p, (('top', '12'),))
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = p.add_run('— End of Paper —')
+    run.bold = True
+    run.font.size = Pt(10)
+
+    p = doc.add_paragraph()
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = p.add_run(' · '.join(_summary_parts(payload)))
+    run.font.size = Pt(8)
+    run.font.color.rgb = RGBColor(100, 100, 100)
+
+    # ── Marking Scheme (separate page) ──
+    doc.add_page_break()
+    add_centered('MARKING SCHEME', bold=True, size=14, caps=False, spacing=2)
+    if school_name:
+        p = add_centered(f'{school_name} — {payload["title"]}', size=9, spacing=6)
+        p.runs[0].font.color.rgb = RGBColor(85, 85, 85)
+    add_thin_line()
+
+    ms_table = doc.add_table(rows=1, cols=3)
+    ms_table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    for ci, header in enumerate(['No.', 'Answer', 'Explanation']):
+        cell = ms_table.rows[0].cells[ci]
+        p = cell.paragraphs[0]
+        p.paragraph_format.space_before = Pt(2)
+        p.paragraph_format.space_after = Pt(2)
+        run = p.add_run(header)
+        run.bold = True
+        run.font.size = Pt(9)
+        shading = cell._tc.get_or_add_tcPr().makeelement(qn('w:shd'), {
+            qn('w:val'): 'clear', qn('w:color'): 'auto', qn('w:fill'): 'E8E8E8',
+        })
+        cell._tc.get_or_add_tcPr().append(shading)
+
+    for num, q in enumerate(questions, 1):
+        row = ms_table.add_row()
+        cells = (
+            (str(num), {'bold': True}, 9, None),
+            (q['answer'] or '—', {}, 9, (13, 110, 63)),
+            (q['explanation'], {'italic': True}, 8, (100, 100, 100)),
+        )
+        for cell, (text, flags, size, color) in zip(row.cells, cells):
+            p = cell.paragraphs[0]
+            p.paragraph_format.space_before = Pt(2)
+            p.paragraph_format.space_after = Pt(2)
+            run = p.add_run(text)
+            run.bold = flags.get('bold')
+            run.italic = flags.get('italic')
+            run.font.size = Pt(size)
+            if color:
+                run.font.color.rgb = RGBColor(*color)
+    progress(0.95)
+
+    _docx_borders(ms_table, '4', '999999')
+    for row in ms_table.rows:
+        for ci, width in enumerate([Cm(1.2), Cm(5.5), Cm(10.0)]):
+            row.cells[ci].width = width
+
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=1)
+def _exam_pdf_styles():
+    from reportlab.lib.colors import HexColor, black
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import cm
+
+    styles = getSampleStyleSheet()
+    muted = HexColor('#555555')
+    s = {}
+    s['school'] = ParagraphStyle('School', parent=styles['Title'], fontSize=14,
+        fontName='Times-Bold', alignment=TA_CENTER, spaceAfter=2, textColor=black)
+    s['motto'] = ParagraphStyle('Motto', parent=styles['Normal'], fontSize=9,
+        fontName='Times-Italic', alignment=TA_CENTER, spaceAfter=6, textColor=muted)
+    s['paper_title'] = ParagraphStyle('PaperTitle', parent=styles['Title'],
+        fontSize=13, fontName='Times-Bold', alignment=TA_CENTER, spaceAfter=4, textColor=black)
+    s['meta'] = ParagraphStyle('Meta', parent=styles['Normal'], fontSize=9,
+        fontName='Times-Roman', alignment=TA_CENTER, spaceAfter=8, textColor=muted)
+    s['section'] = ParagraphStyle('Section', parent=styles['Heading2'],
+        fontSize=10, fontName='Times-Bold', spaceBefore=12, spaceAfter=4,
+        textColor=black, borderWidth=1, borderColor=black, borderPadding=4)
+    s['q'] = ParagraphStyle('Question', parent=styles['Normal'], fontSize=11,
+        fontName='Times-Roman', spaceBefore=6, spaceAfter=2,
+        leftIndent=0.6 * cm, firstLineIndent=-0.6 * cm)
+    s['opt'] = ParagraphStyle('Option', parent=styles['Normal'], fontSize=10,
+        fontName='Times-Roman', spaceBefore=0, spaceAfter=1, leftIndent=1.4 * cm)
+    s['line'] = ParagraphStyle('AnswerLine', parent=styles['Normal'], fontSize=9,
+        fontName='Times-Roman', leftIndent=1.4 * cm, spaceAfter=1, textColor=HexColor('#aaaaaa'))
+    s['footer'] = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=10,
+        fontName='Times-Bold', alignment=TA_CENTER, spaceBefore=14)
+    s['footer_meta'] = ParagraphStyle('FooterMeta', parent=styles['Normal'],
+        fontSize=8, fontName='Times-Roman', alignment=TA_CENTER, textColor=muted)
+    s['instr_head'] = ParagraphStyle('InstrHead', parent=styles['Normal'],
+        fontSize=8, fontName='Times-Bold', spaceAfter=2)
+    s['instr'] = ParagraphStyle('Instr', parent=styles['Normal'],
+        fontSize=10, fontName='Times-Roman', spaceAfter=8)
+    # Marking scheme
+    s['ms_title'] = ParagraphStyle('MSTitle', parent=styles['Title'], fontSize=14,
+        fontName='Times-Bold', alignment=TA_CENTER, spaceAfter=4)
+    s['ms_sub'] = ParagraphStyle('MSSub', parent=styles['Normal'], fontSize=9,
+        fontName='Times-Roman', alignment=TA_CENTER, spaceAfter=8, textColor=muted)
+    s['ms_cell'] = ParagraphStyle('MSCell', parent=styles['Normal'], fontSize=9,
+        fontName='Times-Roman', spaceAfter=0, spaceBefore=0)
+    s['ms_answer'] = ParagraphStyle('MSAnswer', parent=s['ms_cell'], textColor=HexColor('#0d6e3f'))
+    s['ms_expl'] = ParagraphStyle('MSExpl', parent=s['ms_cell'], fontSize=8,
+        fontName='Times-Italic', textColor=muted)
+    return s
+
+
+def _esc(text):
+    """Escape XML for a ReportLab Paragraph."""
+    return str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def exam_paper_pdf(payload, progress):
+    """The exam paper and its marking scheme as an A4 PDF."""
+    from reportlab.lib.colors import HexColor, black
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        HRFlowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle,
+    )
+
+    s = _exam_pdf_styles()
+    questions = payload['questions']
+    sections = _sections(questions)
+    school_name = payload['school_name']
+
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buf, pagesize=A4,
+        topMargin=1.5 * cm, bottomMargin=1.8 * cm,
+        leftMargin=2 * cm, rightMargin=2 * cm,
+    )
+    story = []
+
+    # Masthead
+    if school_name:
+        story.append(Paragraph(school_name.upper(), s['school']))
+    if payload['school_motto']:
+        story.append(Paragraph(f'"{payload["school_motto"]}"', s['motto']))
+    story.append(HRFlowable(width="80%", thickness=0.5, color=black,
+        spaceBefore=2, spaceAfter=6, hAlign='CENTER'))
+    story.append(Paragraph(payload['title'].upper(), s['paper_title']))
+    story.append(Paragraph(_meta_line(payload), s['meta']))
+
+    # Candidate box
+    avail_width = A4[0] - 4 * cm
+    cand_table = Table([
+        ['NAME: ____________________________', 'INDEX NO: ____________________________'],
+        ['CLASS: ____________________________', 'DATE: ________________________________'],
+    ], colWidths=[avail_width / 2] * 2)
+    cand_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Times-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BOX', (0, 0), (-1, -1), 0.5, black),
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, black),
+        ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    story.append(cand_table)
+    story.append(Spacer(1, 8))
+
+    if payload['instructions']:
+        story.append(Paragraph('INSTRUCTIONS TO CANDIDATES', s['instr_head']))
+        story.append(Paragraph(payload['instructions'], s['instr']))
+
+    def render_q_pdf(q, number):
+        story.append(Paragraph(f'<b>{number}.</b> {_esc(q["text"])}', s['q']))
+        fmt = q['format']
+        if fmt == 'mcq' and q['options']:
+            for idx, opt_text in enumerate(q['options']):
+                story.append(Paragraph(f'<b>{chr(65 + idx)}.</b> {_esc(opt_text)}', s['opt']))
+        elif fmt == 'truefalse':
+            story.append(Paragraph('☐ True          ☐ False', s['opt']))
+        elif fmt == 'fill':
+            story.append(Paragraph('Answer: ___________________________________', s['line']))
+        elif fmt == 'short':
+            for _ in range(4):
+                story.append(Paragraph('_' * 70, s['line']))
+        elif fmt == 'essay':
+            for _ in range(8):
+                story.append(Paragraph('_' * 70, s['line']))
+
+    total = len(questions) or 1
+    for letter, label, numbered in sections or [(None, None, list(enumerate(questions, 1)))]:
+        if letter:
+            story.append(Paragraph(
+                f"SECTION {letter}: {label}"
+                f"    <font color='#646464' size='9'>[{_plural(len(numbered), 'question')}]</font>",
+                s['section']))
+        for number, q in numbered:
+            render_q_pdf(q, number)
+            progress(number / total * 0.5)
+
+    # Footer
+    story.append(HRFlowable(width="100%", thickness=1, color=black,
+        spaceBefore=14, spaceAfter=4, hAlign='CENTER'))
+    story.append(Paragraph('— End of Paper —', s['footer']))
+    story.append(Paragraph(' · '.join(_summary_parts(payload)), s['footer_meta']))
+
+    # ── Marking Scheme (page 2) ──
+    story.append(PageBreak())
+    story.append(Paragraph('MARKING SCHEME', s['ms_title']))
+    if school_name:
+        story.append(Paragraph(f'{_esc(school_name)} — {_esc(payload["title"])}', s['ms_sub']))
+    story.append(HRFlowable(width="80%", thickness=0.5, color=black,
+        spaceBefore=2, spaceAfter=8, hAlign='CENTER'))
+
+    ms_data = [[
+        Paragraph('<b>No.</b>', s['ms_cell']),
+        Paragraph('<b>Answer</b>', s['ms_cell']),
+        Paragraph('<b>Explanation</b>', s['ms_cell']),
+    ]]
+    for num, q in enumerate(questions, 1):
+        ms_data.append([
+            Paragraph(f'<b>{num}</b>', s['ms_cell']),
+            Paragraph(_esc(q['answer'] or '—'), s['ms_answer']),
+            Paragraph(_esc(q['explanation']), s['ms_expl']),
+        ])
+    ms_table = Table(ms_data, colWidths=[1.2 * cm, 5.5 * cm, avail_width - 6.7 * cm], repeatRows=1)
+    ms_table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#E8E8E8')),
+        ('FONTNAME', (0, 0), (-1, 0), 'Times-Bold'),
+        ('BOX', (0, 0), (-1, -1), 0.5, HexColor('#999999')),
+        ('INNERGRID', (0, 0), (-1, -1), 0.25, HexColor('#999999')),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+        ('LEFTPADDING', (0, 0), (-1, -1), 4),
+    ]))
+    story.append(ms_table)
+    progress(0.6)
+
+    doc.build(story)
+    return buf.getvalue()
+
+
+# ── Slide decks ────────────────────────────────────────────────
+
+THEME_COLORS = {
+    'aurora':   {'bg': (30, 10, 64),   'accent': (124, 58, 237)},
+    'midnight': {'bg': (15, 23, 42),   'accent': (99, 102, 241)},
+    'forest':   {'bg': (2, 29, 17),    'accent': (52, 211, 153)},
+    'coral':    {'bg': (59, 0, 18),    'accent': (251, 113, 133)},
+    'slate':    {'bg': (15, 24, 36),   'accent': (148, 163, 184)},
+    'ocean':    {'bg': (12, 45, 78),   'accent': (56, 189, 248)},
+    'amber':    {'bg': (67, 20, 7),    'accent': (251, 191, 36)},
+    'rose':     {'bg': (76, 5, 25),    'accent': (244, 63, 94)},
+}
+
+
+def presentation_payload(deck):
+    return {
+        'title': deck.title,
+        'theme': deck.theme if deck.theme in THEME_COLORS else 'aurora',
+        'slides': [
+            {
+                'layout': s.layout,
+                'title': s.title or '',
+                'content': s.content or '',
+                'notes': s.speaker_notes or '',
+                'image_url': s.image_url or '',
+            }
+            for s in deck.slides.all()
+        ],
+    }
+
+
+def presentation_pptx(payload, progress):
+    """A 16:9 deck in the presentation's theme colours, speaker notes included."""
+    from pptx import Presentation as PPTXPres
+    from pptx.dml.color import RGBColor
+    from pptx.enum.text import PP_ALIGN
+    from pptx.util import Inches, Pt
+
+    colors = THEME_COLORS[payload['theme']]
+    bg_rgb      = RGBColor(*colors['bg'])
+    accent_rgb  = RGBColor(*colors['accent'])
+    text_rgb    = RGBColor(241, 245, 249)    # #f1f5f9
+    subtext_rgb = RGBColor(148, 163, 184)    # #94a3b8
+
+    prs = PPTXPres()
+    prs.slide_width  = Inches(13.333)
+    prs.slide_height = Inches(7.5)
+    blank_layout = prs.slide_layouts[6]
+    W = prs.slide_width
+    H = prs.slide_height
+    MARGIN = Inches(0.65)
+
+    def _set_bg(slide, rgb):
+        fill = slide.background.fill
+        fill.solid()
+        fill.fore_color.rgb = rgb
+
+    def _textbox(slide, text, left, top, width, height,
+                 font_size=18, bold=False, italic=False,
+                 color=None, align=PP_ALIGN.LEFT, wrap=True):
+        txb = slide.shapes.add_textbox(left, top, width, height)
+        tf  = txb.text_frame
+        tf.word_wrap = wrap
+        p   = tf.paragraphs[0]
+        p.alignment = align
+        run = p.add_run()
+        run.text            = text
+        run.font.size       = Pt(font_size)
+        run.font.bold       = bold
+        run.font.italic     = italic
+        run.font.color.rgb  = color if color is not None else text_rgb
+        return txb
+
+    def _bullets_frame(slide, items, left, top, width, height, font_size=18):
+        txb = slide.shapes.add_textbox(left, top, width, height)
+        tf  = txb.text_frame
+        tf.word_wrap = True
+        for i, item in enumerate(items):
+            p = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
+            p.text           = '▸  ' + item
+            p.font.size      = Pt(font_size)
+            p.font.color.rgb = subtext_rgb
+
+    slides = payload['slides']
+    for index, s in enumerate(slides, 1):
+        sl = prs.slides.add_slide(blank_layout)
+        _set_bg(sl, bg_rgb)
+        layout  = s['layout']
+        title   = s['title']
+        content = s['content']
+        bullets = [b.strip() for b in content.split('\n') if b.strip()]
+
+        if layout == 'title':
+            _textbox(sl, title, MARGIN, Inches(2.0), W - 2*MARGIN, Inches(2.2),
+                     font_size=44, bold=True, align=PP_ALIGN.CENTER)
+            sub = bullets[0] if bullets else content.strip()
+            if sub:
+                _textbox(sl, sub, MARGIN, Inches(4.3), W - 2*MARGIN, Inches(1.3),
+                         font_size=22, color=subtext_rgb, align=PP_ALIGN.CENTER)
+
+        elif layout == 'big_stat':
+            _textbox(sl, title, MARGIN, Inches(0.5), W - 2*MARGIN, Inches(0.9),
+                     font_size=18, color=subtext_rgb, align=PP_ALIGN.CENTER)
+            stat_val = bullets[0] if bullets else content.strip()
+            _textbox(sl, stat_val, MARGIN, Inches(1.4), W - 2*MARGIN, Inches(3.6),
+                     font_size=96, bold=True, color=accent_rgb, align=PP_ALIGN.CENTER)
+            if len(bullets) > 1:
+                _textbox(sl, bullets[1], MARGIN, Inches(5.1), W - 2*MARGIN, Inches(0.9),
+                         font_size=16, color=subtext_rgb, align=PP_ALIGN.CENTER)
+
+        elif layout == 'quote':
+            _textbox(sl, '“' + title + '”', MARGIN, Inches(1.4), W - 2*MARGIN, Inches(3.8),
+                     font_size=32, italic=True, align=PP_ALIGN.CENTER)
+            author = bullets[0] if bullets else ''
+            if author:
+                _textbox(sl, '— ' + author, MARGIN, Inches(5.5), W - 2*MARGIN, Inches(0.9),
+                         font_size=16, color=subtext_rgb, align=PP_ALIGN.CENTER)
+
+        elif layout == 'two_col':
+            _textbox(sl, title, MARGIN, MARGIN, W - 2*MARGIN, Inches(0.95), font_size=28, bold=True)
+            mid   = W / 2
+            col_w = mid - MARGIN - Inches(0.15)
+            half  = max(len(bullets) // 2, 1)
+            _bullets_frame(sl, bullets[:half],  MARGIN,               Inches(1.55), col_w, H - Inches(2.4))
+            _bullets_frame(sl, bullets[half:],  mid + Inches(0.15),   Inches(1.55), col_w, H - Inches(2.4))
+
+        elif layout in ('poll', 'quiz'):
+            _textbox(sl, title, MARGIN, MARGIN, W - 2*MARGIN, Inches(1.3), font_size=30, bold=True)
+            y = Inches(1.65)
+            for b in bullets[:6]:
+                _textbox(sl, b, MARGIN, y, W - 2*MARGIN, Inches(0.8), font_size=18, color=subtext_rgb)
+                y += Inches(0.92)
+
+        elif layout == 'video':
+            _textbox(sl, title, MARGIN, MARGIN, W - 2*MARGIN, Inches(1.1), font_size=32, bold=True)
+            note = content.strip() or '(no URL)'
+            _textbox(sl, '\U0001f3ac  Video: ' + note, MARGIN, Inches(2.0), W - 2*MARGIN, Inches(1.5),
+                     font_size=14, italic=True, color=subtext_rgb)
+
+        elif layout == 'image':
+            _textbox(sl, title, MARGIN, MARGIN, W - 2*MARGIN, Inches(1.1), font_size=32, bold=True)
+            img_note = s['image_url'][:80] if s['image_url'] else '(no image)'
+            _textbox(sl, '\U0001f5bc\ufe0f  Image: ' + img_note, MARGIN, Inches(2.0), W - 2*MARGIN, Inches(1.5),
+                     font_size=14, italic=True, color=subtext_rgb)
+            cap = bullets[0] if bullets else ''
+            if cap:
+                _textbox(sl, cap, MARGIN, Inches(6.2), W - 2*MARGIN, Inches(0.8),
+                         font_size=14, color=subtext_rgb, align=PP_ALIGN.CENTER)
+
+        else:  # bullets, summary
+            _textbox(sl, title, MARGIN, MARGIN, W - 2*MARGIN, Inches(1.15), font_size=32, bold=True)
+            if bullets:
+                _bullets_frame(sl, bullets, MARGIN, Inches(1.6), W - 2*MARGIN, H - Inches(2.5))
+            elif content.strip():
+                _textbox(sl, content.strip(), MARGIN, Inches(1.6), W - 2*MARGIN, H - Inches(2.5),
+                         font_size=16, color=subtext_rgb)
+
+        if s['notes']:
+            sl.notes_slide.notes_text_frame.text = s['notes']
+        progress(index / len(slides) * 0.9)
+
+    buf = io.BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
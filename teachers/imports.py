@@ -0,0 +1,122 @@
+"""
+Teacher importer for the staged CSV pipeline (accounts.imports).
+"""
+from datetime import date, datetime
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Q
+
+from accounts.imports import (
+    CodeAllocator, Importer, UsernameAllocator, allocate_email, is_blank, pick, username_base,
+)
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y')
+
+
+def _parse_joining_date(value):
+    if is_blank(value):
+        return date.today()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return date.today()
+
+
+class TeacherImporter(Importer):
+    noun = 'teacher'
+
+    def validate(self, batch, rows):
+        from accounts.models import User
+        from teachers.models import Teacher
+
+        parsed = []
+        for row in rows:
+            d = row.data
+            parsed.append({
+                'first_name': pick(d, 'First Name', 'first_name'),
+                'last_name': pick(d, 'Last Name', 'last_name'),
+                'employee_id': pick(d, 'Employee ID', 'employee_id').replace(' ', ''),
+                'email': pick(d, 'Email', 'email'),
+                'qualification': pick(d, 'Qualification', 'qualification'),
+                'date_of_joining': pick(d, 'Date of Joining', 'date_of_joining'),
+                'age': pick(d, 'Age', 'age'),
+            })
+
+        provided = {p['employee_id'] for p in parsed if not is_blank(p['employee_id'])}
+        taken_ids = set(
+            Teacher.objects.filter(Q(employee_id__in=provided) | Q(employee_id__startswith='TCH'))
+            .values_list('employee_id', flat=True)
+        ) | self.reserved(batch, rows, 'employee_id')
+        usernames = UsernameAllocator(
+            [username_base(p['first_name'], p['last_name']) for p in parsed if p['first_name']],
+            reserved=self.reserved(batch, rows, 'username'),
+        )
+        emails = set(
+            User.objects.filter(email__in={p['email'] for p in parsed if not is_blank(p['email'])})
+            .values_list('email', flat=True)
+        ) | self.reserved(batch, rows, 'email')
+        generated = CodeAllocator('TCH', taken_ids)
+
+        for row, p in zip(rows, parsed):
+            if not p['first_name']:
+                row.error = 'Missing first name'
+                continue
+
+            if not is_blank(p['employee_id']):
+                employee_id = p['employee_id']
+                if employee_id in taken_ids:
+                    row.error = f"Employee ID '{employee_id}' already exists"
+                    continue
+                taken_ids.add(employee_id)
+            else:
+                employee_id = generated.allocate()
+                if not employee_id:
+                    row.error = 'Could not generate unique employee ID'
+                    continue
+
+            try:
+                age = int(p['age']) if p['age'] else 30
+            except ValueError:
+                age = 30
+            username = usernames.allocate(username_base(p['first_name'], p['last_name']))
+            row.resolved = {
+                'username': username,
+                'first_name': p['first_name'],
+                'last_name': p['last_name'],
+                'email': allocate_email(p['email'], username, emails),
+                'employee_id': employee_id,
+                'date_of_birth': date(max(1900, date.today().year - age), 1, 1).isoformat(),
+                'date_of_joining': _parse_joining_date(p['date_of_joining']).isoformat(),
+                'qualification': (
+                    'Bachelor of Education' if is_blank(p['qualification']) else p['qualification']
+                ),
+            }
+
+    def commit(self, batch, rows):
+        from accounts.models import User
+        from teachers.models import Teacher
+
+        resolved = [row.resolved for row in rows]
+        users = User.objects.bulk_create([
+            User(
+                username=r['username'],
+                first_name=r['first_name'],
+                last_name=r['last_name'],
+                email=r['email'],
+                user_type='teacher',
+                password=make_password(None),
+            )
+            for r in resolved
+        ])
+        Teacher.objects.bulk_create([
+            Teacher(
+                user=user,
+                employee_id=r['employee_id'],
+                date_of_birth=date.fromisoformat(r['date_of_birth']),
+                date_of_joining=date.fromisoformat(r['date_of_joining']),
+                qualification=r['qualification'],
+            )
+            for user, r in zip(users, resolved)
+        ])
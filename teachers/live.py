@@ -0,0 +1,753 @@
+"""
+Live classroom state: presentation sessions, live quizzes and Pulse check-ins.
+
+A 40-student class polling every two seconds cost about twenty queries a
+second per classroom: ``live_state`` re-read the session and every slide
+and counted distinct voters, ``live_quiz_api`` ran five ``COUNT``s per
+question, and ``pulse_poll`` looked up the session, checked for a
+submission and upserted a typing flag on every tick.
+
+  * **State** lives in ``school_system.livestate`` — the current slide's
+    payload, votes, quiz answers, Pulse answers and who has the Pulse card
+    open.  Polls are answered from it without touching Postgres.
+  * **Write-behind**: votes and answers are also queued and written to
+    ``PollResponse``, ``LiveQuizResponse`` and ``PulseResponse`` as bulk
+    upserts — once ``LIVE_STATE_FLUSH_BATCH`` are waiting or every
+    ``LIVE_STATE_FLUSH_SECONDS``, when the session ends, and from
+    ``manage.py flush_live_state``.
+  * **Recovery**: a session missing from the store (expired, evicted,
+    Redis restarted) is rebuilt from its rows after replaying whatever a
+    crashed flush left queued, so nothing a student already sent is lost.
+  * Without a store every call reads and writes the models directly, as
+    before, with grouped counts in place of one query per option.
+
+Usage::
+
+    from teachers import live
+
+    state = live.presentation_state(code)        # what live_state returns
+    live.presentation_vote(code, slide_pk, 'Ama', 'B')
+    live.end_presentation(code)                   # flush what is queued, drop the state
+
+Settings:
+  LIVE_PRESENCE_SECONDS   How long after its last poll a student still counts
+                          as looking at the Pulse card (default 10)
+"""
+import logging
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from school_system import livestate
+from school_system.livestate import key
+
+logger = logging.getLogger(__name__)
+
+
+def _safely(session, flush):
+    try:
+        flush()
+    except Exception:
+        # The entries stay queued for the next flush; the request must not fail.
+        logger.warning('Live-state flush failed for %s', session, exc_info=True)
+
+
+def _flush_if_due(st, session, flush):
+    if livestate.due(st, session):
+        _safely(session, flush)
+
+
+def _after_commit(fn):
+    # A poll before the view's transaction commits would rebuild the old
+    # state from the database and keep it for LIVE_STATE_TTL.
+    if connection.in_atomic_block:
+        transaction.on_commit(fn)
+    else:
+        fn()
+
+
+def flush_all():
+    """Write every pending entry of this schema.  Returns how many were written."""
+    st = livestate.store()
+    if st is None:
+        return 0
+    written = 0
+    for session in livestate.dirty(st):
+        kind, _, ident = session.partition(':')
+        flush = {'pres': flush_presentation, 'quiz': flush_quiz, 'pulse': flush_pulse}.get(kind)
+        if flush is None:
+            continue
+        for _ in range(3):  # a leftover batch, then what is pending, then anything new
+            n = flush(ident)
+            if not n:
+                break
+            written += n
+    return written
+
+
+# ── Presentations ──────────────────────────────────────────────
+
+def student_notes(raw_notes):
+    """The student-visible part of a slide's speaker notes."""
+    text = str(raw_notes or '').strip()
+    if not text:
+        return ''
+
+    # Remove quiz answer prefix if present.
+    lines = text.splitlines()
+    if lines and lines[0].strip().upper().startswith('ANSWER:'):
+        text = '\n'.join(lines[1:]).strip()
+        if not text:
+            return ''
+
+    lower = text.lower()
+    student_idx = lower.find('student notes:')
+    if student_idx != -1:
+        return text[student_idx + len('student notes:'):].strip()
+
+    # If explicitly structured but missing student section, hide teacher-only content.
+    if 'teacher cue:' in lower:
+        return ''
+
+    # Legacy plain notes are treated as student-visible.
+    return text
+
+
+def _slide_payload(slides, order):
+    slide = next((s for s in slides if s.order == order), slides[0] if slides else None)
+    if slide is None:
+        return None
+    return {
+        'slide_pk': slide.pk,
+        'layout': slide.layout,
+        'title': slide.title,
+        'content': slide.content,
+        'emoji': slide.emoji,
+        'image_url': slide.image_url,
+        'student_notes': student_notes(slide.speaker_notes),
+    }
+
+
+def _load_presentation(st, code):
+    from .models import LiveSession, PollResponse
+
+    sid = f'pres:{code}'
+    session = LiveSession.objects.filter(code=code).first()
+    if session is None or not session.is_active:
+        meta = {'is_active': False}
+    else:
+        _safely(sid, lambda: _flush_presentation(st, code, session.pk))  # replay what a crash left queued
+        slides = list(session.presentation.slides.all())
+        meta = {
+            'is_active': True,
+            'session_id': session.pk,
+            'order': session.current_slide_order,
+            'slides': [s.pk for s in slides],
+            'slide': _slide_payload(slides, session.current_slide_order),
+        }
+        votes = list(PollResponse.objects.filter(session=session)
+                     .values_list('slide_id', 'student_name', 'choice'))
+        st.delete(key(sid, 'votes'), key(sid, 'people'), key(sid, 'time'))
+        st.hset(key(sid, 'votes'), {f'{slide}:{name}': choice for slide, name, choice in votes})
+        for _, name, _ in votes:
+            st.sadd(key(sid, 'people'), name)
+        st.hset(key(sid, 'time'), session.slide_time_data or {})
+    st.hset(key(sid), {'meta': meta})
+    livestate.touch(st, sid, 'votes', 'people', 'time')
+    return meta
+
+
+def _presentation_meta(st, code):
+    meta = st.hget(key(f'pres:{code}'), 'meta')
+    return meta if meta is not None else _load_presentation(st, code)
+
+
+def presentation_state(code):
+    """Current slide and participant count of session ``code`` (``{'is_active': False}`` once ended)."""
+    st = livestate.store()
+    if st is None:
+        from .models import LiveSession
+        session = LiveSession.objects.filter(code=code, is_active=True).first()
+        if session is None:
+            return {'is_active': False}
+        state = {
+            'is_active': True,
+            'current_slide_order': session.current_slide_order,
+            'participant_count': session.responses.values('student_name').distinct().count(),
+        }
+        state.update(_slide_payload(list(session.presentation.slides.all()), session.current_slide_order) or {})
+        return state
+
+    meta = _presentation_meta(st, code)
+    if not meta['is_active']:
+        return {'is_active': False}
+    state = {
+        'is_active': True,
+        'current_slide_order': meta['order'],
+        'participant_count': st.scard(key(f'pres:{code}', 'people')),
+    }
+    state.update(meta['slide'] or {})
+    return state
+
+
+def presentation_slide_changed(deck, codes, order):
+    """The teacher moved sessions ``codes`` of ``deck`` to slide ``order`` (applied on commit)."""
+    st = livestate.store()
+    if st is None or not codes:
+        return
+    slides = list(deck.slides.all())
+    update = {'order': order, 'slides': [s.pk for s in slides], 'slide': _slide_payload(slides, order)}
+
+    def apply():
+        for code in codes:
+            meta = st.hget(key(f'pres:{code}'), 'meta')
+            if not (meta and meta['is_active']):
+                continue
+            meta.update(update)
+            st.hset(key(f'pres:{code}'), {'meta': meta})
+
+    _after_commit(apply)
+
+
+def presentation_vote(code, slide_pk, student_name, choice):
+    """Record a poll vote.  Returns 'ok', 'ended' or 'no-slide'."""
+    st = livestate.store()
+    if st is None:
+        from .models import LiveSession, PollResponse, Slide
+        session = LiveSession.objects.filter(code=code, is_active=True).first()
+        if session is None:
+            return 'ended'
+        if not Slide.objects.filter(pk=slide_pk).exists():
+            return 'no-slide'
+        PollResponse.objects.update_or_create(
+            session=session, slide_id=slide_pk, student_name=student_name,
+            defaults={'choice': choice},
+        )
+        return 'ok'
+
+    meta = _presentation_meta(st, code)
+    if not meta['is_active']:
+        return 'ended'
+    try:
+        slide_pk = int(slide_pk)
+    except (TypeError, ValueError):
+        return 'no-slide'
+    if slide_pk not in meta['slides']:
+        return 'no-slide'
+    sid, field = f'pres:{code}', f'{slide_pk}:{student_name}'
+    st.hset(key(sid, 'votes'), {field: choice})
+    st.sadd(key(sid, 'people'), student_name)
+    livestate.queue(st, sid, {f'v:{field}': choice})
+    livestate.touch(st, sid, 'votes', 'people', 'time')
+    _flush_if_due(st, sid, lambda: _flush_presentation(st, code, meta['session_id']))
+    return 'ok'
+
+
+def presentation_results(code, slide_pk):
+    """``{'counts': {A..D}, 'total'}`` for one slide, or None if there is no session ``code``."""
+    counts = {'A': 0, 'B': 0, 'C': 0, 'D': 0}
+    st = livestate.store()
+    meta = _presentation_meta(st, code) if st is not None else None
+    if meta and meta['is_active']:
+        prefix = f'{slide_pk}:'
+        choices = Counter(c for f, c in st.hgetall(key(f'pres:{code}', 'votes')).items() if f.startswith(prefix))
+    else:
+        from .models import LiveSession, PollResponse
+        if not LiveSession.objects.filter(code=code).exists():
+            return None
+        choices = dict(
+            PollResponse.objects.filter(session__code=code, slide_id=slide_pk)
+            .values('choice').annotate(n=Count('pk')).values_list('choice', 'n')
+        )
+    for choice in counts:
+        counts[choice] = choices.get(choice, 0)
+    return {'counts': counts, 'total': sum(counts.values())}
+
+
+def presentation_slide_time(code, slide_pk, seconds):
+    """Add ``seconds`` a student spent on ``slide_pk``."""
+    st = livestate.store()
+    meta = _presentation_meta(st, code) if st is not None else None
+    if meta and meta['is_active']:
+        sid = f'pres:{code}'
+        total = st.hincr(key(sid, 'time'), slide_pk, seconds)
+        livestate.queue(st, sid, {f't:{slide_pk}': int(total)})
+        livestate.touch(st, sid, 'votes', 'people', 'time')
+        _flush_if_due(st, sid, lambda: _flush_presentation(st, code, meta['session_id']))
+        return
+
+    from .models import LiveSession
+    session = LiveSession.objects.filter(code=code).first()
+    if session is None:
+        return
+    time_data = session.slide_time_data or {}
+    time_data[slide_pk] = time_data.get(slide_pk, 0) + seconds
+    session.slide_time_data = time_data
+    session.save(update_fields=['slide_time_data'])
+
+
+def _flush_presentation(st, code, session_id):
+    def write(entries):
+        from .models import LiveSession, PollResponse, Slide
+
+        votes = [(f[2:].split(':', 1), c) for f, c in entries.items() if f.startswith('v:')]
+        live_slides = set(Slide.objects.filter(pk__in={int(s) for (s, _), _ in votes}).values_list('pk', flat=True))
+        PollResponse.objects.bulk_create(
+            [PollResponse(session_id=session_id, slide_id=int(s), student_name=name, choice=c)
+             for (s, name), c in votes if int(s) in live_slides],
+            update_conflicts=True, unique_fields=['session', 'slide', 'student_name'], update_fields=['choice'],
+        )
+        times = {f[2:]: seconds for f, seconds in entries.items() if f.startswith('t:')}
+        if times:
+            session = LiveSession.objects.filter(pk=session_id).first()
+            if session is not None:
+                session.slide_time_data = {**(session.slide_time_data or {}), **times}
+                session.save(update_fields=['slide_time_data'])
+
+    return livestate.drain(st, f'pres:{code}', write)
+
+
+def flush_presentation(code):
+    """Write session ``code``'s queued votes and slide times."""
+    st = livestate.store()
+    if st is None:
+        return 0
+    from .models import LiveSession
+    meta = st.hget(key(f'pres:{code}'), 'meta')
+    session_id = (meta or {}).get('session_id') or (
+        LiveSession.objects.filter(code=code).values_list('pk', flat=True).first()
+    )
+    return _flush_presentation(st, code, session_id) if session_id else 0
+
+
+def end_presentation(code):
+    """Session ``code`` ended: write what is queued and drop its state on commit.
+
+    Entries a busy flush leaves queued stay listed as dirty and are written
+    by ``flush_live_state``.
+    """
+    st = livestate.store()
+    if st is None:
+        return
+    sid = f'pres:{code}'
+    _safely(sid, lambda: flush_presentation(code))
+    _after_commit(lambda: st.delete(key(sid), key(sid, 'votes'), key(sid, 'people'), key(sid, 'time')))
+
+
+# ── Live quizzes ───────────────────────────────────────────────
+
+QUIZ_QUESTION_FIELDS = ('id', 'order', 'text', 'option_a', 'option_b', 'option_c', 'option_d',
+                        'correct', 'time_limit')
+
+
+def _load_quiz(st, code):
+    from .models import LiveQuiz, LiveQuizResponse
+
+    sid = f'quiz:{code}'
+    quiz = LiveQuiz.objects.filter(join_code=code).first()
+    if quiz is None:
+        meta = {}
+    else:
+        _safely(sid, lambda: flush_quiz(code))  # replay what a crash left queued
+        meta = {
+            'id': quiz.pk,
+            'is_active': quiz.is_active,
+            'questions': list(quiz.questions.values(*QUIZ_QUESTION_FIELDS)),
+        }
+        st.delete(key(sid, 'answers'))
+        st.hset(key(sid, 'answers'), {
+            f'{qid}:{player}': [choice, correct]
+            for qid, player, choice, correct in LiveQuizResponse.objects.filter(question__quiz=quiz)
+            .values_list('question_id', 'player_name', 'choice', 'is_correct')
+        })
+    st.hset(key(sid), {'meta': meta})
+    livestate.touch(st, sid, 'answers')
+    return meta
+
+
+def _quiz_meta(st, code):
+    meta = st.hget(key(f'quiz:{code}'), 'meta')
+    return meta if meta is not None else _load_quiz(st, code)
+
+
+def _quiz_summary(questions, answers):
+    """Per-question totals and the top-20 leaderboard from ``(qid, player, choice, correct)`` rows."""
+    by_question = {q['id']: q for q in questions}
+    for q in questions:
+        q.update(total=0, correct_count=0, breakdown={'A': 0, 'B': 0, 'C': 0, 'D': 0})
+    scores = Counter()
+    for qid, player, choice, correct in answers:
+        q = by_question.get(qid)
+        if q is None:
+            continue
+        q['total'] += 1
+        if choice in q['breakdown']:
+            q['breakdown'][choice] += 1
+        if correct:
+            q['correct_count'] += 1
+            scores[player] += 1
+    leaderboard = [
+        {'player_name': player, 'score': score}
+        for player, score in sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:20]
+    ]
+    return questions, leaderboard
+
+
+def quiz_results(quiz):
+    """``(questions with counts, leaderboard)`` for the teacher's live view."""
+    from .models import LiveQuizResponse
+
+    st = livestate.store()
+    if st is not None and quiz.is_active:
+        meta = _quiz_meta(st, quiz.join_code)
+        answers = (
+            (int(f.split(':', 1)[0]), f.split(':', 1)[1], choice, correct)
+            for f, (choice, correct) in st.hgetall(key(f'quiz:{quiz.join_code}', 'answers')).items()
+        )
+        return _quiz_summary([dict(q) for q in meta['questions']], answers)
+    return _quiz_summary(
+        list(quiz.questions.values(*QUIZ_QUESTION_FIELDS)),
+        LiveQuizResponse.objects.filter(question__quiz=quiz)
+        .values_list('question_id', 'player_name', 'choice', 'is_correct'),
+    )
+
+
+def quiz_answer(code, question_id, player, choice):
+    """Record a player's first answer.  Returns ``(payload, status)`` for the JSON response."""
+    st = livestate.store()
+    if st is None:
+        from .models import LiveQuiz, LiveQuizQuestion, LiveQuizResponse
+        quiz = LiveQuiz.objects.filter(join_code=code).first()
+        if quiz is None:
+            raise Http404('No such quiz')
+        if not quiz.is_active:
+            return {'error': 'Quiz is closed.'}, 403
+        question = LiveQuizQuestion.objects.filter(id=question_id, quiz=quiz).first()
+        if question is None:
+            raise Http404('No such question')
+        is_correct = choice == question.correct.upper()
+        obj, created = LiveQuizResponse.objects.get_or_create(
+            question=question, player_name=player,
+            defaults={'choice': choice, 'is_correct': is_correct},
+        )
+        if not created:
+            return {'error': 'Already answered.', 'is_correct': obj.is_correct}, 200
+        return {'is_correct': is_correct, 'correct_answer': question.correct}, 200
+
+    meta = _quiz_meta(st, code)
+    if not meta:
+        raise Http404('No such quiz')
+    if not meta['is_active']:
+        return {'error': 'Quiz is closed.'}, 403
+    question = next((q for q in meta['questions'] if str(q['id']) == str(question_id)), None)
+    if question is None:
+        raise Http404('No such question')
+    sid = f'quiz:{code}'
+    field = f'{question["id"]}:{player}'
+    is_correct = choice == question['correct'].upper()
+    if not st.hsetnx(key(sid, 'answers'), field, [choice, is_correct]):
+        _, was_correct = st.hget(key(sid, 'answers'), field)
+        return {'error': 'Already answered.', 'is_correct': was_correct}, 200
+    livestate.queue(st, sid, {field: [choice, is_correct]})
+    livestate.touch(st, sid, 'answers')
+    _flush_if_due(st, sid, lambda: flush_quiz(code))
+    return {'is_correct': is_correct, 'correct_answer': question['correct']}, 200
+
+
+def flush_quiz(code):
+    """Write quiz ``code``'s queued answers (first answer per player wins)."""
+    st = livestate.store()
+    if st is None:
+        return 0
+
+    def write(entries):
+        from .models import LiveQuizQuestion, LiveQuizResponse
+
+        rows = [(f.split(':', 1), answer) for f, answer in entries.items()]
+        live_questions = set(
+            LiveQuizQuestion.objects.filter(pk__in={int(q) for (q, _), _ in rows}).values_list('pk', flat=True)
+        )
+        LiveQuizResponse.objects.bulk_create([
+            LiveQuizResponse(question_id=int(q), player_name=player, choice=choice, is_correct=correct)
+            for (q, player), (choice, correct) in rows if int(q) in live_questions
+        ], ignore_conflicts=True)
+
+    return livestate.drain(st, f'quiz:{code}', write)
+
+
+def reset_quiz(code):
+    """Quiz ``code`` was opened or closed: write what is queued and drop its state on commit."""
+    st = livestate.store()
+    if st is None:
+        return
+    _safely(f'quiz:{code}', lambda: flush_quiz(code))
+    _after_commit(lambda: st.delete(key(f'quiz:{code}'), key(f'quiz:{code}', 'answers')))
+
+
+# ── Pulse check-ins ────────────────────────────────────────────
+
+def _pulse_meta_from(session):
+    if session.lesson_plan_id:
+        topic = session.lesson_plan.topic
+    elif session.presentation_id:
+        topic = session.presentation.title
+    else:
+        topic = 'Pulse Check'
+    class_ids = [session.target_class_id]
+    if session.lesson_plan_id:
+        class_ids.append(session.lesson_plan.school_class_id)
+    return {
+        'id': session.pk,
+        'status': session.status,
+        'class_ids': [c for c in class_ids if c],
+        'topic': topic,
+        'q1': session.q1_text,
+        'q2': session.q2_text,
+        'q3': session.q3_text,
+        'chips': session.q3_chips,
+        'total': session.total_students,
+    }
+
+
+def _load_pulse(st, session_id):
+    from academics.pulse_models import PulseResponse, PulseSession
+
+    sid = f'pulse:{session_id}'
+    session = (PulseSession.objects.select_related('lesson_plan', 'presentation')
+               .filter(pk=session_id).first())
+    if session is None:
+        meta = {}
+    else:
+        _safely(sid, lambda: flush_pulse(session_id))  # replay what a crash left queued
+        meta = _pulse_meta_from(session)
+        rows = list(PulseResponse.objects.filter(session=session).values_list(
+            'student_id', 'q1_answer', 'q2_answer', 'q3_answer', 'submitted_at',
+            'student__user__first_name', 'student__user__last_name',
+        ))
+        st.delete(key(sid, 'answers'), key(sid, 'names'))
+        st.hset(key(sid, 'answers'), {
+            student_id: {'q1': q1, 'q2': q2, 'q3': q3, 'at': at.isoformat()}
+            for student_id, q1, q2, q3, at, _, _ in rows if at is not None
+        })
+        st.hset(key(sid, 'names'), {
+            student_id: f'{first} {last}'.strip() for student_id, *_, first, last in rows
+        })
+    st.hset(key(sid), {'meta': meta})
+    livestate.touch(st, sid, 'answers', 'names', 'seen')
+    return meta
+
+
+def pulse_meta(session_id):
+    """The session's questions, status and target classes (None if it does not exist)."""
+    st = livestate.store()
+    if st is None:
+        from academics.pulse_models import PulseSession
+        session = (PulseSession.objects.select_related('lesson_plan', 'presentation')
+                   .filter(pk=session_id).first())
+        return _pulse_meta_from(session) if session else None
+    meta = st.hget(key(f'pulse:{session_id}'), 'meta')
+    if meta is None:
+        meta = _load_pulse(st, session_id)
+    return meta or None
+
+
+def _pulse_card(meta):
+    return {k: meta[k] for k in ('id', 'topic', 'q1', 'q2', 'q3', 'chips')}
+
+
+def pulse_for_student(user):
+    """The Pulse card for ``user``'s class, or None (no active pulse, or already answered).
+
+    Also marks the student as looking at the card.
+    """
+    from academics.pulse_models import PulseResponse, PulseSession
+    from students.models import Student
+
+    st = livestate.store()
+    if st is None:
+        student = Student.objects.select_related('current_class').get(user=user)
+        if not student.current_class_id:
+            return None
+        session = (
+            PulseSession.objects.select_related('lesson_plan', 'presentation')
+            .filter(Q(lesson_plan__school_class_id=student.current_class_id)
+                    | Q(target_class_id=student.current_class_id), status='active')
+            .order_by('-created_at').first()
+        )
+        if session is None:
+            return None
+        response, _ = PulseResponse.objects.get_or_create(session=session, student=student)
+        if response.submitted_at is not None:
+            return None
+        if not response.is_typing:
+            PulseResponse.objects.filter(pk=response.pk).update(is_typing=True)
+        return _pulse_card(_pulse_meta_from(session))
+
+    who_key = key(f'pulse-student:{user.pk}')
+    who = st.hget(who_key, 'who')
+    if who is None:
+        who = list(Student.objects.filter(user=user).values_list('pk', 'current_class_id').first() or (None, None))
+        st.hset(who_key, {'who': who})
+        st.expire([who_key], 300)
+    student_id, class_id = who
+    if not class_id:
+        return None
+
+    class_key = key(f'pulse-class:{class_id}')
+    session_id = st.hget(class_key, 'session')
+    if session_id is None:
+        session_id = (
+            PulseSession.objects.filter(Q(lesson_plan__school_class_id=class_id) | Q(target_class_id=class_id),
+                                        status='active')
+            .order_by('-created_at').values_list('pk', flat=True).first()
+        ) or 0
+        st.hset(class_key, {'session': session_id})
+        st.expire([class_key], livestate.ttl())
+    if not session_id:
+        return None
+
+    meta = pulse_meta(session_id)
+    if not meta or meta['status'] != 'active':
+        return None
+    sid = f'pulse:{session_id}'
+    if st.hget(key(sid, 'answers'), student_id) is not None:
+        return None
+    st.zadd(key(sid, 'seen'), student_id, time.time())
+    if st.hsetnx(key(sid, 'names'), student_id, f'{user.first_name} {user.last_name}'.strip()):
+        livestate.queue(st, sid, {student_id: None})  # the row, with is_typing set
+    livestate.touch(st, sid, 'answers', 'names', 'seen')
+    _flush_if_due(st, sid, lambda: flush_pulse(session_id))
+    return _pulse_card(meta)
+
+
+def pulse_answer(session_id, student, q1, q2, q3):
+    """Record ``student``'s submitted answers."""
+    from academics.pulse_models import PulseResponse
+
+    now = timezone.now()
+    st = livestate.store()
+    if st is None:
+        PulseResponse.objects.update_or_create(
+            session_id=session_id, student=student,
+            defaults={'q1_answer': q1, 'q2_answer': q2, 'q3_answer': q3,
+                      'is_typing': False, 'submitted_at': now},
+        )
+        return
+    sid = f'pulse:{session_id}'
+    answer = {'q1': q1, 'q2': q2, 'q3': q3, 'at': now.isoformat()}
+    st.hset(key(sid, 'answers'), {student.pk: answer})
+    livestate.queue(st, sid, {student.pk: answer})
+    livestate.touch(st, sid, 'answers', 'names', 'seen')
+    _flush_if_due(st, sid, lambda: flush_pulse(session_id))
+
+
+def _tally(answers):
+    q1 = {'true': 0, 'false': 0}
+    q2 = {'true': 0, 'false': 0}
+    q3_counts = {}
+    for a in answers:
+        if a['q1'] is not None:
+            q1['true' if a['q1'] else 'false'] += 1
+        if a['q2'] is not None:
+            q2['true' if a['q2'] else 'false'] += 1
+        if a['q3']:
+            q3_counts[a['q3']] = q3_counts.get(a['q3'], 0) + 1
+    return q1, q2, q3_counts
+
+
+def pulse_summary(session_id):
+    """Teacher's live view of a pulse, or None if it does not exist."""
+    st = livestate.store()
+    if st is None:
+        from academics.pulse_models import PulseSession
+        session = PulseSession.objects.filter(pk=session_id).first()
+        if session is None:
+            return None
+        answers = list(session.responses.filter(submitted_at__isnull=False)
+                       .values('q1_answer', 'q2_answer', 'q3_answer'))
+        q1, q2, q3_counts = _tally(
+            {'q1': a['q1_answer'], 'q2': a['q2_answer'], 'q3': a['q3_answer']} for a in answers
+        )
+        return {
+            'status': session.status,
+            'responded': len(answers),
+            'total': session.total_students,
+            'typing': [f'{fn} {ln}'.strip() for fn, ln in session.typing_students],
+            'q1': q1, 'q2': q2, 'q3_counts': q3_counts,
+        }
+
+    meta = pulse_meta(session_id)
+    if meta is None:
+        return None
+    sid = f'pulse:{session_id}'
+    answers = st.hgetall(key(sid, 'answers'))
+    since = time.time() - getattr(settings, 'LIVE_PRESENCE_SECONDS', 10)
+    looking = [s for s in st.zsince(key(sid, 'seen'), since) if s not in answers]
+    names = st.hgetall(key(sid, 'names')) if looking else {}
+    q1, q2, q3_counts = _tally(answers.values())
+    return {
+        'status': meta['status'],
+        'responded': len(answers),
+        'total': meta['total'],
+        'typing': [names.get(s, '') for s in looking],
+        'q1': q1, 'q2': q2, 'q3_counts': q3_counts,
+    }
+
+
+def flush_pulse(session_id):
+    """Write the queued card views and answers of pulse ``session_id``."""
+    st = livestate.store()
+    if st is None:
+        return 0
+
+    def write(entries):
+        from academics.pulse_models import PulseResponse, PulseSession
+        from students.models import Student
+
+        if not PulseSession.objects.filter(pk=session_id).exists():
+            return
+        known = set(Student.objects.filter(pk__in=[int(s) for s in entries]).values_list('pk', flat=True))
+        PulseResponse.objects.bulk_create([
+            PulseResponse(session_id=session_id, student_id=int(s), is_typing=True)
+            for s, answer in entries.items() if answer is None and int(s) in known
+        ], ignore_conflicts=True)
+        PulseResponse.objects.bulk_create([
+            PulseResponse(session_id=session_id, student_id=int(s), q1_answer=a['q1'], q2_answer=a['q2'],
+                          q3_answer=a['q3'], is_typing=False, submitted_at=parse_datetime(a['at']))
+            for s, a in entries.items() if a is not None and int(s) in known
+        ], update_conflicts=True, unique_fields=['session', 'student'],
+            update_fields=['q1_answer', 'q2_answer', 'q3_answer', 'is_typing', 'submitted_at'])
+
+    return livestate.drain(st, f'pulse:{session_id}', write)
+
+
+def pulse_started(session):
+    """``session`` was launched: point its classes' students at it."""
+    st = livestate.store()
+    if st is None:
+        return
+    for class_id in _pulse_meta_from(session)['class_ids']:
+        st.hset(key(f'pulse-class:{class_id}'), {'session': session.pk})
+        st.expire([key(f'pulse-class:{class_id}')], livestate.ttl())
+
+
+def close_pulse(session_ids):
+    """Pulses ``session_ids`` were closed: write what is queued and drop their state on commit."""
+    st = livestate.store()
+    if st is None:
+        return
+    stale = []
+    for session_id in session_ids:
+        sid = f'pulse:{session_id}'
+        meta = pulse_meta(session_id) or {}
+        _safely(sid, lambda: flush_pulse(session_id))
+        stale += [key(sid), key(sid, 'answers'), key(sid, 'names'), key(sid, 'seen'),
+                  *(key(f'pulse-class:{c}') for c in meta.get('class_ids', ()))]
+    if stale:
+        _after_commit(lambda: st.delete(*stale))
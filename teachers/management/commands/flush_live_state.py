@@ -0,0 +1,19 @@
+"""
+Write live-session state still queued in the store to the database (teachers.live).
+
+Requests write queued votes and answers as they go and when a session ends;
+run this every few minutes per school for sessions nobody ended:
+    python manage.py all_tenants_command flush_live_state
+    python manage.py tenant_command flush_live_state --schema=<school>
+"""
+from django.core.management.base import BaseCommand
+
+from teachers import live
+
+
+class Command(BaseCommand):
+    help = 'Write queued live-session votes and answers for the current schema'
+
+    def handle(self, *args, **options):
+        written = live.flush_all()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} queued live-session entries.'))
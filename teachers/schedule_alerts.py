@@ -0,0 +1,76 @@
+"""
+Class reminders for teachers, 45 and 10 minutes before each timetable slot.
+
+``check_schedule_alerts`` looked at today's whole timetable on every run,
+matched slots to loose 40–50 and 5–15 minute windows and ran a
+``Notification.exists()`` plus an insert per slot.  ``send_due(since,
+until)`` is called by the scheduler (``tenants.scheduler``) with the window
+since its last run: it loads only the slots whose reminder time falls in
+that window, claims one key per slot, day and alert, and inserts the
+notifications it won in one ``bulk_create``.
+
+A window is never stretched back more than ``CATCH_UP``, so a scheduler
+that was down does not send reminders for classes that have started.
+"""
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+CATCH_UP = timedelta(minutes=10)
+
+ALERTS = (
+    ('45_min', 45, "Reminder: You have {subject} with {cls} in 45 minutes ({start})."),
+    ('10_min', 10, "Hurry up! Your class {subject} with {cls} starts in 10 minutes ({start})."),
+)
+
+
+def starting(lo, hi):
+    """``(slot, start)`` for timetable slots starting in ``(lo, hi]`` (local time)."""
+    from academics.models import Timetable
+
+    lo, hi = timezone.localtime(lo), timezone.localtime(hi)
+    found = []
+    day = lo.date()
+    while day <= hi.date():
+        slots = Timetable.objects.filter(day=day.weekday()).select_related(
+            'class_subject__teacher', 'class_subject__subject', 'class_subject__class_name',
+        )
+        if day == lo.date():
+            slots = slots.filter(start_time__gt=lo.time())
+        if day == hi.date():
+            slots = slots.filter(start_time__lte=hi.time())
+        for slot in slots:
+            found.append((slot, timezone.make_aware(datetime.combine(day, slot.start_time))))
+        day += timedelta(days=1)
+    return found
+
+
+def send_due(since, until):
+    """Notify teachers of classes whose reminder time fell in ``(since, until]``."""
+    from announcements.models import Notification
+    from tenants import scheduler
+
+    until = until or timezone.now()
+    if since is None or since < until - CATCH_UP:
+        since = until - CATCH_UP
+    pending = {}
+    for alert_type, lead, text in ALERTS:
+        for slot, start in starting(since + timedelta(minutes=lead), until + timedelta(minutes=lead)):
+            teacher = slot.class_subject.teacher
+            if not teacher or not teacher.email:
+                continue
+            pending[f'alert:{slot.pk}:{start.date()}:{alert_type}'] = Notification(
+                recipient=teacher,
+                timetable_slot=slot,
+                alert_type=alert_type,
+                message=text.format(
+                    subject=slot.class_subject.subject.name,
+                    cls=slot.class_subject.class_name.name,
+                    start=slot.start_time.strftime('%H:%M'),
+                ),
+            )
+    with transaction.atomic():
+        won = scheduler.claim(pending, scheduler.new_run())
+        Notification.objects.bulk_create([n for key, n in pending.items() if key in won])
+    return len(won)
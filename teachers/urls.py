@@ -1,5 +1,9 @@
 from django.urls import path
-from . import views
+
+from school_system.startup import lazy_views
+
+# ~9k lines; imported when one of its views is first dispatched.
+views = lazy_views('teachers.views')
 
 app_name = 'teachers'
 
@@ -10,7 +10,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from tenants.decorators import require_addon, require_plan
 from teachers.addon_utils import requires_addon, requires_addon_freemium, check_freemium_limit, has_addon, get_credit_balance, CREDIT_COSTS, ADDON_FEATURE_MAP, deduct_credits
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
 from decimal import Decimal, InvalidOperation
 from django.utils import timezone
 import os
@@ -26,10 +26,13 @@ from students.models import Student, Grade, ClassExercise, StudentExerciseScore,
 from students.utils import normalize_term
 from .forms import ResourceForm, LessonPlanForm, TeacherCreateForm, TeacherCSVImportForm #, HomeworkForm
 from .models import LessonGenerationSession
+from accounts.imports import finish_import, import_view, stage_upload
+from teachers import live
 
 logger = logging.getLogger(__name__)
 from accounts.models import User
-from academics.tutor_models import generate_teacher_id_card, export_id_card_to_pdf, export_multiple_id_cards_to_pdf, TutorSession, TutorMessage
+from academics.id_cards import export_id_card_to_pdf, generate_teacher_id_card, id_cards_pdf_response
+from academics.tutor_models import TutorSession, TutorMessage
 from communication.models import Conversation, Message
 from django.views.decorators.http import require_POST
 # from parents.models import Homework
@@ -271,9 +274,10 @@ def teacher_list(request):
     return render(request, 'teachers/teacher_list.html', context)
 
 
+@import_view
 @login_required
 def import_teachers_csv(request):
-    """Import teachers from CSV file"""
+    """Import teachers from CSV file (staged and resumable, see accounts.imports)"""
     if request.user.user_type != 'admin':
         messages.error(request, 'Access denied. Only admins can import teachers.')
         return redirect('teachers:teacher_list')
@@ -288,156 +292,12 @@ def import_teachers_csv(request):
                 messages.error(request, 'Please upload a valid CSV file.')
                 return redirect('teachers:import_csv')
             
-            # Read and process CSV
             try:
-                decoded_file = csv_file.read().decode('utf-8').splitlines()
-                reader = csv.DictReader(decoded_file)
-                
-                imported_count = 0
-                skipped_count = 0
-                errors = []
-                
-                for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
-                    try:
-                        # Handle both naming conventions: "First Name" or "first_name"
-                        first_name = (row.get('First Name') or row.get('first_name') or '').strip()
-                        last_name = (row.get('Last Name') or row.get('last_name') or '').strip()
-                        employee_id = (row.get('Employee ID') or row.get('employee_id') or '').strip()
-                        email = (row.get('Email') or row.get('email') or '').strip()
-                        phone = (row.get('Phone') or row.get('phone') or '').strip()
-                        qualification = (row.get('Qualification') or row.get('qualification') or '').strip()
-                        date_of_joining = (row.get('Date of Joining') or row.get('date_of_joining') or '').strip()
-                        age = (row.get('Age') or row.get('age') or '').strip()
-                        
-                        if not first_name:
-                            errors.append(f"Row {row_num}: Missing first name")
-                            skipped_count += 1
-                            continue
-                        
-                        # Last name is optional
-                        if not last_name:
-                            last_name = ''
-                        
-                        # Generate username
-                        if last_name:
-                            base_username = f"{first_name.lower()}.{last_name.lower()}"
-                        else:
-                            base_username = first_name.lower()
-                        username = base_username.replace(' ', '').replace('-', '')
-                        counter = 1
-                        while User.objects.filter(username=username).exists():
-                            username = f"{base_username.replace(' ', '').replace('-', '')}{counter}"
-                            counter += 1
-                        
-                        # Use provided employee ID or generate one
-                        if employee_id and employee_id.upper() not in ['N/A', 'NA', '']:
-                            # Clean up employee ID
-                            employee_id = employee_id.strip().replace(' ', '')
-                            # Check if it already exists
-                            if Teacher.objects.filter(employee_id=employee_id).exists():
-                                errors.append(f"Row {row_num}: Employee ID '{employee_id}' already exists")
-                                skipped_count += 1
-                                continue
-                        else:
-                            # Generate employee ID
-                            prefix = 'TCH'
-                            for _ in range(100):  # Try up to 100 times
-                                suffix = ''.join(random.choices(string.digits, k=4))
-                                candidate = f"{prefix}{suffix}"
-                                if not Teacher.objects.filter(employee_id=candidate).exists():
-                                    employee_id = candidate
-                                    break
-                        
-                        if not employee_id:
-                            errors.append(f"Row {row_num}: Could not generate unique employee ID")
-                            skipped_count += 1
-                            continue
-                        
-                        # Prepare email
-                        if not email or email.upper() in ['N/A', 'NA', '']:
-                            email = f"{username}@school.local"
-                        
-                        # Check if user with this email already exists
-                        if User.objects.filter(email=email).exists():
-                            email = f"{username}{random.randint(1, 999)}@school.local"
-                        
-                        # Parse age for date of birth
-                        try:
-                            teacher_age = int(age) if age else 30
-                        except ValueError:
-                            teacher_age = 30
-                        
-                        # Calculate date of birth
-                        dob_year = max(1900, date.today().year - teacher_age)
-                        date_of_birth = date(dob_year, 1, 1)
-                        
-                        # Parse date of joining
-                        if date_of_joining and date_of_joining.upper() not in ['N/A', 'NA', '']:
-                            try:
-                                # Try parsing common date formats
-                                from datetime import datetime
-                                for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y']:
-                                    try:
-                                        joining_date = datetime.strptime(date_of_joining, fmt).date()
-                                        break
-                                    except ValueError:
-                                        continue
-                                else:
-                                    joining_date = date.today()
-                            except Exception:
-                                joining_date = date.today()
-                        else:
-                            joining_date = date.today()
-                        
-                        # Prepare qualification
-                        if not qualification or qualification.upper() in ['N/A', 'NA', '']:
-                            qualification = 'Bachelor of Education'
-                        
-                        # Create user
-                        user = User.objects.create(
-                            username=username,
-                            first_name=first_name,
-                            last_name=last_name,
-                            email=email,
-                            user_type='teacher'
-                        )
-                        user.set_unusable_password()
-                        user.save()
-                        
-                        # Create teacher
-                        teacher = Teacher.objects.create(
-                            user=user,
-                            employee_id=employee_id,
-                            date_of_birth=date_of_birth,
-                            date_of_joining=joining_date,
-                            qualification=qualification
-                        )
-                        
-                        imported_count += 1
-                        
-                    except Exception as e:
-                        errors.append(f"Row {row_num}: {str(e)}")
-                        skipped_count += 1
-                        continue
-                
-                # Show results
-                if imported_count > 0:
-                    messages.success(request, f'Successfully imported {imported_count} teacher(s).')
-                
-                if skipped_count > 0:
-                    messages.warning(request, f'Skipped {skipped_count} row(s) due to errors.')
-                
-                if errors and len(errors) <= 10:
-                    for error in errors:
-                        messages.error(request, error)
-                elif errors:
-                    messages.error(request, f'{len(errors)} errors occurred. First 10: {", ".join(errors[:10])}')
-                
-                return redirect('teachers:teacher_list')
-                
-            except Exception as e:
+                batch = stage_upload(request.user, 'teachers', csv_file, next_url='teachers:teacher_list')
+            except (UnicodeDecodeError, csv.Error) as e:
                 messages.error(request, f'Error processing CSV file: {str(e)}')
                 return redirect('teachers:import_csv')
+            return finish_import(request, batch)
     else:
         form = TeacherCSVImportForm()
     
@@ -2997,24 +2857,11 @@ def bulk_teacher_id_cards_pdf(request):
             messages.error(request, 'No teachers found')
             return redirect('teachers:teacher_list')
         
-        # Generate cards
-        card_list = []
-        for teacher in teachers:
-            try:
-                card = generate_teacher_id_card(teacher)
-                card_list.append((teacher.user.get_full_name(), card))
-            except Exception:
-                pass  # Skip teachers with errors
-        
-        if not card_list:
+        teachers = teachers.prefetch_related('subjects')
+        response = id_cards_pdf_response(teachers, 'teacher', 'teacher_ids_all.pdf')
+        if response is None:
             messages.error(request, 'Could not generate any ID cards')
             return redirect('teachers:teacher_list')
-        
-        # Export to PDF
-        pdf_buffer = export_multiple_id_cards_to_pdf(card_list)
-        
-        response = HttpResponse(pdf_buffer, content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="teacher_ids_all.pdf"'
         return response
         
     except Exception as e:
@@ -4481,7 +4328,10 @@ def pulse_launch(request, plan_pk):
         teacher = plan.teacher
 
     # Close any previous active sessions for this plan
-    PulseSession.objects.filter(lesson_plan=plan, status='active').update(status='closed')
+    previous = PulseSession.objects.filter(lesson_plan=plan, status='active')
+    closed = list(previous.values_list('pk', flat=True))
+    previous.update(status='closed')
+    live.close_pulse(closed)
 
     q1, q2, q3 = parse_pulse_questions(plan.introduction or '')
     chips       = parse_q3_chips(plan)
@@ -4494,6 +4344,7 @@ def pulse_launch(request, plan_pk):
         q3_text=q3,
         q3_chips=chips,
     )
+    live.pulse_started(session)
     return JsonResponse({
         'session_id': session.pk,
         'q1': q1, 'q2': q2, 'q3': q3,
@@ -4504,53 +4355,17 @@ def pulse_launch(request, plan_pk):
 
 @login_required
 def pulse_live(request, session_id):
-    """Polling endpoint — teacher gets live response count + who's typing."""
+    """Polling endpoint — teacher gets live response count + who's typing (teachers.live)."""
     if request.user.user_type not in ('teacher', 'admin'):
         return JsonResponse({'error': 'Access denied'}, status=403)
 
     try:
-        from academics.pulse_models import PulseSession
-    except ImportError:
-        return JsonResponse({'error': 'unavailable'}, status=500)
-
-    try:
-        session = get_object_or_404(PulseSession, pk=session_id)
+        summary = live.pulse_summary(session_id)
     except (ProgrammingError, OperationalError):
         return JsonResponse({'error': 'Pulse data unavailable. Run migrations.'}, status=503)
-
-    try:
-        responded = session.responded_count
-        total     = session.total_students
-        typing    = [f'{fn} {ln}'.strip() for fn, ln in session.typing_students]
-    except (ProgrammingError, OperationalError):
-        responded = 0
-        total = 0
-        typing = []
-
-    # Build aggregate for Q1 / Q2
-    q1_true = q1_false = q2_true = q2_false = 0
-    q3_counts = {}
-    try:
-        for r in session.responses.filter(submitted_at__isnull=False):
-            if r.q1_answer is True:  q1_true  += 1
-            if r.q1_answer is False: q1_false += 1
-            if r.q2_answer is True:  q2_true  += 1
-            if r.q2_answer is False: q2_false += 1
-            if r.q3_answer:
-                q3_counts[r.q3_answer] = q3_counts.get(r.q3_answer, 0) + 1
-    except (ProgrammingError, OperationalError):
-        q1_true = q1_false = q2_true = q2_false = 0
-        q3_counts = {}
-
-    return JsonResponse({
-        'status': getattr(session, 'status', 'active'),
-        'responded': responded,
-        'total': total,
-        'typing': typing,
-        'q1': {'true': q1_true, 'false': q1_false},
-        'q2': {'true': q2_true, 'false': q2_false},
-        'q3_counts': q3_counts,
-    })
+    if summary is None:
+        raise Http404('No such pulse session')
+    return JsonResponse(summary)
 
 
 @login_required
@@ -4570,6 +4385,7 @@ def pulse_close(request, session_id):
         session.status    = 'closed'
         session.closed_at = timezone.now()
         session.save(update_fields=['status', 'closed_at'])
+    live.close_pulse([session.pk])
 
     from django.urls import reverse
     # Prepend SCRIPT_NAME so path-based tenant prefix (/school1/) is included
@@ -4593,6 +4409,7 @@ def pulse_results(request, session_id):
         return redirect('teachers:lesson_plan_list')
 
     session = get_object_or_404(PulseSession, pk=session_id)
+    live.flush_pulse(session.pk)  # answers still queued in the live-state store
 
     # Ensure the requesting teacher owns the session (admins bypass)
     if request.user.user_type == 'teacher':
@@ -5115,7 +4932,11 @@ def start_live_session(request, pk):
     from .models import Presentation, LiveSession
     teacher = get_object_or_404(Teacher, user=request.user)
     deck = get_object_or_404(Presentation, pk=pk, teacher=teacher)
-    LiveSession.objects.filter(presentation=deck, is_active=True).update(is_active=False)
+    active = LiveSession.objects.filter(presentation=deck, is_active=True)
+    ended = list(active.values_list('code', flat=True))
+    active.update(is_active=False)
+    for old in ended:
+        live.end_presentation(old)
     code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
     while LiveSession.objects.filter(code=code).exists():
         code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
@@ -5137,7 +4958,11 @@ def end_live_session(request, pk):
     from .models import Presentation, LiveSession
     teacher = get_object_or_404(Teacher, user=request.user)
     deck = get_object_or_404(Presentation, pk=pk, teacher=teacher)
-    LiveSession.objects.filter(presentation=deck, is_active=True).update(is_active=False)
+    active = LiveSession.objects.filter(presentation=deck, is_active=True)
+    ended = list(active.values_list('code', flat=True))
+    active.update(is_active=False)
+    for code in ended:
+        live.end_presentation(code)
     return JsonResponse({'ok': True})
 
 
@@ -5156,7 +4981,10 @@ def update_live_slide(request, pk):
         slide_order = int(data.get('slide_order', 0))
     except Exception:
         return JsonResponse({'error': 'Invalid data'}, status=400)
-    LiveSession.objects.filter(presentation=deck, is_active=True).update(current_slide_order=slide_order)
+    active = LiveSession.objects.filter(presentation=deck, is_active=True)
+    codes = list(active.values_list('code', flat=True))
+    active.update(current_slide_order=slide_order)
+    live.presentation_slide_changed(deck, codes, slide_order)
     return JsonResponse({'ok': True})
 
 
@@ -5172,118 +5000,43 @@ def live_student(request, code):
 
 
 def live_state(request, code):
-    """JSON: returns current session state (active slide, content)."""
-    from .models import LiveSession
-
-    def _extract_student_notes(raw_notes):
-        text = str(raw_notes or '').strip()
-        if not text:
-            return ''
-
-        # Remove quiz answer prefix if present.
-        lines = text.splitlines()
-        if lines and lines[0].strip().upper().startswith('ANSWER:'):
-            text = '\n'.join(lines[1:]).strip()
-            if not text:
-                return ''
-
-        lower = text.lower()
-        teacher_tag = 'teacher cue:'
-        student_tag = 'student notes:'
-        student_idx = lower.find(student_tag)
-
-        if student_idx != -1:
-            return text[student_idx + len(student_tag):].strip()
-
-        # If explicitly structured but missing student section, hide teacher-only content.
-        if lower.find(teacher_tag) != -1:
-            return ''
-
-        # Legacy plain notes are treated as student-visible.
-        return text
-
-    try:
-        session = LiveSession.objects.get(code=code)
-    except LiveSession.DoesNotExist:
-        return JsonResponse({'is_active': False})
-    if not session.is_active:
-        return JsonResponse({'is_active': False})
-    slides = list(session.presentation.slides.all())
-    current_slide = None
-    for s in slides:
-        if s.order == session.current_slide_order:
-            current_slide = s
-            break
-    if current_slide is None and slides:
-        current_slide = slides[0]
-    state = {
-        'is_active': True,
-        'current_slide_order': session.current_slide_order,
-        'participant_count': session.responses.values('student_name').distinct().count(),
-    }
-    if current_slide:
-        state.update({
-            'slide_pk': current_slide.pk,
-            'layout': current_slide.layout,
-            'title': current_slide.title,
-            'content': current_slide.content,
-            'emoji': current_slide.emoji,
-            'image_url': current_slide.image_url,
-            'student_notes': _extract_student_notes(current_slide.speaker_notes),
-        })
-    return JsonResponse(state)
+    """JSON: returns current session state (active slide, content) from teachers.live."""
+    return JsonResponse(live.presentation_state(code))
 
 
 @require_POST
 def live_vote(request, code):
     """Student submits a poll/quiz vote. No auth required."""
     import json as _json
-    from .models import LiveSession, Slide, PollResponse
     try:
         data = _json.loads(request.body)
     except Exception:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
-    try:
-        session = LiveSession.objects.get(code=code, is_active=True)
-    except LiveSession.DoesNotExist:
-        return JsonResponse({'error': 'Session not found or ended'}, status=404)
     slide_pk = data.get('slide_pk')
     choice = str(data.get('choice', '')).upper()[:1]
     student_name = str(data.get('student_name', 'Anonymous'))[:100] or 'Anonymous'
     if not slide_pk or choice not in 'ABCD':
         return JsonResponse({'error': 'Invalid vote data'}, status=400)
-    try:
-        slide = Slide.objects.get(pk=slide_pk)
-    except Slide.DoesNotExist:
+    outcome = live.presentation_vote(code, slide_pk, student_name, choice)
+    if outcome == 'ended':
+        return JsonResponse({'error': 'Session not found or ended'}, status=404)
+    if outcome == 'no-slide':
         return JsonResponse({'error': 'Slide not found'}, status=404)
-    PollResponse.objects.update_or_create(
-        session=session, slide=slide, student_name=student_name,
-        defaults={'choice': choice},
-    )
     return JsonResponse({'ok': True})
 
 
 def live_results(request, code, slide_pk):
     """Return live poll result counts for a given slide."""
-    from .models import LiveSession, PollResponse
-    try:
-        session = LiveSession.objects.get(code=code)
-    except LiveSession.DoesNotExist:
+    results = live.presentation_results(code, slide_pk)
+    if results is None:
         return JsonResponse({'error': 'Session not found'}, status=404)
-    responses = PollResponse.objects.filter(session=session, slide_id=slide_pk)
-    counts = {'A': 0, 'B': 0, 'C': 0, 'D': 0}
-    for r in responses:
-        if r.choice in counts:
-            counts[r.choice] += 1
-    total = sum(counts.values())
-    return JsonResponse({'counts': counts, 'total': total})
+    return JsonResponse(results)
 
 
 @require_POST
 def log_slide_time(request, code):
     """Student reports seconds spent on a slide. No authentication required."""
     import json as _json
-    from .models import LiveSession
     try:
         data = _json.loads(request.body)
     except Exception:
@@ -5296,14 +5049,7 @@ def log_slide_time(request, code):
     # Silently ignore bad data rather than erroring on the student
     if not slide_pk or seconds <= 0 or seconds > 3600:
         return JsonResponse({'ok': True})
-    try:
-        session = LiveSession.objects.get(code=code)
-    except LiveSession.DoesNotExist:
-        return JsonResponse({'ok': True})
-    time_data = session.slide_time_data or {}
-    time_data[slide_pk] = time_data.get(slide_pk, 0) + seconds
-    session.slide_time_data = time_data
-    session.save(update_fields=['slide_time_data'])
+    live.presentation_slide_time(code, slide_pk, seconds)
     return JsonResponse({'ok': True})
 
 
@@ -6218,6 +5964,8 @@ def presentation_session_report(request, pk):
     from .models import Presentation, LiveSession, PollResponse
 
     deck = get_object_or_404(Presentation, pk=pk, teacher=teacher)
+    for code in LiveSession.objects.filter(presentation=deck, is_active=True).values_list('code', flat=True):
+        live.flush_presentation(code)
     sessions = (
         LiveSession.objects.filter(presentation=deck)
         .prefetch_related('responses__slide')
@@ -6438,12 +6186,13 @@ def presentation_pulse_launch(request, pk):
         return JsonResponse({'error': 'q1, q2 and q3 are all required'}, status=400)
 
     # Close any other active sessions targeting the same class
-    PulseSession.objects.filter(
-        target_class=deck.school_class, status='active'
-    ).update(status='closed')
-    PulseSession.objects.filter(
-        lesson_plan__school_class=deck.school_class, status='active'
-    ).update(status='closed')
+    previous = PulseSession.objects.filter(
+        Q(target_class=deck.school_class) | Q(lesson_plan__school_class=deck.school_class),
+        status='active',
+    )
+    closed = list(previous.values_list('pk', flat=True))
+    PulseSession.objects.filter(pk__in=closed).update(status='closed')
+    live.close_pulse(closed)
 
     session = PulseSession.objects.create(
         lesson_plan=None,
@@ -6455,6 +6204,7 @@ def presentation_pulse_launch(request, pk):
         q3_text=q3,
         q3_chips=chips or [q3],
     )
+    live.pulse_started(session)
 
     script_name = request.META.get('SCRIPT_NAME', '').rstrip('/')
     from django.urls import reverse
@@ -6687,164 +6437,22 @@ def presentation_export_pptx(request, pk):
         return redirect('dashboard')
     teacher = get_object_or_404(Teacher, user=request.user)
     from .models import Presentation
+    from accounts.documents import document_response
+    from teachers.documents import presentation_payload
     deck = get_object_or_404(Presentation, pk=pk, teacher=teacher)
-    slides_qs = list(deck.slides.all())
+    payload = presentation_payload(deck)
 
+    import re as _re
+    safe = _re.sub(r'[^\w\s-]', '', deck.title).strip().replace(' ', '_')[:60] or 'presentation'
     try:
-        from pptx import Presentation as PPTXPres
-        from pptx.util import Inches, Pt
-        from pptx.dml.color import RGBColor
-        from pptx.enum.text import PP_ALIGN
-        import io as _io
+        return document_response(
+            request, 'teachers.documents.presentation_pptx', payload,
+            filename=f'{safe}.pptx', size=len(payload['slides']),
+        )
     except ImportError:
         messages.error(request, 'python-pptx is not installed. Run: pip install python-pptx')
         return redirect('teachers:presentation_editor', pk=pk)
 
-    THEME_COLORS = {
-        'aurora':   {'bg': (30, 10, 64),   'accent': (124, 58, 237)},
-        'midnight': {'bg': (15, 23, 42),   'accent': (99, 102, 241)},
-        'forest':   {'bg': (2, 29, 17),    'accent': (52, 211, 153)},
-        'coral':    {'bg': (59, 0, 18),    'accent': (251, 113, 133)},
-        'slate':    {'bg': (15, 24, 36),   'accent': (148, 163, 184)},
-        'ocean':    {'bg': (12, 45, 78),   'accent': (56, 189, 248)},
-        'amber':    {'bg': (67, 20, 7),    'accent': (251, 191, 36)},
-        'rose':     {'bg': (76, 5, 25),    'accent': (244, 63, 94)},
-    }
-    theme  = deck.theme if deck.theme in THEME_COLORS else 'aurora'
-    colors = THEME_COLORS[theme]
-    bg_rgb      = RGBColor(*colors['bg'])
-    accent_rgb  = RGBColor(*colors['accent'])
-    text_rgb    = RGBColor(241, 245, 249)    # #f1f5f9
-    subtext_rgb = RGBColor(148, 163, 184)    # #94a3b8
-
-    prs = PPTXPres()
-    prs.slide_width  = Inches(13.333)
-    prs.slide_height = Inches(7.5)
-    blank_layout = prs.slide_layouts[6]
-    W = prs.slide_width
-    H = prs.slide_height
-    MARGIN = Inches(0.65)
-
-    def _set_bg(slide, rgb):
-        fill = slide.background.fill
-        fill.solid()
-        fill.fore_color.rgb = rgb
-
-    def _textbox(slide, text, left, top, width, height,
-                 font_size=18, bold=False, italic=False,
-                 color=None, align=PP_ALIGN.LEFT, wrap=True):
-        txb = slide.shapes.add_textbox(left, top, width, height)
-        tf  = txb.text_frame
-        tf.word_wrap = wrap
-        p   = tf.paragraphs[0]
-        p.alignment = align
-        run = p.add_run()
-        run.text            = text
-        run.font.size       = Pt(font_size)
-        run.font.bold       = bold
-        run.font.italic     = italic
-        run.font.color.rgb  = color if color is not None else text_rgb
-        return txb
-
-    def _bullets_frame(slide, items, left, top, width, height, font_size=18):
-        txb = slide.shapes.add_textbox(left, top, width, height)
-        tf  = txb.text_frame
-        tf.word_wrap = True
-        for i, item in enumerate(items):
-            p = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
-            p.text           = '\u25b8  ' + item
-            p.font.size      = Pt(font_size)
-            p.font.color.rgb = subtext_rgb
-
-    for s in slides_qs:
-        sl = prs.slides.add_slide(blank_layout)
-        _set_bg(sl, bg_rgb)
-        layout  = s.layout
-        title   = s.title or ''
-        content = s.content or ''
-        bullets = [b.strip() for b in content.split('\n') if b.strip()]
-        notes   = s.speaker_notes or ''
-
-        if layout == 'title':
-            _textbox(sl, title, MARGIN, Inches(2.0), W - 2*MARGIN, Inches(2.2),
-                     font_size=44, bold=True, align=PP_ALIGN.CENTER)
-            sub = bullets[0] if bullets else content.strip()
-            if sub:
-                _textbox(sl, sub, MARGIN, Inches(4.3), W - 2*MARGIN, Inches(1.3),
-                         font_size=22, color=subtext_rgb, align=PP_ALIGN.CENTER)
-
-        elif layout == 'big_stat':
-            _textbox(sl, title, MARGIN, Inches(0.5), W - 2*MARGIN, Inches(0.9),
-                     font_size=18, color=subtext_rgb, align=PP_ALIGN.CENTER)
-            stat_val = bullets[0] if bullets else content.strip()
-            _textbox(sl, stat_val, MARGIN, Inches(1.4), W - 2*MARGIN, Inches(3.6),
-                     font_size=96, bold=True, color=accent_rgb, align=PP_ALIGN.CENTER)
-            if len(bullets) > 1:
-                _textbox(sl, bullets[1], MARGIN, Inches(5.1), W - 2*MARGIN, Inches(0.9),
-                         font_size=16, color=subtext_rgb, align=PP_ALIGN.CENTER)
-
-        elif layout == 'quote':
-            _textbox(sl, '\u201c' + title + '\u201d', MARGIN, Inches(1.4), W - 2*MARGIN, Inches(3.8),
-                     font_size=32, italic=True, align=PP_ALIGN.CENTER)
-            author = bullets[0] if bullets else ''
-            if author:
-                _textbox(sl, '\u2014 ' + author, MARGIN, Inches(5.5), W - 2*MARGIN, Inches(0.9),
-                         font_size=16, color=subtext_rgb, align=PP_ALIGN.CENTER)
-
-        elif layout == 'two_col':
-            _textbox(sl, title, MARGIN, MARGIN, W - 2*MARGIN, Inches(0.95), font_size=28, bold=True)
-            mid   = W / 2
-            col_w = mid - MARGIN - Inches(0.15)
-            half  = max(len(bullets) // 2, 1)
-            _bullets_frame(sl, bullets[:half],  MARGIN,               Inches(1.55), col_w, H - Inches(2.4))
-            _bullets_frame(sl, bullets[half:],  mid + Inches(0.15),   Inches(1.55), col_w, H - Inches(2.4))
-
-        elif layout in ('poll', 'quiz'):
-            _textbox(sl, title, MARGIN, MARGIN, W - 2*MARGIN, Inches(1.3), font_size=30, bold=True)
-            y = Inches(1.65)
-            for b in bullets[:6]:
-                _textbox(sl, b, MARGIN, y, W - 2*MARGIN, Inches(0.8), font_size=18, color=subtext_rgb)
-                y += Inches(0.92)
-
-        elif layout == 'video':
-            _textbox(sl, title, MARGIN, MARGIN, W - 2*MARGIN, Inches(1.1), font_size=32, bold=True)
-            note = content.strip() or '(no URL)'
-            _textbox(sl, '\U0001f3ac  Video: ' + note, MARGIN, Inches(2.0), W - 2*MARGIN, Inches(1.5),
-                     font_size=14, italic=True, color=subtext_rgb)
-
-        elif layout == 'image':
-            _textbox(sl, title, MARGIN, MARGIN, W - 2*MARGIN, Inches(1.1), font_size=32, bold=True)
-            img_note = s.image_url[:80] if s.image_url else '(no image)'
-            _textbox(sl, '\U0001f5bc\ufe0f  Image: ' + img_note, MARGIN, Inches(2.0), W - 2*MARGIN, Inches(1.5),
-                     font_size=14, italic=True, color=subtext_rgb)
-            cap = bullets[0] if bullets else ''
-            if cap:
-                _textbox(sl, cap, MARGIN, Inches(6.2), W - 2*MARGIN, Inches(0.8),
-                         font_size=14, color=subtext_rgb, align=PP_ALIGN.CENTER)
-
-        else:  # bullets, summary
-            _textbox(sl, title, MARGIN, MARGIN, W - 2*MARGIN, Inches(1.15), font_size=32, bold=True)
-            if bullets:
-                _bullets_frame(sl, bullets, MARGIN, Inches(1.6), W - 2*MARGIN, H - Inches(2.5))
-            elif content.strip():
-                _textbox(sl, content.strip(), MARGIN, Inches(1.6), W - 2*MARGIN, H - Inches(2.5),
-                         font_size=16, color=subtext_rgb)
-
-        if notes:
-            sl.notes_slide.notes_text_frame.text = notes
-
-    buf = _io.BytesIO()
-    prs.save(buf)
-    buf.seek(0)
-    import re as _re
-    safe = _re.sub(r'[^\w\s-]', '', deck.title).strip().replace(' ', '_')[:60] or 'presentation'
-    resp = HttpResponse(
-        buf.read(),
-        content_type='application/vnd.openxmlformats-officedocument.presentationml.presentation',
-    )
-    resp['Content-Disposition'] = f'attachment; filename="{safe}.pptx"'
-    return resp
-
 
 @login_required
 def presentation_bulk_action(request):
@@ -7365,44 +6973,39 @@ def reorder_pins(request):
 
 # ── Paystack Webhook (server-to-server) ────────────────────────────
 from django.views.decorators.csrf import csrf_exempt
-import hashlib
-import hmac
 
 
 @csrf_exempt
 def paystack_teacher_webhook(request):
-    """Paystack sends charge.success events here. HMAC-verified, idempotent."""
-    if request.method != 'POST':
-        return JsonResponse({'error': 'POST only'}, status=405)
-
-    secret = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
-    if not secret:
-        return JsonResponse({'error': 'not configured'}, status=503)
-
-    # Verify HMAC-SHA512 signature
-    sig = request.headers.get('X-Paystack-Signature', '')
-    expected = hmac.new(secret.encode(), request.body, hashlib.sha512).hexdigest()
-    if not hmac.compare_digest(sig, expected):
-        return JsonResponse({'error': 'bad signature'}, status=403)
-
-    try:
-        payload = json.loads(request.body)
-    except (json.JSONDecodeError, ValueError):
-        return JsonResponse({'error': 'bad json'}, status=400)
+    """Paystack sends charge.success events here; stored once and processed by ``handle_paystack_event``."""
+    from tenants import webhooks
+    return webhooks.receive(request, 'teachers')
+
+
+def handle_paystack_event(data):
+    """Webhook handler (tenants.webhooks): route a charge by its reference prefix."""
+    from tenants.webhooks import Ignore
+
+    reference = data.get('reference', '')
+    # Teacher add-on references start with "TA-"
+    if reference.startswith('TA-'):
+        _handle_teacher_addon_payment(reference, data)
+    # Credit pack references start with "CR-"
+    elif reference.startswith('CR-'):
+        _handle_credit_pack_payment(reference, data)
+    else:
+        raise Ignore('not a teacher store payment')
 
-    event = payload.get('event')
-    data = payload.get('data', {})
 
-    if event == 'charge.success':
-        reference = data.get('reference', '')
-        # Teacher add-on references start with "TA-"
-        if reference.startswith('TA-'):
-            _handle_teacher_addon_payment(reference, data)
-        # Credit pack references start with "CR-"
-        elif reference.startswith('CR-'):
-            _handle_credit_pack_payment(reference, data)
+def paystack_references(references):
+    """Webhook reconciler: which of ``references`` activated an add-on or bought credits."""
+    from teachers.models import CreditTransaction, TeacherAddOnPurchase
 
-    return JsonResponse({'ok': True})
+    found = set(TeacherAddOnPurchase.objects.filter(payment_reference__in=references)
+                .values_list('payment_reference', flat=True))
+    found.update(CreditTransaction.objects.filter(payment_reference__in=references)
+                 .values_list('payment_reference', flat=True))
+    return found
 
 
 def _handle_teacher_addon_payment(reference, data):
@@ -8654,63 +8257,24 @@ def addon_exam_paper(request, **kwargs):
     })
 
 
-@login_required
-@requires_addon('exam-question-bank')
-def addon_exam_paper_docx(request, **kwargs):
-    """Export exam paper as a WAEC-standard Word document (.docx)."""
-    import io
-    import re
-    from collections import OrderedDict
-    from docx import Document
-    from docx.shared import Pt, Inches, Cm, RGBColor
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from docx.enum.table import WD_TABLE_ALIGNMENT
-    from docx.oxml.ns import qn
+def _exam_paper_download(request, renderer, ext):
+    """Exam paper as a document from ``teachers.documents`` (cached, see accounts.documents)."""
+    from accounts.documents import document_response
+    from teachers.documents import exam_paper_payload, safe_title
     from teachers.models import ExamPaper
 
-    # Strip leading letter prefixes like "A) ", "A. ", "a) " from option text
-    _OPT_PREFIX_RE = re.compile(r'^[A-Da-d][.)\]:]\s*')
-
     paper_id = request.GET.get('id')
     if not paper_id:
         return redirect('teachers:addon_question_bank')
-    paper = get_object_or_404(ExamPaper, id=paper_id, teacher=request.user)
-
-    questions_qs = list(paper.questions.all().order_by('question_format', 'id'))
-
-    # Group into sections by format (same logic as addon_exam_paper)
-    FORMAT_LABELS = {
-        'mcq': 'Multiple Choice', 'fill': 'Fill in the Blank',
-        'short': 'Short Answer', 'essay': 'Essay',
-        'truefalse': 'True or False',
-    }
-    sections = []
-    if questions_qs:
-        grouped = OrderedDict()
-        for q in questions_qs:
-            grouped.setdefault(q.question_format, []).append(q)
-        counter = 1
-        letter_idx = 0
-        for fmt, qs_list in grouped.items():
-            numbered = []
-            for q_obj in qs_list:
-                numbered.append({'number': counter, 'obj': q_obj})
-                counter += 1
-            sections.append({
-                'letter': chr(65 + letter_idx),
-                'label': FORMAT_LABELS.get(fmt, fmt),
-                'format': fmt,
-                'questions': numbered,
-            })
-            letter_idx += 1
-    if len(sections) <= 1:
-        sections = []
+    paper = get_object_or_404(
+        ExamPaper.objects.select_related('subject', 'target_class'),
+        id=paper_id, teacher=request.user,
+    )
 
     # School info
     school_name = getattr(request, 'tenant', None) and request.tenant.name or ''
     school_motto = ''
     try:
-        from academics.models import SchoolInfo
         si = SchoolInfo.objects.first()
         if si:
             school_name = si.name or school_name
@@ -8718,607 +8282,26 @@ def addon_exam_paper_docx(request, **kwargs):
     except Exception:
         pass
 
-    # ── Build the Word document ──
-    doc = Document()
-
-    # Page margins (A4-friendly, matches print CSS)
-    for section in doc.sections:
-        section.top_margin = Cm(1.5)
-        section.bottom_margin = Cm(1.8)
-        section.left_margin = Cm(2.0)
-        section.right_margin = Cm(2.0)
-
-    style = doc.styles['Normal']
-    style.font.name = 'Times New Roman'
-    style.font.size = Pt(11)
-    style.paragraph_format.space_after = Pt(2)
-
-    # ── Helper functions ──
-    def add_centered(text, bold=False, size=None, caps=False, spacing=None, color=None):
-        p = doc.add_paragraph()
-        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        p.paragraph_format.space_before = Pt(0)
-        p.paragraph_format.space_after = Pt(spacing if spacing else 2)
-        run = p.add_run(text.upper() if caps else text)
-        run.bold = bold
-        if size:
-            run.font.size = Pt(size)
-        if color:
-            run.font.color.rgb = RGBColor(*color)
-        return p
-
-    def add_thin_line():
-        p = doc.add_paragraph()
-        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        p.paragraph_format.space_before = Pt(0)
-        p.paragraph_format.space_after = Pt(4)
-        run = p.add_run('─' * 50)
-        run.font.size = Pt(8)
-        run.font.color.rgb = RGBColor(0, 0, 0)
-
-    # ── Masthead ──
-    if school_name:
-        add_centered(school_name, bold=True, size=14, caps=True, spacing=1)
-    if school_motto:
-        p = add_centered(f'"{school_motto}"', size=9, spacing=4)
-        p.runs[0].italic = True
-        p.runs[0].font.color.rgb = RGBColor(85, 85, 85)
-
-    add_thin_line()
-    add_centered(paper.title, bold=True, size=13, caps=True, spacing=2)
-
-    # Meta row
-    meta_parts = []
-    if paper.subject:
-        meta_parts.append(paper.subject.name)
-    if paper.target_class:
-        meta_parts.append(paper.target_class.name)
-    meta_parts.append(f'Duration: {paper.duration_minutes} mins')
-    meta_parts.append(f'{len(questions_qs)} Question{"s" if len(questions_qs) != 1 else ""}')
-    p = add_centered('  |  '.join(meta_parts), size=9, spacing=6)
-    p.runs[0].font.color.rgb = RGBColor(85, 85, 85)
-
-    # ── Candidate box (2×2 table) ──
-    table = doc.add_table(rows=2, cols=2)
-    table.alignment = WD_TABLE_ALIGNMENT.CENTER
-    # Set table borders
-    tbl = table._tbl
-    tblPr = tbl.tblPr if tbl.tblPr is not None else tbl._add_tblPr()
-    borders = tblPr.find(qn('w:tblBorders'))
-    if borders is None:
-        borders = tblPr.makeelement(qn('w:tblBorders'), {})
-        tblPr.append(borders)
-    for edge in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'):
-        el = borders.makeelement(qn(f'w:{edge}'), {
-            qn('w:val'): 'single', qn('w:sz'): '6',
-            qn('w:space'): '0', qn('w:color'): '000000',
-        })
-        borders.append(el)
-
-    fields = [('NAME:', ''), ('INDEX NO:', ''), ('CLASS:', ''), ('DATE:', '')]
-    for i, (label, _) in enumerate(fields):
-        cell = table.cell(i // 2, i % 2)
-        p = cell.paragraphs[0]
-        p.paragraph_format.space_before = Pt(3)
-        p.paragraph_format.space_after = Pt(3)
-        run = p.add_run(label)
-        run.bold = True
-        run.font.size = Pt(8)
-        p.add_run('  _______________________________').font.size = Pt(9)
-
-    doc.add_paragraph()  # spacing
-
-    # ── Instructions ──
-    if paper.instructions:
-        p = doc.add_paragraph()
-        p.paragraph_format.space_before = Pt(0)
-        p.paragraph_format.space_after = Pt(2)
-        run = p.add_run('INSTRUCTIONS TO CANDIDATES')
-        run.bold = True
-        run.font.size = Pt(8)
-        p = doc.add_paragraph()
-        p.paragraph_format.space_after = Pt(8)
-        run = p.add_run(paper.instructions)
-        run.font.size = Pt(10)
-
-    # ── Helper: render a single question ──
-    def render_question(q_obj, number):
-        # Question text
-        p = doc.add_paragraph()
-        p.paragraph_format.space_before = Pt(4)
-        p.paragraph_format.space_after = Pt(2)
-        p.paragraph_format.left_indent = Cm(0.6)
-        p.paragraph_format.first_line_indent = Cm(-0.6)
-        run = p.add_run(f'{number}. ')
-        run.bold = True
-        run.font.size = Pt(11)
-        run = p.add_run(q_obj.question_text)
-        run.font.size = Pt(11)
-
-        fmt = q_obj.question_format
-
-        if fmt == 'mcq' and q_obj.options:
-            for idx, opt in enumerate(q_obj.options):
-                letter = chr(65 + idx)
-                opt_text = _OPT_PREFIX_RE.sub('', str(opt))
-                p = doc.add_paragraph()
-                p.paragraph_format.space_before = Pt(0)
-                p.paragraph_format.space_after = Pt(1)
-                p.paragraph_format.left_indent = Cm(1.4)
-                run = p.add_run(f'{letter}. ')
-                run.bold = True
-                run.font.size = Pt(10)
-                run = p.add_run(opt_text)
-                run.font.size = Pt(10)
-
-        elif fmt == 'truefalse':
-            p = doc.add_paragraph()
-            p.paragraph_format.left_indent = Cm(1.4)
-            p.paragraph_format.space_after = Pt(2)
-            run = p.add_run('☐ True          ☐ False')
-            run.font.size = Pt(10)
-
-        elif fmt == 'fill':
-            p = doc.add_paragraph()
-            p.paragraph_format.left_indent = Cm(1.4)
-            p.paragraph_format.space_after = Pt(2)
-            run = p.add_run('Answer: ___________________________________')
-            run.font.size = Pt(10)
-
-        elif fmt == 'short':
-            for _ in range(5):
-                p = doc.add_paragraph()
-                p.paragraph_format.left_indent = Cm(1.4)
-                p.paragraph_format.space_before = Pt(0)
-                p.paragraph_format.space_after = Pt(0)
-                run = p.add_run('_' * 70)
-                run.font.size = Pt(9)
-                run.font.color.rgb = RGBColor(170, 170, 170)
-
-        elif fmt == 'essay':
-            for _ in range(10):
-                p = doc.add_paragraph()
-                p.paragraph_format.left_indent = Cm(1.4)
-                p.paragraph_format.space_before = Pt(0)
-                p.paragraph_format.space_after = Pt(0)
-                run = p.add_run('_' * 70)
-                run.font.size = Pt(9)
-                run.font.color.rgb = RGBColor(170, 170, 170)
-
-    # ── Render sections or flat list ──
-    if sections:
-        for sec in sections:
-            p = doc.add_paragraph()
-            p.paragraph_format.space_before = Pt(10)
-            p.paragraph_format.space_after = Pt(4)
-            # Top border via bottom border of a thin paragraph
-            pPr = p._p.get_or_add_pPr()
-            pBdr = pPr.makeelement(qn('w:pBdr'), {})
-            pPr.append(pBdr)
-            for edge_name in ('top', 'bottom'):
-                sz = '12' if edge_name == 'top' else '4'
-                bdr = pBdr.makeelement(qn(f'w:{edge_name}'), {
-                    qn('w:val'): 'single', qn('w:sz'): sz,
-                    qn('w:space'): '1', qn('w:color'): '000000',
-                })
-                pBdr.append(bdr)
-            run = p.add_run(f"SECTION {sec['letter']}: {sec['label']}")
-            run.bold = True
-            run.font.size = Pt(10)
-            count = len(sec['questions'])
-            run = p.add_run(f'    [{count} question{"s" if count != 1 else ""}]')
-            run.font.size = Pt(9)
-            run.font.color.rgb = RGBColor(100, 100, 100)
-
-            for q in sec['questions']:
-                render_question(q['obj'], q['number'])
-    else:
-        for idx, q_obj in enumerate(questions_qs, 1):
-            render_question(q_obj, idx)
-
-    # ── Footer ──
-    p = doc.add_paragraph()
-    p.paragraph_format.space_before = Pt(14)
-    pPr = p._p.get_or_add_pPr()
-    pBdr = pPr.makeelement(qn('w:pBdr'), {})
-    pPr.append(pBdr)
-    bdr = pBdr.makeelement(qn('w:top'), {
-        qn('w:val'): 'single', qn('w:sz'): '12',
-        qn('w:space'): '1', qn('w:color'): '000000',
-    })
-    pBdr.append(bdr)
-    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    run = p.add_run('— End of Paper —')
-    run.bold = True
-    run.font.size = Pt(10)
-
-    summary_parts = [f'{len(questions_qs)} question{"s" if len(questions_qs) != 1 else ""}']
-    summary_parts.append(f'{paper.duration_minutes} minutes')
-    if paper.subject:
-        summary_parts.append(paper.subject.name)
-    p = doc.add_paragraph()
-    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    run = p.add_run(' · '.join(summary_parts))
-    run.font.size = Pt(8)
-    run.font.color.rgb = RGBColor(100, 100, 100)
-
-    # ── Marking Scheme (separate page) ──
-    doc.add_page_break()
-
-    add_centered('MARKING SCHEME', bold=True, size=14, caps=False, spacing=2)
-    if school_name:
-        p = add_centered(f'{school_name} — {paper.title}', size=9, spacing=6)
-        p.runs[0].font.color.rgb = RGBColor(85, 85, 85)
-    add_thin_line()
-
-    # Build answer list from sections or flat list
-    all_questions = []
-    if sections:
-        for sec in sections:
-            for q in sec['questions']:
-                all_questions.append((q['number'], q['obj']))
-    else:
-        for idx, q_obj in enumerate(questions_qs, 1):
-            all_questions.append((idx, q_obj))
-
-    # Marking scheme table
-    ms_table = doc.add_table(rows=1, cols=3)
-    ms_table.alignment = WD_TABLE_ALIGNMENT.CENTER
-    # Header row
-    for ci, header in enumerate(['No.', 'Answer', 'Explanation']):
-        cell = ms_table.rows[0].cells[ci]
-        p = cell.paragraphs[0]
-        p.paragraph_format.space_before = Pt(2)
-        p.paragraph_format.space_after = Pt(2)
-        run = p.add_run(header)
-        run.bold = True
-        run.font.size = Pt(9)
-        # Shade header cells
-        shading = cell._tc.get_or_add_tcPr().makeelement(qn('w:shd'), {
-            qn('w:val'): 'clear', qn('w:color'): 'auto', qn('w:fill'): 'E8E8E8',
-        })
-        cell._tc.get_or_add_tcPr().append(shading)
-
-    for num, q_obj in all_questions:
-        row = ms_table.add_row()
-        # No.
-        p = row.cells[0].paragraphs[0]
-        p.paragraph_format.space_before = Pt(2)
-        p.paragraph_format.space_after = Pt(2)
-        run = p.add_run(str(num))
-        run.bold = True
-        run.font.size = Pt(9)
-        # Answer
-        p = row.cells[1].paragraphs[0]
-        p.paragraph_format.space_before = Pt(2)
-        p.paragraph_format.space_after = Pt(2)
-        answer_text = q_obj.correct_answer or '—'
-        run = p.add_run(answer_text)
-        run.font.size = Pt(9)
-        run.font.color.rgb = RGBColor(13, 110, 63)
-        # Explanation
-        p = row.cells[2].paragraphs[0]
-        p.paragraph_format.space_before = Pt(2)
-        p.paragraph_format.space_after = Pt(2)
-        expl_text = q_obj.explanation or ''
-        run = p.add_run(expl_text)
-        run.italic = True
-        run.font.size = Pt(8)
-        run.font.color.rgb = RGBColor(100, 100, 100)
-
-    # Table borders
-    ms_tbl = ms_table._tbl
-    ms_tblPr = ms_tbl.tblPr if ms_tbl.tblPr is not None else ms_tbl._add_tblPr()
-    ms_borders = ms_tblPr.find(qn('w:tblBorders'))
-    if ms_borders is None:
-        ms_borders = ms_tblPr.makeelement(qn('w:tblBorders'), {})
-        ms_tblPr.append(ms_borders)
-    for edge in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'):
-        el = ms_borders.makeelement(qn(f'w:{edge}'), {
-            qn('w:val'): 'single', qn('w:sz'): '4',
-            qn('w:space'): '0', qn('w:color'): '999999',
-        })
-        ms_borders.append(el)
-
-    # Set column widths (No: narrow, Answer: medium, Explanation: wide)
-    for row in ms_table.rows:
-        for ci, width in enumerate([Cm(1.2), Cm(5.5), Cm(10.0)]):
-            row.cells[ci].width = width
-
-    # ── Stream response ──
-    buf = io.BytesIO()
-    doc.save(buf)
-    buf.seek(0)
+    payload = exam_paper_payload(paper, school_name, school_motto)
+    return document_response(
+        request, renderer, payload,
+        filename=f'{safe_title(paper.title, "Exam_Paper")}.{ext}',
+        size=len(payload['questions']),
+    )
 
-    safe_title = ''.join(c for c in paper.title if c.isalnum() or c in ' _-').strip()[:80]
-    filename = f'{safe_title or "Exam_Paper"}.docx'
 
-    response = HttpResponse(
-        buf.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-    )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
+@login_required
+@requires_addon('exam-question-bank')
+def addon_exam_paper_docx(request, **kwargs):
+    """Export exam paper as a WAEC-standard Word document (.docx)."""
+    return _exam_paper_download(request, 'teachers.documents.exam_paper_docx', 'docx')
 
 
 @login_required
 @requires_addon('exam-question-bank')
 def addon_exam_paper_pdf(request, **kwargs):
     """Export exam paper as a clean PDF using ReportLab."""
-    import io
-    import re
-    from collections import OrderedDict
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.units import cm, mm
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.colors import HexColor, black, white
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-        HRFlowable, PageBreak,
-    )
-    from teachers.models import ExamPaper
-
-    _OPT_PREFIX_RE = re.compile(r'^[A-Da-d][.)\]:]\s*')
-
-    paper_id = request.GET.get('id')
-    if not paper_id:
-        return redirect('teachers:addon_question_bank')
-    paper = get_object_or_404(ExamPaper, id=paper_id, teacher=request.user)
-
-    questions_qs = list(paper.questions.all().order_by('question_format', 'id'))
-
-    FORMAT_LABELS = {
-        'mcq': 'Multiple Choice', 'fill': 'Fill in the Blank',
-        'short': 'Short Answer', 'essay': 'Essay',
-        'truefalse': 'True or False',
-    }
-    sections = []
-    if questions_qs:
-        grouped = OrderedDict()
-        for q in questions_qs:
-            grouped.setdefault(q.question_format, []).append(q)
-        counter = 1
-        letter_idx = 0
-        for fmt, qs_list in grouped.items():
-            numbered = []
-            for q_obj in qs_list:
-                numbered.append({'number': counter, 'obj': q_obj})
-                counter += 1
-            sections.append({
-                'letter': chr(65 + letter_idx),
-                'label': FORMAT_LABELS.get(fmt, fmt),
-                'format': fmt,
-                'questions': numbered,
-            })
-            letter_idx += 1
-    if len(sections) <= 1:
-        sections = []
-
-    school_name = getattr(request, 'tenant', None) and request.tenant.name or ''
-    school_motto = ''
-    try:
-        from academics.models import SchoolInfo
-        si = SchoolInfo.objects.first()
-        if si:
-            school_name = si.name or school_name
-            school_motto = si.motto or ''
-    except Exception:
-        pass
-
-    # ── Build PDF ──
-    buf = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buf, pagesize=A4,
-        topMargin=1.5 * cm, bottomMargin=1.8 * cm,
-        leftMargin=2 * cm, rightMargin=2 * cm,
-    )
-
-    styles = getSampleStyleSheet()
-    accent = HexColor('#4361ee')
-    muted = HexColor('#555555')
-
-    s_school = ParagraphStyle('School', parent=styles['Title'], fontSize=14,
-        fontName='Times-Bold', alignment=TA_CENTER, spaceAfter=2,
-        textColor=black)
-    s_motto = ParagraphStyle('Motto', parent=styles['Normal'], fontSize=9,
-        fontName='Times-Italic', alignment=TA_CENTER, spaceAfter=6,
-        textColor=muted)
-    s_paper_title = ParagraphStyle('PaperTitle', parent=styles['Title'],
-        fontSize=13, fontName='Times-Bold', alignment=TA_CENTER, spaceAfter=4,
-        textColor=black)
-    s_meta = ParagraphStyle('Meta', parent=styles['Normal'], fontSize=9,
-        fontName='Times-Roman', alignment=TA_CENTER, spaceAfter=8,
-        textColor=muted)
-    s_section = ParagraphStyle('Section', parent=styles['Heading2'],
-        fontSize=10, fontName='Times-Bold', spaceBefore=12, spaceAfter=4,
-        textColor=black, borderWidth=1, borderColor=black, borderPadding=4)
-    s_q = ParagraphStyle('Question', parent=styles['Normal'], fontSize=11,
-        fontName='Times-Roman', spaceBefore=6, spaceAfter=2,
-        leftIndent=0.6 * cm, firstLineIndent=-0.6 * cm)
-    s_opt = ParagraphStyle('Option', parent=styles['Normal'], fontSize=10,
-        fontName='Times-Roman', spaceBefore=0, spaceAfter=1,
-        leftIndent=1.4 * cm)
-    s_line = ParagraphStyle('AnswerLine', parent=styles['Normal'], fontSize=9,
-        fontName='Times-Roman', leftIndent=1.4 * cm, spaceAfter=1,
-        textColor=HexColor('#aaaaaa'))
-    s_footer = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=10,
-        fontName='Times-Bold', alignment=TA_CENTER, spaceBefore=14)
-    s_footer_meta = ParagraphStyle('FooterMeta', parent=styles['Normal'],
-        fontSize=8, fontName='Times-Roman', alignment=TA_CENTER,
-        textColor=muted)
-    # Marking scheme styles
-    s_ms_title = ParagraphStyle('MSTitle', parent=styles['Title'], fontSize=14,
-        fontName='Times-Bold', alignment=TA_CENTER, spaceAfter=4)
-    s_ms_sub = ParagraphStyle('MSSub', parent=styles['Normal'], fontSize=9,
-        fontName='Times-Roman', alignment=TA_CENTER, spaceAfter=8,
-        textColor=muted)
-    s_ms_cell = ParagraphStyle('MSCell', parent=styles['Normal'], fontSize=9,
-        fontName='Times-Roman', spaceAfter=0, spaceBefore=0)
-    s_ms_answer = ParagraphStyle('MSAnswer', parent=s_ms_cell,
-        textColor=HexColor('#0d6e3f'))
-    s_ms_expl = ParagraphStyle('MSExpl', parent=s_ms_cell, fontSize=8,
-        fontName='Times-Italic', textColor=muted)
-
-    story = []
-
-    # Masthead
-    if school_name:
-        story.append(Paragraph(school_name.upper(), s_school))
-    if school_motto:
-        story.append(Paragraph(f'"{school_motto}"', s_motto))
-
-    story.append(HRFlowable(width="80%", thickness=0.5, color=black,
-        spaceBefore=2, spaceAfter=6, hAlign='CENTER'))
-    story.append(Paragraph(paper.title.upper(), s_paper_title))
-
-    meta_parts = []
-    if paper.subject:
-        meta_parts.append(paper.subject.name)
-    if paper.target_class:
-        meta_parts.append(paper.target_class.name)
-    meta_parts.append(f'Duration: {paper.duration_minutes} mins')
-    meta_parts.append(f'{len(questions_qs)} Question{"s" if len(questions_qs) != 1 else ""}')
-    story.append(Paragraph('  |  '.join(meta_parts), s_meta))
-
-    # Candidate box
-    cand_data = [
-        ['NAME: ____________________________', 'INDEX NO: ____________________________'],
-        ['CLASS: ____________________________', 'DATE: ________________________________'],
-    ]
-    cand_style = TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Times-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('BOX', (0, 0), (-1, -1), 0.5, black),
-        ('INNERGRID', (0, 0), (-1, -1), 0.5, black),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-    ])
-    avail_width = A4[0] - 4 * cm
-    cand_table = Table(cand_data, colWidths=[avail_width / 2] * 2)
-    cand_table.setStyle(cand_style)
-    story.append(cand_table)
-    story.append(Spacer(1, 8))
-
-    # Instructions
-    if paper.instructions:
-        s_instr_head = ParagraphStyle('InstrHead', parent=styles['Normal'],
-            fontSize=8, fontName='Times-Bold', spaceAfter=2)
-        s_instr = ParagraphStyle('Instr', parent=styles['Normal'],
-            fontSize=10, fontName='Times-Roman', spaceAfter=8)
-        story.append(Paragraph('INSTRUCTIONS TO CANDIDATES', s_instr_head))
-        story.append(Paragraph(paper.instructions, s_instr))
-
-    # Helper to escape XML for Paragraph
-    def esc(text):
-        return (str(text).replace('&', '&amp;').replace('<', '&lt;')
-                .replace('>', '&gt;'))
-
-    def render_q_pdf(q_obj, number):
-        story.append(Paragraph(
-            f'<b>{number}.</b> {esc(q_obj.question_text)}', s_q))
-        fmt = q_obj.question_format
-        if fmt == 'mcq' and q_obj.options:
-            for idx, opt in enumerate(q_obj.options):
-                letter = chr(65 + idx)
-                opt_text = _OPT_PREFIX_RE.sub('', str(opt))
-                story.append(Paragraph(
-                    f'<b>{letter}.</b> {esc(opt_text)}', s_opt))
-        elif fmt == 'truefalse':
-            story.append(Paragraph(
-                '\u2610 True          \u2610 False', s_opt))
-        elif fmt == 'fill':
-            story.append(Paragraph(
-                'Answer: ___________________________________', s_line))
-        elif fmt == 'short':
-            for _ in range(4):
-                story.append(Paragraph('_' * 70, s_line))
-        elif fmt == 'essay':
-            for _ in range(8):
-                story.append(Paragraph('_' * 70, s_line))
-
-    # Render sections or flat
-    if sections:
-        for sec in sections:
-            count = len(sec['questions'])
-            story.append(Paragraph(
-                f"SECTION {sec['letter']}: {sec['label']}"
-                f"    <font color='#646464' size='9'>"
-                f"[{count} question{'s' if count != 1 else ''}]</font>",
-                s_section))
-            for q in sec['questions']:
-                render_q_pdf(q['obj'], q['number'])
-    else:
-        for idx, q_obj in enumerate(questions_qs, 1):
-            render_q_pdf(q_obj, idx)
-
-    # Footer
-    story.append(HRFlowable(width="100%", thickness=1, color=black,
-        spaceBefore=14, spaceAfter=4, hAlign='CENTER'))
-    story.append(Paragraph('\u2014 End of Paper \u2014', s_footer))
-    summary_parts = [
-        f'{len(questions_qs)} question{"s" if len(questions_qs) != 1 else ""}',
-        f'{paper.duration_minutes} minutes',
-    ]
-    if paper.subject:
-        summary_parts.append(paper.subject.name)
-    story.append(Paragraph(' \u00b7 '.join(summary_parts), s_footer_meta))
-
-    # ── Marking Scheme (page 2) ──
-    story.append(PageBreak())
-    story.append(Paragraph('MARKING SCHEME', s_ms_title))
-    if school_name:
-        story.append(Paragraph(
-            f'{esc(school_name)} \u2014 {esc(paper.title)}', s_ms_sub))
-    story.append(HRFlowable(width="80%", thickness=0.5, color=black,
-        spaceBefore=2, spaceAfter=8, hAlign='CENTER'))
-
-    all_questions = []
-    if sections:
-        for sec in sections:
-            for q in sec['questions']:
-                all_questions.append((q['number'], q['obj']))
-    else:
-        for idx, q_obj in enumerate(questions_qs, 1):
-            all_questions.append((idx, q_obj))
-
-    ms_data = [[
-        Paragraph('<b>No.</b>', s_ms_cell),
-        Paragraph('<b>Answer</b>', s_ms_cell),
-        Paragraph('<b>Explanation</b>', s_ms_cell),
-    ]]
-    for num, q_obj in all_questions:
-        ms_data.append([
-            Paragraph(f'<b>{num}</b>', s_ms_cell),
-            Paragraph(esc(q_obj.correct_answer or '\u2014'), s_ms_answer),
-            Paragraph(esc(q_obj.explanation or ''), s_ms_expl),
-        ])
-
-    col_widths = [1.2 * cm, 5.5 * cm, avail_width - 6.7 * cm]
-    ms_table = Table(ms_data, colWidths=col_widths, repeatRows=1)
-    ms_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Times-Roman'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#E8E8E8')),
-        ('FONTNAME', (0, 0), (-1, 0), 'Times-Bold'),
-        ('BOX', (0, 0), (-1, -1), 0.5, HexColor('#999999')),
-        ('INNERGRID', (0, 0), (-1, -1), 0.25, HexColor('#999999')),
-        ('TOPPADDING', (0, 0), (-1, -1), 3),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ('LEFTPADDING', (0, 0), (-1, -1), 4),
-    ]))
-    story.append(ms_table)
-
-    doc.build(story)
-    buf.seek(0)
-
-    safe_title = ''.join(c for c in paper.title if c.isalnum() or c in ' _-').strip()[:80]
-    filename = f'{safe_title or "Exam_Paper"}.pdf'
-
-    response = HttpResponse(buf.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
+    return _exam_paper_download(request, 'teachers.documents.exam_paper_pdf', 'pdf')
 
 
 # ── 3. Behavior & SEL Tracker ────────────────────────────────────────────
@@ -9558,6 +8541,7 @@ def live_quiz_run(request, quiz_id):
     if request.method == 'POST' and request.POST.get('action') == 'toggle':
         quiz.is_active = not quiz.is_active
         quiz.save(update_fields=['is_active'])
+        live.reset_quiz(quiz.join_code)
         return redirect('teachers:live_quiz_run', quiz_id=quiz.id)
     return render(request, 'teachers/addon_live_quiz_run.html', {
         'quiz': quiz, 'questions': questions,
@@ -9568,31 +8552,13 @@ def live_quiz_run(request, quiz_id):
 @requires_addon('live-quiz-engine')
 def live_quiz_api(request, quiz_id):
     """AJAX API for teacher: get live results, advance questions."""
-    from teachers.models import LiveQuiz, LiveQuizResponse
+    from teachers.models import LiveQuiz
     quiz = get_object_or_404(LiveQuiz, id=quiz_id, teacher=request.user)
-    questions = list(quiz.questions.values('id', 'order', 'text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct', 'time_limit'))
-    # Get response counts
-    for q in questions:
-        resps = LiveQuizResponse.objects.filter(question_id=q['id'])
-        q['total'] = resps.count()
-        q['correct_count'] = resps.filter(is_correct=True).count()
-        q['breakdown'] = {
-            'A': resps.filter(choice='A').count(),
-            'B': resps.filter(choice='B').count(),
-            'C': resps.filter(choice='C').count(),
-            'D': resps.filter(choice='D').count(),
-        }
-    # Leaderboard
-    leaderboard = (
-        LiveQuizResponse.objects.filter(question__quiz=quiz, is_correct=True)
-        .values('player_name')
-        .annotate(score=Count('id'))
-        .order_by('-score')[:20]
-    )
+    questions, leaderboard = live.quiz_results(quiz)
     return JsonResponse({
         'quiz': {'id': quiz.id, 'title': quiz.title, 'is_active': quiz.is_active, 'code': quiz.join_code},
         'questions': questions,
-        'leaderboard': list(leaderboard),
+        'leaderboard': leaderboard,
     })
 
 
@@ -9608,12 +8574,8 @@ def live_quiz_play(request, code):
 
 def live_quiz_student_api(request, code):
     """AJAX: student submits an answer."""
-    from teachers.models import LiveQuiz, LiveQuizQuestion, LiveQuizResponse
     if request.method != 'POST':
         return JsonResponse({'error': 'POST only'}, status=405)
-    quiz = get_object_or_404(LiveQuiz, join_code=code.upper())
-    if not quiz.is_active:
-        return JsonResponse({'error': 'Quiz is closed.'}, status=403)
 
     body = json.loads(request.body) if request.content_type == 'application/json' else request.POST
     q_id = body.get('question_id')
@@ -9623,17 +8585,8 @@ def live_quiz_student_api(request, code):
     if not q_id or not choice:
         return JsonResponse({'error': 'Missing fields.'}, status=400)
 
-    question = get_object_or_404(LiveQuizQuestion, id=q_id, quiz=quiz)
-    is_correct = choice == question.correct.upper()
-
-    obj, created = LiveQuizResponse.objects.get_or_create(
-        question=question, player_name=player,
-        defaults={'choice': choice, 'is_correct': is_correct},
-    )
-    if not created:
-        return JsonResponse({'error': 'Already answered.', 'is_correct': obj.is_correct}, status=200)
-
-    return JsonResponse({'is_correct': is_correct, 'correct_answer': question.correct})
+    payload, status = live.quiz_answer(code.upper(), q_id, player, choice)
+    return JsonResponse(payload, status=status)
 
 
 # ── Attendance Tracker Add-On ─────────────────────────────────────────────
@@ -7,7 +7,7 @@ from tenants.models import (
     School, Domain, SubscriptionPlan, AddOn, 
     SchoolSubscription, SchoolAddOn, Invoice, ChurnEvent,
     SystemHealthMetric, SupportTicket, TicketComment, DatabaseBackup,
-    PlatformSettings,
+    PlatformSettings, WebhookEvent,
 )
 
 @admin.register(School)
@@ -124,10 +124,11 @@ class TicketCommentAdmin(admin.ModelAdmin):
 
 @admin.register(DatabaseBackup)
 class DatabaseBackupAdmin(admin.ModelAdmin):
-    list_display = ('school', 'backup_type', 'status', 'file_size_mb', 'started_at', 'completed_at')
-    list_filter = ('status', 'backup_type', 'started_at')
-    search_fields = ('school__name', 'backup_file')
-    readonly_fields = ('started_at', 'completed_at')
+    list_display = ('school', 'scope', 'backup_type', 'status', 'progress', 'file_size_mb',
+                    'verify_status', 'started_at', 'completed_at')
+    list_filter = ('status', 'scope', 'backup_type', 'verify_status', 'started_at')
+    search_fields = ('school__name', 'backup_file', 'checksum')
+    readonly_fields = ('started_at', 'completed_at', 'checksum', 'raw_size_bytes', 'heartbeat_at', 'verified_at')
 
 
 @admin.register(PlatformSettings)
@@ -141,3 +142,21 @@ class PlatformSettingsAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return False
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('reference', 'event', 'handler', 'schema_name', 'status', 'attempts', 'matched', 'received_at')
+    list_filter = ('status', 'handler', 'matched', 'received_at')
+    search_fields = ('reference', 'key')
+    readonly_fields = [f.name for f in WebhookEvent._meta.fields]
+    actions = ['replay_events']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Replay selected events now')
+    def replay_events(self, request, queryset):
+        from tenants import webhooks
+        counts = webhooks.replay(queryset, include_done=True)
+        self.message_user(request, 'Replayed: ' + (', '.join(f'{n} {s}' for s, n in sorted(counts.items())) or 'nothing'))
@@ -0,0 +1,467 @@
+"""
+Database backups: background pg_dump jobs, compressed, checksummed and rotated.
+
+The backup page ran ``pg_dump`` inside the request — up to 300 seconds of a
+web worker per click — and wrote the dump under ``MEDIA_ROOT``, where the
+download link served it like any upload.
+
+  * **Jobs**: the page only queues a ``DatabaseBackup`` row.  The scheduler
+    process (``run_scheduler``) starts queued dumps and verifications on
+    worker threads, ``BACKUP_CONCURRENCY`` at a time, and
+    ``manage.py run_backups`` runs them in the foreground.  A backup covers
+    the whole database, the public schema or one school's schema;
+    ``schema_only`` skips the data.
+  * **Streaming**: pg_dump writes an uncompressed custom-format archive to a
+    pipe.  It is gzip-compressed and SHA-256-hashed 1 MiB at a time into a
+    temporary file, which is saved to ``BACKUP_STORAGE`` — memory stays
+    flat whatever the size of the database.  The row keeps the compressed
+    size, the checksum, the bytes read and a progress estimate (bytes read
+    against the size of the scope's tables), refreshed while the dump runs.
+  * **Retention**: ``rotate()`` deletes backups past ``expires_at`` but
+    always keeps the newest ``BACKUP_KEEP_MIN`` completed backups of each
+    school and scope.
+  * **Verification**: ``verify()`` checks the stored file against its
+    checksum, restores a schema backup into a scratch schema
+    (``verify_<id>``), compares the restored tables with the archive and
+    drops the scratch schema again.
+  * **Downloads** are streamed from private storage by a staff-only view.
+
+Usage::
+
+    from tenants import backups
+
+    backup = backups.queue('schema', school=school, user=request.user)
+    backups.run(backup.pk)        # what the scheduler does on a worker thread
+
+Settings:
+  BACKUP_STORAGE           Dotted storage class for dumps (default: FileSystemStorage in BACKUP_ROOT)
+  BACKUP_ROOT              Directory of the default storage (default <BASE_DIR>/backups, not served)
+  BACKUP_CONCURRENCY       Dumps and verifications run at once (default 1)
+  BACKUP_RETENTION_DAYS    Days a completed backup is kept (default 30)
+  BACKUP_KEEP_MIN          Newest completed backups never rotated, per school and scope (default 3)
+  BACKUP_NIGHTLY           Queue a whole-database backup every night (default False)
+"""
+import hashlib
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CHUNK = 1024 * 1024
+# A running job refreshes heartbeat_at at least this often while data flows.
+HEARTBEAT_SECONDS = 15
+# In-progress rows silent for this long belong to a worker that died.
+STALE = timedelta(minutes=30)
+
+
+class BackupError(Exception):
+    pass
+
+
+# ── Storage and connection ─────────────────────────────────────
+
+def storage():
+    """Where dumps are kept — never the public media storage."""
+    path = getattr(settings, 'BACKUP_STORAGE', '')
+    if path:
+        return import_string(path)()
+    from django.core.files.storage import FileSystemStorage
+    return FileSystemStorage(location=getattr(settings, 'BACKUP_ROOT', os.path.join(settings.BASE_DIR, 'backups')))
+
+
+def _pg():
+    """``(connection arguments, environment)`` for the pg_* client tools."""
+    db = settings.DATABASES['default']
+    env = os.environ.copy()
+    env['PGPASSWORD'] = db.get('PASSWORD') or ''
+    sslmode = (db.get('OPTIONS') or {}).get('sslmode')
+    if sslmode:
+        env['PGSSLMODE'] = sslmode
+    args = [
+        f'--host={db.get("HOST") or "localhost"}',
+        f'--port={db.get("PORT") or 5432}',
+        f'--username={db.get("USER") or "postgres"}',
+        '--no-password',
+    ]
+    return args, db.get('NAME', ''), env
+
+
+def target(backup):
+    """The schema ``backup`` covers, or None for the whole database."""
+    from django_tenants.utils import get_public_schema_name
+
+    if backup.scope == 'database':
+        return None
+    if backup.scope == 'public':
+        return get_public_schema_name()
+    return backup.school.schema_name
+
+
+def _table_bytes(schema):
+    """On-disk size of the tables a dump of ``schema`` (None: everything) reads."""
+    sql = ("SELECT COALESCE(SUM(pg_table_size(c.oid)), 0) FROM pg_class c "
+           "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE c.relkind IN ('r', 'm')")
+    params = []
+    if schema is None:
+        sql += " AND n.nspname NOT IN ('pg_catalog', 'information_schema')"
+    else:
+        sql += ' AND n.nspname = %s'
+        params.append(schema)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return int(cursor.fetchone()[0] or 0)
+
+
+# ── Queue ──────────────────────────────────────────────────────
+
+def queue(scope, school=None, backup_type='full', user=None):
+    """Queue a backup of ``scope`` ('database', 'public' or 'schema' with ``school``)."""
+    from tenants.models import DatabaseBackup
+
+    if scope == 'schema' and school is None:
+        raise BackupError('A schema backup needs a school')
+    return DatabaseBackup.objects.create(
+        scope=scope, school=school if scope == 'schema' else None,
+        backup_type=backup_type, status='pending', requested_by=user,
+        retention_days=getattr(settings, 'BACKUP_RETENTION_DAYS', 30),
+    )
+
+
+def queue_verify(backup):
+    from tenants.models import DatabaseBackup
+
+    if backup.status != 'completed':
+        raise BackupError('Only completed backups can be verified')
+    DatabaseBackup.objects.filter(pk=backup.pk).update(verify_status='pending', verify_detail='')
+
+
+def nightly():
+    """Scheduled job: queue the nightly whole-database backup when enabled."""
+    if not getattr(settings, 'BACKUP_NIGHTLY', False):
+        return 0
+    queue('database')
+    return 1
+
+
+_running = set()
+_running_lock = threading.Lock()
+
+
+def _work(kind, backup_id):
+    try:
+        (run if kind == 'backup' else verify)(backup_id)
+    except Exception:
+        logger.exception('Backup %s of #%s failed', kind, backup_id)
+    finally:
+        with _running_lock:
+            _running.discard(backup_id)
+        connections.close_all()
+
+
+def run_pending(wait=False):
+    """Start queued backups and verifications, up to ``BACKUP_CONCURRENCY`` at once.
+
+    The scheduler calls this every minute; each job runs on its own
+    (non-daemon) thread.  With ``wait`` they run one after the other here.
+    Returns how many were started.
+    """
+    from tenants.models import DatabaseBackup
+
+    now = timezone.now()
+    with _running_lock:
+        running = set(_running)
+    stale = (DatabaseBackup.objects.filter(status='in_progress', heartbeat_at__lt=now - STALE)
+             .exclude(pk__in=running))
+    for backup_id in stale.values_list('pk', flat=True):
+        logger.warning('Backup #%s stopped reporting; marking it failed', backup_id)
+    stale.update(status='failed', error_message='The backup worker stopped before the dump finished.',
+                 completed_at=now)
+    (DatabaseBackup.objects.filter(verify_status='running', heartbeat_at__lt=now - STALE)
+     .exclude(pk__in=running).update(verify_status='failed', verify_detail='The verification worker stopped.'))
+
+    slots = None if wait else getattr(settings, 'BACKUP_CONCURRENCY', 1) - len(running)
+    if slots is not None and slots <= 0:
+        return 0
+    todo = [('backup', pk) for pk in DatabaseBackup.objects.filter(status='pending')
+            .order_by('started_at').values_list('pk', flat=True)]
+    todo += [('verify', pk) for pk in DatabaseBackup.objects.filter(verify_status='pending')
+             .order_by('completed_at').values_list('pk', flat=True)]
+    todo = [(kind, pk) for kind, pk in todo if pk not in running][:slots]
+    for kind, backup_id in todo:
+        with _running_lock:
+            _running.add(backup_id)
+        if wait:
+            _work(kind, backup_id)
+        else:
+            threading.Thread(target=_work, args=(kind, backup_id), name=f'backup-{backup_id}').start()
+    return len(todo)
+
+
+# ── Dump ───────────────────────────────────────────────────────
+
+class _Reporter:
+    """Throttled progress and heartbeat updates on the backup row."""
+
+    def __init__(self, backup_id, total, field='progress'):
+        self.backup_id, self.total, self.field = backup_id, total, field
+        self.percent, self.at = 0, 0.0
+
+    def __call__(self, done, **extra):
+        from tenants.models import DatabaseBackup
+
+        percent = min(int(done * 100 / self.total), 99) if self.total else 0
+        now = time.monotonic()
+        if percent >= self.percent + 2 or now - self.at >= HEARTBEAT_SECONDS:
+            self.percent, self.at = percent, now
+            DatabaseBackup.objects.filter(pk=self.backup_id).update(
+                heartbeat_at=timezone.now(), **({self.field: percent} if self.field else {}), **extra,
+            )
+
+
+def _fail(backup_id, message):
+    from tenants.models import DatabaseBackup
+
+    DatabaseBackup.objects.filter(pk=backup_id).update(
+        status='failed', error_message=message[:2000], completed_at=timezone.now(),
+    )
+
+
+def run(backup_id):
+    """Dump ``backup_id`` if it is still queued.  Returns the finished row, or None."""
+    from django.core.files import File
+    from tenants.models import DatabaseBackup
+
+    now = timezone.now()
+    if not DatabaseBackup.objects.filter(pk=backup_id, status='pending').update(
+            status='in_progress', started_at=now, heartbeat_at=now, progress=0):
+        return None  # taken by another worker
+    backup = DatabaseBackup.objects.select_related('school').get(pk=backup_id)
+    schema = target(backup)
+    args, dbname, env = _pg()
+    cmd = ['pg_dump', '--format=custom', '--compress=0', *args]
+    if schema:
+        cmd.append(f'--schema={schema}')
+    if backup.backup_type == 'schema_only':
+        cmd.append('--schema-only')
+    cmd.append(dbname)
+    label = schema or 'database'
+    name = f'{label}/{label}_{now:%Y%m%d_%H%M%S}_{backup.pk}.dump.gz'
+    report = _Reporter(backup.pk, 0 if backup.backup_type == 'schema_only' else _table_bytes(schema))
+
+    try:
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, env=env)
+            digest, gz, read = hashlib.sha256(), zlib.compressobj(6, zlib.DEFLATED, 31), 0
+            for chunk in iter(lambda: proc.stdout.read(CHUNK), b''):
+                read += len(chunk)
+                data = gz.compress(chunk)
+                out.write(data)
+                digest.update(data)
+                report(read, raw_size_bytes=read)
+            data = gz.flush()
+            out.write(data)
+            digest.update(data)
+            if proc.wait() != 0:
+                err.seek(0)
+                raise BackupError(f'pg_dump exited with {proc.returncode}: '
+                                  f'{err.read().decode(errors="replace").strip()[-1500:]}')
+            size = out.tell()
+            out.seek(0)
+            stored = storage().save(name, File(out, name=name))
+    except FileNotFoundError:
+        _fail(backup.pk, 'pg_dump binary not found on this host. Use a database-level backup tool instead.')
+        return None
+    except Exception as exc:
+        logger.exception('Backup #%s failed', backup.pk)
+        _fail(backup.pk, str(exc))
+        return None
+
+    done = timezone.now()
+    DatabaseBackup.objects.filter(pk=backup.pk).update(
+        status='completed', backup_file=stored, file_size_mb=round(size / CHUNK, 3),
+        checksum=digest.hexdigest(), raw_size_bytes=read, progress=100, is_encrypted=False,
+        completed_at=done, heartbeat_at=done, expires_at=done + timedelta(days=backup.retention_days),
+    )
+    logger.info('Backup #%s of %s: %d bytes raw, %d stored', backup.pk, label, read, size)
+    return DatabaseBackup.objects.get(pk=backup.pk)
+
+
+# ── Verify ─────────────────────────────────────────────────────
+
+def checksum(name):
+    """SHA-256 of a stored dump, read in chunks."""
+    digest = hashlib.sha256()
+    with storage().open(name, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def retarget(lines, old, new):
+    """Rewrite a pg_restore SQL script from schema ``old`` to ``new``.
+
+    Schema-qualified names outside ``COPY`` data are renamed and the
+    script's own ``CREATE SCHEMA`` is dropped (the caller creates ``new``).
+    Yields ``(line, kind)`` with kind 'table' for a ``CREATE TABLE``, 'row'
+    for a data row and None otherwise.
+    """
+    qualified = re.compile(r'(?<![\w"$])(?:"%s"|%s)(?=\.)' % (re.escape(old), re.escape(old)))
+    in_copy = False
+    for line in lines:
+        if in_copy:
+            if line.rstrip('\n') == '\\.':
+                in_copy = False
+                yield line, None
+            else:
+                yield line, 'row'
+            continue
+        if line.startswith(('CREATE SCHEMA ', 'ALTER SCHEMA ', 'COMMENT ON SCHEMA ')):
+            continue
+        line = qualified.sub(new, line)
+        if line.startswith('COPY ') and line.rstrip().endswith('FROM stdin;'):
+            in_copy = True
+        yield line, 'table' if line.startswith('CREATE TABLE ') else None
+
+
+def _restore_into(backup, scratch, report):
+    """Stream the stored dump through pg_restore into ``scratch``.  Returns (tables, rows)."""
+    args, dbname, env = _pg()
+    with tempfile.TemporaryFile() as restore_err, tempfile.TemporaryFile() as psql_out:
+        restore = subprocess.Popen(
+            ['pg_restore', '--no-owner', '--no-privileges', '--no-comments', '--file=-'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=restore_err, env=env,
+        )
+        psql = subprocess.Popen(
+            ['psql', '-X', '-q', '-v', 'ON_ERROR_STOP=1', '--single-transaction', *args, dbname],
+            stdin=subprocess.PIPE, stdout=psql_out, stderr=subprocess.STDOUT, env=env,
+        )
+        failure = []
+
+        def feed():
+            gz = zlib.decompressobj(31)
+            try:
+                with storage().open(backup.backup_file, 'rb') as f:
+                    for chunk in iter(lambda: f.read(CHUNK), b''):
+                        restore.stdin.write(gz.decompress(chunk))
+                    restore.stdin.write(gz.flush())
+            except Exception as exc:  # BrokenPipe when pg_restore gave up: its stderr says why
+                failure.append(exc)
+            finally:
+                restore.stdin.close()
+
+        feeder = threading.Thread(target=feed, name=f'verify-feed-{backup.pk}')
+        feeder.start()
+        tables = rows = 0
+        source = (raw.decode('utf-8', errors='surrogateescape') for raw in restore.stdout)
+        try:
+            for line, kind in retarget(source, target(backup), scratch):
+                tables += kind == 'table'
+                rows += kind == 'row'
+                psql.stdin.write(line.encode('utf-8', errors='surrogateescape'))
+                report(rows)
+        except BrokenPipeError:
+            pass  # psql stopped on an error; reported below
+        finally:
+            try:
+                psql.stdin.close()
+            except BrokenPipeError:
+                pass
+            feeder.join()
+        restore_code, psql_code = restore.wait(), psql.wait()
+        if failure and not restore_code:
+            raise BackupError(f'Reading the stored dump failed: {failure[0]}')
+        if restore_code:
+            restore_err.seek(0)
+            raise BackupError(f'pg_restore failed: {restore_err.read().decode(errors="replace").strip()[-1500:]}')
+        if psql_code:
+            psql_out.seek(0)
+            raise BackupError(f'Restore failed: {psql_out.read().decode(errors="replace").strip()[-1500:]}')
+    return tables, rows
+
+
+def verify(backup_id):
+    """Check a completed backup: checksum, then a test restore of schema backups."""
+    from tenants.models import DatabaseBackup
+
+    now = timezone.now()
+    if not DatabaseBackup.objects.filter(pk=backup_id, status='completed', verify_status='pending').update(
+            verify_status='running', heartbeat_at=now):
+        return None
+    backup = DatabaseBackup.objects.select_related('school').get(pk=backup_id)
+    status, detail = 'ok', ''
+    scratch = f'verify_{backup.pk}'
+    try:
+        actual = checksum(backup.backup_file)
+        if backup.checksum and actual != backup.checksum:
+            raise BackupError(f'Checksum mismatch: stored file is {actual}, recorded {backup.checksum}')
+        if backup.scope == 'database':
+            detail = 'Checksum verified. Whole-database backups are not test-restored.'
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP SCHEMA IF EXISTS "{scratch}" CASCADE')
+                cursor.execute(f'CREATE SCHEMA "{scratch}"')
+            try:
+                tables, rows = _restore_into(backup, scratch, _Reporter(backup.pk, 0, field=None))
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT count(*) FROM pg_tables WHERE schemaname = %s", [scratch])
+                    restored = cursor.fetchone()[0]
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP SCHEMA IF EXISTS "{scratch}" CASCADE')
+            if restored != tables:
+                raise BackupError(f'The archive defines {tables} table(s) but {restored} were restored')
+            detail = f'Checksum verified. Restored {tables} table(s) and {rows} row(s) into a scratch schema.'
+    except FileNotFoundError as exc:
+        status, detail = 'failed', f'{exc.filename or "pg_restore/psql"} not found on this host.'
+    except Exception as exc:
+        logger.warning('Verification of backup #%s failed', backup.pk, exc_info=True)
+        status, detail = 'failed', str(exc)
+    DatabaseBackup.objects.filter(pk=backup.pk).update(
+        verify_status=status, verify_detail=detail[:2000], verified_at=timezone.now(),
+    )
+    return status
+
+
+# ── Retention ──────────────────────────────────────────────────
+
+def rotate(now=None):
+    """Delete expired backups and their files, keeping the newest per school and scope.
+
+    Failed rows past their expiry go too.  Returns how many were deleted.
+    """
+    from tenants.models import DatabaseBackup
+
+    now = now or timezone.now()
+    keep_min = getattr(settings, 'BACKUP_KEEP_MIN', 3)
+    keep = set()
+    groups = DatabaseBackup.objects.filter(status='completed').values_list('scope', 'school_id').distinct()
+    for scope, school_id in groups:
+        keep.update(
+            DatabaseBackup.objects.filter(status='completed', scope=scope, school_id=school_id)
+            .order_by('-completed_at').values_list('pk', flat=True)[:keep_min]
+        )
+    expired = (DatabaseBackup.objects.filter(expires_at__lt=now, status__in=['completed', 'failed'])
+               .exclude(pk__in=keep))
+    store, deleted = storage(), 0
+    for backup in expired.only('pk', 'backup_file'):
+        if backup.backup_file:
+            try:
+                store.delete(backup.backup_file)
+            except Exception:
+                logger.warning('Could not delete backup file %s', backup.backup_file, exc_info=True)
+                continue
+        backup.delete()
+        deleted += 1
+    return deleted
@@ -155,6 +155,20 @@ class DatabaseBackup(models.Model):
         ('schema_only', 'Schema Only'),
     ]
     
+    SCOPE_CHOICES = [
+        ('database', 'Whole Database'),
+        ('public', 'Public Schema'),
+        ('schema', 'School Schema'),
+    ]
+    
+    VERIFY_CHOICES = [
+        ('', 'Not Verified'),
+        ('pending', 'Queued'),
+        ('running', 'Running'),
+        ('ok', 'Verified'),
+        ('failed', 'Failed'),
+    ]
+    
     school = models.ForeignKey(
         'tenants.School', 
         on_delete=models.CASCADE, 
@@ -164,12 +178,27 @@ class DatabaseBackup(models.Model):
         help_text="Leave blank for system-wide backup"
     )
     
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES, default='schema')
     backup_type = models.CharField(max_length=20, choices=BACKUP_TYPES, default='full')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    requested_by = models.ForeignKey(
+        get_user_model(), on_delete=models.SET_NULL, null=True, blank=True, related_name='requested_backups'
+    )
     
     # Storage
-    backup_file = models.CharField(max_length=500, blank=True, help_text="Cloud storage path")
+    backup_file = models.CharField(max_length=500, blank=True, help_text="Path in BACKUP_STORAGE")
     file_size_mb = models.FloatField(default=0)
+    checksum = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the stored file")
+    raw_size_bytes = models.BigIntegerField(default=0, help_text="Uncompressed bytes read from pg_dump")
+    
+    # Progress (tenants.backups)
+    progress = models.PositiveSmallIntegerField(default=0)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    
+    # Test restore
+    verify_status = models.CharField(max_length=10, choices=VERIFY_CHOICES, blank=True, default='')
+    verified_at = models.DateTimeField(null=True, blank=True)
+    verify_detail = models.TextField(blank=True)
     
     # Metadata
     is_encrypted = models.BooleanField(default=True)
@@ -0,0 +1,30 @@
+"""
+Build-time assets that shorten cold starts (school_system.startup).
+
+Run by build_files.sh after the migrations:
+    python manage.py build_startup_assets
+
+  * compiles every project module — views, question banks, seed content —
+    to hash-checked bytecode, so a read-only deploy never recompiles them;
+  * writes school_system/migrations.json, which lets the WSGI start-up hook
+    check for pending migrations with one query.
+"""
+from django.core.management.base import BaseCommand
+
+from school_system import startup
+
+
+class Command(BaseCommand):
+    help = 'Precompile bytecode and write the migration manifest for faster cold starts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip-bytecode', action='store_true', help='Only write the migration manifest')
+
+    def handle(self, *args, **options):
+        if not options['skip_bytecode']:
+            if startup.compile_bytecode():
+                self.stdout.write(self.style.SUCCESS('Bytecode compiled'))
+            else:
+                self.stdout.write(self.style.WARNING('Bytecode compiled; some files failed (see above)'))
+        count = startup.write_manifest()
+        self.stdout.write(self.style.SUCCESS(f'Migration manifest: {count} migrations in {startup.MANIFEST}'))
@@ -0,0 +1,90 @@
+"""
+Measure cold start: WSGI boot plus URL conf, in fresh interpreters (school_system.startup).
+
+    python manage.py profile_startup                           # report
+    python manage.py profile_startup --runs 20 --budget-ms 1500
+    python manage.py profile_startup --save-baseline startup.json
+    python manage.py profile_startup --baseline startup.json   # fail on a p95 regression
+
+Fails when a COLD_FORBIDDEN module is imported at startup, when a lazy
+view in the URL conf does not exist, or when p95 is over budget or more
+than --tolerance above the baseline.
+"""
+import json
+import platform
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from school_system import startup
+
+
+class Command(BaseCommand):
+    help = 'Profile cold-start import time and check it against a budget or baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Timed boots (default 5)')
+        parser.add_argument('--top', type=int, default=12, help='Rows per table (default 12)')
+        parser.add_argument('--budget-ms', type=float, help='Fail when p95 is over this (default STARTUP_BUDGET_MS)')
+        parser.add_argument('--baseline', help='Fail when p95 regresses against this baseline file')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p95 growth over the baseline, as a fraction (default 0.2)')
+        parser.add_argument('--save-baseline', metavar='FILE', help='Write this run as the new baseline')
+        parser.add_argument('--json', action='store_true', help='Print the raw profile as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            result = startup.profile(options['runs'])
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+        result['missing_views'] = startup.unresolved_views()
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+        else:
+            self.report(result, options['top'])
+
+        problems = []
+        if result['forbidden']:
+            problems.append(f"imported at startup: {', '.join(result['forbidden'])}")
+        if result['missing_views']:
+            problems.append(f"lazy views that do not exist: {', '.join(result['missing_views'])}")
+        budget = options['budget_ms'] if options['budget_ms'] is not None else getattr(settings, 'STARTUP_BUDGET_MS', 0)
+        if budget and result['p95'] > budget:
+            problems.append(f"p95 {result['p95']:.0f} ms is over the {budget:.0f} ms budget")
+        if options['baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline: {exc}")
+            limit = baseline['p95'] * (1 + options['tolerance'])
+            if result['p95'] > limit:
+                problems.append(f"p95 {result['p95']:.0f} ms regressed past {limit:.0f} ms "
+                                f"(baseline {baseline['p95']:.0f} ms)")
+
+        if options['save_baseline']:
+            Path(options['save_baseline']).write_text(json.dumps({
+                'p50': result['p50'], 'p95': result['p95'], 'runs': len(result['samples']),
+                'modules': result['modules'], 'python': platform.python_version(),
+                'recorded_at': timezone.now().isoformat(),
+            }, indent=2))
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+
+        if problems:
+            raise CommandError('; '.join(problems))
+        if not options['json']:
+            self.stdout.write(self.style.SUCCESS('Startup profile OK'))
+
+    def report(self, result, top):
+        self.stdout.write(f"Boot: p50 {result['p50']:.0f} ms, p95 {result['p95']:.0f} ms "
+                          f"over {len(result['samples'])} run(s); {result['modules']} modules")
+        self.stdout.write('\nImport time by package (ms):')
+        for package, ms in list(result['by_package'].items())[:top]:
+            self.stdout.write(f'  {ms:8.1f}  {package}')
+        if result['edges']:
+            self.stdout.write('\nHeaviest third-party imports made by project code (ms, cumulative):')
+            for module, ms, importer in result['edges'][:top]:
+                self.stdout.write(f'  {ms:8.1f}  {module}  <- {importer}')
+        self.stdout.write('')
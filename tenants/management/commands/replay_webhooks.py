@@ -0,0 +1,64 @@
+"""
+Replay stored payment webhooks (tenants.webhooks).
+
+Failed events are retried automatically by the scheduler up to
+WEBHOOK_MAX_ATTEMPTS; this re-runs them — or chosen events — now:
+    python manage.py replay_webhooks --failed
+    python manage.py replay_webhooks --id 812 --id 813
+    python manage.py replay_webhooks --reference PLN-abc123 --include-done
+    python manage.py replay_webhooks --reconcile
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tenants import webhooks
+
+
+class Command(BaseCommand):
+    help = 'Re-run failed or selected payment webhook events, or reconcile processed ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true', help='Every failed event')
+        parser.add_argument('--id', type=int, action='append', dest='ids', help='This event (repeatable)')
+        parser.add_argument('--reference', action='append', dest='references',
+                            help='Events for this payment reference (repeatable)')
+        parser.add_argument('--handler', choices=sorted(webhooks.HANDLERS), help='Only events for this handler')
+        parser.add_argument('--days', type=int, help='Only events received in the last N days')
+        parser.add_argument('--include-done', action='store_true',
+                            help='Re-run processed and ignored events too (handlers skip what they applied)')
+        parser.add_argument('--reconcile', action='store_true',
+                            help='Match processed events against local payment records')
+
+    def handle(self, *args, **options):
+        from tenants.models import WebhookEvent
+
+        if options['reconcile']:
+            since = timezone.now() - timedelta(days=options['days']) if options['days'] else None
+            unmatched = webhooks.reconcile(since)
+            style = self.style.ERROR if unmatched else self.style.SUCCESS
+            self.stdout.write(style(f'{unmatched} processed event(s) without a local payment record'))
+            return
+
+        if not (options['failed'] or options['ids'] or options['references']):
+            raise CommandError('Choose events with --failed, --id or --reference')
+        events = WebhookEvent.objects.all()
+        if options['failed']:
+            events = events.filter(status='failed')
+        if options['ids']:
+            events = events.filter(pk__in=options['ids'])
+        if options['references']:
+            events = events.filter(reference__in=options['references'])
+        if options['handler']:
+            events = events.filter(handler=options['handler'])
+        if options['days']:
+            events = events.filter(received_at__gte=timezone.now() - timedelta(days=options['days']))
+
+        counts = webhooks.replay(events, include_done=options['include_done'])
+        if not counts:
+            self.stdout.write('No matching events')
+            return
+        summary = ', '.join(f'{n} {status}' for status, n in sorted(counts.items()))
+        style = self.style.ERROR if counts.get('failed') else self.style.SUCCESS
+        self.stdout.write(style(f'Replayed: {summary}'))
@@ -0,0 +1,66 @@
+"""
+Run queued database backups and verifications in the foreground (tenants.backups).
+
+The scheduler process does this every minute; this command is for a
+one-off backup from a shell or an external cron:
+    python manage.py run_backups                       # whatever is queued
+    python manage.py run_backups --queue database      # queue one, then run it
+    python manage.py run_backups --queue schema --schema=<school>
+    python manage.py run_backups --verify 42
+    python manage.py run_backups --rotate
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from tenants import backups
+
+
+class Command(BaseCommand):
+    help = 'Run queued database backups and verifications now'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', choices=['database', 'public', 'schema'],
+                            help='Queue a backup of this scope first')
+        parser.add_argument('--schema', help="With --queue schema: the school's schema name")
+        parser.add_argument('--schema-only', action='store_true', help='With --queue: skip the data')
+        parser.add_argument('--verify', type=int, metavar='ID', help='Queue a test restore of this backup first')
+        parser.add_argument('--rotate', action='store_true', help='Delete expired backups afterwards')
+
+    def handle(self, *args, **options):
+        from tenants.models import DatabaseBackup, School
+
+        if options['queue']:
+            school = None
+            if options['queue'] == 'schema':
+                school = School.objects.filter(schema_name=options['schema'] or '').first()
+                if school is None:
+                    raise CommandError('--queue schema needs --schema=<an existing school schema>')
+            backups.queue(options['queue'], school=school,
+                          backup_type='schema_only' if options['schema_only'] else 'full')
+        if options['verify']:
+            backup = DatabaseBackup.objects.filter(pk=options['verify']).first()
+            if backup is None:
+                raise CommandError(f"No backup #{options['verify']}")
+            try:
+                backups.queue_verify(backup)
+            except backups.BackupError as exc:
+                raise CommandError(str(exc))
+
+        queued = list(DatabaseBackup.objects.filter(
+            models.Q(status='pending') | models.Q(verify_status='pending')).values_list('pk', flat=True))
+        backups.run_pending(wait=True)
+        for backup in DatabaseBackup.objects.filter(pk__in=queued).select_related('school'):
+            line = f'#{backup.pk} {backup}: {backup.file_size_mb:.2f} MB'
+            if backup.verify_status:
+                line += f', verify {backup.verify_status}'
+            if backup.status == 'failed':
+                self.stdout.write(self.style.ERROR(f'{line} — {backup.error_message}'))
+            elif backup.verify_status == 'failed':
+                self.stdout.write(self.style.ERROR(f'{line} — {backup.verify_detail}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+        if not queued:
+            self.stdout.write('Nothing queued')
+
+        if options['rotate']:
+            self.stdout.write(f'Rotated {backups.rotate()} expired backup(s)')
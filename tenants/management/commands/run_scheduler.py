@@ -0,0 +1,87 @@
+"""
+Run scheduled jobs in every school schema (tenants.scheduler).
+
+As a daemon (the ``scheduler`` process in the Procfile) it ticks once a
+minute.  Each tick runs in a transaction holding a Postgres advisory lock,
+so a second daemon or an overlapping --once skips the minute instead of
+running jobs twice:
+    python manage.py run_scheduler
+    python manage.py run_scheduler --once          # a single tick, e.g. from an external cron
+    python manage.py run_scheduler --list
+    python manage.py run_scheduler --job fee_reminders --schema=<school>
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from tenants import scheduler
+
+# pg_try_advisory_xact_lock key: "SCHEDULR" as a 64-bit integer.
+LOCK_ID = 0x5343484544554C52
+
+
+class Command(BaseCommand):
+    help = 'Run due scheduled jobs across all active school schemas (once, or every minute)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run one tick and exit')
+        parser.add_argument('--list', action='store_true', help='List the jobs and their next run')
+        parser.add_argument('--job', help='Run this job now, whether or not it is due')
+        parser.add_argument('--schema', action='append', dest='schemas',
+                            help='With --job: only this schema (repeatable)')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            now = timezone.localtime()
+            for job in scheduler.JOBS:
+                self.stdout.write(f'{job.name:28} {job.cron.expr:14} next {job.cron.next_after(now):%Y-%m-%d %H:%M}'
+                                  f'  {job.description}')
+            return
+
+        if options['job']:
+            job = scheduler.jobs().get(options['job'])
+            if job is None:
+                raise CommandError(f"Unknown job {options['job']!r}; see --list")
+            self._report(job.name, scheduler.run_job(job, schemas=options['schemas']))
+            return
+
+        if options['once']:
+            self._tick()
+            return
+
+        self.stdout.write('Scheduler started')
+        day = None
+        while True:
+            self._tick()
+            if day != timezone.localdate():
+                day = timezone.localdate()
+                pruned = scheduler.prune_history()
+                if pruned:
+                    self.stdout.write(f'Pruned {pruned} old job run(s)')
+            time.sleep(60 - time.time() % 60 + 1)  # just past the next minute
+
+    def _tick(self):
+        try:
+            # Released with the transaction: behind pgBouncer in transaction
+            # mode a session lock and its unlock may reach different backends.
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [LOCK_ID])
+                    if not cursor.fetchone()[0]:
+                        self.stdout.write('Another scheduler is ticking; skipped')
+                        return
+                for name, runs in scheduler.tick().items():
+                    self._report(name, runs)
+        except Exception as exc:  # keep the daemon alive through a database blip
+            self.stderr.write(f'Tick failed: {exc}')
+            connection.close_if_unusable_or_obsolete()
+
+    def _report(self, name, runs):
+        failed = [run.schema_name for run in runs if run.status == 'failed']
+        line = f'{timezone.localtime():%H:%M} {name}: {len(runs)} schema(s)'
+        if failed:
+            self.stdout.write(self.style.ERROR(f"{line}, failed in {', '.join(failed)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(line))
@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-19 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0026_agent_memory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitBucket',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('tat', models.FloatField(help_text='Theoretical arrival time, epoch seconds')),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-19 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0027_rate_limit_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledJobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=60)),
+                ('schema_name', models.CharField(max_length=63)),
+                ('status', models.CharField(choices=[('ok', 'OK'), ('failed', 'Failed')], max_length=10)),
+                ('since', models.DateTimeField(blank=True, help_text='Watermark the run started from', null=True)),
+                ('until', models.DateTimeField(help_text='End of the window the run covered')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('items', models.PositiveIntegerField(blank=True, help_text='What the job reported handling', null=True)),
+                ('detail', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['job', 'schema_name', '-until'], name='jobrun_watermark_idx'), models.Index(fields=['-started_at'], name='jobrun_started_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.0 on 2026-10-19 05:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def scope_existing(apps, schema_editor):
+    # Backups taken before scopes existed dumped the public schema when no school was set.
+    DatabaseBackup = apps.get_model('tenants', 'DatabaseBackup')
+    DatabaseBackup.objects.filter(school__isnull=True).update(scope='public')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0028_scheduled_job_run'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='databasebackup',
+            name='checksum',
+            field=models.CharField(blank=True, help_text='SHA-256 of the stored file', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='databasebackup',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='databasebackup',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='databasebackup',
+            name='raw_size_bytes',
+            field=models.BigIntegerField(default=0, help_text='Uncompressed bytes read from pg_dump'),
+        ),
+        migrations.AddField(
+            model_name='databasebackup',
+            name='requested_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requested_backups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='databasebackup',
+            name='scope',
+            field=models.CharField(choices=[('database', 'Whole Database'), ('public', 'Public Schema'), ('schema', 'School Schema')], default='schema', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='databasebackup',
+            name='verified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='databasebackup',
+            name='verify_detail',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='databasebackup',
+            name='verify_status',
+            field=models.CharField(blank=True, choices=[('', 'Not Verified'), ('pending', 'Queued'), ('running', 'Running'), ('ok', 'Verified'), ('failed', 'Failed')], default='', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='databasebackup',
+            name='backup_file',
+            field=models.CharField(blank=True, help_text='Path in BACKUP_STORAGE', max_length=500),
+        ),
+        migrations.RunPython(scope_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0 on 2026-10-19 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0029_database_backup_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(default='paystack', max_length=20)),
+                ('key', models.CharField(help_text='Event type and provider transaction id', max_length=150)),
+                ('handler', models.CharField(max_length=30)),
+                ('event', models.CharField(max_length=60)),
+                ('reference', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('schema_name', models.CharField(help_text='Schema the webhook arrived on; the handler runs there', max_length=63)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('received', 'Received'), ('done', 'Processed'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='received', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('detail', models.CharField(blank=True, default='', max_length=255)),
+                ('matched', models.BooleanField(blank=True, help_text='Local payment record found by reconciliation', null=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-received_at'],
+                'indexes': [models.Index(fields=['status', 'received_at'], name='webhook_status_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='webhookevent',
+            constraint=models.UniqueConstraint(fields=('provider', 'key'), name='webhook_event_unique'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0030_webhook_event'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='webhookevent',
+            name='webhook_event_unique',
+        ),
+        migrations.AddConstraint(
+            model_name='webhookevent',
+            constraint=models.UniqueConstraint(fields=('provider', 'handler', 'key'), name='webhook_event_unique'),
+        ),
+    ]
@@ -540,3 +540,89 @@ from .subscription_models import (
 from .health_models import (
     SystemHealthMetric, SupportTicket, TicketComment, DatabaseBackup
 )
+
+
+class RateLimitBucket(models.Model):
+    """GCRA state of one rate-limit key when Redis is not configured (school_system.ratelimit)."""
+    key = models.CharField(max_length=255, primary_key=True)
+    tat = models.FloatField(help_text="Theoretical arrival time, epoch seconds")
+
+    def __str__(self):
+        return self.key
+
+
+class ScheduledJobRun(models.Model):
+    """One run of a scheduled job in one school schema (tenants.scheduler).
+
+    ``until`` of the latest successful run is the job's watermark in that schema.
+    """
+    STATUS_CHOICES = [
+        ('ok', 'OK'),
+        ('failed', 'Failed'),
+    ]
+
+    job = models.CharField(max_length=60)
+    schema_name = models.CharField(max_length=63)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    since = models.DateTimeField(null=True, blank=True, help_text="Watermark the run started from")
+    until = models.DateTimeField(help_text="End of the window the run covered")
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    items = models.PositiveIntegerField(null=True, blank=True, help_text="What the job reported handling")
+    detail = models.TextField(blank=True, default='')
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['job', 'schema_name', '-until'], name='jobrun_watermark_idx'),
+            models.Index(fields=['-started_at'], name='jobrun_started_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.job} in {self.schema_name} ({self.status})"
+
+    @property
+    def duration(self):
+        return (self.finished_at - self.started_at).total_seconds()
+
+
+class WebhookEvent(models.Model):
+    """A payment provider webhook, stored before it is processed (tenants.webhooks).
+
+    ``(provider, handler, key)`` is unique, so a redelivered event is recorded
+    once per endpoint and its handler commits together with ``status='done'``.
+    """
+    STATUS_CHOICES = [
+        ('received', 'Received'),
+        ('done', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+
+    provider = models.CharField(max_length=20, default='paystack')
+    key = models.CharField(max_length=150, help_text="Event type and provider transaction id")
+    handler = models.CharField(max_length=30)
+    event = models.CharField(max_length=60)
+    reference = models.CharField(max_length=100, blank=True, db_index=True)
+    schema_name = models.CharField(max_length=63, help_text="Schema the webhook arrived on; the handler runs there")
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='received')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    detail = models.CharField(max_length=255, blank=True, default='')
+    matched = models.BooleanField(null=True, blank=True, help_text="Local payment record found by reconciliation")
+    received_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-received_at']
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'handler', 'key'], name='webhook_event_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'received_at'], name='webhook_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} {self.event} {self.reference or self.key} ({self.status})"
@@ -0,0 +1,316 @@
+"""
+Cross-tenant scheduler for time-based jobs.
+
+Schedule alerts, fee reminders and homework deadline reminders only ran
+when something outside the app called them — a cron entry per command and
+per schema, or a button in the UI — and each checked ``exists()`` row by
+row before sending, so a run that overlapped another could still send twice.
+
+  * **Jobs** are declared in ``JOBS`` with a five-field cron expression
+    (minute, hour, day of month, month, day of week; ``*``, ``*/n``,
+    ``a-b`` and ``a,b`` as usual, Sunday is 0 or 7).
+  * **Tenants**: each due job runs in every active school schema, at most
+    ``SCHEDULER_CONCURRENCY`` schemas at a time.  Jobs declared with
+    ``per_school=False`` (backups, rotation) run once, in the public schema.
+  * **Watermarks**: every run is recorded in ``ScheduledJobRun`` (public
+    schema) with the end of the window it covered.  A windowed job is called
+    as ``fn(since, until)``, where ``since`` is the end of the last
+    successful run in that schema (None the first time), so it only
+    looks at what happened since.  A failed run leaves the watermark where
+    it was and the next run covers both windows.
+  * **Idempotency**: ``claim(keys, run)`` inserts ``DeliveryClaim`` rows
+    with ``bulk_create(ignore_conflicts=True)`` against a unique key and
+    returns the keys this run won, so two runs — or a retry — never send
+    the same reminder twice.
+  * **History** is listed in the landlord panel and pruned after
+    ``SCHEDULER_HISTORY_DAYS``.
+
+Usage::
+
+    python manage.py run_scheduler            # daemon: ticks every minute
+    python manage.py run_scheduler --once     # one tick (e.g. from an external cron)
+    python manage.py run_scheduler --job fee_reminders --schema=<school>
+
+    from tenants import scheduler
+
+    won = scheduler.claim([f'fee:{fee.pk}:{fee.fee_structure.due_date}' for fee in fees], run)
+
+Settings:
+  SCHEDULER_CONCURRENCY    Schemas a job runs in at once (default 4)
+  SCHEDULER_HISTORY_DAYS   Days of run history kept (default 30)
+  SCHEDULER_CLAIM_DAYS     Days idempotency claims are kept (default 90)
+"""
+import io
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+# ── Cron expressions ───────────────────────────────────────────
+
+class Cron:
+    """A five-field cron expression, matched against local time."""
+
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f'Cron expression needs 5 fields: {expr!r}')
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, dows = (
+            self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, self.RANGES)
+        )
+        self.dows = {d % 7 for d in dows}
+        # As in cron: when both day fields are restricted, either may match.
+        self.any_day = fields[2] == '*'
+        self.any_dow = fields[4] == '*'
+
+    @staticmethod
+    def _parse(field, lo, hi):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step = part.split('/')
+                step = int(step)
+            if part == '*':
+                start, end = lo, hi
+            elif '-' in part:
+                start, end = map(int, part.split('-'))
+            else:
+                start = end = int(part)
+            if not (lo <= start <= end <= hi) or step < 1:
+                raise ValueError(f'Cron field out of range: {field!r}')
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt):
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.dows
+        if self.any_day or self.any_dow:
+            return dom and dow
+        return dom or dow
+
+    def matches(self, dt):
+        return (dt.minute in self.minutes and dt.hour in self.hours
+                and dt.month in self.months and self._day_matches(dt))
+
+    def next_after(self, dt):
+        """The first matching minute after ``dt`` (aware datetimes stay aware)."""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(5000):  # a handful of jumps per field; bounded for impossible dates
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f'Cron expression never matches: {self.expr!r}')
+
+    def __repr__(self):
+        return f'Cron({self.expr!r})'
+
+
+# ── Jobs ───────────────────────────────────────────────────────
+
+class Job:
+    """A dotted callable run in every school schema on a cron schedule.
+
+    Windowed jobs are called as ``fn(since, until)``; others — including
+    management commands (``command=True``) — with no arguments.  The return
+    value (a count) is kept on the run.  ``per_school=False`` jobs run once,
+    in the public schema.
+    """
+
+    def __init__(self, name, cron, target, windowed=False, command=False, per_school=True, description=''):
+        self.name = name
+        self.cron = Cron(cron)
+        self.target = target
+        self.windowed = windowed
+        self.command = command
+        self.per_school = per_school
+        self.description = description
+
+    def __call__(self, since, until):
+        if self.command:
+            from django.core.management import call_command
+            out = io.StringIO()
+            call_command(self.target, stdout=out)
+            return out.getvalue().strip()[-255:] or None
+        fn = import_string(self.target)
+        return fn(since, until) if self.windowed else fn()
+
+    def __repr__(self):
+        return f'Job({self.name!r}, {self.cron.expr!r})'
+
+
+JOBS = [
+    Job('schedule_alerts', '*/5 * * * *', 'teachers.schedule_alerts.send_due', windowed=True,
+        description='45- and 10-minute class reminders to teachers'),
+    Job('homework_deadline_reminders', '0 7 * * *', 'homework.reminders.send_due', windowed=True,
+        description='Active reminder settings against upcoming homework'),
+    Job('fee_reminders', '0 8 * * *', 'finance.reminders.send_due', windowed=True,
+        description='Reminders for fees that fell due'),
+    Job('flush_live_state', '*/5 * * * *', 'flush_live_state', command=True,
+        description='Queued live-session answers to the database'),
+    Job('archive_notifications', '15 2 * * *', 'archive_notifications', command=True,
+        description='Old notifications to the archive'),
+    Job('rebuild_analytics_cubes', '45 2 * * *', 'rebuild_analytics_cubes', command=True,
+        description='Nightly analytics cube rebuild'),
+    Job('prune_claims', '30 3 * * *', 'tenants.scheduler.prune_claims',
+        description='Expired idempotency claims'),
+    Job('run_backups', '* * * * *', 'tenants.backups.run_pending', per_school=False,
+        description='Queued database backups and verifications'),
+    Job('nightly_backup', '0 1 * * *', 'tenants.backups.nightly', per_school=False,
+        description='Whole-database backup, when BACKUP_NIGHTLY is on'),
+    Job('rotate_backups', '30 4 * * *', 'tenants.backups.rotate', per_school=False,
+        description='Expired backups and their files'),
+    Job('process_webhooks', '* * * * *', 'tenants.webhooks.process_due', per_school=False,
+        description='Payment webhooks not yet processed, and failed ones due a retry'),
+    Job('reconcile_webhooks', '0 5 * * *', 'tenants.webhooks.reconcile', per_school=False,
+        description='Processed payment webhooks against local payment records'),
+    Job('prune_webhooks', '50 3 * * *', 'tenants.webhooks.prune', per_school=False,
+        description='Old processed webhook events'),
+    Job('flush_api_usage', '* * * * *', 'individual_users.metering.flush', per_school=False,
+        description='Buffered API-key usage to the daily rollups'),
+]
+
+
+def jobs():
+    return {job.name: job for job in JOBS}
+
+
+# ── Claims ─────────────────────────────────────────────────────
+
+def new_run():
+    """A token identifying one run's claims."""
+    return uuid.uuid4().hex
+
+
+def claim(keys, run):
+    """Claim ``keys`` for ``run`` in the current schema; returns the set this run won."""
+    from announcements.models import DeliveryClaim
+
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return set()
+    DeliveryClaim.objects.bulk_create(
+        [DeliveryClaim(key=key, run=run) for key in keys], ignore_conflicts=True, batch_size=1000,
+    )
+    return set(DeliveryClaim.objects.filter(run=run, key__in=keys).values_list('key', flat=True))
+
+
+def prune_claims():
+    """Delete claims older than ``SCHEDULER_CLAIM_DAYS``; keys must not be reused within it."""
+    from announcements.models import DeliveryClaim
+
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'SCHEDULER_CLAIM_DAYS', 90))
+    deleted, _ = DeliveryClaim.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+# ── Runs ───────────────────────────────────────────────────────
+
+def active_schemas():
+    from django_tenants.utils import get_public_schema_name
+    from tenants.models import School
+
+    return list(
+        School.objects.filter(is_active=True).exclude(schema_name=get_public_schema_name())
+        .order_by('schema_name').values_list('schema_name', flat=True)
+    )
+
+
+def watermarks(job_name):
+    """``{schema: until}`` of the last successful run of ``job_name`` per schema."""
+    from tenants.models import ScheduledJobRun
+
+    return dict(
+        ScheduledJobRun.objects.filter(job=job_name, status='ok')
+        .order_by('schema_name', '-until').distinct('schema_name')
+        .values_list('schema_name', 'until')
+    )
+
+
+def due(job, now, last_tick):
+    """Whether ``job`` has a scheduled minute in ``(last_tick, now]``."""
+    if last_tick is None:
+        return job.cron.matches(timezone.localtime(now))
+    return job.cron.next_after(timezone.localtime(last_tick)) <= timezone.localtime(now)
+
+
+def _run_in(job, schema, since, until):
+    from django_tenants.utils import schema_context
+    from tenants.models import ScheduledJobRun
+
+    started = timezone.now()
+    status, result, error = 'ok', None, ''
+    try:
+        with schema_context(schema):
+            result = job(since, until)
+    except Exception as exc:
+        logger.exception('Scheduled job %s failed in %s', job.name, schema)
+        status, error = 'failed', f'{type(exc).__name__}: {exc}'[:2000]
+    finally:
+        connections.close_all()  # this worker thread's connections
+    return ScheduledJobRun(
+        job=job.name, schema_name=schema, status=status, since=since, until=until,
+        started_at=started, finished_at=timezone.now(),
+        items=result if isinstance(result, int) else None,
+        detail=error or (result if isinstance(result, str) else ''),
+    )
+
+
+def run_job(job, now=None, schemas=None):
+    """Run ``job`` in ``schemas`` (default: every active school).  Returns the recorded runs."""
+    from django_tenants.utils import get_public_schema_name
+    from tenants.models import ScheduledJobRun
+
+    now = now or timezone.now()
+    if not job.per_school:
+        schemas = [get_public_schema_name()]
+    elif schemas is None:
+        schemas = active_schemas()
+    else:
+        schemas = list(schemas)
+    marks = watermarks(job.name)
+    workers = max(1, min(getattr(settings, 'SCHEDULER_CONCURRENCY', 4), len(schemas) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'job-{job.name}') as pool:
+        runs = list(pool.map(lambda schema: _run_in(job, schema, marks.get(schema), now), schemas))
+    ScheduledJobRun.objects.bulk_create(runs)
+    failed = sum(run.status == 'failed' for run in runs)
+    logger.info('Scheduled job %s ran in %d schema(s), %d failed', job.name, len(runs), failed)
+    return runs
+
+
+def tick(now=None):
+    """Run every job that came due since its previous run.  Returns ``{job: runs}``."""
+    from django.db.models import Max
+    from tenants.models import ScheduledJobRun
+
+    now = (now or timezone.now()).replace(second=0, microsecond=0)
+    last = dict(
+        ScheduledJobRun.objects.values('job').annotate(last=Max('until')).values_list('job', 'last')
+    )
+    return {job.name: run_job(job, now) for job in JOBS if due(job, now, last.get(job.name))}
+
+
+def prune_history():
+    from tenants.models import ScheduledJobRun
+
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'SCHEDULER_HISTORY_DAYS', 30))
+    deleted, _ = ScheduledJobRun.objects.filter(started_at__lt=cutoff).delete()
+    return deleted
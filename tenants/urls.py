@@ -57,6 +57,9 @@ urlpatterns = [
     path('support/<int:ticket_id>/', views.support_ticket_detail, name='support_ticket_detail'),
     path('support/create/', views.create_support_ticket, name='create_support_ticket'),
     path('backups/', views.database_backups, name='database_backups'),
+    path('backups/status/', views.database_backup_status, name='database_backup_status'),
+    path('backups/<int:pk>/download/', views.database_backup_download, name='database_backup_download'),
+    path('scheduled-jobs/', views.scheduled_jobs, name='scheduled_jobs'),
 
     # Public application status check
     path('status/', views.application_status, name='application_status'),
@@ -19,6 +19,7 @@ from django.http import HttpResponse, JsonResponse, Http404
 from django.views.decorators.csrf import csrf_exempt
 from academics.models import SchoolInfo, AcademicYear, Class, Subject, ClassSubject
 from school_system.ratelimit import ratelimit
+from accounts.page_cache import anonymous_page_cache
 from django.utils import timezone
 from datetime import timedelta
 from .email_notifications import send_submission_confirmation, send_approval_notification
@@ -1470,38 +1471,19 @@ def cancel_addon(request, addon_id):
 @csrf_exempt
 def paystack_school_webhook(request):
     """Paystack server-to-server webhook for school add-on payments.
-    Verifies HMAC-SHA512 signature. Handles charge.success events."""
-    if request.method != 'POST':
-        return JsonResponse({'error': 'POST only'}, status=405)
-
-    import json
-    import hmac
-    import hashlib
-
-    secret = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
-    if not secret:
-        return JsonResponse({'error': 'not configured'}, status=503)
-
-    sig = request.headers.get('X-Paystack-Signature', '')
-    expected = hmac.new(secret.encode(), request.body, hashlib.sha512).hexdigest()
-    if not hmac.compare_digest(sig, expected):
-        return JsonResponse({'error': 'bad signature'}, status=403)
-
-    try:
-        payload = json.loads(request.body)
-    except (json.JSONDecodeError, ValueError):
-        return JsonResponse({'error': 'bad json'}, status=400)
+    Verified and stored by tenants.webhooks; processed by ``handle_school_addon_event``."""
+    from . import webhooks
+    return webhooks.receive(request, 'school_addon')
 
-    event = payload.get('event')
-    data = payload.get('data', {})
 
-    if event == 'charge.success':
-        reference = data.get('reference', '')
-        # School add-on references start with "SA-"
-        if reference.startswith('SA-'):
-            _handle_school_addon_payment(reference, data)
+def handle_school_addon_event(data):
+    """Webhook handler (tenants.webhooks): school add-on references start with "SA-"."""
+    from .webhooks import Ignore
 
-    return JsonResponse({'ok': True})
+    reference = data.get('reference', '')
+    if not reference.startswith('SA-'):
+        raise Ignore('not a school add-on payment')
+    _handle_school_addon_payment(reference, data)
 
 
 def _handle_school_addon_payment(reference, data):
@@ -1736,121 +1718,158 @@ def create_support_ticket(request):
 @login_required
 @user_passes_test(lambda u: u.is_staff)
 def database_backups(request):
-    """Manage database backups"""
+    """Manage database backups.
+
+    Backups are queued here and dumped by the scheduler process
+    (tenants.backups); the page polls ``database_backup_status`` for progress.
+    """
+    from . import backups as backup_jobs
     from .models import DatabaseBackup, School
     
     if request.method == 'POST':
         action = request.POST.get('action')
         
         if action == 'trigger_backup':
-            import subprocess, os, tempfile, shutil
-            from django.conf import settings as _settings
-            from django.utils import timezone as _tz
-
-            school_id = request.POST.get('school_id')
+            target = request.POST.get('target', '')
             backup_type = request.POST.get('backup_type', 'full')
-
+            if backup_type != 'schema_only':
+                backup_type = 'full'  # pg_dump has no incremental mode
             school = None
-            schema_name = 'public'
-            if school_id:
-                school = School.objects.get(id=school_id)
-                schema_name = school.schema_name
-
-            backup = DatabaseBackup.objects.create(
-                school=school,
-                backup_type=backup_type,
-                status='in_progress',
-            )
+            if target.startswith('school:'):
+                school = School.objects.filter(pk=target.split(':', 1)[1]).first()
+                if school is None:
+                    messages.error(request, 'School not found.')
+                    return redirect('tenants:database_backups')
+                scope = 'schema'
+            elif target in ('database', 'public'):
+                scope = target
+            else:
+                messages.error(request, 'Choose what to back up.')
+                return redirect('tenants:database_backups')
+            backup_jobs.queue(scope, school=school, backup_type=backup_type, user=request.user)
+            messages.success(request, 'Backup queued. It starts within a minute; progress is shown below.')
+            return redirect('tenants:database_backups')
 
+        if action == 'verify_backup':
+            backup = get_object_or_404(DatabaseBackup, pk=request.POST.get('backup_id'))
             try:
-                # Build output path inside MEDIA_ROOT/backups/
-                backup_dir = os.path.join(_settings.MEDIA_ROOT, 'backups')
-                os.makedirs(backup_dir, exist_ok=True)
-                timestamp = _tz.now().strftime('%Y%m%d_%H%M%S')
-                filename = f'backup_{schema_name}_{timestamp}.dump'
-                output_path = os.path.join(backup_dir, filename)
-
-                # Parse DATABASE_URL or fall back to individual settings
-                db = _settings.DATABASES['default']
-                env = os.environ.copy()
-                env['PGPASSWORD'] = db.get('PASSWORD', '')
-
-                cmd = [
-                    'pg_dump',
-                    '--format=custom',
-                    f'--host={db.get("HOST", "localhost")}',
-                    f'--port={db.get("PORT", 5432)}',
-                    f'--username={db.get("USER", "postgres")}',
-                    f'--schema={schema_name}',
-                    '--no-password',
-                    f'--file={output_path}',
-                    db.get('NAME', ''),
-                ]
-
-                result = subprocess.run(
-                    cmd, env=env, capture_output=True, text=True, timeout=300
-                )
-
-                if result.returncode == 0:
-                    file_size_mb = round(os.path.getsize(output_path) / (1024 * 1024), 3)
-                    backup.status = 'completed'
-                    backup.file_path = f'backups/{filename}'
-                    backup.file_size_mb = file_size_mb
-                    backup.completed_at = _tz.now()
-                    backup.save()
-                    messages.success(request, f'Backup completed: {filename} ({file_size_mb} MB)')
-                else:
-                    backup.status = 'failed'
-                    backup.notes = result.stderr[:500]
-                    backup.save()
-                    messages.error(request, f'pg_dump failed: {result.stderr[:200]}')
-
-            except FileNotFoundError:
-                # pg_dump not available (e.g. serverless/Vercel)
-                backup.status = 'failed'
-                backup.notes = 'pg_dump binary not found on this host. Use a database-level backup tool instead.'
-                backup.save()
-                messages.warning(request, 'pg_dump is not available on this hosting environment. Use your database provider\'s backup tool (e.g. Neon Console).')
-            except subprocess.TimeoutExpired:
-                backup.status = 'failed'
-                backup.notes = 'pg_dump timed out after 300 seconds.'
-                backup.save()
-                messages.error(request, 'Backup timed out. Try a smaller scope backup.')
-            except Exception as exc:
-                backup.status = 'failed'
-                backup.notes = str(exc)[:500]
-                backup.save()
-                messages.error(request, f'Backup error: {exc}')
-
+                backup_jobs.queue_verify(backup)
+                messages.success(request, 'Verification queued: the backup will be test-restored into a scratch schema.')
+            except backup_jobs.BackupError as exc:
+                messages.error(request, str(exc))
             return redirect('tenants:database_backups')
     
     # Get recent backups
-    backups = DatabaseBackup.objects.select_related('school').order_by('-started_at')[:50]
+    backups = DatabaseBackup.objects.select_related('school', 'requested_by').order_by('-started_at')[:50]
     
     # Get schools for backup selection
     schools = School.objects.filter(is_active=True).order_by('name')
     
     # Stats
-    total_backups = DatabaseBackup.objects.count()
-    completed_backups = DatabaseBackup.objects.filter(status='completed').count()
-    failed_backups = DatabaseBackup.objects.filter(status='failed').count()
-    total_size_gb = DatabaseBackup.objects.filter(
-        status='completed'
-    ).aggregate(total=Sum('file_size_mb'))['total'] or 0
-    total_size_gb = total_size_gb / 1024
+    totals = DatabaseBackup.objects.aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=models.Q(status='completed')),
+        failed=Count('id', filter=models.Q(status='failed')),
+        size=Sum('file_size_mb', filter=models.Q(status='completed')),
+    )
     
     context = {
         'backups': backups,
         'schools': schools,
-        'total_backups': total_backups,
-        'completed_backups': completed_backups,
-        'failed_backups': failed_backups,
-        'total_size_gb': round(total_size_gb, 2),
+        'total_backups': totals['total'],
+        'completed_backups': totals['completed'],
+        'failed_backups': totals['failed'],
+        'total_size_gb': round((totals['size'] or 0) / 1024, 2),
     }
     
     return render(request, 'tenants/database_backups.html', context)
 
 
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+def database_backup_status(request):
+    """Progress of the given backups, polled by the backups page."""
+    from .models import DatabaseBackup
+
+    ids = [int(i) for i in request.GET.get('ids', '').split(',') if i.isdigit()][:50]
+    rows = DatabaseBackup.objects.filter(pk__in=ids).values(
+        'id', 'status', 'progress', 'file_size_mb', 'verify_status', 'error_message',
+    )
+    return JsonResponse({'backups': list(rows)})
+
+
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+def database_backup_download(request, pk):
+    """Stream a completed backup from backup storage (never from MEDIA_URL)."""
+    import os
+    from django.http import FileResponse
+    from . import backups as backup_jobs
+    from .models import DatabaseBackup
+
+    backup = get_object_or_404(DatabaseBackup, pk=pk, status='completed')
+    if not backup.backup_file:
+        raise Http404
+    try:
+        handle = backup_jobs.storage().open(backup.backup_file, 'rb')
+    except (FileNotFoundError, OSError):
+        raise Http404('Backup file is missing from storage')
+    logger.info('Backup #%s downloaded by %s', backup.pk, request.user)
+    return FileResponse(handle, as_attachment=True, filename=os.path.basename(backup.backup_file))
+
+
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+def scheduled_jobs(request):
+    """Scheduled job definitions and their run history across schools (tenants.scheduler)."""
+    from django.db.models import Max, Q
+    from .models import ScheduledJobRun
+    from . import scheduler
+
+    now = timezone.now()
+    day_ago = now - timedelta(days=1)
+    stats = {
+        row['job']: row for row in ScheduledJobRun.objects.values('job').annotate(
+            last_run=Max('started_at'),
+            runs_24h=Count('pk', filter=Q(started_at__gte=day_ago)),
+            failed_24h=Count('pk', filter=Q(started_at__gte=day_ago, status='failed')),
+        )
+    }
+    local_now = timezone.localtime(now)
+    jobs = [
+        {
+            'name': job.name,
+            'cron': job.cron.expr,
+            'description': job.description,
+            'next_run': job.cron.next_after(local_now),
+            **{k: stats.get(job.name, {}).get(k) for k in ('last_run', 'runs_24h', 'failed_24h')},
+        }
+        for job in scheduler.JOBS
+    ]
+
+    runs = ScheduledJobRun.objects.all()
+    job_filter = request.GET.get('job', '')
+    status_filter = request.GET.get('status', '')
+    schema_filter = request.GET.get('schema', '').strip()
+    if job_filter:
+        runs = runs.filter(job=job_filter)
+    if status_filter:
+        runs = runs.filter(status=status_filter)
+    if schema_filter:
+        runs = runs.filter(schema_name=schema_filter)
+
+    context = {
+        'jobs': jobs,
+        'runs': runs[:200],
+        'job_filter': job_filter,
+        'status_filter': status_filter,
+        'schema_filter': schema_filter,
+        'failed_24h': sum(j['failed_24h'] or 0 for j in jobs),
+        'runs_24h': sum(j['runs_24h'] or 0 for j in jobs),
+    }
+    return render(request, 'tenants/scheduled_jobs.html', context)
+
+
 def application_status(request):
     """Public page for applicants to check their school application approval status."""
     schema = request.GET.get('school', '').strip().lower()
@@ -1868,6 +1887,7 @@ def application_status(request):
     })
 
 
+@anonymous_page_cache()
 def pricing_page(request):
     """Public pricing page showing available subscription plans."""
     from .models import SubscriptionPlan
@@ -2315,42 +2335,31 @@ def paystack_subscription_webhook(request):
 
     This is the safety net for cases where the browser redirect callback
     (/subscription/upgrade/callback/) is missed (network drop, closed tab).
+    The event is stored by tenants.webhooks and processed by
+    ``handle_subscription_event``.
     """
-    import hmac as _hmac
-    import hashlib
-    import json as _json
-    from calendar import monthrange as _mr
-    from django.utils import timezone as _tz
+    from . import webhooks
+    return webhooks.receive(request, 'subscription')
 
-    if request.method != 'POST':
-        return HttpResponse(status=405)
 
-    secret_key = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
-    signature  = request.META.get('HTTP_X_PAYSTACK_SIGNATURE', '')
-    body       = request.body
+def subscription_references(references):
+    """Webhook reconciler: which of ``references`` produced a paid invoice."""
+    from .models import Invoice
+    return Invoice.objects.filter(payment_reference__in=references).values_list('payment_reference', flat=True)
 
-    # Verify HMAC-SHA512 signature to confirm the request is from Paystack
-    if secret_key:
-        expected = _hmac.new(secret_key.encode(), body, hashlib.sha512).hexdigest()
-        if not _hmac.compare_digest(expected, signature):
-            logger.warning("Paystack subscription webhook: HMAC mismatch — rejected.")
-            return HttpResponse(status=400)
 
-    try:
-        payload = _json.loads(body)
-    except Exception:
-        return HttpResponse(status=400)
-
-    if payload.get('event') != 'charge.success':
-        return HttpResponse(status=200)
+def handle_subscription_event(trx):
+    """Webhook handler (tenants.webhooks): activate the plan paid for by a PLN- charge."""
+    from calendar import monthrange as _mr
+    from django.utils import timezone as _tz
+    from .webhooks import Ignore
 
-    trx       = payload['data']
     reference = trx.get('reference', '')
-    meta      = trx.get('metadata', {})
+    meta      = trx.get('metadata') or {}
 
     # Only handle plan-upgrade payments (fee payments start with SPS-)
     if not reference.startswith('PLN-'):
-        return HttpResponse(status=200)
+        raise Ignore('not a plan payment')
 
     plan_id      = meta.get('plan_id')
     billing_cycle = meta.get('billing_cycle', 'monthly')
@@ -2358,7 +2367,7 @@ def paystack_subscription_webhook(request):
 
     if not plan_id or not school_id:
         logger.error(f"Paystack subscription webhook: missing plan_id/school_id in metadata (ref={reference})")
-        return HttpResponse(status=200)
+        return 'missing plan_id/school_id'
 
     from .models import SchoolSubscription, SubscriptionPlan, Invoice
 
@@ -2367,7 +2376,7 @@ def paystack_subscription_webhook(request):
 
     if not plan or not school:
         logger.error(f"Paystack subscription webhook: plan {plan_id} or school {school_id} not found (ref={reference})")
-        return HttpResponse(status=200)
+        return 'plan or school not found'
 
     try:
         with transaction.atomic():
@@ -2378,7 +2387,7 @@ def paystack_subscription_webhook(request):
         ).filter(school=school).first()
     if not subscription:
         logger.error(f"Paystack subscription webhook: no subscription for school {school_id} (ref={reference})")
-        return HttpResponse(status=200)
+        return 'no subscription'
 
     def _add_months(dt, months):
         month = dt.month - 1 + months
@@ -2444,7 +2453,7 @@ def paystack_subscription_webhook(request):
         f"Paystack subscription webhook: activated {plan.name} ({billing_cycle}) "
         f"for school '{school.name}' (ref={reference})"
     )
-    return HttpResponse(status=200)
+    return f'{plan.name} ({billing_cycle}) activated'
 
 
 # ── Individual Addon Pricing Management ──────────────────────────────────────
@@ -2876,8 +2885,6 @@ def promo_campaign_edit(request, pk):
 def promo_campaign_send(request, pk):
     """Send a promo campaign to its target audience."""
     from .models import PromoCampaign
-    from django.core.mail import send_mail
-    from django.template.loader import render_to_string
 
     campaign = get_object_or_404(PromoCampaign, pk=pk)
 
@@ -2894,30 +2901,20 @@ def promo_campaign_send(request, pk):
             'recipient_count': len(recipients),
         })
 
-    # Actually send
-    recipients = _get_campaign_recipients(campaign.audience)
-    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@schoolpadi.xyz')
-    sent = 0
-    failed = 0
+    # Actually send — one compiled template, reused SMTP connections
+    from communication.bulk_mail import BulkMailer, Recipient
 
-    for recip in recipients:
-        try:
-            html_body = render_to_string('tenants/emails/promo_email.html', {
-                'subject': campaign.subject,
-                'body_html': campaign.body_html,
-                'recipient_name': recip['name'],
-            })
-            send_mail(
-                subject=campaign.subject,
-                message='',
-                from_email=from_email,
-                recipient_list=[recip['email']],
-                html_message=html_body,
-                fail_silently=True,
-            )
-            sent += 1
-        except Exception:
-            failed += 1
+    recipients = _get_campaign_recipients(campaign.audience)
+    mailer = BulkMailer(
+        subject='{{ subject }}',
+        html_template_name='tenants/emails/promo_email.html',
+        from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@schoolpadi.xyz'),
+    )
+    result = mailer.send(
+        [Recipient(r['email'], {'recipient_name': r['name']}) for r in recipients],
+        shared_context={'subject': campaign.subject, 'body_html': campaign.body_html},
+    )
+    sent, failed = result.sent, result.failed
 
     campaign.status = 'sent'
     campaign.sent_count = sent
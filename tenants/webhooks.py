@@ -0,0 +1,263 @@
+"""
+Payment webhook ingestion: an event ledger, then exactly-once processing.
+
+The Paystack endpoints verified the signature and then did the lookups and
+activation work inside the request.  A retry could apply a credit pack or
+an add-on twice, and a slow database made Paystack time out and retry again.
+
+  * **Ledger**: ``receive(request, handler)`` verifies the signature and
+    stores the event as a ``WebhookEvent`` (public schema), unique per
+    provider, handler and event (``charge.success:<transaction id>``), then
+    answers 200 at once — a charge sent to two endpoints is stored for
+    each.  A redelivery hits the unique constraint and is only
+    acknowledged.
+  * **Processing**: the event is handled on a thread once the insert has
+    committed, in the schema the webhook arrived on.  ``process(event_id)``
+    locks the event row (``select_for_update(skip_locked=True)``) and runs
+    the handler and the status change in one transaction: either both
+    commit or neither does, so an event is applied exactly once however
+    often it is retried.
+  * **Retries**: the scheduler's ``process_webhooks`` job picks up events
+    whose thread never ran and failed events, with exponential backoff, up
+    to ``WEBHOOK_MAX_ATTEMPTS``.  ``manage.py replay_webhooks`` (and the
+    admin action) re-runs failed or chosen events on demand.
+  * **Reconciliation**: ``reconcile()`` checks processed events against the
+    local payment records — one query per handler and schema for all their
+    references — and flags events with no matching record.
+
+Handlers are registered by name in ``HANDLERS`` and called as
+``fn(data)`` with the event's ``data`` object.  A handler raises
+``Ignore`` for a charge that is not its business (a reference prefix it
+does not handle) and any other exception to have the event retried.
+``RECONCILERS`` map a handler to ``fn(references)`` returning the
+references that have a local record.
+
+Usage::
+
+    @csrf_exempt
+    def paystack_teacher_webhook(request):
+        return webhooks.receive(request, 'teachers')
+
+Settings:
+  WEBHOOK_MAX_ATTEMPTS      Automatic attempts before an event waits for a replay (default 6)
+  WEBHOOK_RETENTION_DAYS    Days processed events are kept (default 180)
+"""
+import hashlib
+import hmac
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {
+    'finance': 'finance.views.handle_paystack_event',
+    'individual': 'individual_users.views.handle_paystack_event',
+    'school_addon': 'tenants.views.handle_school_addon_event',
+    'subscription': 'tenants.views.handle_subscription_event',
+    'teachers': 'teachers.views.handle_paystack_event',
+}
+
+RECONCILERS = {
+    'finance': 'finance.views.paystack_references',
+    'individual': 'individual_users.views.paystack_references',
+    'subscription': 'tenants.views.subscription_references',
+    'teachers': 'teachers.views.paystack_references',
+}
+
+# Only payment confirmations are stored; anything else is acknowledged and dropped.
+EVENTS = ('charge.success',)
+# Received events whose worker thread has not picked them up after this are swept.
+GRACE = timedelta(minutes=1)
+
+
+class Ignore(Exception):
+    """Raised by a handler for an event it does not handle; the event is not retried or reconciled."""
+
+
+# ── Ingestion ──────────────────────────────────────────────────
+
+def signature_ok(request):
+    secret = getattr(settings, 'PAYSTACK_SECRET_KEY', '')
+    expected = hmac.new(secret.encode(), request.body, hashlib.sha512).hexdigest()
+    return hmac.compare_digest(expected, request.headers.get('X-Paystack-Signature', ''))
+
+
+def event_key(payload, body):
+    """Paystack's identity for an event: its type and transaction id (or reference)."""
+    data = payload.get('data') or {}
+    ident = data.get('id') or data.get('reference') or hashlib.sha256(body).hexdigest()
+    return f"{payload.get('event', '')}:{ident}"[:150]
+
+
+def receive(request, handler, provider='paystack'):
+    """Verify, store and acknowledge a webhook; ``handler`` runs after the response."""
+    from tenants.models import WebhookEvent
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST only'}, status=405)
+    if not getattr(settings, 'PAYSTACK_SECRET_KEY', ''):
+        return JsonResponse({'error': 'not configured'}, status=503)
+    if not signature_ok(request):
+        logger.warning('Webhook %s: bad signature', handler)
+        return JsonResponse({'error': 'bad signature'}, status=403)
+    try:
+        payload = json.loads(request.body)
+    except (json.JSONDecodeError, ValueError):
+        return JsonResponse({'error': 'bad json'}, status=400)
+    if not isinstance(payload, dict) or payload.get('event') not in EVENTS:
+        return JsonResponse({'ok': True})
+
+    data = payload.get('data') or {}
+    key = event_key(payload, request.body)
+    WebhookEvent.objects.bulk_create([WebhookEvent(
+        provider=provider, key=key, handler=handler,
+        event=payload.get('event', ''), reference=str(data.get('reference', ''))[:100],
+        schema_name=getattr(connection, 'schema_name', '') or 'public', payload=payload,
+    )], ignore_conflicts=True)
+    # ignore_conflicts leaves pk unset either way; a redelivery finds the original row.
+    event = WebhookEvent.objects.filter(provider=provider, handler=handler, key=key).only('pk', 'status').first()
+    if event is not None and event.status == 'received':
+        dispatch(event.pk)
+    return JsonResponse({'ok': True})
+
+
+def dispatch(event_id):
+    """Process ``event_id`` on a daemon thread once the current transaction commits."""
+    def _worker():
+        try:
+            process(event_id)
+        except Exception:
+            logger.exception('Webhook event %s: processing crashed', event_id)
+        finally:
+            close_old_connections()
+
+    start = lambda: threading.Thread(target=_worker, daemon=True, name=f'webhook-{event_id}').start()
+    if connection.in_atomic_block:
+        transaction.on_commit(start)
+    else:
+        start()
+
+
+# ── Processing ─────────────────────────────────────────────────
+
+def process(event_id, replay=False):
+    """Run the handler for ``event_id`` unless it is done or being processed elsewhere.
+
+    Returns the event's new status, or None when it was skipped.
+    """
+    from django_tenants.utils import schema_context
+    from tenants.models import WebhookEvent
+
+    statuses = ['received', 'failed'] + (['done', 'ignored'] if replay else [])
+    with transaction.atomic():
+        event = (WebhookEvent.objects.select_for_update(skip_locked=True)
+                 .filter(pk=event_id, status__in=statuses).first())
+        if event is None:
+            return None
+        event.attempts += 1
+        try:
+            with schema_context(event.schema_name), transaction.atomic():
+                detail = import_string(HANDLERS[event.handler])((event.payload or {}).get('data') or {})
+            event.status, event.last_error = 'done', ''
+            event.detail = str(detail or '')[:255]
+            event.processed_at = timezone.now()
+        except Ignore as exc:
+            event.status, event.last_error, event.detail = 'ignored', '', str(exc)[:255]
+            event.processed_at = timezone.now()
+        except Exception as exc:
+            logger.warning('Webhook event %s (%s) failed', event.pk, event.reference, exc_info=True)
+            event.status, event.last_error = 'failed', f'{type(exc).__name__}: {exc}'[:2000]
+        event.save(update_fields=['status', 'attempts', 'last_error', 'detail', 'processed_at', 'updated_at'])
+    return event.status
+
+
+def retry_after(attempts):
+    """Backoff before automatic attempt ``attempts + 1``: 1, 2, 4 … minutes, at most 6 hours."""
+    return timedelta(minutes=min(2 ** max(attempts - 1, 0), 360))
+
+
+def process_due(now=None):
+    """Scheduled job: events no thread picked up, and failed events whose backoff is over."""
+    from django.db.models import Q
+    from tenants.models import WebhookEvent
+
+    now = now or timezone.now()
+    max_attempts = getattr(settings, 'WEBHOOK_MAX_ATTEMPTS', 6)
+    candidates = WebhookEvent.objects.filter(
+        Q(status='received', received_at__lt=now - GRACE)
+        | Q(status='failed', attempts__lt=max_attempts)
+    ).order_by('received_at').values_list('pk', 'status', 'attempts', 'updated_at')[:500]
+    handled = 0
+    for pk, status, attempts, updated_at in candidates:
+        if status == 'failed' and updated_at + retry_after(attempts) > now:
+            continue
+        handled += process(pk) == 'done'
+    return handled
+
+
+def replay(events, include_done=False):
+    """Re-run ``events`` (a queryset) now, whatever their attempts.  Returns ``{status: count}``.
+
+    Processed events are only re-run with ``include_done``; handlers skip
+    references they have already applied.
+    """
+    counts = defaultdict(int)
+    for pk in events.order_by('received_at').values_list('pk', flat=True):
+        counts[process(pk, replay=include_done) or 'skipped'] += 1
+    return dict(counts)
+
+
+# ── Reconciliation ─────────────────────────────────────────────
+
+def reconcile(since=None):
+    """Match processed events against local payment records, in bulk.
+
+    Sets ``matched`` on every processed event since ``since`` (default: the
+    last ``WEBHOOK_RETENTION_DAYS``) whose handler has a reconciler.
+    Returns the number of events with no local record.
+    """
+    from django_tenants.utils import schema_context
+    from tenants.models import WebhookEvent
+
+    since = since or timezone.now() - timedelta(days=getattr(settings, 'WEBHOOK_RETENTION_DAYS', 180))
+    groups = defaultdict(list)
+    for pk, handler, schema, reference in (
+        WebhookEvent.objects.filter(status='done', received_at__gte=since, handler__in=RECONCILERS)
+        .exclude(reference='').values_list('pk', 'handler', 'schema_name', 'reference')
+    ):
+        groups[handler, schema].append((pk, reference))
+
+    unmatched = 0
+    for (handler, schema), rows in groups.items():
+        try:
+            with schema_context(schema):
+                found = set(import_string(RECONCILERS[handler])({ref for _, ref in rows}))
+        except Exception:
+            logger.warning('Webhook reconciliation of %s in %s failed', handler, schema, exc_info=True)
+            continue
+        hit = [pk for pk, ref in rows if ref in found]
+        miss = [pk for pk, ref in rows if ref not in found]
+        WebhookEvent.objects.filter(pk__in=hit).update(matched=True)
+        WebhookEvent.objects.filter(pk__in=miss).update(matched=False)
+        unmatched += len(miss)
+    if unmatched:
+        logger.warning('Webhook reconciliation: %d processed event(s) have no local payment record', unmatched)
+    return unmatched
+
+
+def prune():
+    """Delete processed events older than ``WEBHOOK_RETENTION_DAYS``; failed ones are kept."""
+    from tenants.models import WebhookEvent
+
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'WEBHOOK_RETENTION_DAYS', 180))
+    deleted, _ = WebhookEvent.objects.filter(status__in=['done', 'ignored'], received_at__lt=cutoff).delete()
+    return deleted
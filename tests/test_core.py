@@ -1016,3 +1016,1345 @@ class SecurityIsolationTests(TenantTestCase):
         from django.conf import settings
         # Should be 30 days or less, not 365
         self.assertLessEqual(settings.SESSION_COOKIE_AGE, 30 * 24 * 60 * 60)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 7) PARENT NOTIFICATION DIGEST (unit, no tenant needed)
+# ═══════════════════════════════════════════════════════════════
+class ParentDigestTests(unittest.TestCase):
+    """Events raised inside parent_digest() are queued and flushed once."""
+
+    def _student(self, pk, name):
+        from types import SimpleNamespace
+        return SimpleNamespace(pk=pk, user=SimpleNamespace(get_full_name=lambda: name))
+
+    def test_events_flushed_once_at_scope_exit(self):
+        from unittest import mock
+        from announcements import digest
+
+        with mock.patch.object(digest, 'flush_parent_events') as flush:
+            with digest.parent_digest():
+                for i in range(30):
+                    digest.notify_parents(self._student(i % 3, 'Ama'), f'grade {i}')
+                with digest.parent_digest():  # nested scope shares the queue
+                    digest.notify_parents(self._student(1, 'Ama'), 'late')
+                flush.assert_not_called()
+        self.assertEqual(flush.call_count, 1)
+        self.assertEqual(len(flush.call_args[0][0]), 31)
+
+    def test_discarded_events_are_not_flushed(self):
+        from unittest import mock
+        from announcements import digest
+
+        with mock.patch.object(digest, 'flush_parent_events') as flush:
+            with digest.parent_digest():
+                digest.notify_parents(self._student(1, 'Kofi'), 'absent')
+                digest.discard_parent_events()
+        flush.assert_not_called()
+
+    def test_summary_truncated_to_message_field(self):
+        from announcements import digest
+
+        events = [digest._ParentEvent(1, 'Kofi Mensah', 'x' * 100) for _ in range(5)]
+        line = digest._summarise('Kofi Mensah', events)
+        self.assertTrue(line.startswith('5 updates for Kofi Mensah'))
+        self.assertLessEqual(len(line), digest.MESSAGE_MAX_LENGTH)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 8) BULK MAILER (unit, locmem email backend)
+# ═══════════════════════════════════════════════════════════════
+class BulkMailerTests(unittest.TestCase):
+    """One compiled template, chunked sends, per-recipient status."""
+
+    def setUp(self):
+        from django.core import mail
+        from django.test.utils import override_settings
+        self._override = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        )
+        self._override.enable()
+        mail.outbox = []
+
+    def tearDown(self):
+        self._override.disable()
+
+    def test_renders_per_recipient_and_dedupes(self):
+        from django.core import mail
+        from communication.bulk_mail import BulkMailer, Recipient
+
+        mailer = BulkMailer(
+            subject='Hello {{ name }}',
+            text_template='Dear {{ name }}, {{ note }} & more',
+            chunk_size=2, chunk_pause=0, connections=2,
+        )
+        recipients = [Recipient(f'p{i}@example.com', {'name': f'P{i}'}) for i in range(5)]
+        recipients.append(Recipient('P0@example.com', {'name': 'dup'}))
+        result = mailer.send(recipients, shared_context={'note': 'fees due'})
+
+        self.assertEqual(result.sent, 5)
+        self.assertEqual(result.failed, 0)
+        self.assertEqual(len(mail.outbox), 5)
+        bodies = {m.to[0]: m.body for m in mail.outbox}
+        # Plain-text body is not HTML-escaped
+        self.assertEqual(bodies['p3@example.com'], 'Dear P3, fees due & more')
+        self.assertEqual({m.subject for m in mail.outbox}, {f'Hello P{i}' for i in range(5)})
+
+
+# ═══════════════════════════════════════════════════════════════
+# 9) SMS DISPATCHER (unit, fake provider)
+# ═══════════════════════════════════════════════════════════════
+class SMSDispatcherTests(unittest.TestCase):
+    """Identical messages are grouped, numbers de-duplicated and chunked."""
+
+    def setUp(self):
+        from announcements.sms_dispatch import FakeSMSProvider
+        FakeSMSProvider.outbox.clear()
+
+    def test_groups_dedupes_and_chunks(self):
+        from announcements.sms_dispatch import FakeSMSProvider, SMSDispatcher
+
+        sms = SMSDispatcher(provider=FakeSMSProvider(), batch_size=2, max_workers=3, record=False)
+        for n in ('0201111111', '+233201111111', '0202222222', '0203333333', ''):
+            sms.add(n, 'School closes at noon')
+        sms.add('0204444444', 'Fee reminder for Ama')
+        result = sms.send()
+
+        self.assertEqual(result.sent, 4)
+        self.assertEqual(result.failed, 0)
+        self.assertEqual(result.api_calls, 3)  # 2 + 1 for the shared text, 1 for the other
+        sent_numbers = sorted(n for batch, _ in FakeSMSProvider.outbox for n in batch)
+        self.assertEqual(sent_numbers, ['+233201111111', '+233202222222', '+233203333333', '+233204444444'])
+
+    def test_provider_error_marks_batch_failed(self):
+        from announcements.sms_dispatch import SMSDispatcher
+
+        class Broken:
+            max_recipients = 100
+
+            def send(self, recipients, message, sender_id=''):
+                raise RuntimeError('gateway down')
+
+        sms = SMSDispatcher(provider=Broken(), record=False)
+        sms.add('0205555555', 'hello')
+        result = sms.send()
+        self.assertEqual((result.sent, result.failed), (0, 1))
+
+
+# ═══════════════════════════════════════════════════════════════
+# 10) WEB-PUSH ENGINE (unit, no network)
+# ═══════════════════════════════════════════════════════════════
+class PushEngineVapidTests(unittest.TestCase):
+    """VAPID key parsed once; signed headers cached per push-service origin."""
+
+    def setUp(self):
+        from py_vapid import Vapid
+        from cryptography.hazmat.primitives import serialization
+        vapid = Vapid()
+        vapid.generate_keys()
+        self.pem = vapid.private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        self.claims = {'sub': 'mailto:test@example.com'}
+
+    def test_headers_cached_per_origin(self):
+        from announcements.push_engine import vapid_headers
+        a1 = vapid_headers('https://fcm.googleapis.com/fcm/send/abc', self.pem, self.claims, now=1000)
+        a2 = vapid_headers('https://fcm.googleapis.com/fcm/send/xyz', self.pem, self.claims, now=1060)
+        b = vapid_headers('https://updates.push.services.mozilla.com/wpush/v2/q', self.pem, self.claims, now=1060)
+        self.assertIs(a1, a2)
+        self.assertIsNot(a1, b)
+        self.assertTrue(a1['Authorization'].startswith('vapid '))
+
+    def test_headers_resigned_near_expiry(self):
+        from announcements.push_engine import VAPID_TOKEN_LIFETIME, vapid_headers
+        first = vapid_headers('https://web.push.apple.com/x', self.pem, self.claims, now=5000)
+        later = vapid_headers('https://web.push.apple.com/y', self.pem, self.claims,
+                              now=5000 + VAPID_TOKEN_LIFETIME - 60)
+        self.assertIsNot(first, later)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 11) ANALYTICS CUBES (unit, no tenant needed)
+# ═══════════════════════════════════════════════════════════════
+class AnalyticsCubeBucketTests(unittest.TestCase):
+    """Grade histogram buckets match the old Python-side thresholds."""
+
+    def test_bucket_boundaries(self):
+        from academics.analytics import grade_bucket
+        cases = {100: 'A+', 90: 'A+', 89.99: 'A', 80: 'A', 75: 'B+', 60: 'B',
+                 59.5: 'C', 50: 'C', 49.99: 'F', 0: 'F'}
+        for score, label in cases.items():
+            self.assertEqual(grade_bucket(score), label, score)
+        self.assertIsNone(grade_bucket(None))
+
+    def test_sql_expression_covers_every_bucket(self):
+        from academics.analytics import GRADE_BUCKETS, _bucket_expression
+        expr = _bucket_expression()
+        labels = [case.result.value for case in expr.cases] + [expr.default.value]
+        self.assertEqual(labels, [label for label, _min in GRADE_BUCKETS])
+
+    def test_signals_mark_the_touched_slice(self):
+        import datetime
+        from unittest import mock
+        from academics import signals
+        with mock.patch('academics.analytics.mark_stale') as mark:
+            signals.attendance_cube_stale(None, mock.Mock(date=datetime.date(2026, 3, 2)))
+            signals.grade_cube_stale(None, mock.Mock(academic_year_id=4, term='second'))
+            signals.fee_cube_stale(None, mock.Mock())
+        self.assertEqual(mark.call_args_list, [
+            mock.call('attendance', '2026-03-02'),
+            mock.call('grades', '4:second'),
+            mock.call('fees', 'all'),
+        ])
+
+
+# ═══════════════════════════════════════════════════════════════
+# 12) TUTOR PROMPT-CONTEXT CACHE (unit, locmem cache)
+# ═══════════════════════════════════════════════════════════════
+class TutorPromptCacheTests(unittest.TestCase):
+    """Segments are reused until a tag they depend on is bumped."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from unittest import mock
+        cache.clear()
+        self.student = mock.Mock(pk=7, user_id=70)
+        self.calls = {'grades': 0, 'schedule': 0}
+
+    def _segments(self):
+        from academics.prompt_cache import Segment
+
+        def build(name):
+            def _build():
+                self.calls[name] += 1
+                return f'{name}-{self.calls[name]}'
+            return _build
+
+        return [
+            Segment('grades', ('grades', 'academic_year'), build('grades')),
+            Segment('schedule', ('timetable',), build('schedule')),
+        ]
+
+    def test_segments_reused_until_bumped(self):
+        from academics.prompt_cache import bump, load_segments
+        first = load_segments(self.student, self._segments())
+        again = load_segments(self.student, self._segments())
+        self.assertEqual(first, again)
+        self.assertEqual(self.calls, {'grades': 1, 'schedule': 1})
+
+        bump('grades', 7)
+        after = load_segments(self.student, self._segments())
+        self.assertEqual(after['grades'], 'grades-2')
+        self.assertEqual(after['schedule'], 'schedule-1')
+
+    def test_bump_is_scoped_to_the_student(self):
+        from academics.prompt_cache import bump, load_segments
+        load_segments(self.student, self._segments())
+        bump('grades', 8)
+        load_segments(self.student, self._segments())
+        self.assertEqual(self.calls['grades'], 1)
+
+        bump('timetable')
+        load_segments(self.student, self._segments())
+        self.assertEqual(self.calls, {'grades': 1, 'schedule': 2})
+
+
+# ═══════════════════════════════════════════════════════════════
+# 13) SEMANTIC AI CACHE (unit, offline embedder)
+# ═══════════════════════════════════════════════════════════════
+class SemanticAICacheTests(unittest.TestCase):
+    """Normalisation and the deterministic hashing embedder."""
+
+    def test_embedding_ignores_case_spacing_order_and_stop_words(self):
+        from individual_users.ai_cache import cosine, embed
+        a = embed('Fractions for  Beginners')
+        b = embed('beginners FRACTIONS')
+        self.assertAlmostEqual(cosine(a, b), 1.0, places=5)
+
+    def test_different_topics_stay_below_threshold(self):
+        from individual_users.ai_cache import DEFAULT_THRESHOLDS, cosine, embed
+        sim = cosine(embed('Adding fractions'), embed('Subtracting fractions'))
+        self.assertLess(sim, DEFAULT_THRESHOLDS['lesson_plan'])
+
+    def test_embedding_is_deterministic_and_packable(self):
+        from individual_users.ai_cache import _pack, _unpack, embed
+        vec = embed('Photosynthesis in green plants')
+        self.assertEqual(vec, embed('Photosynthesis in green plants'))
+        self.assertEqual(len(_unpack(_pack(vec))), len(vec))
+
+    def test_structured_fields_are_order_and_case_insensitive(self):
+        from individual_users.ai_cache import _group_key
+        k1 = _group_key('sys', 'm', 0.7, {'subject': 'Maths', 'class': 'B4 '})
+        k2 = _group_key('sys', 'm', 0.7, {'class': 'b4', 'subject': 'maths'})
+        k3 = _group_key('sys', 'm', 0.7, {'class': 'b5', 'subject': 'maths'})
+        self.assertEqual(k1, k2)
+        self.assertNotEqual(k1, k3)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 14) STREAMING EXPORTS (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class StreamingExportTests(unittest.TestCase):
+    """CSV and XLSX documents are produced chunk by chunk from row iterators."""
+
+    HEADERS = ['Admission No', 'Name', 'Score']
+
+    def _rows(self, n):
+        return ((f'ADM{i:05d}', f'Pupil {i}', i % 100) for i in range(n))
+
+    def test_csv_streams_in_chunks(self):
+        import csv as _csv
+        from accounts.exports import iter_csv
+        chunks = list(iter_csv(self.HEADERS, self._rows(1200)))
+        self.assertGreater(len(chunks), 1)
+        parsed = list(_csv.reader(b''.join(chunks).decode().splitlines()))
+        self.assertEqual(parsed[0], self.HEADERS)
+        self.assertEqual(len(parsed), 1201)
+        self.assertEqual(parsed[-1], ['ADM01199', 'Pupil 1199', '99'])
+
+    def test_xlsx_is_a_valid_workbook(self):
+        import io
+        import zipfile as _zip
+        from accounts.exports import iter_xlsx
+        data = b''.join(iter_xlsx(self.HEADERS, self._rows(1200), sheet_name='grades/B4'))
+        with _zip.ZipFile(io.BytesIO(data)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertIn('[Content_Types].xml', zf.namelist())
+            sheet = zf.read('xl/worksheets/sheet1.xml').decode()
+            workbook = zf.read('xl/workbook.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 1201)
+        self.assertIn('Pupil 1199', sheet)
+        self.assertIn('name="grades_B4"', workbook)
+
+    def test_xlsx_cells_are_escaped_and_typed(self):
+        from accounts.exports import _cell
+        self.assertIn('&lt;b&gt; &amp; co', _cell('<b> & co'))
+        self.assertIn('<v>42</v>', _cell(42))
+        self.assertEqual(_cell(None), '<c/>')
+        self.assertNotIn('\x01', _cell('bad\x01char'))
+
+    def test_streamed_rows_are_read_inside_a_transaction(self):
+        from unittest import mock
+        from accounts import exports
+
+        events = []
+
+        def rows():
+            events.append('first row')
+            yield ('ADM00001', 'Pupil 1', 50)
+
+        atomic = mock.MagicMock()
+        atomic.return_value.__enter__.side_effect = lambda *a: events.append('begin')
+        atomic.return_value.__exit__.side_effect = lambda *a: events.append('commit')
+        with mock.patch.object(exports.transaction, 'atomic', atomic):
+            response = exports.stream_export('grades', self.HEADERS, rows())
+            self.assertEqual(events, [])
+            b''.join(response.streaming_content)
+        self.assertEqual(events, ['begin', 'first row', 'commit'])
+
+
+# ═══════════════════════════════════════════════════════════════
+# 15) STAGED CSV IMPORTS (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class StagedImportHelperTests(unittest.TestCase):
+    """Row parsing and the in-memory allocators used by bulk validation."""
+
+    def test_pick_uses_first_non_empty_alias(self):
+        from accounts.imports import is_blank, pick
+        row = {'First Name': '  ', 'first_name': ' Ama '}
+        self.assertEqual(pick(row, 'First Name', 'first_name'), 'Ama')
+        self.assertEqual(pick(row, 'Missing'), '')
+        self.assertTrue(is_blank(' n/a '))
+        self.assertFalse(is_blank('ADM0001'))
+
+    def test_usernames_follow_counter_scheme_without_queries(self):
+        from accounts.imports import UsernameAllocator, username_base
+        base = username_base('Kofi', 'Mensah-Boateng')
+        self.assertEqual(base, 'kofi.mensahboateng')
+        allocator = UsernameAllocator([], reserved={base, f'{base}1'})
+        self.assertEqual(allocator.allocate(base), f'{base}2')
+        self.assertEqual(allocator.allocate(base), f'{base}3')
+
+    def test_codes_and_emails_never_repeat(self):
+        from accounts.imports import CodeAllocator, allocate_email
+        codes = CodeAllocator('ADM', set())
+        issued = {codes.allocate() for _ in range(200)}
+        self.assertEqual(len(issued), 200)
+        taken = {'ama@school.local'}
+        self.assertEqual(allocate_email('N/A', 'kofi', taken), 'kofi@school.local')
+        self.assertNotEqual(allocate_email('', 'ama', taken), 'ama@school.local')
+
+    def test_apply_scores_without_scale_uses_default_bands(self):
+        from decimal import Decimal
+        from academics.grading import DEFAULT_SCALE
+        from students.models import Grade
+        grade = Grade(class_score='25', exams_score='60')
+        grade.apply_scores(scale=DEFAULT_SCALE)
+        self.assertEqual(grade.total_score, Decimal('85'))
+        self.assertEqual((grade.grade, grade.remarks), ('1', 'Highest'))
+        grade = Grade(class_score='50', exams_score='70')
+        grade.apply_scores(scale=DEFAULT_SCALE)
+        self.assertEqual(grade.total_score, Decimal('100.00'))
+
+    def test_import_view_runs_stages_after_the_view_transaction(self):
+        from unittest import mock
+        from accounts import imports
+
+        events = []
+        atomic = mock.MagicMock()
+        atomic.return_value.__enter__.side_effect = lambda *a: events.append('begin')
+        atomic.return_value.__exit__.side_effect = lambda *a: events.append('commit')
+        batch = mock.Mock(options={'next': '/done/'})
+
+        @imports.import_view
+        def upload(request):
+            events.append('view')
+            return imports.finish_import(request, batch)
+
+        def run(batch, budget):
+            events.append('run')
+            return False
+
+        request = RequestFactory().post('/import/')
+        with mock.patch.object(imports.transaction, 'atomic', atomic), \
+                mock.patch.object(imports, 'run_import', side_effect=run), \
+                mock.patch('django.shortcuts.redirect', return_value='redirected'):
+            self.assertEqual(upload(request), 'redirected')
+        self.assertEqual(events, ['begin', 'view', 'commit', 'run'])
+        self.assertTrue(upload._non_atomic_requests)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 16) GRADING SCALE SERVICE (unit, LocMem cache)
+# ═══════════════════════════════════════════════════════════════
+class GradingScaleServiceTests(unittest.TestCase):
+    """Bisect lookup and tenant/version keyed compiled scales."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from academics import grading
+        cache.clear()
+        grading._compiled.clear()
+
+    def test_default_scale_boundaries(self):
+        from academics.grading import DEFAULT_SCALE
+        self.assertEqual(DEFAULT_SCALE.lookup(80), ('1', 'Highest'))
+        self.assertEqual(DEFAULT_SCALE.lookup('79.99'), ('2', 'Higher'))
+        self.assertEqual(DEFAULT_SCALE.lookup(40), ('8', 'Lower'))
+        self.assertEqual(DEFAULT_SCALE.lookup(0), ('9', 'Lowest'))
+        self.assertEqual(DEFAULT_SCALE.lookup(None), ('9', 'Lowest'))
+
+    def test_custom_scale_below_lowest_band_uses_lowest(self):
+        from academics.grading import CompiledScale
+        scale = CompiledScale([(90, 'A1', 'Excellent'), (50, 'C4', 'Credit'), (30, 'F9', 'Fail')])
+        self.assertEqual(scale.lookup(95), ('A1', 'Excellent'))
+        self.assertEqual(scale.lookup(50), ('C4', 'Credit'))
+        self.assertEqual(scale.lookup(10), ('F9', 'Fail'))
+
+    def test_scales_are_keyed_by_schema_and_version(self):
+        from unittest import mock
+        from academics import grading
+        rows = {
+            'school_a': [(80, 'A', 'Top')],
+            'school_b': [(80, '1', 'Highest'), (0, '9', 'Lowest')],
+        }
+        current = {'schema': 'school_a'}
+        loads = []
+
+        def _load():
+            loads.append(current['schema'])
+            return rows[current['schema']]
+
+        with mock.patch.object(grading, '_schema', lambda: current['schema']), \
+                mock.patch.object(grading, '_load_rows', _load):
+            self.assertEqual(grading.grade_for(85), ('A', 'Top'))
+            current['schema'] = 'school_b'
+            self.assertEqual(grading.grade_for(85), ('1', 'Highest'))
+            current['schema'] = 'school_a'
+            self.assertEqual(grading.grade_for(85), ('A', 'Top'))
+            self.assertEqual(loads, ['school_a', 'school_b'])
+
+            rows['school_a'] = [(80, 'A+', 'Outstanding')]
+            with mock.patch('django.db.connection.in_atomic_block', True), \
+                    mock.patch('django.db.transaction.on_commit') as on_commit:
+                grading.bump_version()
+            # Until the write commits, readers keep the old version.
+            self.assertEqual(grading.grade_for(85), ('A', 'Top'))
+            on_commit.call_args.args[0]()
+            self.assertEqual(grading.grade_for(85), ('A+', 'Outstanding'))
+            self.assertEqual(loads, ['school_a', 'school_b', 'school_a'])
+
+
+# ═══════════════════════════════════════════════════════════════
+# 17) ANONYMOUS PAGE CACHE (unit, LocMem cache)
+# ═══════════════════════════════════════════════════════════════
+class AnonymousPageCacheTests(unittest.TestCase):
+    """Keying, CSRF re-issue, conditional GET and bypass of the page cache."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.renders = []
+
+    def _view(self, body='<p>hello</p>'):
+        from django.http import HttpResponse
+        from accounts.page_cache import anonymous_page_cache
+
+        @anonymous_page_cache()
+        def view(request):
+            self.renders.append(request.get_full_path())
+            return HttpResponse(body)
+        return view
+
+    def _get(self, path='/pricing/', **extra):
+        from django.contrib.auth.models import AnonymousUser
+        from django.test import RequestFactory
+        request = RequestFactory().get(path, **extra)
+        request.user = AnonymousUser()
+        request.LANGUAGE_CODE = 'en'
+        return request
+
+    def test_second_request_is_a_hit_and_keys_vary_by_path(self):
+        view = self._view()
+        self.assertEqual(view(self._get())['X-Page-Cache'], 'MISS')
+        self.assertEqual(view(self._get())['X-Page-Cache'], 'HIT')
+        view(self._get('/pricing/?plan=pro'))
+        self.assertEqual(self.renders, ['/pricing/', '/pricing/?plan=pro'])
+
+    def test_csrf_token_is_reissued_per_visitor(self):
+        import re
+        from django.http import HttpResponse
+        from django.middleware.csrf import _unmask_cipher_token
+        from django.template import engines
+        from accounts.page_cache import anonymous_page_cache
+        template = engines['django'].from_string('<form>{% csrf_token %}</form>')
+
+        @anonymous_page_cache()
+        def view(request):
+            return HttpResponse(template.render({}, request))
+
+        def secret_in(body):
+            return _unmask_cipher_token(re.search(r'value="([^"]+)"', body).group(1))
+
+        first = self._get()
+        self.assertEqual(secret_in(view(first).content.decode()), first.META['CSRF_COOKIE'])
+        second = self._get()
+        body = view(second).content.decode()
+        self.assertNotIn('__PAGE_CACHE_CSRF__', body)
+        self.assertEqual(secret_in(body), second.META['CSRF_COOKIE'])
+        self.assertNotEqual(first.META['CSRF_COOKIE'], second.META['CSRF_COOKIE'])
+
+    def test_matching_etag_returns_304(self):
+        view = self._view()
+        etag = view(self._get())['ETag']
+        self.assertEqual(view(self._get(HTTP_IF_NONE_MATCH=etag)).status_code, 304)
+
+    def test_authenticated_and_post_requests_bypass(self):
+        from unittest import mock
+        from django.conf import settings
+        view = self._view()
+        request = self._get()
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = 'abc'
+        request.user = mock.Mock(is_authenticated=True)
+        self.assertFalse(view(request).has_header('X-Page-Cache'))
+        view(self._get())
+        self.assertEqual(len(self.renders), 2)
+
+    def test_purge_drops_cached_pages(self):
+        from accounts.page_cache import purge_all
+        view = self._view()
+        view(self._get())
+        purge_all()
+        self.assertEqual(view(self._get())['X-Page-Cache'], 'MISS')
+        self.assertEqual(len(self.renders), 2)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 18) CREDIT LEDGER (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class CreditLedgerTests(unittest.TestCase):
+    """Conditional posting SQL and cached balance reads."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_posting_is_one_conditional_statement(self):
+        from individual_users.credit_utils import LEDGER
+        sql, attnames = LEDGER._post_sql()
+        self.assertTrue(sql.startswith('WITH upd AS (UPDATE'))
+        self.assertIn('"balance" + %s >= 0', sql)
+        self.assertIn('INSERT INTO "individual_users_individualcredittransaction"', sql)
+        self.assertEqual(sql.count('%s'), 11)
+        self.assertIn('balance', attnames)
+
+    def test_balance_is_served_from_cache(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from individual_users.credit_utils import LEDGER, get_credit_balance
+        user = mock.Mock(pk=42, is_authenticated=True)
+        cache.set(LEDGER.cache_key(42), 7)
+        self.assertEqual(get_credit_balance(user), 7)
+
+    def test_insufficient_credits_write_nothing(self):
+        from unittest import mock
+        from teachers import addon_utils
+        user = mock.Mock(pk=3, is_authenticated=True, user_type='teacher')
+        with mock.patch.object(addon_utils.LEDGER, '_try_post', return_value=None) as post, \
+                mock.patch.object(addon_utils.LEDGER, 'open_account', return_value=mock.Mock(balance=2)):
+            ok, err = addon_utils.deduct_credits(user, 'slide_gen')
+        self.assertFalse(ok)
+        self.assertEqual((err['balance'], err['cost']), (2, 3))
+        self.assertEqual(post.call_count, 1)
+
+    def test_uncommitted_balance_is_never_cached(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from individual_users.credit_utils import LEDGER
+        key = LEDGER.cache_key(42)
+        cache.set(key, 7)
+        with mock.patch('django.db.connection.in_atomic_block', True), \
+                mock.patch('django.db.transaction.on_commit') as on_commit:
+            LEDGER._cache_written(42, 5)
+            self.assertEqual(cache.get(key), 7)
+            on_commit.call_args[0][0]()
+        self.assertIsNone(cache.get(key))
+        LEDGER._cache_written(42, 5)
+        self.assertEqual(cache.get(key), 5)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 19) ID-CARD PIPELINE (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class IdCardPipelineTests(unittest.TestCase):
+    """Spec-based rendering and the streaming PDF writer."""
+
+    SCHOOL = {
+        'name': 'Test School', 'address': 'Box 1', 'phone': '0200', 'email': 'info@test.edu',
+        'motto': 'Knowledge', 'template': 'classic', 'issued': '01/09/2026',
+    }
+    STUDENT = {
+        'id': 7, 'first_name': 'Ama', 'last_name': 'Mensah', 'full_name': 'Ama Mensah',
+        'email': 'ama@test.edu', 'phone': '', 'photo': None, 'admission_number': 'ADM1234',
+        'class_name': 'Basic 7', 'blood_group': '', 'emergency_contact': '0244000000',
+    }
+
+    def test_every_template_renders_from_a_spec(self):
+        from academics.id_cards import render_card
+        for template, size in (('classic', (650, 1000)), ('modern', (650, 1000)), ('elegant', (920, 580))):
+            card = render_card(self.STUDENT, 'student', dict(self.SCHOOL, template=template))
+            self.assertEqual(card.size, size)
+
+    def test_pdf_stream_places_six_portrait_cards_per_page(self):
+        import re
+        from academics.id_cards import SHEET_PORTRAIT, _jpeg, iter_pdf, render_card
+        card = _jpeg(render_card(self.STUDENT, 'student', self.SCHOOL))
+        pdf = b''.join(iter_pdf([card] * 8, SHEET_PORTRAIT))
+        self.assertTrue(pdf.startswith(b'%PDF-1.4'))
+        self.assertIn(b'/Count 2', pdf)
+        self.assertEqual(pdf.count(b'/Subtype /Image'), 8)
+        xref_at = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+        self.assertTrue(pdf[xref_at:].startswith(b'xref'))
+
+    def test_querysets_are_read_chunk_by_chunk_in_transactions(self):
+        from unittest import mock
+        from academics import id_cards
+
+        people = [mock.Mock(pk=pk, user=mock.Mock(profile_picture=None)) for pk in range(1, 251)]
+        state = {'atomic': False, 'reads': []}
+
+        class People:
+            def iterator(self, **kwargs):
+                raise AssertionError('no server-side cursor')
+
+            def values_list(self, *args, **kwargs):
+                assert state['atomic']
+                return [p.pk for p in reversed(people)]
+
+            def filter(self, pk__in):
+                assert state['atomic']
+                state['reads'].append(len(pk__in))
+                return [p for p in people if p.pk in pk__in]
+
+        atomic = mock.MagicMock()
+        atomic.return_value.__enter__.side_effect = lambda *a: state.update(atomic=True)
+        atomic.return_value.__exit__.side_effect = lambda *a: state.update(atomic=False)
+        with mock.patch('django.db.transaction.atomic', atomic), \
+                mock.patch.object(id_cards, '_person_spec', lambda person, kind: {'id': person.pk}):
+            specs = list(id_cards.iter_specs(People(), 'student', self.SCHOOL))
+        self.assertEqual([s['id'] for s in specs], list(range(250, 0, -1)))
+        self.assertEqual(state['reads'], [100, 100, 50])
+
+    def test_failed_thumbnails_are_not_cached(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from academics import id_cards
+        cache.clear()
+        person = mock.Mock(pk=7)
+        person.user.profile_picture.name = 'photos/ama.jpg'
+        with mock.patch.object(id_cards, '_person_spec', lambda person, kind: {'id': person.pk}), \
+                mock.patch.object(id_cards, '_make_thumbnail', return_value=b'') as make:
+            list(id_cards.iter_specs([person], 'student', self.SCHOOL))
+            list(id_cards.iter_specs([person], 'student', self.SCHOOL))
+        self.assertEqual(make.call_count, 2)
+        self.assertIsNone(cache.get(id_cards._thumb_key('photos/ama.jpg', id_cards.PHOTO_SIZES['classic'])))
+
+
+# ═══════════════════════════════════════════════════════════════
+# 20) SHARED LICENSURE QUESTION BANK (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class LicensureBankTests(unittest.TestCase):
+    """Content-hash identity, overlay edits and stratified allocation."""
+
+    ITEM = {
+        'question_text': 'Which activity builds  phonemic awareness?',
+        'option_a': 'Sounds', 'option_b': 'Copying', 'option_c': 'Drawing', 'option_d': 'Spelling',
+        'correct_option': 'A', 'explanation': 'Sounds first.',
+    }
+
+    def test_content_hash_ignores_spacing_case_and_explanation(self):
+        from individual_users.licensure_bank import content_hash
+        variant = dict(self.ITEM, question_text='which activity builds phonemic awareness? ', explanation='')
+        self.assertEqual(content_hash(self.ITEM), content_hash(variant))
+        self.assertNotEqual(content_hash(self.ITEM), content_hash(dict(self.ITEM, correct_option='B')))
+
+    def test_every_bank_question_is_distinct(self):
+        from individual_users.gtle_question_bank import GTLE_QUESTION_BANK
+        from individual_users.licensure_bank import content_hash
+        self.assertEqual(len({content_hash(q) for q in GTLE_QUESTION_BANK}), len(GTLE_QUESTION_BANK))
+
+    def test_overlay_edits_are_limited_to_editable_fields(self):
+        from types import SimpleNamespace
+        from individual_users.licensure_bank import apply_edits
+        question = SimpleNamespace(**self.ITEM, domain='literacy')
+        apply_edits(question, {'correct_option': 'c', 'domain': 'numeracy', 'explanation': ' Mine '})
+        self.assertEqual((question.correct_option, question.domain, question.explanation), ('C', 'literacy', 'Mine'))
+        apply_edits(question, {'correct_option': 'E'})
+        self.assertEqual(question.correct_option, 'C')
+
+    def test_allocation_is_proportional_and_exact(self):
+        from individual_users.licensure_bank import allocate
+        counts = {('bank', 'literacy'): 20, ('bank', 'numeracy'): 20, ('own', 'literacy'): 10, ('own', 'pedagogy'): 3}
+        quota = allocate(counts, 20)
+        self.assertEqual(sum(quota.values()), 20)
+        self.assertTrue(all(quota[s] <= counts[s] for s in counts))
+        self.assertEqual((quota[('bank', 'literacy')], quota[('own', 'literacy')]), (8, 4))
+        self.assertEqual(allocate({('own', 'numeracy'): 3}, 20), {('own', 'numeracy'): 3})
+
+
+# ═══════════════════════════════════════════════════════════════
+# 21) DOCUMENT RENDERING SERVICE (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class DocumentRenderingTests(unittest.TestCase):
+    """Artifact naming, exam-paper sections and renderer output."""
+
+    PAPER = {
+        'school_name': 'Demo School', 'school_motto': 'Knowledge is light',
+        'title': 'Mid-Term <Maths>', 'subject': 'Mathematics', 'class_name': 'JHS 2',
+        'duration': 60, 'instructions': 'Answer all questions.',
+        'questions': [
+            {'format': 'mcq', 'text': '2 + 2 = ?', 'options': ['3', '4', '5', '6'],
+             'answer': 'B', 'explanation': ''},
+            {'format': 'mcq', 'text': '3 x 3 = ?', 'options': ['6', '9', '12', '8'],
+             'answer': 'B', 'explanation': ''},
+            {'format': 'essay', 'text': 'Explain place value & give examples.', 'options': [],
+             'answer': '', 'explanation': ''},
+        ],
+    }
+
+    def test_artifact_name_is_stable_and_tracks_payload(self):
+        from accounts.documents import artifact_name
+        renderer = 'teachers.documents.exam_paper_pdf'
+        name = artifact_name(renderer, self.PAPER, 'pdf')
+        self.assertTrue(name.startswith('documents/') and name.endswith('.pdf'))
+        self.assertEqual(name, artifact_name(renderer, dict(reversed(list(self.PAPER.items()))), 'pdf'))
+        self.assertNotEqual(name, artifact_name(renderer, dict(self.PAPER, duration=90), 'pdf'))
+        self.assertNotEqual(name, artifact_name('teachers.documents.exam_paper_docx', self.PAPER, 'pdf'))
+
+    def test_sections_group_by_format_with_running_numbers(self):
+        from teachers.documents import _sections
+        sections = _sections(self.PAPER['questions'])
+        self.assertEqual([(letter, label) for letter, label, _ in sections],
+                         [('A', 'Multiple Choice'), ('B', 'Essay')])
+        self.assertEqual([n for _, _, numbered in sections for n, _ in numbered], [1, 2, 3])
+        self.assertEqual(_sections(self.PAPER['questions'][:2]), [])
+
+    def test_renderers_produce_files(self):
+        from teachers.documents import exam_paper_docx, exam_paper_pdf, presentation_pptx
+        from finance.documents import receipt_pdf
+        try:
+            pdf = exam_paper_pdf(self.PAPER, lambda f: None)
+            docx = exam_paper_docx(self.PAPER, lambda f: None)
+            pptx = presentation_pptx({'title': 'Fractions', 'theme': 'ocean', 'slides': [
+                {'layout': 'title', 'title': 'Fractions', 'content': 'Halves\nQuarters',
+                 'notes': '', 'image_url': ''},
+            ]}, lambda f: None)
+            receipt = receipt_pdf({'rows': [['Receipt No.:', 'RCT-00001', 'Date:', '01 Jan 2026']]}, None)
+        except ImportError:
+            self.skipTest('document libraries not installed')
+        self.assertTrue(pdf.startswith(b'%PDF') and receipt.startswith(b'%PDF'))
+        self.assertTrue(docx.startswith(b'PK') and pptx.startswith(b'PK'))
+
+
+# ═══════════════════════════════════════════════════════════════
+# 22) GAMIFICATION ENGINE (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class GamificationEngineTests(unittest.TestCase):
+    """Threshold crossings, levels and leaderboard ranks."""
+
+    def test_level_formula(self):
+        from academics.gamification import level_for
+        self.assertEqual([level_for(x) for x in (0, 99, 100, 250, -5)], [1, 1, 2, 3, 1])
+
+    def test_only_crossed_thresholds_unlock(self):
+        from academics.gamification import crossed
+        self.assertEqual(crossed({'total_xp': (480, 510), 'level': (5, 6)}), ['xp-500'])
+        self.assertEqual(crossed({'total_xp': (0, 10), 'level': (1, 1)}), ['first-steps'])
+        self.assertEqual(crossed({'total_xp': (510, 540)}), [])
+        self.assertEqual(crossed({'current_streak': (2, 3)}), ['streak-3'])
+        self.assertEqual(crossed({'level': (4, 5)}), ['level-5'])
+
+    def test_reached_checks_the_whole_catalog(self):
+        from types import SimpleNamespace
+        from academics.gamification import reached
+        profile = SimpleNamespace(total_xp=600, level=7, current_streak=8)
+        self.assertEqual(sorted(reached(profile)), ['first-steps', 'level-5', 'streak-3', 'streak-7', 'xp-500'])
+
+    def test_rank_rows_share_ranks_on_ties(self):
+        from academics.gamification import rank_rows
+        rows = rank_rows([{'total_xp': x} for x in (90, 70, 70, 40, 0, 0)])
+        self.assertEqual([r['rank'] for r in rows], [1, 2, 2, 4, 5, 5])
+
+
+# ═══════════════════════════════════════════════════════════════
+# 23) NOTIFICATION STORE (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class NotificationStoreTests(unittest.TestCase):
+    """The bell is served from one cache entry that changes drop."""
+
+    def test_badge_is_served_from_cache(self):
+        from types import SimpleNamespace
+        from django.core.cache import cache
+        from announcements import inbox
+        user = SimpleNamespace(pk=987654)
+        bell = {'count': 42, 'unread': [{'id': 1, 'message': 'Fees due', 'link': '', 'alert_type': 'general'}]}
+        cache.set(inbox._key(user.pk), bell)
+        self.assertEqual(inbox.badge(user), bell)  # no database behind this test
+        inbox.invalidate([user.pk])
+        self.assertIsNone(cache.get(inbox._key(user.pk)))
+
+    def test_manager_keeps_counters_in_step(self):
+        from announcements.models import Notification, NotificationQuerySet
+        self.assertIsInstance(Notification.objects.all(), NotificationQuerySet)
+        self.assertTrue(hasattr(Notification.objects, 'mark_read'))
+
+
+# ═══════════════════════════════════════════════════════════════
+# 24) RATE LIMITER (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class RateLimiterTests(unittest.TestCase):
+    """GCRA buckets: a burst of N, then 429 with Retry-After."""
+
+    def _request(self, ip='10.0.0.1'):
+        from django.contrib.auth.models import AnonymousUser
+        request = RequestFactory().post('/x/', REMOTE_ADDR=ip)
+        request.user = AnonymousUser()
+        return request
+
+    def test_parse_rate(self):
+        from school_system.ratelimit import _parse_rate
+        self.assertEqual(_parse_rate('5/m'), (5, 60))
+        self.assertEqual(_parse_rate('100/d'), (100, 86400))
+        self.assertEqual(_parse_rate('5/300s'), (5, 300))
+        self.assertEqual(_parse_rate('3/15m'), (3, 900))
+        with self.assertRaises(ValueError):
+            _parse_rate('often')
+
+    def test_gcra_allows_burst_then_rejects(self):
+        from school_system.ratelimit import gcra
+        tat, now = None, 1000.0
+        for _ in range(3):
+            allowed, tat, _ = gcra(tat, now, 20.0, 60.0)
+            self.assertTrue(allowed)
+        allowed, same, retry_after = gcra(tat, now, 20.0, 60.0)
+        self.assertFalse(allowed)
+        self.assertEqual(same, tat)
+        self.assertAlmostEqual(retry_after, 20.0)
+        self.assertTrue(gcra(tat, now + 20.0, 20.0, 60.0)[0])
+
+    def test_check_counts_per_key(self):
+        from django.test import override_settings
+        from school_system import ratelimit
+        with override_settings(RATELIMIT_BACKEND='local'):
+            first = self._request('10.0.0.1')
+            decisions = [ratelimit.check(first, 'unit-test', '2/m', key='ip') for _ in range(3)]
+            self.assertEqual([d.allowed for d in decisions], [True, True, False])
+            self.assertFalse(ratelimit.peek(first, 'unit-test', '2/m', key='ip').allowed)
+            self.assertTrue(ratelimit.check(self._request('10.0.0.2'), 'unit-test', '2/m', key='ip'))
+            ratelimit.reset(first, 'unit-test', key='ip')
+            self.assertTrue(ratelimit.check(first, 'unit-test', '2/m', key='ip'))
+
+    def test_rejection_response(self):
+        from school_system.ratelimit import Decision
+        response = Decision(False, 5, 0, 12.2).response({'error': 'slow down'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '13')
+        self.assertEqual(response['X-RateLimit-Limit'], '5')
+
+    def test_composite_keys(self):
+        from school_system.ratelimit import make_key
+        request = self._request('10.1.2.3')
+        schema = getattr(connection, 'schema_name', 'public')
+        self.assertEqual(make_key(request, 'chat', ('tenant', 'user', 'ip')), f'rl:chat:{schema}:anon:10.1.2.3')
+        self.assertEqual(make_key(request, 'chat', lambda r: 'p7'), 'rl:chat:p7')
+
+    def test_database_backend_reuses_its_connection(self):
+        from unittest import mock
+        from school_system.ratelimit import DatabaseBackend
+        conn = mock.MagicMock(settings_dict={'CONN_MAX_AGE': 0})
+        backend = DatabaseBackend()
+        with mock.patch('django.db.connections.create_connection', return_value=conn) as create:
+            for _ in range(2):
+                with backend._cursor():
+                    pass
+        create.assert_called_once()
+        self.assertEqual(conn.settings_dict['CONN_MAX_AGE'], 60)
+        self.assertEqual(conn.close_if_unusable_or_obsolete.call_count, 2)
+        conn.close.assert_not_called()
+
+
+# ═══════════════════════════════════════════════════════════════
+# 25) LIVE-SESSION STATE STORE (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class LiveStateStoreTests(unittest.TestCase):
+    """In-process store operations and write-behind batches that survive a failed write."""
+
+    def setUp(self):
+        from school_system.livestate import LocalStore
+        self.st = LocalStore()
+
+    def test_hash_set_and_presence_ops(self):
+        st = self.st
+        self.assertTrue(st.hsetnx('h', '7:Ama', ['B', True]))
+        self.assertFalse(st.hsetnx('h', '7:Ama', ['C', False]))  # first answer wins
+        self.assertEqual(st.hget('h', '7:Ama'), ['B', True])
+        self.assertEqual(st.hincr('t', '12', 5) + st.hincr('t', '12', 3), 13)
+        st.sadd('people', 'Ama')
+        st.sadd('people', 'Ama')
+        self.assertEqual(st.scard('people'), 1)
+        st.zadd('seen', 41, 100.0)
+        st.zadd('seen', 42, 200.0)
+        self.assertEqual(st.zsince('seen', 150.0), ['42'])
+        st.expire(['h'], -1)
+        self.assertEqual(st.hgetall('h'), {})
+
+    def test_failed_write_is_replayed(self):
+        from unittest import mock
+        from school_system import livestate
+        st, session = self.st, 'quiz:TEST01'
+        livestate.queue(st, session, {'7:Ama': ['B', True]})
+        self.assertIn(session, livestate.dirty(st))
+
+        def broken(entries):
+            raise RuntimeError('database down')
+
+        with mock.patch('django.db.transaction.atomic'):
+            with self.assertRaises(RuntimeError):
+                livestate.drain(st, session, broken)
+            livestate.queue(st, session, {'7:Kofi': ['A', False]})
+
+            batches = []
+            self.assertEqual(livestate.drain(st, session, batches.append), 1)  # the leftover batch first
+            self.assertEqual(livestate.drain(st, session, batches.append), 1)
+            self.assertEqual(livestate.drain(st, session, batches.append), 0)
+        self.assertEqual([list(b) for b in batches], [['7:Ama'], ['7:Kofi']])
+        self.assertNotIn(session, livestate.dirty(st))
+
+    def test_lock_is_released_when_the_outer_transaction_commits(self):
+        from unittest import mock
+        from school_system import livestate
+        st, session = self.st, 'quiz:TEST02'
+        livestate.queue(st, session, {'7:Ama': ['B', True]})
+        with mock.patch('django.db.transaction.atomic') as atomic, \
+                mock.patch('django.db.connection.in_atomic_block', True), \
+                mock.patch('django.db.transaction.on_commit') as on_commit:
+            self.assertEqual(livestate.drain(st, session, lambda entries: None), 1)
+            atomic.assert_called_once_with()
+            self.assertIsNone(livestate.drain(st, session, lambda entries: None))  # still locked
+            on_commit.call_args[0][0]()
+        self.assertEqual(livestate.drain(st, session, lambda entries: None), 0)
+
+    def test_quiz_state_is_dropped_when_the_transaction_commits(self):
+        from unittest import mock
+        from school_system.livestate import key
+        from teachers import live
+        st = self.st
+        st.hset(key('quiz:AB12CD'), {'meta': {'is_open': True}})
+        with mock.patch('school_system.livestate.store', return_value=st), \
+                mock.patch.object(live, 'flush_quiz') as flush, \
+                mock.patch('django.db.connection.in_atomic_block', True), \
+                mock.patch('django.db.transaction.on_commit') as on_commit:
+            live.reset_quiz('AB12CD')
+            flush.assert_called_once_with('AB12CD')
+            self.assertTrue(st.exists(key('quiz:AB12CD')))
+            on_commit.call_args[0][0]()
+        self.assertFalse(st.exists(key('quiz:AB12CD')))
+
+    def test_student_notes_hide_teacher_cues(self):
+        from teachers.live import student_notes
+        self.assertEqual(student_notes('ANSWER: B\nTeacher cue: ask why\nStudent notes: Read p. 4'), 'Read p. 4')
+        self.assertEqual(student_notes('Teacher cue: only for me'), '')
+        self.assertEqual(student_notes('Plain notes'), 'Plain notes')
+
+    def test_quiz_summary_counts_and_ranks(self):
+        from teachers.live import _quiz_summary
+        questions, leaderboard = _quiz_summary(
+            [{'id': 1}, {'id': 2}],
+            [(1, 'Ama', 'A', True), (1, 'Kofi', 'B', False), (2, 'Ama', 'C', True), (2, 'Kofi', 'C', True)],
+        )
+        self.assertEqual(questions[0]['breakdown'], {'A': 1, 'B': 1, 'C': 0, 'D': 0})
+        self.assertEqual(questions[1]['correct_count'], 2)
+        self.assertEqual(leaderboard, [{'player_name': 'Ama', 'score': 2}, {'player_name': 'Kofi', 'score': 1}])
+
+
+# ═══════════════════════════════════════════════════════════════
+# 26) ARENA FEED (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class ArenaFeedTests(unittest.TestCase):
+    """The capped per-room tail and the rows each reader gets from it."""
+
+    def test_feed_keeps_newest_and_replaces_by_id(self):
+        from school_system.livestate import LocalStore
+        st = LocalStore()
+        for i in range(1, 6):
+            st.zadd('feed', f'm{i}', i)
+        st.zkeep('feed', 3)
+        self.assertEqual(st.zsince('feed', 0), ['m3', 'm4', 'm5'])
+        st.zdrop('feed', 4)
+        st.zadd('feed', 'm4-answered', 4)
+        self.assertEqual(st.zsince('feed', 4), ['m4-answered', 'm5'])
+
+    def test_rows_are_deduped_and_marked_per_reader(self):
+        from academics.arena_feed import _for
+        rows = [
+            {'id': 9, 'sender_id': 3, 'battle_answered': False},
+            {'id': 8, 'sender_id': None, 'battle_answered': False},
+            {'id': 9, 'sender_id': 3, 'battle_answered': True},
+        ]
+        out = _for(rows, 3)
+        self.assertEqual([(r['id'], r['is_me']) for r in out], [(8, False), (9, True)])
+        self.assertTrue(out[1]['battle_answered'])
+        self.assertNotIn('sender_id', out[0])
+        self.assertIn('sender_id', rows[0])  # stored rows are left alone
+
+    def test_seeded_feed_keeps_its_expiry(self):
+        from unittest import mock
+        from academics import arena_feed
+        from school_system.livestate import LocalStore
+        st = LocalStore()
+        messages = [mock.Mock(id=i) for i in (2, 1)]
+        query = mock.Mock()
+        query.order_by.return_value = messages
+        with mock.patch.object(arena_feed, '_query', return_value=query), \
+                mock.patch.object(arena_feed, 'payload', lambda m: {'id': m.id}):
+            self.assertTrue(arena_feed._seed(st, 5))
+        self.assertEqual(st.zsince(arena_feed._feed(5), 0), ['{"id": 1}', '{"id": 2}'])
+        self.assertIn(arena_feed._feed(5), st._expires)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 27) SCHEDULER (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class SchedulerCronTests(unittest.TestCase):
+    """Cron parsing, next-run arithmetic and the due check."""
+
+    def test_fields_and_ranges(self):
+        from tenants.scheduler import Cron
+        cron = Cron('*/15 8-9,17 * * 1-5')
+        self.assertEqual(cron.minutes, {0, 15, 30, 45})
+        self.assertEqual(cron.hours, {8, 9, 17})
+        self.assertEqual(cron.dows, {1, 2, 3, 4, 5})
+        self.assertEqual(Cron('0 0 * * 7').dows, {0})  # Sunday either way
+        for bad in ('* * * *', '60 * * * *', '*/0 * * * *'):
+            with self.assertRaises(ValueError):
+                Cron(bad)
+
+    def test_next_after(self):
+        from datetime import datetime
+        from tenants.scheduler import Cron
+        # 2026-10-16 is a Friday.
+        self.assertEqual(Cron('*/5 * * * *').next_after(datetime(2026, 10, 16, 9, 2, 30)),
+                         datetime(2026, 10, 16, 9, 5))
+        self.assertEqual(Cron('0 8 * * 1-5').next_after(datetime(2026, 10, 16, 8, 0)),
+                         datetime(2026, 10, 19, 8, 0))  # skips the weekend
+        self.assertEqual(Cron('30 3 1 * *').next_after(datetime(2026, 12, 15)),
+                         datetime(2027, 1, 1, 3, 30))
+        # Both day fields restricted: either may match.
+        self.assertEqual(Cron('0 0 13 * 5').next_after(datetime(2026, 10, 10)),
+                         datetime(2026, 10, 13))
+
+    def test_due_since_last_tick(self):
+        from datetime import datetime, timezone as tz
+        from tenants.scheduler import Job, due
+        job = Job('nightly', '15 2 * * *', 'tenants.scheduler.prune_claims')
+        last = datetime(2026, 10, 16, 2, 15, tzinfo=tz.utc)  # TIME_ZONE is UTC
+        self.assertFalse(due(job, datetime(2026, 10, 17, 2, 14, tzinfo=tz.utc), last))
+        self.assertTrue(due(job, datetime(2026, 10, 17, 2, 15, tzinfo=tz.utc), last))
+        self.assertTrue(due(job, datetime(2026, 10, 18, 9, 0, tzinfo=tz.utc), last))  # missed runs: once
+        self.assertFalse(due(job, datetime(2026, 10, 17, 9, 0, tzinfo=tz.utc), None))
+
+
+# ═══════════════════════════════════════════════════════════════
+# 28) DATABASE BACKUPS (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class BackupRetargetTests(unittest.TestCase):
+    """Restore scripts are moved to the scratch schema; COPY data is left alone."""
+
+    SCRIPT = [
+        'CREATE SCHEMA greenfield;\n',
+        "SELECT pg_catalog.set_config('search_path', '', false);\n",
+        'CREATE TABLE greenfield.academics_class (\n',
+        "    id bigint DEFAULT nextval('greenfield.academics_class_id_seq'::regclass) NOT NULL,\n",
+        '    name character varying(50) NOT NULL\n',
+        ');\n',
+        'COPY greenfield.academics_class (id, name) FROM stdin;\n',
+        '1\tgreenfield.JHS 1\n',
+        '2\tnotgreenfield.x\n',
+        '\\.\n',
+        'ALTER TABLE ONLY greenfield.academics_class ADD CONSTRAINT fk FOREIGN KEY (x) REFERENCES public.tenants_school(id);\n',
+    ]
+
+    def test_retarget(self):
+        from tenants.backups import retarget
+        out = list(retarget(self.SCRIPT, 'greenfield', 'verify_7'))
+        lines = [line for line, _ in out]
+        self.assertNotIn('CREATE SCHEMA greenfield;\n', lines)
+        self.assertEqual(lines[1], 'CREATE TABLE verify_7.academics_class (\n')
+        self.assertIn("nextval('verify_7.academics_class_id_seq'", lines[2])
+        self.assertEqual(lines[5], 'COPY verify_7.academics_class (id, name) FROM stdin;\n')
+        self.assertEqual(lines[6], '1\tgreenfield.JHS 1\n')  # data untouched
+        self.assertIn('ONLY verify_7.academics_class', lines[-1])
+        self.assertIn('public.tenants_school', lines[-1])
+        kinds = [kind for _, kind in out]
+        self.assertEqual(kinds.count('table'), 1)
+        self.assertEqual(kinds.count('row'), 2)
+
+    def test_stream_round_trip(self):
+        import gzip
+        import hashlib
+        import zlib
+        data = b'PGDMP' + bytes(range(256)) * 5000
+        gz, digest, out = zlib.compressobj(6, zlib.DEFLATED, 31), hashlib.sha256(), b''
+        for i in range(0, len(data), 4096):  # as run() writes it, chunk by chunk
+            block = gz.compress(data[i:i + 4096])
+            out += block
+            digest.update(block)
+        tail = gz.flush()
+        out += tail
+        digest.update(tail)
+        self.assertEqual(gzip.decompress(out), data)
+        self.assertEqual(digest.hexdigest(), hashlib.sha256(out).hexdigest())
+
+
+# ═══════════════════════════════════════════════════════════════
+# 29) PAYMENT WEBHOOK LEDGER (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class WebhookLedgerTests(unittest.TestCase):
+    """Signature check, event identity and retry backoff of tenants.webhooks."""
+
+    def _post(self, body, secret='sk_test', signature=None):
+        import hashlib
+        import hmac
+        from django.test import RequestFactory
+        if signature is None:
+            signature = hmac.new(secret.encode(), body, hashlib.sha512).hexdigest()
+        return RequestFactory().post('/webhook/', data=body, content_type='application/json',
+                                     HTTP_X_PAYSTACK_SIGNATURE=signature)
+
+    def test_receive_rejects_before_touching_the_database(self):
+        import json
+        from django.test import override_settings
+        from tenants import webhooks
+        body = json.dumps({'event': 'charge.success', 'data': {'id': 1, 'reference': 'CR-1-2-x'}}).encode()
+        with override_settings(PAYSTACK_SECRET_KEY='sk_test'):
+            self.assertEqual(webhooks.receive(self._post(body, signature='forged'), 'teachers').status_code, 403)
+            self.assertEqual(webhooks.receive(self._post(b'{not json'), 'teachers').status_code, 400)
+            other = json.dumps({'event': 'transfer.success', 'data': {}}).encode()
+            self.assertEqual(webhooks.receive(self._post(other), 'teachers').status_code, 200)
+        with override_settings(PAYSTACK_SECRET_KEY=''):
+            self.assertEqual(webhooks.receive(self._post(body, secret=''), 'teachers').status_code, 503)
+
+    def test_event_key(self):
+        from tenants.webhooks import event_key
+        self.assertEqual(event_key({'event': 'charge.success', 'data': {'id': 42, 'reference': 'X'}}, b''),
+                         'charge.success:42')
+        self.assertEqual(event_key({'event': 'charge.success', 'data': {'reference': 'PLN-9'}}, b''),
+                         'charge.success:PLN-9')
+        self.assertEqual(event_key({'event': 'charge.success'}, b'body'),
+                         event_key({'event': 'charge.success'}, b'body'))
+
+    def test_retry_backoff(self):
+        from datetime import timedelta
+        from tenants.webhooks import retry_after
+        self.assertEqual(retry_after(1), timedelta(minutes=1))
+        self.assertEqual(retry_after(4), timedelta(minutes=8))
+        self.assertEqual(retry_after(20), timedelta(hours=6))
+
+
+# ═══════════════════════════════════════════════════════════════
+# 30) API-KEY METERING (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class APIMeteringTests(unittest.TestCase):
+    """In-memory counters, daily quotas and the @metered edge checks."""
+
+    INFO = {'id': 7, 'profile_id': 1, 'name': 'CI', 'user': 'Ama', 'email': 'a@x.io', 'tier': 'free',
+            'rate': '1000/m', 'quota': 3, 'day': '', 'used': 0}
+
+    def test_local_counter_take_and_restore(self):
+        from individual_users.metering import LocalCounter
+        meter = LocalCounter()
+        meter.hit(7, '2026-10-19', 100.0)
+        meter.hit(7, '2026-10-19', 105.0)
+        meter.hit(8, '2026-10-19', 101.0)
+        rows, restore, _ = meter.take()
+        self.assertEqual(sorted(rows), [(7, '2026-10-19', 2, 105.0), (8, '2026-10-19', 1, 101.0)])
+        self.assertEqual(meter.take()[0], [])
+        restore()  # a failed flush keeps its counts for the next one
+        meter.hit(7, '2026-10-19', 110.0)
+        self.assertIn((7, '2026-10-19', 3, 110.0), meter.take()[0])
+
+    def test_quota_counts_flushed_calls_too(self):
+        from unittest import mock
+        from django.utils import timezone
+        from individual_users import metering
+        meter = metering.LocalCounter()
+        info = dict(self.INFO, day=timezone.localdate().isoformat(), used=1)
+        with mock.patch.object(metering, 'counter', return_value=meter):
+            self.assertEqual(metering.record(info), (True, 2))
+            self.assertEqual(metering.record(info), (True, 3))
+            self.assertEqual(metering.record(info), (False, 3))  # rejected calls are not counted
+        self.assertEqual(meter.take()[0][0][2], 2)
+
+    def test_metered_edge(self):
+        from unittest import mock
+        from django.http import JsonResponse
+        from django.test import RequestFactory
+        from individual_users import metering
+
+        view = metering.metered(lambda request: JsonResponse({'key': request.api_key['name']}))
+        factory = RequestFactory()
+        self.assertEqual(view(factory.get('/api/status/')).status_code, 401)
+        with mock.patch.object(metering, 'lookup', return_value=None):
+            self.assertEqual(view(factory.get('/api/status/', HTTP_AUTHORIZATION='Bearer nope')).status_code, 401)
+        meter = metering.LocalCounter()
+        with mock.patch.object(metering, 'lookup', return_value=dict(self.INFO)), \
+                mock.patch.object(metering, 'counter', return_value=meter), \
+                mock.patch.object(metering, '_flush_due'), \
+                mock.patch('school_system.ratelimit._call', return_value=(True, 0.0, 0.0)):
+            request = factory.get('/api/status/', HTTP_AUTHORIZATION='Bearer padi_x')
+            responses = [view(request) for _ in range(4)]
+        self.assertEqual([r.status_code for r in responses], [200, 200, 200, 429])
+        self.assertEqual(responses[0]['X-Quota-Remaining'], '2')
+        self.assertEqual(responses[3]['X-Quota-Remaining'], '0')
+        self.assertIn('Retry-After', responses[3])
+
+
+# ═══════════════════════════════════════════════════════════════
+# 31) COLD START (unit, no database)
+# ═══════════════════════════════════════════════════════════════
+class ColdStartTests(unittest.TestCase):
+    """Lazy URL-conf views, the import-time profile and the migration manifest."""
+
+    def _fake_views(self):
+        import sys
+        import types
+        from django.views.decorators.csrf import csrf_exempt
+        from django.db import transaction
+
+        module = types.ModuleType('_coldstart_views')
+        module.plain = lambda request, pk=None: ('plain', pk)
+        module.hook = csrf_exempt(lambda request: 'hook')
+        module.bulk = transaction.non_atomic_requests(lambda request: 'bulk')
+        self.addCleanup(sys.modules.pop, '_coldstart_views', None)
+        return module
+
+    def test_url_conf_probes_do_not_import(self):
+        from unittest import mock
+        from asgiref.sync import iscoroutinefunction
+        from django.urls import path
+        from django.views.decorators.csrf import csrf_exempt
+        from school_system.startup import LazyView, lazy_views
+
+        views = lazy_views('_coldstart_views')
+        with mock.patch('school_system.startup.import_module') as load:
+            view = views.plain
+            self.assertIsInstance(view, LazyView)
+            self.assertEqual((view.__module__, view.__name__), ('_coldstart_views', 'plain'))
+            self.assertFalse(iscoroutinefunction(view))
+            self.assertFalse(hasattr(view, 'view_class'))
+            wrapped = csrf_exempt(view)
+            pattern = path('x/<int:pk>/', wrapped, name='x')
+            self.assertEqual(pattern.lookup_str, '_coldstart_views.plain')
+            load.assert_not_called()
+
+    def test_dispatch_and_markers_load_the_view(self):
+        import sys
+        from school_system.startup import lazy_views, unresolved_views
+
+        sys.modules['_coldstart_views'] = self._fake_views()
+        views = lazy_views('_coldstart_views')
+        self.assertEqual(views.plain(None, pk=3), ('plain', 3))
+        self.assertTrue(views.hook.csrf_exempt)
+        self.assertTrue(getattr(views.bulk, '_non_atomic_requests', None))
+        self.assertFalse(getattr(views.plain, 'csrf_exempt', False))
+
+        class Conf:
+            url_patterns = [__import__('django.urls', fromlist=['path']).path('y/', views.missing)]
+        self.assertEqual(unresolved_views(Conf), ['_coldstart_views.missing'])
+
+    def test_importtime_attribution(self):
+        from school_system.startup import attribute, parse_importtime, percentile
+
+        text = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       300 |        300 |     PIL._util\n'
+            'import time:       900 |       1200 |   PIL\n'
+            'import time:       100 |        100 |   django.http\n'
+            'import time:       500 |       1800 | academics.id_cards\n'
+        )
+        rows = parse_importtime(text)
+        self.assertEqual(rows[1], ('PIL', 900, 1200, 1))
+        by_package, edges = attribute(rows, {'academics'})
+        self.assertEqual(by_package, {'PIL': 1200, 'django': 100, 'academics': 500})
+        self.assertEqual(edges, [('PIL', 1200, 'academics.id_cards'), ('django.http', 100, 'academics.id_cards')])
+        self.assertEqual(percentile([5, 1, 3, 4, 2], 95), 5)
+        self.assertEqual(percentile([5, 1, 3, 4, 2], 50), 3)
+
+    def test_cold_boot_skips_heavy_modules(self):
+        """Regression guard: booting WSGI and the URL conf imports nothing in COLD_FORBIDDEN."""
+        from school_system import startup
+
+        result, _ = startup._boot()
+        loaded = set(result['modules'])
+        self.assertEqual([m for m in startup.COLD_FORBIDDEN if m in loaded], [])
+
+    def test_pending_migrations_from_manifest(self):
+        import tempfile
+        from unittest import mock
+        from school_system.startup import pending_migrations
+
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value.fetchall.return_value = [('academics', '0001_initial')]
+        conn = mock.Mock(cursor=mock.Mock(return_value=cursor))
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = os.path.join(tmp, 'migrations.json')
+            self.assertIsNone(pending_migrations(conn, manifest))
+            with open(manifest, 'w') as fh:
+                fh.write('[["academics", "0001_initial"]]')
+            self.assertFalse(pending_migrations(conn, manifest))
+            with open(manifest, 'w') as fh:
+                fh.write('[["academics", "0001_initial"], ["academics", "0002_initial"]]')
+            self.assertTrue(pending_migrations(conn, manifest))